@@ -0,0 +1,65 @@
+import secrets
+from fastapi import APIRouter
+import numpy as np
+from ..models.character import AbilityScores
+from ..schemas.ability_scores import (
+    AbilityScoreRating,
+    PointBuyResult,
+    StatBlock,
+    StatBlockBatch,
+    StatBlockRequest,
+)
+from ..services import ability_scores
+
+router = APIRouter(prefix="/ability-scores", tags=["ability-scores"])
+
+@router.post("/generate", response_model=StatBlockBatch)
+async def generate_ability_scores(request: StatBlockRequest):
+    """
+    Generate up to 10,000 stat blocks for NPCs or pregenerated characters.
+
+    "roll" rolls 4d6-drop-lowest for each ability; "standard_array" assigns
+    15, 14, 13, 12, 10, 8 (in a random order per block unless shuffle is
+    false). Each block reports its total and the exact percentile of that
+    total among rolled stat blocks.
+    """
+    seed = secrets.randbits(63) if request.seed is None else request.seed
+    rng = np.random.default_rng(seed)
+    if request.method == "roll":
+        blocks = ability_scores.roll_stat_blocks(request.count, rng)
+    else:
+        blocks = ability_scores.standard_array_blocks(request.count, rng, request.shuffle)
+    totals = blocks.sum(axis=1)
+    percentiles = ability_scores.total_percentile(totals)
+    return StatBlockBatch(
+        method=request.method,
+        seed=seed,
+        stat_blocks=[
+            StatBlock(
+                ability_scores=ability_scores.as_ability_scores(block),
+                total=total,
+                percentile=percentile,
+            )
+            for block, total, percentile in zip(blocks.tolist(), totals.tolist(), percentiles.tolist())
+        ],
+    )
+
+def _point_buy(scores: AbilityScores) -> PointBuyResult:
+    cost, errors = ability_scores.point_buy_cost(list(scores.model_dump().values()))
+    return PointBuyResult(valid=not errors, cost=cost, budget=ability_scores.POINT_BUY_BUDGET, errors=errors)
+
+@router.post("/point-buy", response_model=PointBuyResult)
+async def validate_point_buy(scores: AbilityScores):
+    """Check ability scores (before racial bonuses) against the 27-point buy rules"""
+    return _point_buy(scores)
+
+@router.post("/rate", response_model=AbilityScoreRating)
+async def rate_ability_scores(scores: AbilityScores):
+    """Rate ability scores against the exact 4d6-drop-lowest distributions"""
+    values = np.array(list(scores.model_dump().values()))
+    return AbilityScoreRating(
+        total=int(values.sum()),
+        percentile=float(ability_scores.total_percentile(values.sum())),
+        score_percentiles=dict(zip(ability_scores.ABILITIES, ability_scores.score_percentile(values).tolist())),
+        point_buy=_point_buy(scores),
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Literal, Optional
+from ..schemas.analytics import RosterHistogram, RosterSummary
+from ..services.analytics import NUMERIC_FIELDS
+from . import characters
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+GroupBy = Optional[Literal["race", "character_class", "level"]]
+
+@router.get("/summary", response_model=RosterSummary)
+async def roster_summary(
+    group_by: GroupBy = None,
+    percentiles: List[float] = Query([25, 50, 75, 90]),
+):
+    """
+    Count, mean, min, max and percentiles of level, HP and every ability score,
+    for the whole roster or per race, class or level.
+    """
+    try:
+        return await characters.character_service.roster_summary(group_by, tuple(percentiles))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/histogram", response_model=RosterHistogram)
+async def roster_histogram(
+    field: Literal[NUMERIC_FIELDS] = "level",
+    group_by: GroupBy = None,
+):
+    """Distribution of one numeric field, e.g. level histograms by race."""
+    try:
+        return await characters.character_service.roster_histogram(field, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,64 +1,240 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, Body, HTTPException, UploadFile, File, Query, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from typing import Any, Dict, List, Literal, Optional, Union
+from ..config import settings
 from ..models.character import Character
-from ..services.character_service import CharacterService
+from ..schemas.bulk_import import BulkImportReport
+from ..schemas.character import CharacterPage
+from ..schemas.history import CharacterEvent
+from ..schemas.hp_batch import HpBatchReport, HpBatchRequest
+from ..services.async_character_service import AsyncCharacterService
+from ..services.bulk_export import iter_ndjson, iter_zip
+from ..services.character_patch import PatchConflictError, PatchError
+from ..services.character_service import CharacterService, VersionMismatchError
+from ..storage.factory import create_store
 
 router = APIRouter(prefix="/characters", tags=["characters"])
-character_service = CharacterService()
+character_service = AsyncCharacterService(
+    CharacterService(store=create_store(settings), cache_size=settings.cache_size),
+    max_workers=settings.io_workers,
+)
+
+def _format_etag(version: str) -> str:
+    return f'"{version}"'
+
+def _etag_matches(header: str, version: Optional[str], strong: bool = False) -> bool:
+    """
+    Check an If-Match/If-None-Match header against a stored version.
+
+    If-None-Match uses weak comparison, so the weak ETags of MessagePack or
+    compressed responses still match. If-Match needs strong comparison
+    (RFC 9110, section 13.1.1), where a weak tag never matches.
+    """
+    if version is None:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            if strong:
+                continue
+            tag = tag[2:]
+        if tag.strip('"') == version:
+            return True
+    return False
+
+async def _require_etag(character_name: str, if_match: Optional[str]) -> Optional[str]:
+    """Resolve an If-Match header to the version a write must still find."""
+    if if_match is None:
+        return None
+    current = await character_service.get_etag(character_name)
+    if not _etag_matches(if_match, current, strong=True):
+        raise HTTPException(status_code=412, detail="Character has been modified")
+    return current
 
 @router.post("/", response_model=bool)
 async def create_character(character: Character):
     """Create a new character"""
     # Check if character already exists
-    existing = character_service.load_character(character.name)
-    if existing:
+    if await character_service.character_exists(character.name):
         raise HTTPException(status_code=400, detail="Character already exists")
     
-    success = character_service.save_character(character)
+    success = await character_service.save_character(character)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to save character")
     return success
 
+@router.post("/hp", response_model=HpBatchReport)
+async def apply_hp_changes(batch: HpBatchRequest):
+    """
+    Apply damage and healing to many characters at once.
+
+    Each delta is clamped so current_hp stays within 0..max_hp. All targets
+    are read together and written as one batch; the report has a result for
+    every change, in request order.
+    """
+    return await character_service.apply_hp_changes(batch.changes)
+
+@router.get("/export")
+async def export_characters(
+    format: Literal["ndjson", "zip"] = "ndjson",
+    gzip: bool = False,
+    race: Optional[str] = None,
+    character_class: Optional[str] = None,
+    level: Optional[int] = Query(None, ge=1, le=20),
+):
+    """
+    Export every character, or a filtered subset, as a stream.
+
+    ndjson writes one character per line (gzip-compressed when gzip=true);
+    zip writes one JSON file per character (deflated when gzip=true).
+    """
+    records = character_service.service.iter_character_data(
+        race=race, character_class=character_class, level=level
+    )
+    if format == "zip":
+        chunks = iter_zip(records, compress=gzip)
+        media_type, filename = "application/zip", "characters.zip"
+    else:
+        chunks = iter_ndjson(records, gzip=gzip)
+        media_type, filename = "application/x-ndjson", "characters.ndjson"
+        if gzip:
+            media_type, filename = "application/gzip", "characters.ndjson.gz"
+    return StreamingResponse(
+        character_service.iterate(chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/summaries", response_model=CharacterPage)
+async def list_character_summaries(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    race: Optional[str] = None,
+    character_class: Optional[str] = None,
+    level: Optional[int] = Query(None, ge=1, le=20),
+    sort: Literal["name", "level"] = "name",
+    order: Literal["asc", "desc"] = "asc",
+):
+    """
+    List one page of character summaries, optionally filtered by race, class or level.
+
+    Pass the returned next_cursor back to get the following page; it is
+    null on the last one.
+    """
+    try:
+        return await character_service.list_character_summaries(
+            race=race,
+            character_class=character_class,
+            level=level,
+            sort=sort,
+            descending=order == "desc",
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{character_name}", response_model=Character)
-async def get_character(character_name: str):
-    """Get a character by name"""
-    character = character_service.load_character(character_name)
-    if not character:
+async def get_character(character_name: str, response: Response,
+                        if_none_match: Optional[str] = Header(None)):
+    """
+    Get a character by name.
+
+    The response carries an ETag; a request whose If-None-Match still
+    matches gets 304 without the character being read or parsed.
+    """
+    if if_none_match is not None:
+        etag = await character_service.get_etag(character_name)
+        if etag is None:
+            raise HTTPException(status_code=404, detail="Character not found")
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": _format_etag(etag)})
+
+    loaded = await character_service.load_character_with_etag(character_name)
+    if not loaded:
         raise HTTPException(status_code=404, detail="Character not found")
+    character, etag = loaded
+    response.headers["ETag"] = _format_etag(etag)
     return character
 
 @router.get("/", response_model=List[str])
 async def list_characters():
-    """List all characters"""
-    return character_service.list_characters()
+    """List all characters (see /characters/summaries for pages of summaries)"""
+    return await character_service.list_characters()
 
 @router.put("/{character_name}", response_model=bool)
-async def update_character(character_name: str, character: Character):
-    """Update an existing character"""
+async def update_character(character_name: str, character: Character, response: Response,
+                           if_match: Optional[str] = Header(None)):
+    """Update an existing character; If-Match makes the write conditional (412 if stale)"""
     # Check if character exists
-    existing = character_service.load_character(character_name)
-    if not existing:
+    if not await character_service.character_exists(character_name):
         raise HTTPException(status_code=404, detail="Character not found")
     
     # Check if names match (case-insensitive)
     if character_name.lower() != character.name.lower():
         raise HTTPException(status_code=400, detail="Character name mismatch")
     
-    success = character_service.save_character(character)
+    expected_version = await _require_etag(character_name, if_match)
+    try:
+        success = await character_service.save_character(character, expected_version)
+    except VersionMismatchError:
+        raise HTTPException(status_code=412, detail="Character has been modified")
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update character")
+    etag = await character_service.get_etag(character.name)
+    if etag is not None:
+        response.headers["ETag"] = _format_etag(etag)
     return success
 
+@router.patch("/{character_name}", response_model=Character)
+async def patch_character(
+    character_name: str,
+    patch: Union[Dict[str, Any], List[Dict[str, Any]]] = Body(...),
+    content_type: Optional[str] = Header(None),
+    if_match: Optional[str] = Header(None),
+):
+    """
+    Partially update a character.
+
+    The body is a JSON Merge Patch (application/merge-patch+json or
+    application/json) or, with Content-Type application/json-patch+json, a
+    JSON Patch. Only the fields the patch changes are validated (422 if
+    invalid); a failed JSON Patch test gives 409 and a stale If-Match 412.
+    """
+    if not await character_service.character_exists(character_name):
+        raise HTTPException(status_code=404, detail="Character not found")
+
+    expected_version = await _require_etag(character_name, if_match)
+    try:
+        record = await character_service.patch_character(character_name, patch, content_type, expected_version)
+    except VersionMismatchError:
+        raise HTTPException(status_code=412, detail="Character has been modified")
+    except PatchConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except PatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    if record is None:
+        raise HTTPException(status_code=500, detail="Failed to update character")
+    # The stored document is returned as is; untouched fields were not re-validated.
+    return JSONResponse(content=record.data, headers={"ETag": _format_etag(record.version)})
+
 @router.delete("/{character_name}", response_model=bool)
-async def delete_character(character_name: str):
-    """Delete a character by name"""
+async def delete_character(character_name: str, if_match: Optional[str] = Header(None)):
+    """Delete a character by name; If-Match makes the delete conditional (412 if stale)"""
     # Check if character exists
-    existing = character_service.load_character(character_name)
-    if not existing:
+    if not await character_service.character_exists(character_name):
         raise HTTPException(status_code=404, detail="Character not found")
     
-    success = character_service.delete_character(character_name)
+    expected_version = await _require_etag(character_name, if_match)
+    try:
+        success = await character_service.delete_character(character_name, expected_version)
+    except VersionMismatchError:
+        raise HTTPException(status_code=412, detail="Character has been modified")
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete character")
     return success
@@ -66,7 +242,7 @@ async def delete_character(character_name: str):
 @router.get("/export/{character_name}")
 async def export_character(character_name: str):
     """Export a character as a JSON file"""
-    character = character_service.load_character(character_name)
+    character = await character_service.load_character(character_name)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
     
@@ -77,6 +253,37 @@ async def export_character(character_name: str):
         }
     )
 
+@router.get("/{character_name}/history", response_model=List[CharacterEvent])
+async def get_character_history(character_name: str):
+    """List a character's logged changes, oldest first (event log backend only)"""
+    try:
+        events = await character_service.character_history(character_name)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    if events is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return events
+
+@router.post("/{character_name}/undo", response_model=Character)
+async def undo_character(character_name: str):
+    """
+    Revert a character's most recent change (event log backend only).
+
+    Returns the restored character, or 204 if the undo reverted its
+    creation. Repeated undos walk further back through the log.
+    """
+    try:
+        record = await character_service.undo_character(character_name)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Character not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if record is None:
+        return Response(status_code=204)
+    return JSONResponse(content=record.data, headers={"ETag": _format_etag(record.version)})
+
 @router.post("/import")
 async def import_character(file: UploadFile = File(...)):
     """Import a character from a JSON file"""
@@ -89,13 +296,38 @@ async def import_character(file: UploadFile = File(...)):
         character = Character.model_validate_json(character_data)
         
         # Check if character already exists
-        existing = character_service.load_character(character.name)
-        if existing:
+        if await character_service.character_exists(character.name):
             raise HTTPException(status_code=400, detail="Character already exists")
         
-        success = character_service.save_character(character)
+        success = await character_service.save_character(character)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save character")
         return success
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid character data: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=f"Invalid character data: {str(e)}") 
+
+@router.post("/import/bulk", response_model=BulkImportReport)
+async def import_characters(
+    file: UploadFile = File(...),
+    on_conflict: Literal["skip", "overwrite", "fail"] = "skip",
+):
+    """
+    Import many characters from an NDJSON stream or a ZIP of JSON files.
+
+    Records are validated one at a time and written in batches. The report
+    lists the outcome of every record; with on_conflict=fail the import stops
+    at the first existing character and the report is returned with 409. An
+    upload that cannot be read to the end is answered with 400 and the report
+    of the records written before the error.
+    """
+    try:
+        records = await character_service.open_import_records(file.filename or "", file.file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    report = await character_service.import_records(records, on_conflict)
+    if report.error is not None:
+        return JSONResponse(status_code=400, content=report.model_dump())
+    if report.aborted:
+        return JSONResponse(status_code=409, content=report.model_dump())
+    return report
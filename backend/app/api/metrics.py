@@ -0,0 +1,83 @@
+import time
+from fastapi import APIRouter, Response
+from ..metrics import REGISTRY, MetricsRegistry
+from . import characters
+
+router = APIRouter(tags=["metrics"])
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "dnd_http_request_duration_seconds",
+    "Time to handle an HTTP request, by route template",
+    ("method", "route"),
+)
+REQUESTS = REGISTRY.counter(
+    "dnd_http_requests_total",
+    "HTTP requests handled, by route template and status code",
+    ("method", "route", "status"),
+)
+IN_FLIGHT = REGISTRY.gauge("dnd_http_requests_in_flight", "HTTP requests currently being handled")
+
+PROMETHEUS_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency, status codes and requests in flight.
+
+    Requests are labelled with the route template (e.g.
+    ``/characters/{character_name}``) rather than the raw path, so the number
+    of series stays bounded; requests that match no route share one label.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path", "<unmatched>")
+            REQUEST_SECONDS.observe(elapsed, scope["method"], template)
+            REQUESTS.inc(scope["method"], template, str(status))
+
+
+def collect_cache_stats():
+    """Report the character cache counters of the running service."""
+    stats = characters.character_service.cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    yield ("dnd_character_cache_size", "gauge", "Validated characters in the LRU cache",
+           [("", (), stats["size"])])
+    yield ("dnd_character_cache_capacity", "gauge", "Capacity of the LRU cache",
+           [("", (), stats["max_size"])])
+    for counter in ("hits", "misses", "evictions"):
+        yield (f"dnd_character_cache_{counter}_total", "counter", f"LRU cache {counter}",
+               [("", (), stats[counter])])
+    yield ("dnd_character_cache_hit_ratio", "gauge", "Share of cache lookups that were hits",
+           [("", (), stats["hits"] / lookups if lookups else 0.0)])
+
+
+REGISTRY.register_collector(collect_cache_stats)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose request, storage and cache metrics in the Prometheus text format"""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_TEXT)
@@ -0,0 +1,185 @@
+import gzip
+import json
+from typing import List, Optional, Sequence, Tuple
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import msgpack
+except ImportError:  # optional: without it every response is JSON
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzip-compressed
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+# Older names clients still send for MessagePack
+MSGPACK_ALIASES = ("application/x-msgpack", "application/vnd.msgpack")
+# Response types worth compressing; archives and images are already compressed
+COMPRESSIBLE_TYPES = (JSON, MSGPACK, "text/", "application/x-ndjson")
+GZIP_LEVEL = 6
+# Brotli's default quality (11) is meant for static assets; 5 compresses
+# better than gzip at a similar speed
+BROTLI_QUALITY = 5
+# Bodies at least this large are converted on a worker thread, so that
+# re-encoding and compressing them does not stall the event loop
+OFFLOAD_SIZE = 64 * 1024
+
+
+def parse_header(header: str) -> List[Tuple[str, float]]:
+    """Split an Accept or Accept-Encoding header into (value, quality) pairs."""
+    values = []
+    for part in header.split(","):
+        value, _, parameters = part.partition(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, number = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        values.append((value, quality))
+    return values
+
+
+def _quality(offer: str, accepted: List[Tuple[str, float]], aliases: Sequence[str] = ()) -> Optional[float]:
+    """Quality the most specific matching range gives an offer; None if none matches."""
+    best: Optional[Tuple[int, float]] = None
+    offer_type = offer.split("/")[0]
+    for value, quality in accepted:
+        if value == offer or value in aliases:
+            specificity = 3
+        elif value == f"{offer_type}/*":
+            specificity = 2
+        elif value in ("*/*", "*"):
+            specificity = 1
+        else:
+            continue
+        if best is None or specificity > best[0]:
+            best = (specificity, quality)
+    return best[1] if best is not None else None
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    Tell whether an Accept header prefers MessagePack over JSON.
+
+    JSON wins ties, and is the answer when msgpack is not installed.
+    """
+    if msgpack is None or not accept:
+        return False
+    accepted = parse_header(accept)
+    msgpack_quality = _quality(MSGPACK, accepted, MSGPACK_ALIASES) or 0.0
+    json_quality = _quality(JSON, accepted) or 0.0
+    return msgpack_quality > json_quality
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for a response from an Accept-Encoding header.
+
+    Returns:
+        Optional[str]: "br" (if brotli is installed) or "gzip", whichever the
+        client rates higher, preferring br on a tie; None for no compression
+    """
+    if not accept_encoding:
+        return None
+    accepted = parse_header(accept_encoding)
+    best, best_quality = None, 0.0
+    for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+        quality = _quality(coding, accepted) or 0.0
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    """Compress a response body with "gzip" or "br"."""
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class NegotiationMiddleware:
+    """
+    ASGI middleware serving JSON responses as MessagePack and compressing them on request.
+
+    A client whose Accept header prefers application/msgpack gets JSON
+    bodies re-encoded as MessagePack (when msgpack is installed). Bodies of
+    at least ``minimum_size`` bytes are compressed with brotli or gzip as
+    Accept-Encoding allows. Only responses sent in one piece are converted;
+    streamed responses such as bulk exports pass through untouched (they
+    compress themselves with their gzip option), without a Vary header. A
+    converted response's ETag is made weak, since the bytes differ from the
+    stored document's hash. Bodies of at least ``offload_size`` bytes are
+    converted on a worker thread.
+    """
+
+    def __init__(self, app, compress: bool = True, minimum_size: int = 1024, offload_size: int = OFFLOAD_SIZE):
+        self.app = app
+        self.compress = compress
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        to_msgpack = wants_msgpack(request_headers.get("accept"))
+        coding = choose_encoding(request_headers.get("accept-encoding")) if self.compress else None
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] != "http.response.start" and start is None:
+                await send(message)  # the rest of a streamed body
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            response_start, start = start, None
+            if not message.get("more_body", False):
+                headers = MutableHeaders(raw=response_start["headers"])
+                headers.add_vary_header("Accept")
+                if self.compress:
+                    headers.add_vary_header("Accept-Encoding")
+                body = message.get("body", b"")
+                if len(body) >= self.offload_size:
+                    body = await anyio.to_thread.run_sync(self._convert, body, headers, to_msgpack, coding)
+                else:
+                    body = self._convert(body, headers, to_msgpack, coding)
+                message = {"type": "http.response.body", "body": body}
+            await send(response_start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _convert(self, body: bytes, headers: MutableHeaders, to_msgpack: bool, coding: Optional[str]) -> bytes:
+        """Re-encode and compress a complete body, updating the headers to match."""
+        if not body or "content-encoding" in headers:
+            return body
+        content_type = headers.get("content-type", "")
+        converted = False
+        if to_msgpack and content_type.startswith(JSON):
+            body = msgpack.packb(json.loads(body), use_bin_type=True)
+            headers["content-type"] = MSGPACK
+            content_type = MSGPACK
+            converted = True
+        if coding is not None and len(body) >= self.minimum_size and content_type.startswith(COMPRESSIBLE_TYPES):
+            body = compress(body, coding)
+            headers["content-encoding"] = coding
+            converted = True
+        if converted:
+            headers["content-length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["etag"] = f"W/{etag}"
+        return body
@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional
+from ..config import settings
+from ..schemas.profiling import ProfileSummary, RequestProfile
+from ..services.profiling import (
+    MAX_FUNCTIONS,
+    ProfileBuffer,
+    ProfileSession,
+    activate,
+    deactivate,
+    new_profile_id,
+    utc_now,
+)
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+profile_buffer = ProfileBuffer(settings.profile_buffer_size)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles opted-in requests with cProfile.
+
+    A request is profiled when it carries an ``X-Profile: 1`` header or is
+    picked by the sampling rate. Its event loop thread and the storage calls
+    it runs on worker threads are profiled, and the merged result is kept in
+    the profile buffer; the response carries an ``X-Profile-Id`` header to
+    look it up under /admin/profiles. Other coroutines running on the event
+    loop at the same time show up in the loop thread's profile, so only one
+    request is profiled at a time.
+    """
+
+    def __init__(self, app, buffer: Optional[ProfileBuffer] = None, sample_rate: float = 0.0):
+        self.app = app
+        self.buffer = buffer if buffer is not None else profile_buffer
+        self.sample_rate = sample_rate
+        self._busy = threading.Lock()
+
+    def _reason(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER and value.strip().lower() in (b"1", b"true", b"yes"):
+                return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        reason = self._reason(scope) if scope["type"] == "http" else None
+        if reason is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        profile_id = new_profile_id()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        session = ProfileSession()
+        token = activate(session)
+        started_at = utc_now()
+        started = time.perf_counter()
+        loop_profile = session.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if loop_profile is not None:
+                loop_profile.disable()
+            duration = time.perf_counter() - started
+            deactivate(token)
+            self._busy.release()
+            total_calls, functions = session.functions()
+            self.buffer.add(RequestProfile(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                status=status,
+                reason=reason,
+                started_at=started_at,
+                duration_ms=duration * 1000,
+                total_calls=total_calls,
+                functions=functions,
+                skipped_profilers=session.skipped,
+            ))
+
+
+@router.get("", response_model=List[ProfileSummary])
+async def list_profiles():
+    """List the buffered request profiles, newest first"""
+    return profile_buffer.list()
+
+@router.get("/{profile_id}", response_model=RequestProfile)
+async def get_profile(profile_id: str, limit: int = Query(25, ge=1, le=MAX_FUNCTIONS)):
+    """Show a request profile's top functions by cumulative time"""
+    profile = profile_buffer.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.model_copy(update={"functions": profile.functions[:limit]})
+
+@router.delete("", status_code=204)
+async def clear_profiles():
+    """Drop every buffered profile"""
+    profile_buffer.clear()
+    return Response(status_code=204)
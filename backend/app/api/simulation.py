@@ -0,0 +1,68 @@
+import secrets
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import numpy as np
+from ..config import settings
+from ..schemas.simulation import MAX_COMBATANT_HP, DiceRollResult, EncounterRequest, EncounterResult
+from ..services.dice import parse_dice
+from ..services.simulation import (
+    ENEMIES,
+    PARTY,
+    EncounterSimulator,
+    combatant_from_character,
+    combatants_from_monster,
+)
+from . import characters
+
+router = APIRouter(tags=["simulation"])
+simulator = EncounterSimulator(max_workers=settings.sim_workers)
+
+@router.get("/dice/roll", response_model=DiceRollResult)
+def roll_dice(
+    expression: str = Query(..., max_length=200, examples=["4d6kh3"]),
+    count: int = Query(1, ge=1, le=10_000),
+    seed: Optional[int] = Query(None, ge=0),
+):
+    """Roll a dice expression such as 4d6kh3 or 2d20kl1+5, count times (sampled on a worker thread)"""
+    try:
+        dice = parse_dice(expression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    seed = secrets.randbits(63) if seed is None else seed
+    rolls = dice.sample(np.random.default_rng(seed), count)
+    return DiceRollResult(
+        expression=str(dice),
+        seed=seed,
+        minimum=dice.minimum,
+        maximum=dice.maximum,
+        mean=float(rolls.mean()),
+        rolls=rolls.tolist(),
+    )
+
+@router.post("/simulations/encounter", response_model=EncounterResult)
+async def simulate_encounter(request: EncounterRequest):
+    """
+    Estimate a party's odds against monsters and/or other stored characters.
+
+    Runs `trials` independent fights on the simulation process pool and
+    returns win rates and end-of-fight HP distributions. The same seed
+    always gives the same result.
+    """
+    if not request.monsters and not request.enemies:
+        raise HTTPException(status_code=400, detail="An encounter needs at least one enemy")
+    combatants = []
+    for side, names in ((PARTY, request.party), (ENEMIES, request.enemies)):
+        for name in names:
+            character = await characters.character_service.load_character(name)
+            if character is None:
+                raise HTTPException(status_code=404, detail=f"Character not found: {name}")
+            if max(character.max_hp, character.current_hp) > MAX_COMBATANT_HP:
+                raise HTTPException(status_code=400,
+                                    detail=f"{name} has more than {MAX_COMBATANT_HP} HP to simulate")
+            combatants.append(combatant_from_character(character, side))
+    try:
+        for monster in request.monsters:
+            combatants.extend(combatants_from_monster(monster))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await simulator.simulate(combatants, request.trials, request.max_rounds, request.seed)
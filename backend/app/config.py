@@ -0,0 +1,112 @@
+import os
+from pathlib import Path
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class Settings(BaseModel):
+    """
+    Runtime configuration, read from ``DND_*`` environment variables.
+
+    Attributes:
+        storage_backend: "json" for one file per character, "sqlite" for a database,
+            "eventlog" for append-only mutation logs with snapshots
+        data_dir: Directory used by the JSON store
+        storage_encoding: How the JSON store writes files: "indented" JSON,
+            "compact" JSON or "msgpack" (needs msgpack); all three are read
+        sqlite_path: Database file used by the SQLite store
+        event_log_dir: Directory used by the event log store
+        log_compact_every: Logged events per character between snapshots
+        log_undo_depth: Changes per character that can be undone
+        index_snapshot: Persist the JSON store's indexes and load them at startup
+        index_snapshot_interval: Seconds between index snapshots while the
+            indexes change (0 = only on shutdown)
+        watch_files: Follow edits made to the data directory outside the API
+            (JSON store only)
+        watch_mode: "inotify", "poll", or "auto" for inotify with a polling fallback
+        watch_debounce: Seconds without new changes that end a batch of them
+        watch_poll_interval: Seconds between scans of the data directory when polling
+        cache_size: Number of validated characters kept in the LRU cache
+        io_workers: Size of the thread pool that runs storage calls
+        write_behind: Buffer saves in memory and flush them in groups
+        write_behind_interval: Seconds a buffered save waits for more saves
+            before its group is flushed
+        write_behind_max_batch: Buffered characters that trigger an early flush
+        write_behind_fsync: "never" to leave syncing to the OS, "batch" to
+            fsync every flushed group
+        write_behind_max_retries: Failed flushes in a row after which the
+            flusher stops retrying and saves flush (and fail) themselves
+        sim_workers: Worker processes for encounter simulations (None = one
+            per CPU, 0 = run in threads without starting processes)
+        metrics_enabled: Record request and storage timings and serve /metrics
+        profiling_enabled: Allow requests to be profiled and serve /admin/profiles
+        profile_sample_rate: Share of requests profiled without asking (0-1)
+        profile_buffer_size: Number of request profiles kept
+        response_compression: Compress responses with brotli or gzip when the
+            client accepts it
+        compression_min_size: Smallest response body, in bytes, worth compressing
+    """
+    storage_backend: Literal["json", "sqlite", "eventlog"] = "json"
+    data_dir: Path = Path("data/characters")
+    storage_encoding: Literal["indented", "compact", "msgpack"] = "indented"
+    sqlite_path: Path = Path("data/characters.db")
+    event_log_dir: Path = Path("data/character_logs")
+    log_compact_every: int = Field(default=100, ge=1)
+    log_undo_depth: int = Field(default=100, ge=0)
+    index_snapshot: bool = True
+    index_snapshot_interval: float = Field(default=300, ge=0)
+    watch_files: bool = False
+    watch_mode: Literal["auto", "inotify", "poll"] = "auto"
+    watch_debounce: float = Field(default=0.5, ge=0)
+    watch_poll_interval: float = Field(default=2.0, gt=0)
+    cache_size: int = Field(default=1024, ge=0)
+    io_workers: int = Field(default=8, ge=1)
+    write_behind: bool = False
+    write_behind_interval: float = Field(default=0.05, gt=0)
+    write_behind_max_batch: int = Field(default=500, ge=1)
+    write_behind_fsync: Literal["never", "batch"] = "never"
+    write_behind_max_retries: int = Field(default=8, ge=1)
+    sim_workers: Optional[int] = Field(default=None, ge=0)
+    metrics_enabled: bool = True
+    profiling_enabled: bool = False
+    profile_sample_rate: float = Field(default=0.0, ge=0, le=1)
+    profile_buffer_size: int = Field(default=50, ge=1)
+    response_compression: bool = True
+    compression_min_size: int = Field(default=1024, ge=0)
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from the environment, falling back to defaults."""
+        env = {
+            "storage_backend": os.environ.get("DND_STORAGE_BACKEND"),
+            "data_dir": os.environ.get("DND_DATA_DIR"),
+            "storage_encoding": os.environ.get("DND_STORAGE_ENCODING"),
+            "sqlite_path": os.environ.get("DND_SQLITE_PATH"),
+            "event_log_dir": os.environ.get("DND_EVENT_LOG_DIR"),
+            "log_compact_every": os.environ.get("DND_LOG_COMPACT_EVERY"),
+            "log_undo_depth": os.environ.get("DND_LOG_UNDO_DEPTH"),
+            "index_snapshot": os.environ.get("DND_INDEX_SNAPSHOT"),
+            "index_snapshot_interval": os.environ.get("DND_INDEX_SNAPSHOT_INTERVAL"),
+            "watch_files": os.environ.get("DND_WATCH_FILES"),
+            "watch_mode": os.environ.get("DND_WATCH_MODE"),
+            "watch_debounce": os.environ.get("DND_WATCH_DEBOUNCE"),
+            "watch_poll_interval": os.environ.get("DND_WATCH_POLL_INTERVAL"),
+            "cache_size": os.environ.get("DND_CACHE_SIZE"),
+            "io_workers": os.environ.get("DND_IO_WORKERS"),
+            "write_behind": os.environ.get("DND_WRITE_BEHIND"),
+            "write_behind_interval": os.environ.get("DND_WRITE_BEHIND_INTERVAL"),
+            "write_behind_max_batch": os.environ.get("DND_WRITE_BEHIND_MAX_BATCH"),
+            "write_behind_fsync": os.environ.get("DND_WRITE_BEHIND_FSYNC"),
+            "write_behind_max_retries": os.environ.get("DND_WRITE_BEHIND_MAX_RETRIES"),
+            "sim_workers": os.environ.get("DND_SIM_WORKERS"),
+            "metrics_enabled": os.environ.get("DND_METRICS_ENABLED"),
+            "profiling_enabled": os.environ.get("DND_PROFILING_ENABLED"),
+            "profile_sample_rate": os.environ.get("DND_PROFILE_SAMPLE_RATE"),
+            "profile_buffer_size": os.environ.get("DND_PROFILE_BUFFER_SIZE"),
+            "response_compression": os.environ.get("DND_RESPONSE_COMPRESSION"),
+            "compression_min_size": os.environ.get("DND_COMPRESSION_MIN_SIZE"),
+        }
+        return cls(**{key: value for key, value in env.items() if value is not None})
+
+
+settings = Settings.from_env()
@@ -0,0 +1,164 @@
+import asyncio
+import contextlib
+import functools
+import threading
+from collections import deque
+from contextvars import Context, ContextVar, copy_context
+from typing import AsyncIterator, Callable, Deque, FrozenSet, Iterable, Iterator, List, Tuple
+
+# Stripes held by the running thread or task, as (KeyLocks id, stripe index).
+# Context variables follow a task into the worker threads it hands calls to
+# (see AsyncCharacterService._run), so a stripe taken by the task is not
+# taken again, and deadlocked on, by the storage call running on its behalf.
+_held: ContextVar[FrozenSet[Tuple[int, int]]] = ContextVar("held_key_locks", default=frozenset())
+
+
+class _Stripe:
+    """A lock that threads wait on by blocking and coroutines wait on by awaiting."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._waiters_lock = threading.Lock()
+
+    def acquire(self) -> None:
+        self._lock.acquire()
+
+    async def acquire_async(self) -> None:
+        if self._lock.acquire(blocking=False):
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            with self._waiters_lock:
+                self._waiters.append((loop, future))
+            # Retry after queueing, so a release between the two steps is not missed
+            if self._lock.acquire(blocking=False):
+                self._forget(loop, future)
+                return
+            try:
+                await future
+            except asyncio.CancelledError:
+                self._forget(loop, future)
+                raise
+            if self._lock.acquire(blocking=False):
+                return
+
+    def _forget(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future) -> None:
+        """Drop a waiter that no longer waits, passing on a wake-up it already got."""
+        with self._waiters_lock:
+            try:
+                self._waiters.remove((loop, future))
+            except ValueError:
+                pass
+        if future.done() and not future.cancelled():
+            self._wake_one()
+
+    def release(self) -> None:
+        self._lock.release()
+        self._wake_one()
+
+    def _wake_one(self) -> None:
+        with self._waiters_lock:
+            if not self._waiters:
+                return
+            loop, future = self._waiters.popleft()
+        loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class KeyLocks:
+    """
+    Striped per-key locks shared by threads and coroutines.
+
+    Keys are hashed onto a fixed number of stripes, so memory stays constant
+    however many characters there are, and operations on keys that land on
+    different stripes never wait for each other. Threads block on a stripe;
+    coroutines await it without blocking the event loop (hold_async). Holding
+    a stripe is re-entrant within one context, including the worker threads
+    a coroutine hands its calls to. Several keys are always locked in stripe
+    order, so batches cannot deadlock against each other.
+    """
+
+    def __init__(self, stripes: int = 64):
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._stripes = [_Stripe() for _ in range(stripes)]
+
+    def _indexes(self, keys: Iterable[str]) -> List[int]:
+        held = _held.get()
+        indexes = {hash(key) % len(self._stripes) for key in keys}
+        return sorted(index for index in indexes if (id(self), index) not in held)
+
+    def _mark_held(self, indexes: List[int]):
+        return _held.set(_held.get() | {(id(self), index) for index in indexes})
+
+    def _release(self, acquired: List[int]) -> None:
+        for index in reversed(acquired):
+            self._stripes[index].release()
+
+    async def _acquire_async(self, indexes: List[int], acquired: List[int]) -> None:
+        for index in indexes:
+            await self._stripes[index].acquire_async()
+            acquired.append(index)
+
+    @contextlib.contextmanager
+    def hold(self, *keys: str) -> Iterator[None]:
+        """Hold the stripes of ``keys`` in the calling thread."""
+        indexes = self._indexes(keys)
+        acquired = []
+        try:
+            for index in indexes:
+                self._stripes[index].acquire()
+                acquired.append(index)
+            token = self._mark_held(indexes)
+            try:
+                yield
+            finally:
+                _held.reset(token)
+        finally:
+            self._release(acquired)
+
+    @contextlib.asynccontextmanager
+    async def hold_async(self, *keys: str) -> AsyncIterator[None]:
+        """Hold the stripes of ``keys`` in the calling task, awaiting them if they are busy."""
+        indexes = self._indexes(keys)
+        acquired: List[int] = []
+        try:
+            await self._acquire_async(indexes, acquired)
+            token = self._mark_held(indexes)
+            try:
+                yield
+            finally:
+                _held.reset(token)
+        finally:
+            self._release(acquired)
+
+    async def acquire_for_worker(self, *keys: str) -> Tuple[Context, Callable[[], None]]:
+        """
+        Await the stripes of ``keys`` for work the calling task hands to another thread.
+
+        Unlike hold_async, the stripes are not tied to the task: they stay
+        held until the returned release function is called (from any
+        thread), so cancelling the task cannot free them while the work
+        still runs.
+
+        Returns:
+            Tuple[Context, Callable[[], None]]: A copy of the calling context
+                in which the stripes are marked held, to run the work in, and
+                the function that releases them; call it exactly once
+        """
+        indexes = self._indexes(keys)
+        acquired: List[int] = []
+        try:
+            await self._acquire_async(indexes, acquired)
+        except BaseException:
+            self._release(acquired)
+            raise
+        context = copy_context()
+        context.run(self._mark_held, indexes)
+        return context, functools.partial(self._release, acquired)
@@ -1,11 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api import characters
+from .api import ability_scores, analytics, characters, metrics, negotiation, profiling, simulation
+from .config import settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up character files edited or copied in outside the API
+    if settings.watch_files:
+        characters.character_service.start_watching(settings.watch_mode, settings.watch_debounce,
+                                                    settings.watch_poll_interval)
+    yield
+    # Every step runs even if an earlier one fails, ending with the store closed
+    try:
+        characters.character_service.stop_watching()
+    finally:
+        try:
+            # Release the storage worker threads and simulation processes on shutdown
+            characters.character_service.shutdown()
+        finally:
+            try:
+                # Write-behind mode: persist saves that are still buffered
+                characters.character_service.flush()
+            finally:
+                try:
+                    # Save the index snapshot the next start loads instead of reading every file
+                    characters.character_service.checkpoint()
+                finally:
+                    try:
+                        simulation.simulator.shutdown()
+                    finally:
+                        characters.character_service.close()
 
 app = FastAPI(
     title="D&D Character Builder",
     description="A D&D 5e Character Builder API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -17,9 +48,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Serve MessagePack and compressed responses to clients that ask for them
+app.add_middleware(negotiation.NegotiationMiddleware, compress=settings.response_compression,
+                   minimum_size=settings.compression_min_size)
+
+# Record request latency for /metrics
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Profile requests that ask for it (X-Profile: 1) or are sampled
+if settings.profiling_enabled:
+    app.add_middleware(profiling.ProfilingMiddleware, sample_rate=settings.profile_sample_rate)
+
 # Include routers
 app.include_router(characters.router)
+app.include_router(analytics.router)
+app.include_router(simulation.router)
+app.include_router(ability_scores.router)
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
+if settings.profiling_enabled:
+    app.include_router(profiling.router)
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to D&D Character Builder API"} 
\ No newline at end of file
+    return {"message": "Welcome to D&D Character Builder API"}
\ No newline at end of file
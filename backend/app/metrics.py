@@ -0,0 +1,218 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets (seconds) from 100 µs to 10 s
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# A sample is (metric name suffix, label pairs, value)
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    text = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+    return f"{{{text}}}" if text else ""
+
+
+class Metric:
+    """Base class for a named metric with a fixed set of label names."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(zip(self.labelnames, values))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A value that only goes up, e.g. a number of requests."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [("", self._labels(labels), value) for labels, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. requests in flight."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Histogram(Metric):
+    """
+    Observations counted into fixed buckets, per combination of labels.
+
+    Recording is a bisect and three additions under a lock; cumulative
+    bucket counts are only computed when the metric is rendered.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation; the series is created on first use."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One count per bucket, then +Inf, sum and count
+                series = self._series[labels] = [0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *labels: str) -> _Timer:
+        """Context manager that observes the time spent inside it, in seconds."""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return int(series[-1]) if series is not None else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        samples: List[Sample] = []
+        for labels, series in snapshot.items():
+            pairs = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                samples.append(("_bucket", pairs + (("le", _format_value(bound)),), cumulative))
+            samples.append(("_sum", pairs, series[-2]))
+            samples.append(("_count", pairs, series[-1]))
+        return samples
+
+
+# A collector is called at render time and returns (name, kind, help, samples)
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class MetricsRegistry:
+    """Metrics of one process, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        """Add a callback that reports values owned elsewhere (e.g. cache counters)."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric and collector in the Prometheus text format (0.0.4)."""
+        with self._lock:
+            families = [
+                (metric.name, metric.kind, metric.documentation, metric.samples())
+                for metric in self._metrics.values()
+            ]
+            collectors = list(self._collectors)
+        for collector in collectors:
+            families.extend(collector())
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+OPERATION_SECONDS = REGISTRY.histogram(
+    "dnd_character_operation_seconds",
+    "Time spent in character storage operations (parse time is also counted in read)",
+    ("operation",),
+)
+
+
+def timed(operation: str) -> _Timer:
+    """Time a block of code as one character storage operation."""
+    return OPERATION_SECONDS.time(operation)
@@ -1,6 +1,11 @@
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from pydantic import BaseModel, Field
 
+# Version of the Character schema that stored records are stamped with.
+# Bump it whenever a field or constraint changes, so that records written
+# under the old schema go through lax validation again (see validate_trusted).
+SCHEMA_VERSION = 1
+
 class AbilityScores(BaseModel):
     strength: int = Field(ge=1, le=20)
     dexterity: int = Field(ge=1, le=20)
@@ -49,4 +54,29 @@ class Character(BaseModel):
                     }
                 ]
             }
-        } 
\ No newline at end of file
+        }
+
+
+
+def validate_trusted(character_data: Dict[str, Any]) -> Character:
+    """
+    Build a Character from a document that already passed validation.
+
+    Only for documents known to be ``Character.model_dump()`` output of the
+    current SCHEMA_VERSION, such as store records whose stamp checked out
+    (see StoredRecord.trusted). Such documents hold every value with its
+    exact type, so they go through strict validation, which skips the type
+    coercion lax validation tries and is measurably cheaper per inventory
+    item than ``Character(**data)``. The result is the same model: a
+    document that is not exact model_dump output fails instead.
+
+    Args:
+        character_data (Dict[str, Any]): The validated character document
+
+    Returns:
+        Character: The character
+
+    Raises:
+        ValidationError: If the document does not validate strictly
+    """
+    return Character.model_validate(character_data, strict=True)
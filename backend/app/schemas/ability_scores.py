@@ -0,0 +1,41 @@
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+from ..models.character import AbilityScores
+
+
+class StatBlockRequest(BaseModel):
+    """How many stat blocks to generate, and how."""
+    method: Literal["roll", "standard_array"] = "roll"
+    count: int = Field(default=1, ge=1, le=10_000)
+    seed: Optional[int] = Field(default=None, ge=0)
+    shuffle: bool = True
+
+
+class StatBlock(BaseModel):
+    """One generated set of ability scores and how it compares to rolled sets."""
+    ability_scores: AbilityScores
+    total: int
+    percentile: float
+
+
+class StatBlockBatch(BaseModel):
+    """Generated stat blocks; the seed reproduces the batch."""
+    method: str
+    seed: int
+    stat_blocks: List[StatBlock]
+
+
+class PointBuyResult(BaseModel):
+    """Whether a set of ability scores is a legal point buy."""
+    valid: bool
+    cost: Optional[int]
+    budget: int
+    errors: List[str]
+
+
+class AbilityScoreRating(BaseModel):
+    """Exact percentiles of a set of ability scores against 4d6-drop-lowest rolls."""
+    total: int
+    percentile: float
+    score_percentiles: Dict[str, float]
+    point_buy: PointBuyResult
@@ -0,0 +1,40 @@
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
+
+GroupKey = Union[str, int, None]
+
+
+class FieldStats(BaseModel):
+    """Aggregates of one numeric field within a group."""
+    mean: float
+    min: int
+    max: int
+    percentiles: Dict[str, float] = {}
+
+
+class GroupStats(BaseModel):
+    """Aggregates of every numeric field for one group of characters."""
+    key: GroupKey = None
+    count: int
+    fields: Dict[str, FieldStats]
+
+
+class RosterSummary(BaseModel):
+    """Roster-wide aggregates, optionally broken down by a grouping field."""
+    count: int
+    group_by: Optional[str] = None
+    groups: List[GroupStats] = []
+
+
+class GroupHistogram(BaseModel):
+    """Counts per bin for one group; aligned with RosterHistogram.bins."""
+    key: GroupKey = None
+    counts: List[int]
+
+
+class RosterHistogram(BaseModel):
+    """Distribution of a numeric field over the observed values."""
+    field: str
+    group_by: Optional[str] = None
+    bins: List[int]
+    groups: List[GroupHistogram] = []
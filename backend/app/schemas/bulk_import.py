@@ -0,0 +1,31 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+ImportStatus = Literal["created", "updated", "skipped", "invalid", "conflict", "error"]
+
+
+class ImportResult(BaseModel):
+    """Outcome of importing one record."""
+    record: str
+    name: Optional[str] = None
+    status: ImportStatus
+    error: Optional[str] = None
+
+
+class BulkImportReport(BaseModel):
+    """
+    Counts and per-record outcomes of a bulk import.
+
+    ``aborted`` is set when the import stopped early, at a conflict under
+    on_conflict="fail" or, with ``error`` set, because the rest of the
+    upload could not be read; the records reported before that were written.
+    """
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    conflicts: int = 0
+    errors: int = 0
+    aborted: bool = False
+    error: Optional[str] = None
+    results: List[ImportResult] = []
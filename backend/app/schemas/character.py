@@ -0,0 +1,18 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class CharacterSummary(BaseModel):
+    """The fields shown for each row of a character listing."""
+    name: str
+    race: str
+    character_class: str
+    level: int
+    max_hp: int
+    current_hp: int
+
+
+class CharacterPage(BaseModel):
+    """One page of a filtered, sorted character listing."""
+    items: List[CharacterSummary]
+    next_cursor: Optional[str] = None
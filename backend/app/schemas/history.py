@@ -0,0 +1,10 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class CharacterEvent(BaseModel):
+    """One logged change of a character."""
+    seq: int
+    op: str
+    at: Optional[str] = None
+    fields: List[str] = []
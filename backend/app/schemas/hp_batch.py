@@ -0,0 +1,33 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+HpChangeStatus = Literal["updated", "not_found", "invalid", "error"]
+
+
+class HpChange(BaseModel):
+    """Damage (negative delta) or healing (positive delta) for one character."""
+    name: str
+    delta: int
+
+
+class HpBatchRequest(BaseModel):
+    """HP changes to apply together, e.g. everyone caught in one area effect."""
+    changes: List[HpChange] = Field(max_length=2000)
+
+
+class HpChangeResult(BaseModel):
+    """Outcome of one HP change."""
+    name: str
+    status: HpChangeStatus
+    previous_hp: Optional[int] = None
+    current_hp: Optional[int] = None
+    error: Optional[str] = None
+
+
+class HpBatchReport(BaseModel):
+    """Counts and per-change outcomes of a batch HP update."""
+    updated: int = 0
+    not_found: int = 0
+    invalid: int = 0
+    errors: int = 0
+    results: List[HpChangeResult] = []
@@ -0,0 +1,34 @@
+from typing import List, Literal
+from pydantic import BaseModel
+
+
+class ProfiledFunction(BaseModel):
+    """Time spent in one function during a profiled request."""
+    function: str
+    calls: int
+    total_time: float
+    cumulative_time: float
+
+
+class ProfileSummary(BaseModel):
+    """A profiled request, without its function breakdown."""
+    id: str
+    method: str
+    path: str
+    status: int
+    reason: Literal["header", "sampled"]
+    started_at: str
+    duration_ms: float
+
+
+class RequestProfile(ProfileSummary):
+    """
+    A profiled request with its slowest functions, by cumulative time.
+
+    ``skipped_profilers`` counts profilers that could not be enabled because
+    another one was active; on Python 3.12+ worker threads are still covered
+    by the event loop's profiler.
+    """
+    total_calls: int
+    functions: List[ProfiledFunction]
+    skipped_profilers: int = 0
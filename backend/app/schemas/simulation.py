@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+# Bounds on an encounter's size. End-of-fight HP histograms are as long as a
+# combatant's max HP, once per combatant per chunk of trials.
+MAX_COMBATANT_HP = 1000
+MAX_COMBATANTS = 100
+
+
+class DiceRollResult(BaseModel):
+    """Rolls of one dice expression and their summary statistics."""
+    expression: str
+    seed: int
+    minimum: int
+    maximum: int
+    mean: float
+    rolls: List[int]
+
+
+class MonsterSpec(BaseModel):
+    """An ad-hoc opponent that is not a stored character."""
+    name: str
+    max_hp: int = Field(ge=1, le=MAX_COMBATANT_HP)
+    armor_class: int = Field(ge=1, le=30)
+    attack_bonus: int = Field(ge=-5, le=20)
+    damage: str = Field(default="1d6", max_length=50)
+    attacks: int = Field(default=1, ge=1, le=4)
+    initiative_bonus: int = Field(default=0, ge=-5, le=10)
+    count: int = Field(default=1, ge=1, le=50)
+
+
+class EncounterRequest(BaseModel):
+    """A party of stored characters against monsters and/or other stored characters."""
+    party: List[str] = Field(min_length=1, max_length=20)
+    monsters: List[MonsterSpec] = Field(default=[], max_length=20)
+    enemies: List[str] = Field(default=[], max_length=20)
+    trials: int = Field(default=10_000, ge=1, le=2_000_000)
+    max_rounds: int = Field(default=50, ge=1, le=500)
+    seed: Optional[int] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def check_combatant_count(self) -> "EncounterRequest":
+        combatants = len(self.party) + len(self.enemies) + sum(monster.count for monster in self.monsters)
+        if combatants > MAX_COMBATANTS:
+            raise ValueError(f"An encounter can have at most {MAX_COMBATANTS} combatants, not {combatants}")
+        return self
+
+
+class CombatantOutcome(BaseModel):
+    """How one combatant ended the simulated encounters."""
+    name: str
+    side: str
+    survival_rate: float
+    mean_hp: float
+    hp_percentiles: Dict[str, int]
+
+
+class EncounterResult(BaseModel):
+    """Win rates and end-of-fight HP distributions over every trial."""
+    trials: int
+    seed: int
+    party_win_rate: float
+    enemy_win_rate: float
+    draw_rate: float
+    mean_rounds: float
+    combatants: List[CombatantOutcome]
@@ -0,0 +1,128 @@
+import functools
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..models.character import AbilityScores
+from .dice import parse_dice
+
+ABILITIES = tuple(AbilityScores.model_fields)
+STANDARD_ARRAY = (15, 14, 13, 12, 10, 8)
+POINT_BUY_BUDGET = 27
+POINT_BUY_COSTS = {8: 0, 9: 1, 10: 2, 11: 3, 12: 4, 13: 5, 14: 7, 15: 9}
+ROLL = parse_dice("4d6kh3")
+
+
+@functools.lru_cache(maxsize=None)
+def score_distribution() -> np.ndarray:
+    """
+    Exact distribution of one 4d6-drop-lowest score.
+
+    Computed once by enumerating all 6^4 rolls.
+
+    Returns:
+        np.ndarray: Read-only P(score = s), indexed by s (0..18)
+    """
+    faces = np.arange(1, 7)
+    rolls = np.array(np.meshgrid(faces, faces, faces, faces, indexing="ij")).reshape(4, -1)
+    scores = rolls.sum(axis=0) - rolls.min(axis=0)
+    pmf = np.bincount(scores, minlength=19) / rolls.shape[1]
+    pmf.setflags(write=False)
+    return pmf
+
+
+@functools.lru_cache(maxsize=None)
+def total_distribution() -> np.ndarray:
+    """
+    Exact distribution of the sum of six 4d6-drop-lowest scores.
+
+    Returns:
+        np.ndarray: Read-only P(total = t), indexed by t (0..108)
+    """
+    pmf = np.array([1.0])
+    for _ in ABILITIES:
+        pmf = np.convolve(pmf, score_distribution())
+    pmf.setflags(write=False)
+    return pmf
+
+
+@functools.lru_cache(maxsize=None)
+def _cdf(table: str) -> np.ndarray:
+    pmf = score_distribution() if table == "score" else total_distribution()
+    cdf = np.minimum(np.cumsum(pmf), 1.0)
+    cdf.setflags(write=False)
+    return cdf
+
+
+def _lookup(cdf: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return 100 * np.where(values < 0, 0.0, cdf[np.clip(values, 0, len(cdf) - 1)])
+
+
+def score_percentile(scores: np.ndarray) -> np.ndarray:
+    """
+    Percent of 4d6-drop-lowest rolls at or below each score.
+
+    A table lookup per value; scores above 18 count as 100.
+    """
+    return _lookup(_cdf("score"), np.asarray(scores))
+
+
+def total_percentile(totals: np.ndarray) -> np.ndarray:
+    """Percent of rolled stat blocks (six 4d6-drop-lowest scores) whose total is at or below each total."""
+    return _lookup(_cdf("total"), np.asarray(totals))
+
+
+def roll_stat_blocks(count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Roll ``count`` stat blocks of six 4d6-drop-lowest scores at once.
+
+    Returns:
+        np.ndarray: (count, 6) scores in ABILITIES order
+    """
+    return ROLL.sample(rng, count * len(ABILITIES)).reshape(count, len(ABILITIES))
+
+
+def standard_array_blocks(count: int, rng: np.random.Generator, shuffle: bool = True) -> np.ndarray:
+    """
+    Assign the standard array to ``count`` stat blocks.
+
+    Args:
+        count: Number of stat blocks
+        rng: Random generator for the assignment
+        shuffle: Assign the scores to abilities in a random order per block
+            instead of highest-first
+
+    Returns:
+        np.ndarray: (count, 6) scores in ABILITIES order
+    """
+    base = np.array(STANDARD_ARRAY)
+    if not shuffle:
+        return np.tile(base, (count, 1))
+    return base[np.argsort(rng.random((count, len(base))), axis=1)]
+
+
+def point_buy_cost(scores: Sequence[int]) -> Tuple[Optional[int], List[str]]:
+    """
+    Price a set of ability scores under 5e point buy (before racial bonuses).
+
+    Args:
+        scores: Six scores in ABILITIES order
+
+    Returns:
+        Tuple[Optional[int], List[str]]: Points spent (None if any score is
+            outside 8-15) and the reasons the scores are not a legal buy
+    """
+    errors = [
+        f"{ability} must be between 8 and 15 for point buy (got {score})"
+        for ability, score in zip(ABILITIES, scores)
+        if score not in POINT_BUY_COSTS
+    ]
+    if errors:
+        return None, errors
+    cost = sum(POINT_BUY_COSTS[score] for score in scores)
+    if cost > POINT_BUY_BUDGET:
+        errors.append(f"Costs {cost} points, more than the budget of {POINT_BUY_BUDGET}")
+    return cost, errors
+
+
+def as_ability_scores(block: Sequence[int]) -> Dict[str, int]:
+    """Map a row of scores onto AbilityScores field names."""
+    return dict(zip(ABILITIES, (int(score) for score in block)))
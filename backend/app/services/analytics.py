@@ -0,0 +1,230 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+import numpy as np
+from ..schemas.analytics import FieldStats, GroupHistogram, GroupStats, RosterHistogram, RosterSummary
+
+ABILITY_FIELDS = ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma")
+NUMERIC_FIELDS = ("level", "max_hp", "current_hp") + ABILITY_FIELDS
+CATEGORY_FIELDS = ("race", "character_class")
+GROUP_FIELDS = CATEGORY_FIELDS + ("level",)
+
+T = TypeVar("T")
+
+
+def extract_row(character_data: Dict[str, Any]) -> Tuple[List[int], List[str]]:
+    """
+    Pull the analytics columns out of a stored character document.
+
+    Raises:
+        ValueError: If a column is missing or has the wrong type
+    """
+    try:
+        abilities = character_data["ability_scores"]
+        numbers = [character_data[field] for field in NUMERIC_FIELDS[:3]]
+        numbers += [abilities[field] for field in ABILITY_FIELDS]
+        categories = [character_data[field] for field in CATEGORY_FIELDS]
+    except (KeyError, TypeError):
+        raise ValueError("Character is missing analytics fields")
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in numbers):
+        raise ValueError("Analytics fields must be integers")
+    if not all(isinstance(value, str) for value in categories):
+        raise ValueError("Race and class must be strings")
+    return numbers, categories
+
+
+class RosterColumns:
+    """
+    The numeric and categorical fields of every character as NumPy columns.
+
+    Rows are addressed by store key and kept dense: a removed row is
+    replaced by the last one, so every column is a contiguous array of
+    ``size`` values. Race and class are stored as integer codes into a
+    per-column list of values. ``revision`` changes on every update, which
+    lets callers cache results computed from the columns.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._numbers = np.zeros((len(NUMERIC_FIELDS), capacity), dtype=np.int64)
+        self._codes = np.zeros((len(CATEGORY_FIELDS), capacity), dtype=np.int64)
+        self._values: List[List[str]] = [[] for _ in CATEGORY_FIELDS]
+        self._value_codes: List[Dict[str, int]] = [{} for _ in CATEGORY_FIELDS]
+        self._rows: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self.revision = 0
+        self.lock = threading.Lock()
+        self._results: Dict[Tuple[Any, ...], Any] = {}
+        self._results_revision = 0
+
+    @classmethod
+    def build(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "RosterColumns":
+        """Build columns from (key, character data) pairs, skipping unusable records."""
+        columns = cls()
+        for key, data in records:
+            columns.upsert(key, data)
+        return columns
+
+    @property
+    def size(self) -> int:
+        return len(self._keys)
+
+    def _grow(self) -> None:
+        capacity = self._numbers.shape[1] * 2
+        numbers = np.zeros((len(NUMERIC_FIELDS), capacity), dtype=np.int64)
+        codes = np.zeros((len(CATEGORY_FIELDS), capacity), dtype=np.int64)
+        numbers[:, :self.size] = self._numbers[:, :self.size]
+        codes[:, :self.size] = self._codes[:, :self.size]
+        self._numbers, self._codes = numbers, codes
+
+    def _code(self, column: int, value: str) -> int:
+        codes = self._value_codes[column]
+        if value not in codes:
+            codes[value] = len(self._values[column])
+            self._values[column].append(value)
+        return codes[value]
+
+    def upsert(self, key: str, character_data: Dict[str, Any]) -> None:
+        """Insert or update a character's row; unusable documents are dropped."""
+        try:
+            numbers, categories = extract_row(character_data)
+        except ValueError:
+            self.remove(key)
+            return
+        with self.lock:
+            row = self._rows.get(key)
+            if row is None:
+                if self.size == self._numbers.shape[1]:
+                    self._grow()
+                row = self.size
+                self._rows[key] = row
+                self._keys.append(key)
+            self._numbers[:, row] = numbers
+            self._codes[:, row] = [self._code(i, value) for i, value in enumerate(categories)]
+            self.revision += 1
+
+    def remove(self, key: str) -> None:
+        """Drop a character's row, if present."""
+        with self.lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return
+            last = self.size - 1
+            last_key = self._keys.pop()
+            if row != last:
+                self._numbers[:, row] = self._numbers[:, last]
+                self._codes[:, row] = self._codes[:, last]
+                self._rows[last_key] = row
+                self._keys[row] = last_key
+            self.revision += 1
+
+    def _memoized(self, key: Tuple[Any, ...], compute: Callable[[], T]) -> T:
+        """Reuse a result computed at the current revision, or compute and keep it."""
+        with self.lock:
+            if self._results_revision != self.revision:
+                self._results, self._results_revision = {}, self.revision
+            revision = self.revision
+            if key in self._results:
+                return self._results[key]
+        result = compute()
+        with self.lock:
+            if self.revision == revision:
+                self._results[key] = result
+        return result
+
+    def _group_codes(self, group_by: Optional[str]) -> Tuple[np.ndarray, List[Any]]:
+        """Return each row's group code and the group keys; call with the lock held."""
+        if group_by is None:
+            return np.zeros(self.size, dtype=np.int64), [None]
+        if group_by == "level":
+            levels = self._numbers[NUMERIC_FIELDS.index("level"), :self.size]
+            keys, codes = np.unique(levels, return_inverse=True)
+            return codes, [int(key) for key in keys]
+        if group_by not in CATEGORY_FIELDS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        column = CATEGORY_FIELDS.index(group_by)
+        return self._codes[column, :self.size].copy(), list(self._values[column])
+
+    def summary(self, group_by: Optional[str] = None,
+                percentiles: Sequence[float] = (25, 50, 75, 90)) -> RosterSummary:
+        """
+        Count, mean, min, max and percentiles of every numeric field, per group.
+
+        Args:
+            group_by: "race", "character_class", "level" or None for the whole roster
+            percentiles: Percentiles (0-100) to report for each field
+
+        Returns:
+            RosterSummary: One entry per non-empty group, largest first
+
+        Raises:
+            ValueError: If group_by or a percentile is not supported
+        """
+        if group_by is not None and group_by not in GROUP_FIELDS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        if any(not 0 <= q <= 100 for q in percentiles):
+            raise ValueError("Percentiles must be between 0 and 100")
+        return self._memoized(("summary", group_by, tuple(percentiles)),
+                              lambda: self._summary(group_by, percentiles))
+
+    def _summary(self, group_by: Optional[str], percentiles: Sequence[float]) -> RosterSummary:
+        with self.lock:
+            codes, keys = self._group_codes(group_by)
+            numbers = self._numbers[:, :self.size].copy()
+        counts = np.bincount(codes, minlength=len(keys))
+        present = np.flatnonzero(counts)
+        sums = np.stack([np.bincount(codes, weights=column, minlength=len(keys)) for column in numbers])
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        quantiles = np.asarray(percentiles, dtype=float)
+
+        groups = []
+        for group in present:
+            segment = numbers[:, order[bounds[group]:bounds[group + 1]]]
+            minimum, maximum = segment.min(axis=1), segment.max(axis=1)
+            marks = np.percentile(segment, quantiles, axis=1) if len(quantiles) else np.empty((0, len(NUMERIC_FIELDS)))
+            groups.append(GroupStats(
+                key=keys[group],
+                count=int(counts[group]),
+                fields={
+                    field: FieldStats(
+                        mean=float(sums[i, group] / counts[group]),
+                        min=int(minimum[i]),
+                        max=int(maximum[i]),
+                        percentiles={f"p{q:g}": float(marks[j, i]) for j, q in enumerate(quantiles)},
+                    )
+                    for i, field in enumerate(NUMERIC_FIELDS)
+                },
+            ))
+        groups.sort(key=lambda group: (-group.count, str(group.key)))
+        return RosterSummary(count=int(counts.sum()), group_by=group_by, groups=groups)
+
+    def histogram(self, field: str, group_by: Optional[str] = None) -> RosterHistogram:
+        """
+        Count how many characters have each value of a numeric field, per group.
+
+        Args:
+            field: A numeric field, e.g. "level" or an ability score
+            group_by: "race", "character_class", "level" or None
+
+        Returns:
+            RosterHistogram: The observed values and the counts of each group
+
+        Raises:
+            ValueError: If the field or group_by is not supported
+        """
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Unsupported field: {field}")
+        return self._memoized(("histogram", field, group_by), lambda: self._histogram(field, group_by))
+
+    def _histogram(self, field: str, group_by: Optional[str]) -> RosterHistogram:
+        with self.lock:
+            codes, keys = self._group_codes(group_by)
+            values = self._numbers[NUMERIC_FIELDS.index(field), :self.size].copy()
+        bins, positions = np.unique(values, return_inverse=True)
+        counts = np.zeros((len(keys), len(bins)), dtype=np.int64)
+        np.add.at(counts, (codes, positions), 1)
+        groups = [
+            GroupHistogram(key=keys[group], counts=counts[group].tolist())
+            for group in np.flatnonzero(counts.sum(axis=1))
+        ]
+        groups.sort(key=lambda group: str(group.key))
+        return RosterHistogram(field=field, group_by=group_by, bins=bins.tolist(), groups=groups)
@@ -0,0 +1,203 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from ..models.character import Character
+from ..schemas.analytics import RosterHistogram, RosterSummary
+from ..schemas.bulk_import import BulkImportReport
+from ..schemas.character import CharacterPage
+from ..schemas.history import CharacterEvent
+from ..schemas.hp_batch import HpBatchReport, HpChange
+from ..storage.base import StoredRecord
+from .bulk_import import ConflictPolicy, RawRecord, import_batch, open_import_records, read_batch
+from .character_service import CharacterService
+from .hp_batch import apply_hp_changes
+from .profiling import profiled
+
+T = TypeVar("T")
+
+
+class AsyncCharacterService:
+    """
+    Awaitable facade over CharacterService.
+
+    Every storage call is handed to a bounded thread pool so that slow disk
+    I/O never blocks the event loop. The pool size caps how many file
+    operations run at once; further calls queue until a worker is free.
+
+    Writes first await their characters' locks on the event loop, so writes
+    queued behind another write to the same character do not tie up workers.
+    """
+
+    def __init__(self, service: Optional[CharacterService] = None, max_workers: int = 8):
+        self.service = service if service is not None else CharacterService()
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="character-io",
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        # Bind to the request's profile session (if any) before leaving its context,
+        # and carry the context (and so the locks the task holds) into the worker
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._get_executor(),
+                                          functools.partial(context.run, profiled(func), *args))
+
+    async def _run_locked(self, character_names: Iterable[str], func: Callable[..., T], *args: Any) -> T:
+        keys = [self.service.store.key_for(name) for name in character_names]
+        context, release = await self.service.locks.acquire_for_worker(*keys)
+        try:
+            future = self._get_executor().submit(context.run, profiled(func), *args)
+        except BaseException:
+            release()
+            raise
+        # Release when the worker is done, not when this task is: a cancelled
+        # request must not free the characters while its write still runs
+        future.add_done_callback(lambda _: release())
+        return await asyncio.wrap_future(future)
+
+    async def save_character(self, character: Character, expected_version: Optional[str] = None) -> bool:
+        """Save a character without blocking the event loop."""
+        return await self._run_locked([character.name], self.service.save_character, character, expected_version)
+
+    async def patch_character(self, character_name: str, patch: Any, content_type: Optional[str] = None,
+                              expected_version: Optional[str] = None) -> Optional[StoredRecord]:
+        """Patch a character without blocking the event loop."""
+        return await self._run_locked([character_name], self.service.patch_character, character_name, patch,
+                                      content_type, expected_version)
+
+    async def character_exists(self, character_name: str) -> bool:
+        """Check for a character without blocking the event loop."""
+        return await self._run(self.service.character_exists, character_name)
+
+    async def get_etag(self, character_name: str) -> Optional[str]:
+        """Look up a character's version without blocking the event loop."""
+        return await self._run(self.service.get_etag, character_name)
+
+    async def load_character_with_etag(self, character_name: str) -> Optional[Tuple[Character, str]]:
+        """Load a character and its version without blocking the event loop."""
+        return await self._run(self.service.load_character_with_etag, character_name)
+
+    async def load_character(self, character_name: str) -> Optional[Character]:
+        """Load a character without blocking the event loop."""
+        return await self._run(self.service.load_character, character_name)
+
+    async def list_characters(self) -> List[str]:
+        """List character names without blocking the event loop."""
+        return await self._run(self.service.list_characters)
+
+    async def list_character_summaries(self, **query: Any) -> CharacterPage:
+        """List a page of character summaries without blocking the event loop."""
+        return await self._run(functools.partial(self.service.list_character_summaries, **query))
+
+    async def delete_character(self, character_name: str, expected_version: Optional[str] = None) -> bool:
+        """Delete a character without blocking the event loop."""
+        return await self._run_locked([character_name], self.service.delete_character, character_name,
+                                      expected_version)
+
+    async def character_history(self, character_name: str) -> Optional[List[CharacterEvent]]:
+        """Read a character's change log without blocking the event loop."""
+        return await self._run(self.service.character_history, character_name)
+
+    async def undo_character(self, character_name: str) -> Optional[StoredRecord]:
+        """Undo a character's last change without blocking the event loop."""
+        return await self._run_locked([character_name], self.service.undo_character, character_name)
+
+    async def roster_summary(self, group_by: Optional[str] = None,
+                             percentiles: Tuple[float, ...] = (25, 50, 75, 90)) -> RosterSummary:
+        """Aggregate the roster on the worker pool."""
+        return await self._run(self.service.roster_summary, group_by, percentiles)
+
+    async def roster_histogram(self, field: str, group_by: Optional[str] = None) -> RosterHistogram:
+        """Build a roster histogram on the worker pool."""
+        return await self._run(self.service.roster_histogram, field, group_by)
+
+    async def open_import_records(self, filename: str, fileobj: BinaryIO) -> Iterator[RawRecord]:
+        """Pick a record reader for an upload, probing ZIP/gzip files on the worker pool."""
+        return await self._run(open_import_records, filename, fileobj)
+
+    async def import_records(self, records: Iterator[RawRecord], on_conflict: ConflictPolicy = "skip",
+                             batch_size: int = 500) -> BulkImportReport:
+        """
+        Run a bulk import on the worker pool, one batch at a time.
+
+        Each batch is read and parsed on a worker, then written like the
+        other writes: its characters' locks are awaited on the event loop
+        first, so imports queued behind other writes do not tie up workers.
+        """
+        report = BulkImportReport()
+        while True:
+            batch = await self._run(read_batch, records, batch_size, report)
+            if not batch:
+                break
+            names = [character.name for _, character in batch if isinstance(character, Character)]
+            await self._run_locked(names, import_batch, self.service, batch, report, on_conflict)
+            if report.aborted:
+                break
+        return report
+
+    async def apply_hp_changes(self, changes: List[HpChange]) -> HpBatchReport:
+        """Apply a batch of HP changes on the worker pool."""
+        return await self._run_locked([change.name for change in changes], apply_hp_changes, self.service, changes)
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """
+        Drain a blocking iterator from the worker pool.
+
+        Each ``next()`` call runs on a worker thread, so generators that read
+        from storage (e.g. bulk exports) can be streamed from async code.
+        """
+        done = object()
+        while True:
+            item = await self._run(next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Report cache counters; this never touches the disk."""
+        return self.service.cache_stats()
+
+    def flush(self) -> int:
+        """
+        Write out buffered saves from the calling thread.
+
+        Returns:
+            int: Number of characters written
+        """
+        return self.service.flush()
+
+    def checkpoint(self) -> bool:
+        """Persist the store's startup state (e.g. its index snapshot) from the calling thread."""
+        return self.service.checkpoint()
+
+    def start_watching(self, mode: str = "auto", debounce: float = 0.5, poll_interval: float = 2.0) -> bool:
+        """Follow out-of-band edits to the storage; see CharacterService.start_watching."""
+        return self.service.start_watching(mode, debounce, poll_interval)
+
+    def stop_watching(self) -> None:
+        """Stop following out-of-band edits."""
+        self.service.stop_watching()
+
+    def close(self) -> None:
+        """Release the underlying store from the calling thread."""
+        self.service.close()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker threads.
+
+        A new pool is created on the next call, so shutting down is safe even
+        if the service is used again afterwards (e.g. across test clients).
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
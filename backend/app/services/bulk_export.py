@@ -0,0 +1,92 @@
+import json
+import zipfile
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Output is buffered into chunks of roughly this size before being yielded,
+# so each chunk costs one hop through the I/O thread pool.
+CHUNK_SIZE = 64 * 1024
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that collects bytes for streaming."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        self.size = 0
+        return data
+
+
+def iter_ndjson(records: Iterable[Record], gzip: bool = False) -> Iterator[bytes]:
+    """
+    Encode records as newline-delimited JSON, one character per line.
+
+    Args:
+        records: (key, character data) pairs
+        gzip: Compress the stream with gzip
+
+    Yields:
+        bytes: Chunks of the encoded stream
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    buffer: List[bytes] = []
+    buffered = 0
+    for _, data in records:
+        line = json.dumps(data, separators=(',', ':')).encode('utf-8') + b"\n"
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= CHUNK_SIZE:
+            chunk = b"".join(buffer)
+            buffer, buffered = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def iter_zip(records: Iterable[Record], compress: bool = False) -> Iterator[bytes]:
+    """
+    Encode records as a ZIP archive of per-character JSON files.
+
+    Entries are named ``<key>.json`` and formatted like the files of the
+    JSON store. The archive is written to an unseekable sink, so zipfile
+    emits data descriptors and nothing but the current entry is held in
+    memory.
+
+    Args:
+        records: (key, character data) pairs
+        compress: Deflate each entry instead of storing it
+
+    Yields:
+        bytes: Chunks of the archive
+    """
+    sink = _ChunkSink()
+    method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(sink, mode='w', compression=method) as archive:
+        for key, data in records:
+            with archive.open(f"{key}.json", mode='w') as entry:
+                entry.write(json.dumps(data, indent=4).encode('utf-8'))
+            if sink.size >= CHUNK_SIZE:
+                yield sink.drain()
+    data = sink.drain()
+    if data:
+        yield data
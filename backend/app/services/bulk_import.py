@@ -0,0 +1,225 @@
+import gzip
+import itertools
+import zipfile
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, Literal, Tuple, Union
+from pydantic import ValidationError
+from ..models.character import Character
+from ..schemas.bulk_import import BulkImportReport, ImportResult
+from .character_service import CharacterService
+
+ConflictPolicy = Literal["skip", "overwrite", "fail"]
+
+# (record label, raw JSON bytes)
+RawRecord = Tuple[str, bytes]
+
+# Largest record (NDJSON line or ZIP entry, after decompression) read into memory
+MAX_RECORD_BYTES = 1024 * 1024
+
+
+class RecordTooLargeError(ValueError):
+    """A record of an upload is larger than MAX_RECORD_BYTES (e.g. a decompression bomb)."""
+
+
+# Raised while reading a truncated, corrupt or oversized upload
+READ_ERRORS = (OSError, EOFError, zipfile.BadZipFile, zlib.error, RecordTooLargeError)
+
+
+def _too_large(label: str) -> RecordTooLargeError:
+    return RecordTooLargeError(f"{label} is larger than {MAX_RECORD_BYTES} bytes")
+
+
+def iter_ndjson_records(fileobj: BinaryIO) -> Iterator[RawRecord]:
+    """
+    Yield the non-blank lines of an NDJSON stream, labelled by line number.
+
+    Raises:
+        RecordTooLargeError: If a line is longer than MAX_RECORD_BYTES
+    """
+    line_number = 0
+    while True:
+        line = fileobj.readline(MAX_RECORD_BYTES + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > MAX_RECORD_BYTES:
+            raise _too_large(f"line {line_number}")
+        if line.strip():
+            yield f"line {line_number}", line
+
+
+def iter_zip_records(fileobj: BinaryIO) -> Iterator[RawRecord]:
+    """
+    Yield every ``*.json`` entry of a ZIP archive, labelled by entry name.
+
+    Entries are decompressed as a stream and no more than MAX_RECORD_BYTES
+    of each is read, whatever size the archive claims for it.
+
+    Raises:
+        RecordTooLargeError: If an entry is larger than MAX_RECORD_BYTES
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith('.json'):
+                continue
+            if info.file_size > MAX_RECORD_BYTES:
+                raise _too_large(info.filename)
+            with archive.open(info) as entry:
+                raw = entry.read(MAX_RECORD_BYTES + 1)
+            if len(raw) > MAX_RECORD_BYTES:
+                raise _too_large(info.filename)
+            yield info.filename, raw
+
+
+def open_import_records(filename: str, fileobj: BinaryIO) -> Iterator[RawRecord]:
+    """
+    Pick a record reader for an uploaded file based on its extension.
+
+    Accepts ``.ndjson``/``.jsonl`` (optionally ``.gz``) and ``.zip``.
+
+    Raises:
+        ValueError: If the file type is not supported or the archive is corrupt
+    """
+    name = filename.lower()
+    if name.endswith('.zip'):
+        try:
+            zipfile.ZipFile(fileobj).close()
+        except zipfile.BadZipFile:
+            raise ValueError("File is not a valid ZIP archive")
+        fileobj.seek(0)
+        return iter_zip_records(fileobj)
+    if name.endswith('.gz'):
+        name = name[:-3]
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode='rb')
+    if name.endswith(('.ndjson', '.jsonl')):
+        return iter_ndjson_records(fileobj)
+    raise ValueError("File must be an NDJSON (.ndjson, .jsonl, optionally .gz) or ZIP file")
+
+
+def _summarize_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in issue['loc']) or 'record'}: {issue['msg']}"
+        for issue in error.errors()
+    )
+
+
+def read_batch(records: Iterator[RawRecord], size: int,
+               report: BulkImportReport) -> List[Tuple[str, Union[Character, ValidationError]]]:
+    """
+    Parse up to ``size`` records from the stream.
+
+    If the upload cannot be read any further (see READ_ERRORS), the records
+    read so far are returned and ``report`` is marked aborted with the error,
+    so the caller stores them and stops.
+
+    Returns:
+        (label, character) pairs, with the validation error in place of the
+        character for invalid records; an empty list once the stream is done
+    """
+    batch: List[Tuple[str, Union[Character, ValidationError]]] = []
+    try:
+        for label, raw in itertools.islice(records, size):
+            try:
+                batch.append((label, Character.model_validate_json(raw)))
+            except ValidationError as e:
+                batch.append((label, e))
+    except READ_ERRORS as e:
+        report.aborted = True
+        report.error = f"Unreadable upload: {e}"
+    return batch
+
+
+def import_batch(service: CharacterService, batch: List[Tuple[str, Union[Character, ValidationError]]],
+                 report: BulkImportReport, on_conflict: ConflictPolicy = "skip") -> None:
+    """
+    Store one batch of parsed records (see read_batch), adding their results to ``report``.
+
+    Callers importing concurrently with other writes should hold the locks
+    of the batch's characters (see CharacterService.locked), so that the
+    conflict checks and the writes see the same state. Sets report.aborted
+    if a conflict stops the import under "fail".
+    """
+    pending: Dict[str, Tuple[ImportResult, Character]] = {}
+
+    def flush() -> None:
+        if not pending:
+            return
+        batch = list(pending.values())
+        pending.clear()
+        if service.save_characters([character for _, character in batch]):
+            for result, _ in batch:
+                if result.status == "created":
+                    report.created += 1
+                else:
+                    report.updated += 1
+            return
+        for result, _ in batch:
+            result.status, result.error = "error", "Failed to save character"
+            report.errors += 1
+
+    for label, character in batch:
+        if isinstance(character, ValidationError):
+            report.results.append(ImportResult(record=label, status="invalid", error=_summarize_error(character)))
+            report.invalid += 1
+            continue
+
+        key = service.store.key_for(character.name)
+        if key in pending:
+            # A later duplicate in the same upload: settle the earlier one first
+            flush()
+        if service.character_exists(character.name):
+            if on_conflict == "skip":
+                report.results.append(ImportResult(record=label, name=character.name, status="skipped"))
+                report.skipped += 1
+                continue
+            if on_conflict == "fail":
+                flush()
+                report.results.append(ImportResult(
+                    record=label, name=character.name, status="conflict", error="Character already exists"
+                ))
+                report.conflicts += 1
+                report.aborted = True
+                return
+            result = ImportResult(record=label, name=character.name, status="updated")
+        else:
+            result = ImportResult(record=label, name=character.name, status="created")
+        report.results.append(result)
+        pending[key] = (result, character)
+
+    flush()
+
+
+def import_records(service: CharacterService, records: Iterator[RawRecord],
+                   on_conflict: ConflictPolicy = "skip", batch_size: int = 500) -> BulkImportReport:
+    """
+    Validate and store characters from a stream of raw JSON records.
+
+    Records are read and written in batches of ``batch_size``, so memory
+    use does not depend on the size of the upload. A record conflicts when
+    a character with the same storage key already exists, either in the
+    store or earlier in the same upload. On conflict, "skip" leaves the
+    stored character alone, "overwrite" replaces it and "fail" stops the
+    import; records before the conflict are still written. An upload that
+    turns out to be truncated or corrupt also stops the import, after the
+    records read before the error are written (see read_batch).
+
+    Args:
+        service (CharacterService): Service to write through
+        records (Iterator[RawRecord]): Labelled raw JSON records
+        on_conflict (ConflictPolicy): "skip", "overwrite" or "fail"
+        batch_size (int): Records read and written per batch
+
+    Returns:
+        BulkImportReport: Counts and per-record results
+    """
+    report = BulkImportReport()
+    while True:
+        batch = read_batch(records, batch_size, report)
+        if not batch:
+            break
+        names = [character.name for _, character in batch if isinstance(character, Character)]
+        with service.locked(*names):
+            import_batch(service, batch, report, on_conflict)
+        if report.aborted:
+            break
+    return report
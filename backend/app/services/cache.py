@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Bounded least-recently-used cache with hit/miss/eviction counters.
+
+    All operations take an internal lock, so one cache can be shared by the
+    worker threads that serve storage calls.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+        self.max_size = max_size
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._data
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Look up a value and mark it as most recently used.
+
+        Args:
+            key (K): Cache key
+
+        Returns:
+            Optional[V]: The cached value or None on a miss
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Insert or replace a value, evicting the least recently used entry if full."""
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Drop a single entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the current size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
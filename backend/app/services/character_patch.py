@@ -0,0 +1,215 @@
+import copy
+from typing import Any, Dict, List, Optional
+from ..models.character import Character
+
+MERGE_PATCH = "application/merge-patch+json"
+JSON_PATCH = "application/json-patch+json"
+
+
+class PatchError(ValueError):
+    """Raised when a patch document is malformed or cannot be applied."""
+
+
+class PatchConflictError(PatchError):
+    """Raised when a JSON Patch ``test`` operation does not hold."""
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply an RFC 7396 JSON Merge Patch.
+
+    Args:
+        target: The document to patch; it is not modified
+        patch: The merge patch
+
+    Returns:
+        Any: The patched document
+    """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def _parse_pointer(pointer: Any) -> List[str]:
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == "":
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: List[Any], token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        if isinstance(document, dict):
+            if token not in document:
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_list_index(document, token, allow_end=False)]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        raise PatchError(f"Cannot add to /{'/'.join(tokens[:-1])}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise PatchError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1])
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, tokens[-1], allow_end=False))
+    raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def apply_json_patch(target: Any, operations: Any) -> Any:
+    """
+    Apply an RFC 6902 JSON Patch.
+
+    Operations are applied to a copy in order; if any of them fails the
+    target is left untouched.
+
+    Args:
+        target: The document to patch; it is not modified
+        operations: The list of patch operations
+
+    Returns:
+        Any: The patched document
+
+    Raises:
+        PatchError: If the patch is malformed or a path does not exist
+        PatchConflictError: If a ``test`` operation fails
+    """
+    if not isinstance(operations, list):
+        raise PatchError("A JSON Patch must be a list of operations")
+    document = copy.deepcopy(target)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise PatchError(f"Invalid patch operation: {operation!r}")
+        op = operation["op"]
+        tokens = _parse_pointer(operation["path"])
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise PatchError(f"Operation {op!r} requires a value")
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(document, tokens)
+        elif op == "replace":
+            _resolve(document, tokens)
+            if tokens:
+                _remove(document, tokens)
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op in ("move", "copy"):
+            source = _parse_pointer(operation.get("from"))
+            if op == "move" and tokens[:len(source)] == source and tokens != source:
+                raise PatchError("Cannot move a value into one of its children")
+            value = _remove(document, source) if op == "move" else copy.deepcopy(_resolve(document, source))
+            document = _add(document, tokens, value)
+        elif op == "test":
+            if _resolve(document, tokens) != operation["value"]:
+                raise PatchConflictError(f"Test failed at {operation['path']}")
+        else:
+            raise PatchError(f"Unsupported patch operation: {op!r}")
+    return document
+
+
+def apply_patch(target: Dict[str, Any], patch: Any, content_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Apply a merge patch or a JSON Patch, chosen by media type.
+
+    Args:
+        target: The stored character document
+        patch: The parsed patch body
+        content_type: The request's Content-Type; JSON Patch is used for
+            ``application/json-patch+json``, merge patch otherwise
+
+    Returns:
+        Dict[str, Any]: The patched document
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type == JSON_PATCH:
+        patched = apply_json_patch(target, patch)
+    elif isinstance(patch, dict):
+        patched = apply_merge_patch(target, patch)
+    else:
+        raise PatchError("A merge patch must be a JSON object")
+    if not isinstance(patched, dict):
+        raise PatchError("A patch must leave the character a JSON object")
+    return patched
+
+
+def validate_changes(current: Dict[str, Any], patched: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the top-level fields a patch changed, and only those.
+
+    Each changed field is checked with Pydantic's assignment validation
+    against a character built from the stored document without validation,
+    so untouched fields are neither re-validated nor re-serialized. Removing
+    a field that has a default resets it to that default.
+
+    Args:
+        current: The stored character document
+        patched: The document after the patch was applied
+
+    Returns:
+        Dict[str, Any]: Field name -> validated, JSON-ready value for every
+            changed field
+
+    Raises:
+        PatchError: If the patch renames the character or touches unknown
+            or required fields
+        pydantic.ValidationError: If a changed field violates its constraints
+    """
+    changed = {
+        field for field in current.keys() | patched.keys()
+        if field not in patched or field not in current or patched[field] != current[field]
+    }
+    if "name" in changed:
+        raise PatchError("The character name cannot be changed with PATCH")
+    unknown = changed - Character.model_fields.keys()
+    if unknown:
+        raise PatchError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    character = Character.model_construct(**current)
+    for field in sorted(changed):
+        if field in patched:
+            value = patched[field]
+        elif Character.model_fields[field].is_required():
+            raise PatchError(f"Required field cannot be removed: {field}")
+        else:
+            value = Character.model_fields[field].get_default(call_default_factory=True)
+        Character.__pydantic_validator__.validate_assignment(character, field, value)
+    return character.model_dump(include=changed) if changed else {}
+
@@ -1,93 +1,672 @@
-import json
-import os
+import threading
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
-from ..models.character import Character
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from ..locks import KeyLocks
+from ..metrics import timed
+from ..models.character import Character, validate_trusted
+from ..schemas.analytics import RosterHistogram, RosterSummary
+from ..schemas.character import CharacterPage, CharacterSummary
+from ..schemas.history import CharacterEvent
+from ..storage.base import CharacterStore, StoredRecord
+from ..storage.json_store import JsonCharacterStore
+from .analytics import RosterColumns
+from .cache import LRUCache
+from .character_patch import apply_patch, validate_changes
+
+
+class VersionMismatchError(Exception):
+    """Raised when a conditional write finds a different stored version."""
+
+    def __init__(self, expected: str, actual: Optional[str]):
+        super().__init__(f"Expected version {expected}, found {actual}")
+        self.expected = expected
+        self.actual = actual
+
+
+@dataclass
+class CachedCharacter:
+    """A validated character together with the store version it was read at."""
+    character: Character
+    version: str
+
 
 class CharacterService:
-    def __init__(self):
-        self.save_dir = Path("data/characters")
-        self.save_dir.mkdir(parents=True, exist_ok=True)
+    """
+    Character persistence with validation and caching on top of a CharacterStore.
+
+    Defaults to the JSON directory store. Instances are safe to share between
+    threads: the cache and the stores guard their own in-memory state, while
+    storage I/O runs without holding a service-wide lock. Writes to one
+    character (including their version checks and read-modify-write cycles)
+    are serialized by striped per-key locks (see KeyLocks), so writes to
+    different characters still run in parallel.
+    """
+
+    def __init__(self, save_dir: Optional[Path] = None, cache_size: int = 1024,
+                 store: Optional[CharacterStore] = None, lock_stripes: int = 64):
+        if store is None:
+            save_dir = Path(save_dir) if save_dir is not None else Path("data/characters")
+            save_dir.mkdir(parents=True, exist_ok=True)
+            store = JsonCharacterStore(save_dir)
+        self.store = store
+        self._cache: LRUCache[str, CachedCharacter] = LRUCache(cache_size)
+        self._roster: Optional[RosterColumns] = None
+        self._roster_generation: Optional[int] = None
+        self._roster_lock = threading.Lock()
+        # While the columns are being built, tracked writes are queued here
+        # and applied to the new columns afterwards; see _roster_columns
+        self._roster_pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+        self._roster_stale = False
+        self._roster_pending_lock = threading.Lock()
+        self.locks = KeyLocks(lock_stripes)
+
+    @property
+    def save_dir(self) -> Optional[Path]:
+        """Directory of the JSON store, or None for other backends."""
+        return getattr(self.store, "root", None)
+
+    @save_dir.setter
+    def save_dir(self, value: Path) -> None:
+        self.store = JsonCharacterStore(Path(value))
+        self._cache.clear()
+        self._drop_roster()
+
+    def rebuild_index(self) -> None:
+        """Resynchronize the store's index after out-of-band changes."""
+        self.store.rebuild_index()
+        self._drop_roster()
+
+    def locked(self, *character_names: str) -> AbstractContextManager:
+        """
+        Hold the write locks of some characters in the calling thread.
+
+        Use it around a read-modify-write built from several service calls;
+        the service's own writes inside it do not wait for the held locks.
+        """
+        return self.locks.hold(*(self.store.key_for(name) for name in character_names))
+
+    def _track(self, key: str, character_data: Optional[Dict[str, Any]]) -> None:
+        """Keep the analytics columns, if built or being built, in step with a write or delete."""
+        with self._roster_pending_lock:
+            if self._roster_pending is not None:
+                self._roster_pending[key] = character_data
+                return
+            roster = self._roster
+        if roster is not None:
+            self._apply_to_roster(roster, key, character_data)
+
+    @staticmethod
+    def _apply_to_roster(roster: RosterColumns, key: str, character_data: Optional[Dict[str, Any]]) -> None:
+        if character_data is None:
+            roster.remove(key)
+        else:
+            roster.upsert(key, character_data)
+
+    def _drop_roster(self) -> None:
+        """Discard the analytics columns, including any being built, so the next query rebuilds them."""
+        with self._roster_pending_lock:
+            self._roster = None
+            self._roster_stale = self._roster_pending is not None
 
-    def save_character(self, character: Character) -> bool:
+    def _check_version(self, character_name: str, expected_version: Optional[str]) -> None:
+        if expected_version is None:
+            return
+        with timed("version"):
+            actual = self.store.version(character_name)
+        if actual != expected_version:
+            raise VersionMismatchError(expected_version, actual)
+
+    def save_character(self, character: Character, expected_version: Optional[str] = None) -> bool:
         """
-        Save a character to a JSON file.
-        
+        Save a character to the configured store.
+
         Args:
             character (Character): The character to save
-            
+            expected_version (Optional[str]): Only save if the stored version
+                (see get_etag) still matches
+
         Returns:
             bool: True if save was successful, False otherwise
+
+        Raises:
+            VersionMismatchError: If expected_version no longer matches
+        """
+        with self.locked(character.name):
+            self._check_version(character.name, expected_version)
+            try:
+                key = self.store.key_for(character.name)
+                with timed("serialize"):
+                    character_data = character.model_dump()
+                self._cache.invalidate(key)
+                with timed("write"):
+                    self.store.write(character_data)
+                self._track(key, character_data)
+                return True
+            except Exception as e:
+                print(f"Error saving character: {e}")
+                return False
+
+    def save_characters(self, characters: List[Character]) -> bool:
+        """
+        Save several characters as one storage batch.
+
+        Args:
+            characters (List[Character]): The characters to save
+
+        Returns:
+            bool: True if the whole batch was saved, False otherwise
         """
         try:
-            file_path = self.save_dir / f"{character.name.lower().replace(' ', '_')}.json"
-            with open(file_path, 'w') as f:
-                json.dump(character.model_dump(), f, indent=4)
+            with timed("serialize"):
+                characters_data = [character.model_dump() for character in characters]
+            with self.locked(*(character_data["name"] for character_data in characters_data)):
+                for character_data in characters_data:
+                    self._cache.invalidate(self.store.key_for(character_data["name"]))
+                with timed("write_many"):
+                    self.store.write_many(characters_data)
+                for character_data in characters_data:
+                    self._track(self.store.key_for(character_data["name"]), character_data)
             return True
         except Exception as e:
-            print(f"Error saving character: {e}")
+            print(f"Error saving characters: {e}")
             return False
 
-    def load_character(self, character_name: str) -> Optional[Character]:
+    def patch_character(self, character_name: str, patch: Any, content_type: Optional[str] = None,
+                        expected_version: Optional[str] = None) -> Optional[StoredRecord]:
+        """
+        Apply a JSON Merge Patch or JSON Patch to a stored character.
+
+        Only the top-level fields the patch changes are validated and handed
+        to the store, which may update them in place (see CharacterStore.patch).
+
+        Args:
+            character_name (str): Name of the character to patch
+            patch (Any): The parsed patch document
+            content_type (Optional[str]): Media type of the patch; see
+                character_patch.apply_patch
+            expected_version (Optional[str]): Only patch if the stored version
+                (see get_etag) still matches
+
+        Returns:
+            Optional[StoredRecord]: The patched document and its new version,
+                or None if the character was not found or could not be saved
+
+        Raises:
+            VersionMismatchError: If expected_version no longer matches
+            PatchError: If the patch is malformed, fails a test operation or
+                touches fields it may not change
+            pydantic.ValidationError: If a changed field is invalid
+        """
+        with self.locked(character_name):
+            try:
+                with timed("read"):
+                    record = self.store.read(character_name)
+            except Exception as e:
+                print(f"Error loading character: {e}")
+                return None
+            if record is None:
+                return None
+            if expected_version is not None and record.version != expected_version:
+                raise VersionMismatchError(expected_version, record.version)
+
+            with timed("validate"):
+                changes = validate_changes(record.data, apply_patch(record.data, patch, content_type))
+            if not changes:
+                return record
+            key = self.store.key_for(character_name)
+            try:
+                self._cache.invalidate(key)
+                with timed("patch"):
+                    version = self.store.patch(character_name, changes, record)
+            except Exception as e:
+                print(f"Error saving character: {e}")
+                return None
+            if version is None:
+                return None
+            patched = StoredRecord({**record.data, **changes}, version, record.trusted)
+            self._track(key, patched.data)
+            return patched
+
+    def patch_characters(self, changes: Dict[str, Dict[str, Any]],
+                         current: Optional[Dict[str, StoredRecord]] = None) -> Optional[Dict[str, Optional[str]]]:
         """
-        Load a character from a JSON file.
-        
+        Write already validated field changes for several characters as one batch.
+
+        Args:
+            changes (Dict[str, Dict[str, Any]]): Field changes keyed by character name
+            current (Optional[Dict[str, StoredRecord]]): Records the changes were
+                computed from, keyed the same way
+
+        Returns:
+            Optional[Dict[str, Optional[str]]]: The new version of each character
+                (None if it no longer exists), or None if the batch failed
+        """
+        with self.locked(*changes):
+            try:
+                for name in changes:
+                    self._cache.invalidate(self.store.key_for(name))
+                with timed("patch_many"):
+                    versions = self.store.patch_many(changes, current)
+            except Exception as e:
+                print(f"Error saving characters: {e}")
+                return None
+            for name, version in versions.items():
+                record = (current or {}).get(name)
+                if version is None:
+                    continue
+                if record is not None:
+                    self._track(self.store.key_for(name), {**record.data, **changes[name]})
+                else:
+                    self._drop_roster()
+            return versions
+
+    def character_exists(self, character_name: str) -> bool:
+        """
+        Check whether a character is stored, without reading or validating it.
+
+        Args:
+            character_name (str): Name of the character to look for
+
+        Returns:
+            bool: True if the character exists
+        """
+        try:
+            with timed("version"):
+                return self.store.version(character_name) is not None
+        except Exception as e:
+            print(f"Error checking character: {e}")
+            return False
+
+    def get_etag(self, character_name: str) -> Optional[str]:
+        """
+        Return the stored version of a character without loading it.
+
+        Args:
+            character_name (str): Name of the character
+
+        Returns:
+            Optional[str]: The content hash, or None if the character is absent
+        """
+        try:
+            with timed("version"):
+                return self.store.version(character_name)
+        except Exception as e:
+            print(f"Error checking character: {e}")
+            return None
+
+    def load_character_with_etag(self, character_name: str) -> Optional[Tuple[Character, str]]:
+        """
+        Load a character together with the version it was read at.
+
+        Validated characters are kept in an LRU cache and reused for as long
+        as the store's version token is unchanged. The returned instance is
+        shared with the cache and must not be mutated.
+
+        Records the store vouches for (StoredRecord.trusted: written by the
+        service under the current schema and unchanged since) go through the
+        cheaper strict validation (see validate_trusted); all others, such as
+        hand-edited, copied-in or legacy files, and trusted records strict
+        validation rejects, are validated in lax mode.
+
         Args:
             character_name (str): Name of the character to load
-            
+
         Returns:
-            Optional[Character]: The loaded character or None if not found
+            Optional[Tuple[Character, str]]: The character and its content hash,
+                or None if not found
         """
         try:
-            file_path = self.save_dir / f"{character_name.lower().replace(' ', '_')}.json"
-            if not file_path.exists():
+            key = self.store.key_for(character_name)
+            with timed("version"):
+                version = self.store.version(character_name)
+            if version is None:
+                self._cache.invalidate(key)
+                return None
+
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached.version == version:
+                    return cached.character, cached.version
+                self._cache.invalidate(key)
+
+            with timed("read"):
+                record = self.store.read(character_name)
+            if record is None:
                 return None
-            
-            with open(file_path, 'r') as f:
-                character_data = json.load(f)
-            return Character(**character_data)
+            character = None
+            if record.trusted:
+                try:
+                    with timed("validate_trusted"):
+                        character = validate_trusted(record.data)
+                except ValidationError:
+                    pass  # e.g. "level": 3.0, which only lax validation coerces
+            if character is None:
+                with timed("validate"):
+                    character = Character(**record.data)
+            self._cache.put(key, CachedCharacter(character, record.version))
+            return character, record.version
         except Exception as e:
             print(f"Error loading character: {e}")
             return None
 
+    def load_character(self, character_name: str) -> Optional[Character]:
+        """
+        Load a character from the configured store.
+
+        Served from the LRU cache while the stored version is unchanged; the
+        returned instance is shared with the cache and must not be mutated.
+
+        Args:
+            character_name (str): Name of the character to load
+
+        Returns:
+            Optional[Character]: The loaded character or None if not found
+        """
+        loaded = self.load_character_with_etag(character_name)
+        return loaded[0] if loaded is not None else None
+
     def list_characters(self) -> List[str]:
         """
         List all saved characters.
-        
+
+        Names come from the store's index; the JSON store serves them from
+        memory after a single stat of its directory.
+
         Returns:
             List[str]: List of character names (preserving original case)
         """
         try:
-            characters = []
-            for file_path in self.save_dir.glob('*.json'):
-                try:
-                    with open(file_path, 'r') as f:
-                        character_data = json.load(f)
-                        characters.append(character_data["name"])
-                except:
-                    continue
-            return characters
+            with timed("list"):
+                return self.store.list_names()
         except Exception as e:
             print(f"Error listing characters: {e}")
             return []
 
-    def delete_character(self, character_name: str) -> bool:
+    def list_character_summaries(self, race: Optional[str] = None, character_class: Optional[str] = None,
+                                 level: Optional[int] = None, sort: str = "name", descending: bool = False,
+                                 limit: int = 50, cursor: Optional[str] = None) -> CharacterPage:
+        """
+        List one page of character summaries, optionally filtered.
+
+        Pages are read from the store's secondary indexes, so the cost of a
+        page does not grow with the size of the roster.
+
+        Args:
+            race (Optional[str]): Only include characters of this race
+            character_class (Optional[str]): Only include characters of this class
+            level (Optional[int]): Only include characters of this level
+            sort (str): "name" or "level"
+            descending (bool): Reverse the sort order
+            limit (int): Maximum number of characters on the page
+            cursor (Optional[str]): next_cursor from the previous page
+
+        Returns:
+            CharacterPage: The page and the cursor of the next one
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        filters = {
+            field: value
+            for field, value in (("race", race), ("character_class", character_class), ("level", level))
+            if value is not None
+        }
+        try:
+            with timed("query"):
+                items, next_cursor = self.store.query_summaries(filters, sort, descending, limit, cursor)
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error listing characters: {e}")
+            return CharacterPage(items=[])
+        return CharacterPage(
+            items=[CharacterSummary(**item) for item in items],
+            next_cursor=next_cursor,
+        )
+
+    def iter_character_data(self, race: Optional[str] = None, character_class: Optional[str] = None,
+                            level: Optional[int] = None, page_size: int = 500) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over stored character documents, optionally filtered.
+
+        Characters are fetched page by page in name order, so memory use is
+        bounded by ``page_size`` regardless of the roster size. Documents are
+        yielded as stored, without Pydantic validation; characters deleted
+        while iterating are skipped.
+
+        Args:
+            race (Optional[str]): Only include characters of this race
+            character_class (Optional[str]): Only include characters of this class
+            level (Optional[int]): Only include characters of this level
+            page_size (int): Number of summaries fetched per index query
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: The store key and the character data
+        """
+        filters = {
+            field: value
+            for field, value in (("race", race), ("character_class", character_class), ("level", level))
+            if value is not None
+        }
+        cursor = None
+        while True:
+            with timed("query"):
+                items, cursor = self.store.query_summaries(filters, "name", False, page_size, cursor)
+            for item in items:
+                with timed("read"):
+                    record = self.store.read(item["name"])
+                if record is not None:
+                    yield self.store.key_for(item["name"]), record.data
+            if cursor is None:
+                return
+
+    def delete_character(self, character_name: str, expected_version: Optional[str] = None) -> bool:
         """
-        Delete a character file.
-        
+        Delete a character from the configured store.
+
         Args:
             character_name (str): Name of the character to delete
-            
+            expected_version (Optional[str]): Only delete if the stored version
+                (see get_etag) still matches
+
         Returns:
             bool: True if deletion was successful, False otherwise
+
+        Raises:
+            VersionMismatchError: If expected_version no longer matches
         """
-        try:
-            file_path = self.save_dir / f"{character_name.lower().replace(' ', '_')}.json"
-            if not file_path.exists():
+        with self.locked(character_name):
+            self._check_version(character_name, expected_version)
+            try:
+                key = self.store.key_for(character_name)
+                self._cache.invalidate(key)
+                with timed("delete"):
+                    deleted = self.store.delete(character_name)
+                self._track(key, None)
+                return deleted
+            except Exception as e:
+                print(f"Error deleting character: {e}")
                 return False
-            
-            file_path.unlink()
+
+    def character_history(self, character_name: str) -> Optional[List[CharacterEvent]]:
+        """
+        List the logged changes of a character, oldest first.
+
+        Args:
+            character_name (str): Name of the character
+
+        Returns:
+            Optional[List[CharacterEvent]]: The change log, or None if the
+                character has never been stored
+
+        Raises:
+            NotImplementedError: If the storage backend keeps no history
+        """
+        events = self.store.history(character_name)
+        return [CharacterEvent(**event) for event in events] if events is not None else None
+
+    def undo_character(self, character_name: str) -> Optional[StoredRecord]:
+        """
+        Revert a character's most recent change.
+
+        Args:
+            character_name (str): Name of the character
+
+        Returns:
+            Optional[StoredRecord]: The restored character and its version, or
+                None if the undo reverted the character's creation
+
+        Raises:
+            NotImplementedError: If the storage backend keeps no history
+            LookupError: If the character has never been stored
+            ValueError: If there is nothing left to undo
+        """
+        with self.locked(character_name):
+            key = self.store.key_for(character_name)
+            self._cache.invalidate(key)
+            record = self.store.undo(character_name)
+            self._track(key, record.data if record is not None else None)
+            return record
+
+    def _roster_columns(self) -> RosterColumns:
+        """
+        Return the analytics columns, building them with one pass over the store if needed.
+
+        Writes tracked while the pass runs may or may not be seen by it, so
+        they are queued and applied to the new columns once it ends. If the
+        columns are dropped meanwhile (see _drop_roster), the new ones serve
+        this call only and the next query builds them again.
+        """
+        generation = self.store.generation()
+        with self._roster_lock:
+            if self._roster is not None and self._roster_generation == generation:
+                return self._roster
+            with self._roster_pending_lock:
+                self._roster_pending, self._roster_stale = {}, False
+            try:
+                roster = RosterColumns.build(self.iter_character_data())
+            except BaseException:
+                with self._roster_pending_lock:
+                    self._roster_pending = None
+                raise
+            with self._roster_pending_lock:
+                pending, self._roster_pending = self._roster_pending, None
+                for key, character_data in pending.items():
+                    self._apply_to_roster(roster, key, character_data)
+                if not self._roster_stale:
+                    self._roster, self._roster_generation = roster, generation
+            return roster
+
+    def roster_summary(self, group_by: Optional[str] = None,
+                       percentiles: Tuple[float, ...] = (25, 50, 75, 90)) -> RosterSummary:
+        """
+        Aggregate level, HP and ability scores across the roster.
+
+        The first call loads every character into NumPy columns; after that
+        the columns follow each save and delete, and results are reused until
+        the roster changes.
+
+        Args:
+            group_by (Optional[str]): "race", "character_class", "level" or None
+            percentiles (Tuple[float, ...]): Percentiles (0-100) to report
+
+        Returns:
+            RosterSummary: Count, mean, min, max and percentiles per group
+
+        Raises:
+            ValueError: If group_by or a percentile is invalid
+        """
+        return self._roster_columns().summary(group_by, percentiles)
+
+    def roster_histogram(self, field: str, group_by: Optional[str] = None) -> RosterHistogram:
+        """
+        Count characters by the value of a numeric field, optionally per group.
+
+        Args:
+            field (str): "level", "max_hp", "current_hp" or an ability score
+            group_by (Optional[str]): "race", "character_class", "level" or None
+
+        Returns:
+            RosterHistogram: Observed values and per-group counts
+
+        Raises:
+            ValueError: If field or group_by is not supported
+        """
+        return self._roster_columns().histogram(field, group_by)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Report load_character cache counters.
+
+        Returns:
+            Dict[str, int]: Cache size, capacity and hit/miss/eviction counts
+        """
+        return self._cache.stats()
+
+    def flush(self) -> int:
+        """
+        Write out saves the store is still buffering (write-behind mode).
+
+        Returns:
+            int: Number of characters written
+        """
+        with timed("flush"):
+            return self.store.flush()
+
+    def checkpoint(self) -> bool:
+        """
+        Let the store persist state that speeds up the next start (e.g. its index snapshot).
+
+        Returns:
+            bool: True if the state was saved (or there was nothing to save), False otherwise
+        """
+        try:
+            with timed("checkpoint"):
+                self.store.checkpoint()
             return True
         except Exception as e:
-            print(f"Error deleting character: {e}")
-            return False 
\ No newline at end of file
+            print(f"Error saving store checkpoint: {e}")
+            return False
+
+    def start_watching(self, mode: str = "auto", debounce: float = 0.5, poll_interval: float = 2.0) -> bool:
+        """
+        Follow edits made to the storage outside the API.
+
+        The store re-indexes changed files as they are reported (in debounced
+        batches, see watcher.py) and the cache entries of the characters they
+        hold are dropped, so listings, summaries and loads reflect the edits
+        without a manual rebuild_index().
+
+        Args:
+            mode: "inotify", "poll", or "auto" for inotify with a polling fallback
+            debounce: Quiet period, in seconds, that ends a batch of changes
+            poll_interval: Seconds between scans when polling
+
+        Returns:
+            bool: True if watching started, False if the store cannot be watched
+        """
+        try:
+            return self.store.watch(self._on_external_change, mode, debounce, poll_interval)
+        except Exception as e:
+            print(f"Error watching character storage: {e}")
+            return False
+
+    def stop_watching(self) -> None:
+        """Stop following out-of-band edits."""
+        self.store.unwatch()
+
+    def _on_external_change(self, keys: Optional[List[str]]) -> None:
+        """Drop cached state for characters changed outside the API; None means any may have."""
+        if keys is None:
+            self._cache.clear()
+        else:
+            for key in keys:
+                self._cache.invalidate(key)
+        self._drop_roster()
+
+    def close(self) -> None:
+        """Release the underlying store."""
+        self.store.close()
@@ -0,0 +1,131 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Limits per expression; the dice of every term count towards MAX_DICE
+MAX_DICE = 1000
+MAX_SIDES = 1000
+
+_TERM = re.compile(r"([+-])?\s*(?:(\d*)d(\d+)(?:(kh|kl)(\d+))?|(\d+))", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """``count`` dice with ``sides`` faces, optionally keeping the highest/lowest ``keep``."""
+    count: int
+    sides: int
+    keep: Optional[Tuple[str, int]] = None
+    sign: int = 1
+
+    def __str__(self) -> str:
+        keep = f"{self.keep[0]}{self.keep[1]}" if self.keep else ""
+        return f"{self.count}d{self.sides}{keep}"
+
+    @property
+    def kept(self) -> int:
+        return self.keep[1] if self.keep else self.count
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Roll this term ``n`` times; returns the signed totals."""
+        rolls = rng.integers(1, self.sides + 1, size=(n, self.count), dtype=np.int32)
+        if self.keep is not None and self.kept == 1 < self.count:
+            # Advantage/disadvantage: a max/min pass instead of a sort
+            best = rolls.max(axis=1) if self.keep[0] == "kh" else rolls.min(axis=1)
+            return self.sign * best.astype(np.int64)
+        if self.keep is not None and self.kept < self.count:
+            rolls.sort(axis=1)
+            rolls = rolls[:, self.count - self.kept:] if self.keep[0] == "kh" else rolls[:, :self.kept]
+        return self.sign * rolls.sum(axis=1, dtype=np.int64)
+
+
+@dataclass(frozen=True)
+class DiceExpression:
+    """A sum of dice terms and a constant modifier, e.g. ``2d20kl1+5``."""
+    terms: Tuple[DiceTerm, ...]
+    modifier: int = 0
+
+    def __str__(self) -> str:
+        text = ""
+        for term in self.terms:
+            text += ("-" if term.sign < 0 else "+" if text else "") + str(term)
+        if self.modifier or not text:
+            text += f"{self.modifier:+d}" if text else str(self.modifier)
+        return text
+
+    @property
+    def minimum(self) -> int:
+        return self.modifier + sum(
+            term.kept if term.sign > 0 else -term.kept * term.sides for term in self.terms
+        )
+
+    @property
+    def maximum(self) -> int:
+        return self.modifier + sum(
+            term.kept * term.sides if term.sign > 0 else -term.kept for term in self.terms
+        )
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """
+        Roll the whole expression ``n`` times at once.
+
+        Args:
+            rng: NumPy random generator
+            n: Number of independent rolls
+
+        Returns:
+            np.ndarray: int64 array of ``n`` totals
+        """
+        totals = np.full(n, self.modifier, dtype=np.int64)
+        for term in self.terms:
+            totals += term.sample(rng, n)
+        return totals
+
+
+def parse_dice(expression: str, max_dice: int = MAX_DICE) -> DiceExpression:
+    """
+    Parse a dice expression such as ``4d6kh3``, ``2d20kl1+5`` or ``d8+1d6-2``.
+
+    Supports ``NdM`` (N defaults to 1), keep-highest ``khK`` and keep-lowest
+    ``klK`` suffixes, integer constants and ``+``/``-`` between terms.
+
+    Args:
+        expression: The expression to parse
+        max_dice: Most dice the whole expression may roll, across all terms
+
+    Returns:
+        DiceExpression: The parsed expression
+
+    Raises:
+        ValueError: If the expression is malformed or rolls too many dice
+    """
+    text = expression.replace(" ", "")
+    if not text:
+        raise ValueError("Empty dice expression")
+    terms: List[DiceTerm] = []
+    modifier = 0
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if match is None or match.end() == position or (position and match.group(1) is None):
+            raise ValueError(f"Invalid dice expression: {expression!r}")
+        sign_text, count, sides, keep, keep_count, constant = match.groups()
+        sign = -1 if sign_text == "-" else 1
+        if constant is not None:
+            modifier += sign * int(constant)
+        else:
+            term = DiceTerm(
+                count=int(count) if count else 1,
+                sides=int(sides),
+                keep=(keep.lower(), int(keep_count)) if keep else None,
+                sign=sign,
+            )
+            if not 1 <= term.count <= MAX_DICE or not 1 <= term.sides <= MAX_SIDES:
+                raise ValueError(f"Dice must be between 1d1 and {MAX_DICE}d{MAX_SIDES}: {term}")
+            if term.keep is not None and not 1 <= term.keep[1] <= term.count:
+                raise ValueError(f"Cannot keep {term.keep[1]} of {term.count} dice")
+            terms.append(term)
+            if sum(term.count for term in terms) > max_dice:
+                raise ValueError(f"A dice expression can roll at most {max_dice} dice: {expression!r}")
+        position = match.end()
+    return DiceExpression(tuple(terms), modifier)
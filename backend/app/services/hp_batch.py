@@ -0,0 +1,81 @@
+from typing import Dict, List
+from ..metrics import timed
+from ..schemas.hp_batch import HpBatchReport, HpChange, HpChangeResult
+from .character_service import CharacterService
+
+
+def apply_hp_changes(service: CharacterService, changes: List[HpChange]) -> HpBatchReport:
+    """
+    Apply damage and healing to many characters with one read and one write batch.
+
+    Every target is read in a single store call, each delta is clamped so
+    current_hp stays within 0..max_hp, and all new values are written with
+    one patch batch (a single transaction on SQLite). Several changes for
+    the same character are applied in order. Only current_hp is touched, so
+    the rest of each character is neither validated nor re-serialized.
+
+    Args:
+        service (CharacterService): Service to read and write through
+        changes (List[HpChange]): HP deltas in the order they happen
+
+    Returns:
+        HpBatchReport: Counts and per-change results, in request order
+    """
+    report = HpBatchReport()
+    names: Dict[str, str] = {}
+    for change in changes:
+        names.setdefault(service.store.key_for(change.name), change.name)
+    # Hold the targets from the read to the write, so no other write slips in between
+    with service.locked(*names.values()):
+        try:
+            with timed("read_many"):
+                records = service.store.read_many(names.values())
+        except Exception as e:
+            print(f"Error loading characters: {e}")
+            records = None
+
+        hit_points: Dict[str, int] = {}
+        updated: Dict[str, List[HpChangeResult]] = {}
+        for change in changes:
+            result = HpChangeResult(name=change.name, status="updated")
+            report.results.append(result)
+            if records is None:
+                result.status, result.error = "error", "Failed to load character"
+                report.errors += 1
+                continue
+            name = names[service.store.key_for(change.name)]
+            record = records.get(name)
+            if record is None:
+                result.status = "not_found"
+                report.not_found += 1
+                continue
+            previous = hit_points.get(name, record.data.get("current_hp"))
+            max_hp = record.data.get("max_hp")
+            if not isinstance(previous, int) or not isinstance(max_hp, int):
+                result.status, result.error = "invalid", "Stored character has no valid hit points"
+                report.invalid += 1
+                continue
+            hit_points[name] = max(0, min(max_hp, previous + change.delta))
+            result.previous_hp, result.current_hp = previous, hit_points[name]
+            updated.setdefault(name, []).append(result)
+
+        if not hit_points:
+            return report
+        versions = service.patch_characters(
+            {name: {"current_hp": hp} for name, hp in hit_points.items()},
+            {name: records[name] for name in hit_points},
+        )
+        for name, results in updated.items():
+            for result in results:
+                if versions is not None and versions.get(name) is not None:
+                    report.updated += 1
+                    continue
+                result.previous_hp = result.current_hp = None
+                if versions is None:
+                    result.status, result.error = "error", "Failed to save character"
+                    report.errors += 1
+                else:
+                    # Deleted between the read and the write
+                    result.status = "not_found"
+                    report.not_found += 1
+        return report
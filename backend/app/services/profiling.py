@@ -0,0 +1,161 @@
+import contextvars
+import cProfile
+import pstats
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, List, Optional, Tuple, TypeVar
+from ..schemas.profiling import ProfiledFunction, RequestProfile
+
+T = TypeVar("T")
+
+# Functions kept per profile; the rest of the pstats table is dropped
+MAX_FUNCTIONS = 200
+
+_current_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+
+class ProfileSession:
+    """
+    cProfile data collected for one request.
+
+    The request's own thread (the event loop) is profiled, and so is every
+    storage call the request hands to a worker thread; storage calls pick up
+    the session through ``profiled`` while it is current, and the profiles
+    are merged at the end. Up to Python 3.11 cProfile only sees the thread
+    it is enabled in, so the worker profiles are what capture storage calls.
+    From Python 3.12 cProfile is built on sys.monitoring: only one profiler
+    can be active in the process, and the event loop's profiler already
+    records every thread. Enabling a worker's profiler then fails, and the
+    failure is counted in ``skipped`` rather than lost.
+    """
+
+    def __init__(self):
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """
+        Profile the calling thread until the returned profiler is disabled.
+
+        Returns None, and counts the attempt in ``skipped``, if another
+        profiler is already active (in this thread, or anywhere in the
+        process on Python 3.12+).
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            with self._lock:
+                self.skipped += 1
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Call ``func`` in the current thread with a profiler attached."""
+        profile = self.start()
+        try:
+            return func(*args)
+        finally:
+            if profile is not None:
+                profile.disable()
+
+    def functions(self, limit: int = MAX_FUNCTIONS) -> Tuple[int, List[ProfiledFunction]]:
+        """
+        Merge the collected profiles into the slowest functions by cumulative time.
+
+        Returns:
+            Tuple[int, List[ProfiledFunction]]: Total function calls and the
+                ``limit`` functions with the highest cumulative time
+        """
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats()
+        for profile in profiles:
+            try:
+                stats.add(profile)
+            except TypeError:
+                continue  # nothing was recorded
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return stats.total_calls, [
+            ProfiledFunction(
+                function=f"{filename}:{line}({name})" if line else name,
+                calls=calls,
+                total_time=total_time,
+                cumulative_time=cumulative_time,
+            )
+            for (filename, line, name), (_, calls, total_time, cumulative_time, _) in rows
+        ]
+
+
+def current_session() -> Optional[ProfileSession]:
+    """Return the profile session of the request being handled, if it is profiled."""
+    return _current_session.get()
+
+
+def activate(session: Optional[ProfileSession]) -> contextvars.Token:
+    """Make ``session`` current for the running request."""
+    return _current_session.set(session)
+
+
+def deactivate(token: contextvars.Token) -> None:
+    _current_session.reset(token)
+
+
+def profiled(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Bind ``func`` to the current profile session, if any.
+
+    Call this in the request's context before handing ``func`` to another
+    thread; the returned callable profiles itself wherever it runs.
+    """
+    session = _current_session.get()
+    if session is None:
+        return func
+    return lambda *args: session.run(func, *args)
+
+
+class ProfileBuffer:
+    """The most recent request profiles, oldest dropped first."""
+
+    def __init__(self, max_size: int = 50):
+        self._profiles: Deque[RequestProfile] = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        return self._profiles.maxlen
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        """Return the kept profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
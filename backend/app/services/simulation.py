@@ -0,0 +1,290 @@
+import asyncio
+import multiprocessing
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from ..models.character import Character
+from ..schemas.simulation import CombatantOutcome, EncounterResult, MonsterSpec
+from .dice import DiceExpression, parse_dice
+
+# Trials are split into chunks of this size, each with its own child seed,
+# so results for a given seed do not depend on the number of workers.
+CHUNK_TRIALS = 20_000
+
+# Damage dice a monster may roll per attack; each attack rolls them for a
+# whole chunk of trials at once
+MAX_DAMAGE_DICE = 40
+
+PARTY, ENEMIES = 0, 1
+SIDE_NAMES = ("party", "enemies")
+HP_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Weapon or cantrip damage die and attack ability by class.
+CLASS_ATTACKS = {
+    "barbarian": (12, "strength"),
+    "bard": (8, "charisma"),
+    "cleric": (8, "wisdom"),
+    "druid": (8, "wisdom"),
+    "fighter": (10, "strength"),
+    "monk": (6, "dexterity"),
+    "paladin": (10, "strength"),
+    "ranger": (8, "dexterity"),
+    "rogue": (6, "dexterity"),
+    "sorcerer": (10, "charisma"),
+    "warlock": (10, "charisma"),
+    "wizard": (10, "intelligence"),
+}
+EXTRA_ATTACK_CLASSES = {"barbarian", "fighter", "monk", "paladin", "ranger"}
+
+
+@dataclass(frozen=True)
+class CombatantSpec:
+    """Everything the simulator needs to know about one combatant."""
+    name: str
+    side: int
+    max_hp: int
+    start_hp: int
+    armor_class: int
+    attack_bonus: int
+    damage: str
+    attacks: int = 1
+    initiative_bonus: int = 0
+
+
+def modifier(score: int) -> int:
+    """D&D 5e ability modifier."""
+    return (score - 10) // 2
+
+
+def combatant_from_character(character: Character, side: int) -> CombatantSpec:
+    """
+    Derive combat statistics from a stored character.
+
+    Characters carry no equipment stats, so armour class is unarmoured
+    (10 + Dex, plus Con for barbarians and Wis for monks) and damage uses the
+    class's typical weapon or cantrip die plus the attack ability modifier.
+    Martial classes gain a second attack at level 5.
+    """
+    scores = character.ability_scores
+    die, ability = CLASS_ATTACKS.get(character.character_class.lower(), (8, "strength"))
+    if ability == "strength":
+        ability = max("strength", "dexterity", key=lambda name: getattr(scores, name))
+    ability_modifier = modifier(getattr(scores, ability))
+    proficiency = 2 + (character.level - 1) // 4
+    armor_class = 10 + modifier(scores.dexterity)
+    if character.character_class.lower() == "barbarian":
+        armor_class += modifier(scores.constitution)
+    elif character.character_class.lower() == "monk":
+        armor_class += modifier(scores.wisdom)
+    extra_attack = character.character_class.lower() in EXTRA_ATTACK_CLASSES and character.level >= 5
+    return CombatantSpec(
+        name=character.name,
+        side=side,
+        max_hp=character.max_hp,
+        start_hp=character.current_hp,
+        armor_class=armor_class,
+        attack_bonus=ability_modifier + proficiency,
+        damage=f"1d{die}{ability_modifier:+d}" if ability_modifier else f"1d{die}",
+        attacks=2 if extra_attack else 1,
+        initiative_bonus=modifier(scores.dexterity),
+    )
+
+
+def combatants_from_monster(monster: MonsterSpec) -> List[CombatantSpec]:
+    """Expand a monster spec into ``count`` enemy combatants."""
+    parse_dice(monster.damage, MAX_DAMAGE_DICE)
+    names = [monster.name] if monster.count == 1 else [f"{monster.name} {i}" for i in range(1, monster.count + 1)]
+    return [
+        CombatantSpec(
+            name=name,
+            side=ENEMIES,
+            max_hp=monster.max_hp,
+            start_hp=monster.max_hp,
+            armor_class=monster.armor_class,
+            attack_bonus=monster.attack_bonus,
+            damage=monster.damage,
+            attacks=monster.attacks,
+            initiative_bonus=monster.initiative_bonus,
+        )
+        for name in names
+    ]
+
+
+@dataclass
+class ChunkResult:
+    """Raw counts from one chunk of trials."""
+    trials: int
+    party_wins: int
+    enemy_wins: int
+    rounds: int
+    hp_histograms: List[np.ndarray]
+
+
+def simulate_chunk(combatants: Sequence[CombatantSpec], trials: int, max_rounds: int,
+                   seed: np.random.SeedSequence) -> ChunkResult:
+    """
+    Simulate ``trials`` independent encounters, vectorized across trials.
+
+    Each trial rolls initiative once; every round, each living combatant in
+    initiative order makes its attacks against a random living opponent. A
+    natural 20 always hits and doubles the damage dice, a natural 1 always
+    misses. A trial ends when one side is down or after ``max_rounds``.
+
+    Runs in worker processes, so it only takes picklable arguments.
+    """
+    rng = np.random.default_rng(seed)
+    count = len(combatants)
+    side = np.array([c.side for c in combatants])
+    armor_class = np.array([c.armor_class for c in combatants])
+    attack_bonus = np.array([c.attack_bonus for c in combatants])
+    attacks = np.array([c.attacks for c in combatants])
+    damage: List[DiceExpression] = [parse_dice(c.damage) for c in combatants]
+    crit_dice = [replace(expression, modifier=0) for expression in damage]
+    opponents = side[None, :] != side[:, None]
+
+    final_hp = np.tile(np.array([c.start_hp for c in combatants], dtype=np.int64), (trials, 1))
+    initiative = rng.integers(1, 21, size=(trials, count)) + np.array([c.initiative_bonus for c in combatants])
+    rounds = np.full(trials, max_rounds, dtype=np.int64)
+
+    # Work on the undecided trials only; finished ones are written back and dropped.
+    trial_ids = np.arange(trials)
+    hp = final_hp.copy()
+    order = np.argsort(-initiative, axis=1, kind="stable")
+    for round_number in range(1, max_rounds + 1):
+        active = len(trial_ids)
+        every = np.arange(active)
+        for attack in range(int(attacks.max())):
+            rolls = np.stack([expression.sample(rng, active) for expression in damage], axis=1)
+            crits = np.stack([expression.sample(rng, active) for expression in crit_dice], axis=1)
+            for step in range(count):
+                actor = order[:, step]
+                targets = opponents[actor] & (hp > 0)
+                acting = (hp[every, actor] > 0) & (attacks[actor] > attack) & targets.any(axis=1)
+                target = np.argmax(rng.random((active, count)) * targets, axis=1)
+                d20 = rng.integers(1, 21, size=active)
+                hit = acting & (d20 != 1) & ((d20 == 20) | (d20 + attack_bonus[actor] >= armor_class[target]))
+                dealt = rolls[every, actor] + np.where(d20 == 20, crits[every, actor], 0)
+                hp[every[hit], target[hit]] -= np.maximum(dealt[hit], 0)
+        alive = hp > 0
+        finished = ~((alive & (side == PARTY)).any(axis=1) & (alive & (side == ENEMIES)).any(axis=1))
+        final_hp[trial_ids] = hp
+        rounds[trial_ids[finished]] = round_number
+        trial_ids, hp, order = trial_ids[~finished], hp[~finished], order[~finished]
+        if not len(trial_ids):
+            break
+
+    hp = np.maximum(final_hp, 0)
+    alive = hp > 0
+    party_up = (alive & (side == PARTY)).any(axis=1)
+    enemies_up = (alive & (side == ENEMIES)).any(axis=1)
+    return ChunkResult(
+        trials=trials,
+        party_wins=int((party_up & ~enemies_up).sum()),
+        enemy_wins=int((enemies_up & ~party_up).sum()),
+        rounds=int(rounds.sum()),
+        hp_histograms=[
+            np.bincount(hp[:, i], minlength=max(c.max_hp, c.start_hp) + 1)
+            for i, c in enumerate(combatants)
+        ],
+    )
+
+
+def _histogram_percentile(histogram: np.ndarray, total: int, pct: float) -> int:
+    """Nearest-rank percentile of the values counted in a histogram."""
+    rank = max(1, int(np.ceil(pct / 100 * total)))
+    return int(np.searchsorted(np.cumsum(histogram), rank))
+
+
+def merge_results(combatants: Sequence[CombatantSpec], chunks: Sequence[ChunkResult], seed: int) -> EncounterResult:
+    """Combine chunk counts into win rates and HP distributions."""
+    trials = sum(chunk.trials for chunk in chunks)
+    party_wins = sum(chunk.party_wins for chunk in chunks)
+    enemy_wins = sum(chunk.enemy_wins for chunk in chunks)
+    outcomes = []
+    for i, combatant in enumerate(combatants):
+        histogram = np.sum([chunk.hp_histograms[i] for chunk in chunks], axis=0)
+        outcomes.append(CombatantOutcome(
+            name=combatant.name,
+            side=SIDE_NAMES[combatant.side],
+            survival_rate=float(1 - histogram[0] / trials),
+            mean_hp=float(np.dot(np.arange(len(histogram)), histogram) / trials),
+            hp_percentiles={
+                f"p{pct}": _histogram_percentile(histogram, trials, pct) for pct in HP_PERCENTILES
+            },
+        ))
+    return EncounterResult(
+        trials=trials,
+        seed=seed,
+        party_win_rate=party_wins / trials,
+        enemy_win_rate=enemy_wins / trials,
+        draw_rate=(trials - party_wins - enemy_wins) / trials,
+        mean_rounds=sum(chunk.rounds for chunk in chunks) / trials,
+        combatants=outcomes,
+    )
+
+
+def plan_chunks(trials: int, seed: int) -> List[Tuple[int, np.random.SeedSequence]]:
+    """Split trials into fixed-size chunks with independent child seeds."""
+    sizes = [CHUNK_TRIALS] * (trials // CHUNK_TRIALS)
+    if trials % CHUNK_TRIALS:
+        sizes.append(trials % CHUNK_TRIALS)
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+
+class EncounterSimulator:
+    """
+    Runs encounter simulations on a pool of worker processes.
+
+    The simulation is CPU-bound NumPy work, so chunks of trials are spread
+    across processes rather than threads. With ``max_workers=0`` chunks run
+    on the event loop's default thread pool instead, which avoids starting
+    processes (e.g. in tests). Results for a given seed are identical either way.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers == 0:
+            return None
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads or open files
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def simulate(self, combatants: Sequence[CombatantSpec], trials: int, max_rounds: int = 50,
+                       seed: Optional[int] = None) -> EncounterResult:
+        """
+        Simulate an encounter without blocking the event loop.
+
+        Args:
+            combatants: Both sides' combatants
+            trials: Number of independent encounters
+            max_rounds: Rounds after which an undecided encounter is a draw
+            seed: Seed for reproducible results; a random one is chosen and
+                reported back if omitted
+
+        Returns:
+            EncounterResult: Win rates and end-of-fight HP distributions
+        """
+        seed = secrets.randbits(63) if seed is None else seed
+        combatants = tuple(combatants)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(executor, simulate_chunk, combatants, size, max_rounds, chunk_seed)
+            for size, chunk_seed in plan_chunks(trials, seed)
+        ))
+        return merge_results(combatants, chunks, seed)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes; a new pool is started on the next simulation."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
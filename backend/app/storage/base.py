@@ -0,0 +1,272 @@
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Longer keys are truncated and suffixed with a hash, to stay within
+# filesystem name limits
+MAX_KEY_LENGTH = 200
+_SAFE_CHARACTERS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-")
+
+
+def content_hash(document: bytes) -> str:
+    """Hash a serialized character document into a version token."""
+    return hashlib.blake2b(document, digest_size=16).hexdigest()
+
+
+def encode_key(character_name: str) -> str:
+    """
+    Map a character name onto a collision-free, filesystem-safe key.
+
+    Names stay case-insensitive. Spaces become "_" and every other character
+    outside a-z, 0-9 and "-" (including "_" itself) is written as the %xx
+    escapes of its UTF-8 bytes, so "A B" and "a_b" get different keys and no
+    key can name a path outside a store's directory. Names of letters,
+    digits and spaces keep the key of the original lowercase/underscore
+    scheme, so most existing files and rows keep theirs.
+    """
+    parts = []
+    for char in character_name.lower():
+        if char in _SAFE_CHARACTERS:
+            parts.append(char)
+        elif char == " ":
+            parts.append("_")
+        else:
+            parts.append("".join(f"%{byte:02x}" for byte in char.encode("utf-8")))
+    key = "".join(parts)
+    if len(key) > MAX_KEY_LENGTH:
+        # "~" never appears in an escaped key, so truncated keys cannot collide with full ones
+        digest = hashlib.blake2b(key.encode("ascii"), digest_size=16).hexdigest()
+        key = f"{key[:MAX_KEY_LENGTH - len(digest) - 1]}~{digest}"
+    return key
+
+
+@dataclass
+class StoredRecord:
+    """
+    Raw character data as persisted, plus the store's version token.
+
+    ``trusted`` is set by stores that stamp the records they write with the
+    schema version and a checksum (see JsonCharacterStore): it means the
+    stamp checked out, so the data is exactly a document the service
+    validated under the current schema and need not be validated again.
+    """
+    data: Dict[str, Any]
+    version: str
+    trusted: bool = False
+
+
+class CharacterStore(ABC):
+    """
+    Persistence interface for characters.
+
+    Stores deal in plain dictionaries (``Character.model_dump()`` output);
+    validation and caching stay in CharacterService. Every stored record has
+    a version token, a hash of its stored content (see content_hash), which
+    callers use to check cached copies without re-reading the record and
+    which the API exposes as the ETag.
+
+    Failures are raised as exceptions; CharacterService turns them into its
+    boolean/None return values.
+    """
+
+    def key_for(self, character_name: str) -> str:
+        """Map a character name onto the store's lookup key (see encode_key)."""
+        return encode_key(character_name)
+
+    @abstractmethod
+    def version(self, character_name: str) -> Optional[str]:
+        """Return the current version token, or None if the character is absent."""
+
+    @abstractmethod
+    def read(self, character_name: str) -> Optional[StoredRecord]:
+        """Read a character record, or None if it does not exist."""
+
+    def read_many(self, character_names: Iterable[str]) -> Dict[str, StoredRecord]:
+        """
+        Read several characters.
+
+        Returns:
+            The records found, keyed by the names they were requested with
+        """
+        records = {}
+        for name in character_names:
+            record = self.read(name)
+            if record is not None:
+                records[name] = record
+        return records
+
+    @abstractmethod
+    def write(self, character_data: Dict[str, Any]) -> str:
+        """Insert or replace a character and return its new version token."""
+
+    def version_for(self, character_data: Dict[str, Any]) -> str:
+        """
+        Return the version token write() would give this data, without writing it.
+
+        Raises:
+            NotImplementedError: If the store cannot predict its versions
+        """
+        raise NotImplementedError("This storage backend cannot predict version tokens")
+
+    def sync(self, character_names: Iterable[str]) -> None:
+        """
+        Force the last writes of these characters onto stable storage (fsync).
+
+        The default does nothing, for stores that sync on every write.
+        """
+
+    def write_many(self, characters_data: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Insert or replace several characters.
+
+        The default writes one at a time; backends with transactions
+        override this to commit the whole batch at once.
+        """
+        return [self.write(data) for data in characters_data]
+
+    def patch(self, character_name: str, changes: Dict[str, Any],
+              current: Optional[StoredRecord] = None) -> Optional[str]:
+        """
+        Replace some top-level fields of a stored character.
+
+        The default rewrites the whole record; backends that can update a
+        document in place override this.
+
+        Args:
+            character_name: Name of the character
+            changes: Already validated, JSON-ready values by field name
+            current: The record the changes were computed from, if the
+                caller has already read it
+
+        Returns:
+            The new version token, or None if the character does not exist
+        """
+        record = current if current is not None else self.read(character_name)
+        if record is None:
+            return None
+        return self.write({**record.data, **changes})
+
+    def patch_many(self, changes: Dict[str, Dict[str, Any]],
+                   current: Optional[Dict[str, StoredRecord]] = None) -> Dict[str, Optional[str]]:
+        """
+        Apply patch() to several characters as one write batch.
+
+        The default merges the changes into each record and hands them to
+        write_many, so backends with transactional batches commit them at once.
+
+        Args:
+            changes: Field changes keyed by character name
+            current: Records already read by the caller, keyed the same way
+
+        Returns:
+            The new version token of each character, or None for characters
+            that do not exist
+        """
+        current = current or {}
+        documents = {}
+        for name, fields in changes.items():
+            record = current.get(name) or self.read(name)
+            if record is not None:
+                documents[name] = {**record.data, **fields}
+        written = dict(zip(documents, self.write_many(list(documents.values()))))
+        return {name: written.get(name) for name in changes}
+
+    @abstractmethod
+    def delete(self, character_name: str) -> bool:
+        """Delete a character; return False if it did not exist."""
+
+    @abstractmethod
+    def list_names(self) -> List[str]:
+        """List the names of every stored character."""
+
+    @abstractmethod
+    def query_summaries(self, filters: Dict[str, Any], sort: str = "name", descending: bool = False,
+                        limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return one page of character summaries using the store's secondary indexes.
+
+        Args:
+            filters: Required values for any of race, character_class and level
+            sort: "name" or "level"; ties are broken by the store key
+            descending: Reverse the sort order
+            limit: Maximum number of rows
+            cursor: Opaque cursor returned with the previous page
+
+        Returns:
+            The page rows (see summary_index.SUMMARY_FIELDS) and the cursor of
+            the next page, or None if this is the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+
+    def history(self, character_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        List the logged changes of a character, oldest first.
+
+        Only stores that keep a mutation log support this.
+
+        Raises:
+            NotImplementedError: If the store keeps no history
+        """
+        raise NotImplementedError("This storage backend does not keep character history")
+
+    def undo(self, character_name: str) -> Optional[StoredRecord]:
+        """
+        Revert a character's most recent change.
+
+        Raises:
+            NotImplementedError: If the store keeps no history
+        """
+        raise NotImplementedError("This storage backend does not keep character history")
+
+    def generation(self) -> int:
+        """
+        Return a counter that changes whenever the store reloads its contents.
+
+        Stores that detect out-of-band changes (and rebuild their indexes)
+        bump it, so callers holding derived data know to rebuild it too.
+        """
+        return 0
+
+    def rebuild_index(self) -> None:
+        """Resynchronize any in-memory index with the underlying storage."""
+
+    def flush(self) -> int:
+        """
+        Write out changes the store has buffered in memory.
+
+        Returns:
+            int: Number of characters written; stores that write through return 0
+        """
+        return 0
+
+    def checkpoint(self) -> None:
+        """Persist in-memory state that speeds up the next start, such as an index snapshot."""
+
+    def watch(self, on_change: Callable[[Optional[List[str]]], None], mode: str = "auto",
+              debounce: float = 0.5, poll_interval: float = 2.0) -> bool:
+        """
+        Follow changes made to the storage outside the store.
+
+        The store brings its own indexes up to date, then calls ``on_change``
+        with the keys of the characters that changed, or None if it had to
+        reload everything.
+
+        Args:
+            on_change: Receives the changed keys, in debounced batches
+            mode: "inotify", "poll", or "auto" for inotify with a polling fallback
+            debounce: Quiet period, in seconds, that ends a batch of changes
+            poll_interval: Seconds between scans when polling
+
+        Returns:
+            bool: False if the store cannot watch its storage
+        """
+        return False
+
+    def unwatch(self) -> None:
+        """Stop following out-of-band changes."""
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
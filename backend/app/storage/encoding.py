@@ -0,0 +1,124 @@
+import json
+from typing import Any, Dict, Literal, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for the msgpack encoding
+    msgpack = None
+
+# How the JSON store encodes the files it writes. Files in any of these
+# encodings are read whatever the setting, so it can be changed at any time.
+StorageEncoding = Literal["indented", "compact", "msgpack"]
+
+# Field appended to files the store writes: "<schema version>:<checksum>",
+# the checksum being the content hash of the file without this field
+STAMP_FIELD = "_stamp"
+
+# Leading bytes of a MessagePack map (fixmap, map 16, map 32); JSON documents
+# start with "{" or whitespace instead
+_MSGPACK_MAP_BYTES = frozenset(range(0x80, 0x90)) | {0xde, 0xdf}
+
+# How a stamp is appended to each JSON layout: (what precedes the stamp,
+# what follows it, what closes the document once the stamp is removed)
+_JSON_STAMPS = (
+    (b',\n    "' + STAMP_FIELD.encode() + b'": "', b'"\n}', b"\n}"),
+    (b',"' + STAMP_FIELD.encode() + b'":"', b'"}', b"}"),
+)
+
+
+def is_msgpack(document: bytes) -> bool:
+    """Tell whether a stored document is MessagePack rather than JSON."""
+    return bool(document) and document[0] in _MSGPACK_MAP_BYTES
+
+
+def check_encoding(encoding: StorageEncoding) -> None:
+    """
+    Make sure documents can be written in an encoding.
+
+    Raises:
+        RuntimeError: If encoding is "msgpack" and msgpack is not installed
+    """
+    if encoding == "msgpack" and msgpack is None:
+        raise RuntimeError("The msgpack storage encoding needs the msgpack package")
+
+
+def encode_document(character_data: Dict[str, Any], encoding: StorageEncoding) -> bytes:
+    """
+    Encode a character document for storage.
+
+    Args:
+        character_data: The character document
+        encoding: "indented" JSON (readable, the original layout), "compact"
+            JSON without whitespace, or "msgpack"
+
+    Returns:
+        bytes: The encoded document
+
+    Raises:
+        RuntimeError: If encoding is "msgpack" and msgpack is not installed
+    """
+    if encoding == "msgpack":
+        check_encoding(encoding)
+        return msgpack.packb(character_data, use_bin_type=True)
+    if encoding == "compact":
+        return json.dumps(character_data, separators=(',', ':')).encode('utf-8')
+    return json.dumps(character_data, indent=4).encode('utf-8')
+
+
+def append_stamp(document: bytes, stamp: str) -> bytes:
+    """
+    Append the stamp field to a document made by encode_document.
+
+    JSON documents get it as their last field. MessagePack documents are
+    followed by the stamp as a second object, so the document itself stays
+    byte-for-byte what was encoded.
+    """
+    if is_msgpack(document):
+        return document + msgpack.packb(stamp)
+    prefix, suffix, closing = _JSON_STAMPS[0] if document.endswith(b"\n}") else _JSON_STAMPS[1]
+    return document[:-len(closing)] + prefix + stamp.encode('ascii') + suffix
+
+
+def _split_json_stamp(document: bytes) -> Tuple[bytes, Optional[str]]:
+    for prefix, suffix, closing in _JSON_STAMPS:
+        if document.endswith(suffix):
+            start = document.rfind(prefix)
+            if start >= 0:
+                stamp = document[start + len(prefix):-len(suffix)]
+                return document[:start] + closing, stamp.decode('ascii', 'replace')
+    return document, None
+
+
+def decode_document(document: bytes) -> Tuple[Any, bytes, Optional[str]]:
+    """
+    Decode a stored document in any of the storage encodings.
+
+    Args:
+        document: The file's content
+
+    Returns:
+        Tuple[Any, bytes, Optional[str]]: The decoded data (without the
+        stamp field), the document as it was before its stamp was appended,
+        and the stamp, or None if there is none
+
+    Raises:
+        ValueError: If the document cannot be decoded
+        RuntimeError: If it is MessagePack and msgpack is not installed
+    """
+    if is_msgpack(document):
+        if msgpack is None:
+            raise RuntimeError("Reading msgpack-encoded characters needs the msgpack package")
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(document)
+        try:
+            data = unpacker.unpack()
+            end = unpacker.tell()
+            stamp = unpacker.unpack() if end < len(document) else None
+        except (ValueError, msgpack.OutOfData) as e:
+            raise ValueError(f"Invalid msgpack document: {e}") from e
+        return data, document[:end], stamp if isinstance(stamp, str) else None
+    data = json.loads(document)
+    if isinstance(data, dict):
+        data.pop(STAMP_FIELD, None)
+    body, stamp = _split_json_stamp(document)
+    return data, body, stamp
@@ -0,0 +1,439 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..locks import KeyLocks
+from ..metrics import timed
+from .base import CharacterStore, StoredRecord, content_hash, encode_key
+from .summary_index import SummaryIndex, decode_cursor, encode_cursor, summarize
+
+
+# Snapshots written before they carried an undo stack; their log is replayed from the start
+SNAPSHOT_FORMAT = 2
+UndoStack = List[Optional[Dict[str, Any]]]
+
+
+@dataclass
+class LogState:
+    """
+    What is kept in memory about one character's log; the document itself is not.
+
+    ``version`` is None once the character has been deleted.
+    """
+    version: Optional[str]
+    log_size: int
+    tail_events: int
+
+
+def _encode(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _apply(data: Optional[Dict[str, Any]], event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply one log event to a character document (None = absent)."""
+    op = event["op"]
+    if op in ("put", "undo"):
+        return event["data"]
+    if op == "patch":
+        return {**(data or {}), **event["changes"]}
+    if op == "delete":
+        return None
+    raise ValueError(f"Unknown log event: {op}")
+
+
+def _replay_event(stack: UndoStack, event: Dict[str, Any], depth: int) -> None:
+    """
+    Apply one log event to an undo stack, whose top is the current document.
+
+    Undo events pop the stack; every other event pushes its result, keeping
+    the current document and at most ``depth`` earlier ones.
+    """
+    if event["op"] == "undo":
+        if len(stack) > 1:
+            stack.pop()
+        stack[-1] = event["data"]
+        return
+    stack.append(_apply(stack[-1], event))
+    del stack[:-(depth + 1)]
+
+
+def _changed_fields(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> List[str]:
+    before, after = before or {}, after or {}
+    return sorted(field for field in before.keys() | after.keys() if before.get(field) != after.get(field))
+
+
+class EventLogCharacterStore(CharacterStore):
+    """
+    Characters stored as append-only mutation logs with periodic snapshots.
+
+    Each character has a ``<key>.log`` file of newline-delimited JSON events
+    (put, patch, delete, undo) and a ``<key>.snapshot.json`` file holding the
+    document as of a byte offset into the log. Writes append a single event:
+    a save that changes a few fields is logged as a patch of just those
+    fields. Once ``compact_every`` events have accumulated past the snapshot,
+    a new snapshot is written; the log itself is never truncated, so it
+    doubles as an audit trail.
+
+    Snapshots also hold the undo stack: the previous ``undo_depth``
+    documents. An undo replays only the snapshot and the events after it,
+    so its cost does not grow with the length of the log, and a character
+    can be walked back at most ``undo_depth`` changes. The full history is
+    still read from the whole log.
+
+    Only each character's version, log size and summary are kept in memory,
+    so memory does not grow with the size of the documents. Reads and
+    writes replay the character's snapshot and the events after it (at most
+    ``compact_every``) from disk. A stat of the log detects appends made out
+    of band and refreshes that character's entry.
+    Changes to one character are serialized by striped per-key locks (see
+    KeyLocks); the in-memory indexes have their own lock, held only briefly.
+    """
+
+    def __init__(self, root: Path, compact_every: int = 100, undo_depth: int = 100):
+        self.root = Path(root)
+        self.compact_every = compact_every
+        self.undo_depth = undo_depth
+        self._states: Dict[str, LogState] = {}
+        self._names: Dict[str, str] = {}
+        self._summaries = SummaryIndex()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._index_lock = threading.RLock()
+        self._key_locks = KeyLocks()
+        self._generation = 0
+        self.rebuild_index()
+
+    def _log_path(self, key: str) -> Path:
+        return self.root / f"{key}.log"
+
+    def _snapshot_path(self, key: str) -> Path:
+        return self.root / f"{key}.snapshot.json"
+
+    def _directory_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.root)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _read_snapshot(self, key: str) -> Tuple[int, UndoStack]:
+        """Return a snapshot's log offset and undo stack, or the start of the log if there is none."""
+        try:
+            with open(self._snapshot_path(key), 'rb') as f:
+                snapshot = json.loads(f.read())
+            if snapshot.get("format") == SNAPSHOT_FORMAT:
+                return snapshot["offset"], snapshot["undo"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return 0, [None]
+
+    def _replay(self, key: str) -> Optional[Tuple[LogState, UndoStack]]:
+        """Rebuild a character and its undo stack from its snapshot and the log events after it."""
+        offset, stack = self._read_snapshot(key)
+        try:
+            with open(self._log_path(key), 'rb') as f:
+                log_size = os.fstat(f.fileno()).st_size
+                if offset > log_size:
+                    offset, stack = 0, [None]
+                f.seek(offset)
+                tail = f.read()
+        except FileNotFoundError:
+            return None
+        events = 0
+        for line in tail.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # an append still in progress
+            _replay_event(stack, json.loads(line), self.undo_depth)
+            events += 1
+        return LogState(self._version(stack[-1]), log_size, events), stack
+
+    def _version(self, data: Optional[Dict[str, Any]]) -> Optional[str]:
+        return self.version_for(data) if data is not None else None
+
+    def _remember(self, key: str, state: Optional[LogState], data: Optional[Dict[str, Any]] = None) -> None:
+        """Record a character's state and summary in the in-memory indexes; call with the index lock held."""
+        if state is None:
+            self._states.pop(key, None)
+        else:
+            self._states[key] = state
+        if data is None:
+            self._names.pop(key, None)
+            self._summaries.remove(key)
+            return
+        self._names[key] = data["name"]
+        try:
+            self._summaries.add(key, summarize(data))
+        except ValueError:
+            self._summaries.remove(key)
+
+    def rebuild_index(self) -> None:
+        """Replay every character in the directory into memory."""
+        with self._index_lock:
+            self._states, self._names, self._summaries = {}, {}, SummaryIndex()
+            self._signature = self._directory_signature()
+            self._generation += 1
+            if self._signature is None:
+                return
+            rekeyed = False
+            for log_path in self.root.glob('*.log'):
+                try:
+                    key, replayed = log_path.stem, self._replay(log_path.stem)
+                    if replayed is None:
+                        continue
+                    state, stack = replayed
+                    if stack[-1] is not None:
+                        key = self._rekey(key, stack[-1]["name"])
+                        rekeyed = rekeyed or key != log_path.stem
+                    self._remember(key, state, stack[-1])
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+            if rekeyed:
+                self._signature = self._directory_signature()
+
+    def _rekey(self, key: str, character_name: str) -> str:
+        """
+        Move a log written under an older key scheme to its character's current key.
+
+        Logs of deleted characters have no name to go by and are left where they are.
+        """
+        current = encode_key(character_name)
+        if current == key or self._log_path(current).exists():
+            return key
+        if self._snapshot_path(key).exists():
+            os.replace(self._snapshot_path(key), self._snapshot_path(current))
+        os.replace(self._log_path(key), self._log_path(current))
+        return current
+
+    def _ensure_index_fresh(self) -> None:
+        if self._directory_signature() != self._signature:
+            self.rebuild_index()
+
+    def generation(self) -> int:
+        self._ensure_index_fresh()
+        return self._generation
+
+    def _state(self, key: str) -> Optional[LogState]:
+        """Return a character's state, replaying it if its log grew out of band."""
+        try:
+            log_size = self._log_path(key).stat().st_size
+        except FileNotFoundError:
+            with self._index_lock:
+                self._remember(key, None)
+            return None
+        with self._index_lock:
+            state = self._states.get(key)
+        if state is not None and state.log_size == log_size:
+            return state
+        with self._key_locks.hold(key):
+            self._load(key)
+            with self._index_lock:
+                return self._states.get(key)
+
+    def _load(self, key: str) -> Optional[Tuple[LogState, Optional[Dict[str, Any]]]]:
+        """
+        Replay a character from disk and refresh its in-memory entry.
+
+        Returns:
+            The character's state and current document (None if deleted),
+            or None if it has never been stored
+        """
+        with timed("parse"):
+            replayed = self._replay(key)
+        state, data = (replayed[0], replayed[1][-1]) if replayed is not None else (None, None)
+        with self._index_lock:
+            self._remember(key, state, data)
+        return (state, data) if state is not None else None
+
+    def _append(self, key: str, event: Dict[str, Any], previous: Optional[LogState],
+                data: Optional[Dict[str, Any]]) -> Tuple[LogState, Optional[Dict[str, Any]]]:
+        """
+        Append an event to a character's log and update its in-memory entry; call with the key's lock held.
+
+        Args:
+            previous: The character's state before the event (None if never stored)
+            data: The character's document before the event (None if absent)
+
+        Returns:
+            The new state and document
+        """
+        event = {"at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), **event}
+        line = _encode(event) + b"\n"
+        with open(self._log_path(key), 'ab') as f:
+            f.write(line)
+            log_size = f.tell()
+        data = _apply(data, event)
+        state = LogState(self._version(data), log_size, (previous.tail_events if previous is not None else 0) + 1)
+        if state.tail_events >= self.compact_every:
+            self._compact(key, state)
+        with self._index_lock:
+            self._remember(key, state, data)
+            self._signature = self._directory_signature()
+        return state, data
+
+    def _compact(self, key: str, state: LogState) -> None:
+        """Snapshot a character and its undo stack at the end of its log; call with the key's lock held."""
+        replayed = self._replay(key)
+        if replayed is None:
+            return
+        snapshot = {"format": SNAPSHOT_FORMAT, "offset": replayed[0].log_size, "undo": replayed[1]}
+        temp_path = self._snapshot_path(key).with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(_encode(snapshot))
+        os.replace(temp_path, self._snapshot_path(key))
+        state.tail_events = 0
+
+    def compact(self) -> int:
+        """
+        Snapshot every character that has events past its last snapshot.
+
+        Returns:
+            int: Number of snapshots written
+        """
+        self._ensure_index_fresh()
+        written = 0
+        with self._index_lock:
+            keys = list(self._states)
+        for key in keys:
+            with self._key_locks.hold(key):
+                state = self._state(key)
+                if state is not None and state.tail_events:
+                    self._compact(key, state)
+                    written += 1
+        with self._index_lock:
+            self._signature = self._directory_signature()
+        return written
+
+    def version(self, character_name: str) -> Optional[str]:
+        state = self._state(self.key_for(character_name))
+        return state.version if state is not None else None
+
+    def read(self, character_name: str) -> Optional[StoredRecord]:
+        loaded = self._load(self.key_for(character_name))
+        if loaded is None or loaded[1] is None:
+            return None
+        state, data = loaded
+        return StoredRecord(data, state.version)
+
+    def write(self, character_data: Dict[str, Any]) -> str:
+        key = self.key_for(character_data["name"])
+        with self._key_locks.hold(key):
+            state, current = self._load(key) or (None, None)
+            if current is not None and current.keys() == character_data.keys():
+                changes = {
+                    field: value for field, value in character_data.items()
+                    if current[field] != value
+                }
+                if not changes:
+                    return state.version
+                event = {"op": "patch", "changes": changes}
+            else:
+                event = {"op": "put", "data": character_data}
+            return self._append(key, event, state, current)[0].version
+
+    def version_for(self, character_data: Dict[str, Any]) -> str:
+        return content_hash(_encode(character_data))
+
+    def sync(self, character_names: Iterable[str]) -> None:
+        """fsync the characters' logs."""
+        for name in character_names:
+            try:
+                with open(self._log_path(self.key_for(name)), 'rb') as f:
+                    os.fsync(f.fileno())
+            except FileNotFoundError:
+                continue
+
+    def patch(self, character_name: str, changes: Dict[str, Any],
+              current: Optional[StoredRecord] = None) -> Optional[str]:
+        """Append the changed fields as a single patch event."""
+        key = self.key_for(character_name)
+        with self._key_locks.hold(key):
+            state, data = self._load(key) or (None, None)
+            if data is None:
+                return None
+            if not changes:
+                return state.version
+            return self._append(key, {"op": "patch", "changes": changes}, state, data)[0].version
+
+    def delete(self, character_name: str) -> bool:
+        key = self.key_for(character_name)
+        with self._key_locks.hold(key):
+            state = self._state(key)
+            if state is None or state.version is None:
+                return False
+            self._append(key, {"op": "delete"}, state, None)
+        return True
+
+    def history(self, character_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        List every logged change of a character, oldest first.
+
+        Reads the whole log, so its cost grows with the number of changes.
+
+        Returns:
+            One entry per event (seq, op, at and the fields it changed), or
+            None if the character has never been stored
+        """
+        try:
+            with open(self._log_path(self.key_for(character_name)), 'rb') as f:
+                lines = f.read().splitlines(keepends=True)
+        except FileNotFoundError:
+            return None
+        events: List[Dict[str, Any]] = []
+        stack: UndoStack = [None]
+        for seq, line in enumerate(lines, start=1):
+            if not line.endswith(b"\n"):
+                break
+            event = json.loads(line)
+            before = stack[-1]
+            _replay_event(stack, event, self.undo_depth)
+            events.append({
+                "seq": seq,
+                "op": event["op"],
+                "at": event.get("at"),
+                "fields": _changed_fields(before, stack[-1]),
+            })
+        return events
+
+    def undo(self, character_name: str) -> Optional[StoredRecord]:
+        """
+        Revert a character's most recent change that has not been undone yet.
+
+        The undo is itself appended to the log, recording the restored state,
+        so repeated undos walk further back, up to ``undo_depth`` changes,
+        and the audit trail is kept.
+
+        Returns:
+            The restored record, or None if the undo removed the character
+            (i.e. it reverted its creation)
+
+        Raises:
+            LookupError: If the character has never been stored
+            ValueError: If there is nothing left to undo
+        """
+        key = self.key_for(character_name)
+        with self._key_locks.hold(key):
+            replayed = self._replay(key)
+            if replayed is None:
+                raise LookupError(character_name)
+            previous, stack = replayed
+            if len(stack) < 2:
+                raise ValueError("Nothing to undo")
+            state, data = self._append(key, {"op": "undo", "data": stack[-2]}, previous, stack[-1])
+        if data is None:
+            return None
+        return StoredRecord(data, state.version)
+
+    def list_names(self) -> List[str]:
+        self._ensure_index_fresh()
+        with self._index_lock:
+            return list(self._names.values())
+
+    def query_summaries(self, filters: Dict[str, Any], sort: str = "name", descending: bool = False,
+                        limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        position = decode_cursor(cursor, sort) if cursor is not None else None
+        self._ensure_index_fresh()
+        with self._index_lock:
+            items, last = self._summaries.query(filters, sort, descending, limit, position)
+        return items, encode_cursor(last) if last is not None else None
@@ -0,0 +1,35 @@
+from ..config import Settings
+from .base import CharacterStore
+from .event_log_store import EventLogCharacterStore
+from .json_store import JsonCharacterStore
+from .sqlite_store import SqliteCharacterStore
+from .write_behind import WriteBehindStore
+
+
+def create_store(settings: Settings) -> CharacterStore:
+    """
+    Build the storage backend selected by configuration.
+
+    Args:
+        settings (Settings): Application settings
+
+    Returns:
+        CharacterStore: The configured store, wrapped in a WriteBehindStore
+        when write-behind is enabled
+    """
+    store: CharacterStore
+    if settings.storage_backend == "sqlite":
+        store = SqliteCharacterStore(settings.sqlite_path)
+    elif settings.storage_backend == "eventlog":
+        settings.event_log_dir.mkdir(parents=True, exist_ok=True)
+        store = EventLogCharacterStore(settings.event_log_dir, settings.log_compact_every, settings.log_undo_depth)
+    else:
+        settings.data_dir.mkdir(parents=True, exist_ok=True)
+        store = JsonCharacterStore(settings.data_dir, migrate_in_background=True,
+                                   snapshot=settings.index_snapshot,
+                                   snapshot_interval=settings.index_snapshot_interval,
+                                   encoding=settings.storage_encoding)
+    if settings.write_behind:
+        return WriteBehindStore(store, settings.write_behind_interval, settings.write_behind_max_batch,
+                                settings.write_behind_fsync, settings.write_behind_max_retries)
+    return store
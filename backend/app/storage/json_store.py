@@ -0,0 +1,714 @@
+import contextlib
+import hashlib
+import json
+import os
+import posixpath
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..metrics import timed
+from ..models.character import SCHEMA_VERSION
+from .base import CharacterStore, StoredRecord, content_hash, encode_key
+from .encoding import StorageEncoding, append_stamp, check_encoding, decode_document, encode_document
+from .summary_index import SummaryIndex, decode_cursor, encode_cursor, summarize
+from .watcher import DirectoryWatcher, WatchMode, watch_directory
+
+# Files live under SHARD_LEVELS directories of SHARD_WIDTH hex digits each,
+# taken from a hash of the key: 65,536 leaf directories.
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+# Persisted copy of the indexes, loaded at startup instead of reading every file
+SNAPSHOT_NAME = ".index-snapshot"
+SNAPSHOT_FORMAT = 1
+# A directory modified this close to the snapshot's creation may have changed
+# again within the same mtime tick, so it is rescanned rather than trusted
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def shard_path(root: Path, key: str) -> Path:
+    """Return the sharded location of a key's file under ``root``."""
+    digest = hashlib.blake2b(key.encode("ascii"), digest_size=8).hexdigest()
+    shards = [digest[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+    return root.joinpath(*shards, f"{key}.json")
+
+
+def _make_shard_dirs(file_path: Path) -> None:
+    """Create the shard directories of a file; the root itself must already exist."""
+    for depth in range(SHARD_LEVELS, 0, -1):
+        file_path.parents[depth - 1].mkdir(exist_ok=True)
+
+
+def _write_atomically(file_path: Path, document: bytes) -> None:
+    """
+    Write a file through a temporary sibling renamed over it.
+
+    Readers and a crash mid-write only ever see the old or the new document,
+    never a truncated one. The temporary name is unique per process and
+    thread, and does not end in .json, so scans never pick it up.
+    """
+    temp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        f = open(temp_path, 'wb')
+    except FileNotFoundError:
+        _make_shard_dirs(file_path)
+        f = open(temp_path, 'wb')
+    try:
+        with f:
+            f.write(document)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            temp_path.unlink()
+        raise
+
+
+def _fsync_path(path: Path) -> None:
+    """fsync a file or directory; a path that has since been deleted is skipped."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def character_files(root: Path) -> Iterator[Path]:
+    """Yield every character file under ``root``: sharded ones, then any left in the flat layout."""
+    yield from Path(root).glob("/".join(["*"] * SHARD_LEVELS) + "/*.json")
+    yield from Path(root).glob("*.json")
+
+
+_NO_LOCK = contextlib.nullcontext()
+
+
+def stamp_document(document: bytes) -> bytes:
+    """
+    Append the stamp to an encoded character document.
+
+    Args:
+        document: The document as encode_document made it
+
+    Returns:
+        bytes: The document with a trailing stamp of the current
+        SCHEMA_VERSION and the document's content hash
+    """
+    return append_stamp(document, f"{SCHEMA_VERSION}:{content_hash(document)}")
+
+
+def _verified(body: bytes, stamp: Optional[str]) -> Tuple[str, bool]:
+    """Hash a document for its version token and check the stamp against it."""
+    etag = content_hash(body)
+    return etag, stamp == f"{SCHEMA_VERSION}:{etag}"
+
+
+@dataclass
+class IndexEntry:
+    """In-memory metadata for one character file."""
+    name: str
+    path: str
+    mtime_ns: int
+    size: int
+    etag: str
+
+
+# What indexing a file yields: its key, index entry and summary (None if invalid)
+IndexedFile = Tuple[str, IndexEntry, Optional[Dict[str, Any]]]
+
+
+class JsonCharacterStore(CharacterStore):
+    """
+    One JSON file per character, sharded by a hash of its key.
+
+    Files are stored as ``root/ab/cd/<key>.json`` (see encode_key and
+    shard_path), so no directory grows beyond a few dozen entries even with
+    millions of characters. Files are replaced by renaming a fully written
+    temporary file over them, so they are never seen half-written.
+
+    A name -> file metadata index, plus secondary indexes over the summary
+    fields, is built when the store is created and kept current by
+    write/delete, so listing never opens character files. A stat of the
+    root directory detects files dropped into it (or removed) out of band
+    and triggers a rebuild; rebuild_index() covers edits inside the shards.
+
+    Files still in the old flat layout (``root/<name>.json``) are indexed and
+    served, and moved into their shard the first time they are read or
+    written; migrate_layout() moves the rest, and with
+    ``migrate_in_background`` it runs on a thread as soon as any are found.
+
+    Version tokens are content hashes. Each index entry remembers the hash
+    together with the file's mtime and size, so version() costs one stat
+    unless the file has changed since it was last read.
+
+    Files the store writes end with a ``_stamp`` field holding the schema
+    version and the content hash of the rest of the file (see
+    stamp_document). A file whose stamp still matches its content is read
+    as a trusted record, which CharacterService validates in strict mode
+    (see validate_trusted). Hand-edited, imported-by-copy and flat-layout
+    files have no valid stamp and are validated in lax mode. Patches keep the stamp only if
+    the record they patched was trusted, since they validate just the
+    fields they change.
+
+    New files are written in ``encoding``: indented JSON (the default, easy
+    to edit by hand), compact JSON, or MessagePack (see encoding.py). Files
+    keep the .json name either way, and files in every encoding are read,
+    so existing data needs no conversion when the setting changes; files
+    are rewritten in the new encoding as they are saved.
+
+    With ``snapshot`` enabled the indexes are saved to ``root/.index-snapshot``
+    by checkpoint() and close(), and every ``snapshot_interval`` seconds while
+    they have changed. A new store loads the snapshot instead of reading every
+    file: shard directories whose mtime still matches are taken as recorded,
+    and only files in changed directories are stat'ed, and re-read if they
+    changed. Like the live index, it does not notice a file edited in place
+    inside an unchanged directory until that file is read or rebuild_index()
+    runs.
+
+    watch() follows such out-of-band edits as they happen (see watcher.py),
+    re-indexing just the files that changed.
+    """
+
+    def __init__(self, root: Path, migrate_in_background: bool = False, snapshot: bool = False,
+                 snapshot_interval: float = 0, encoding: StorageEncoding = "indented"):
+        check_encoding(encoding)
+        self.root = Path(root)
+        self.encoding = encoding
+        self.snapshot = snapshot
+        self._index: Dict[str, IndexEntry] = {}
+        self._summaries = SummaryIndex()
+        self._legacy: Dict[str, Path] = {}
+        self._index_signature: Optional[Tuple[int, int]] = None
+        self._index_lock = threading.Lock()
+        self._migration_lock = threading.RLock()
+        self._generation = 0
+        # Index changes so far, and how many of them the snapshot on disk has
+        self._changes = 0
+        self._snapshot_changes = 0
+        self._snapshot_lock = threading.Lock()
+        self._stop_snapshots = threading.Event()
+        self._watcher: Optional[DirectoryWatcher] = None
+        if not (snapshot and self._load_snapshot()):
+            self.rebuild_index()
+        if migrate_in_background and self._legacy:
+            threading.Thread(target=self.migrate_layout, name="json-store-migration", daemon=True).start()
+        if snapshot and snapshot_interval > 0:
+            threading.Thread(target=self._save_snapshots, args=(snapshot_interval,),
+                             name="json-store-snapshot", daemon=True).start()
+
+    def path_for(self, character_name: str) -> Path:
+        """Return the file a character is stored in."""
+        return shard_path(self.root, self.key_for(character_name))
+
+    def _directory_signature(self) -> Optional[Tuple[int, int]]:
+        """Identify the current state of the directory (inode, mtime)."""
+        try:
+            stat = os.stat(self.root)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def rebuild_index(self) -> None:
+        """
+        Rebuild the name and summary indexes by scanning every file in the directory.
+
+        Call this after files have been changed outside the service; it also
+        runs automatically when the directory itself is replaced or files are
+        added or removed behind the store's back.
+        """
+        signature = self._directory_signature()
+        files = character_files(self.root) if signature is not None else ()
+        self._install(((file_path.parent == self.root, self._index_file(str(file_path))) for file_path in files),
+                      signature)
+
+    def _index_file(self, file_path: str) -> Optional[IndexedFile]:
+        """Read a file for the indexes; None if it is not a readable character."""
+        try:
+            with open(file_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                document = f.read()
+            character_data, body, _ = decode_document(document)
+            key = encode_key(character_data["name"])
+        except:
+            return None
+        try:
+            summary = summarize(character_data)
+        except ValueError:
+            summary = None
+        entry = IndexEntry(
+            name=character_data["name"],
+            path=str(file_path),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            etag=content_hash(body),
+        )
+        return key, entry, summary
+
+    def _install(self, files: Iterable[Tuple[bool, Optional[IndexedFile]]],
+                 signature: Optional[Tuple[int, int]]) -> None:
+        """
+        Replace the indexes with the given files: sharded ones first, then the flat layout.
+
+        Args:
+            files: Whether each file is in the flat layout, and what indexing it yielded
+            signature: Directory signature the files were listed under
+        """
+        index: Dict[str, IndexEntry] = {}
+        summaries: Dict[str, Dict[str, Any]] = {}
+        legacy: Dict[str, Path] = {}
+        for flat, indexed in files:
+            if indexed is None:
+                continue
+            key, entry, summary = indexed
+            if flat:
+                legacy[key] = Path(entry.path)
+                if key in index:
+                    continue  # already moved into its shard; the flat copy is stale
+            index[key] = entry
+            if summary is not None:
+                summaries[key] = summary
+        summary_index = SummaryIndex.build(summaries)
+        with self._index_lock:
+            self._index = index
+            self._summaries = summary_index
+            self._legacy = legacy
+            self._index_signature = signature
+            self._generation += 1
+            self._changes += 1
+
+    def _load_snapshot(self) -> bool:
+        """
+        Build the indexes from the snapshot, re-reading only files that changed since.
+
+        Returns:
+            bool: False, leaving the indexes alone, if there is no usable snapshot
+        """
+        try:
+            snapshot = json.loads((self.root / SNAPSHOT_NAME).read_bytes())
+            if snapshot["format"] != SNAPSHOT_FORMAT:
+                return False
+            trusted_before = snapshot["created_ns"] - RACY_WINDOW_NS
+            directories: Dict[str, int] = snapshot["directories"]
+            files: Dict[str, List[list]] = snapshot["files"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        subdirectories: Dict[str, List[str]] = {}
+        for relative in directories:
+            subdirectories.setdefault(posixpath.dirname(relative), []).append(relative)
+        signature = self._directory_signature()
+        root = str(self.root)
+        sharded: List[Tuple[bool, Optional[IndexedFile]]] = []
+        flat: List[Tuple[bool, Optional[IndexedFile]]] = []
+
+        # Paths are plain strings here: building Path objects would cost more than the stats
+        def from_row(file_path: str, row: list) -> IndexedFile:
+            _, key, name, mtime_ns, size, etag, summary = row
+            return key, IndexEntry(name, file_path, mtime_ns, size, etag), summary
+
+        def visit(relative: str, depth: int) -> None:
+            directory = f"{root}/{relative}"
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                return
+            if directories.get(relative) != mtime_ns or mtime_ns >= trusted_before:
+                scan(relative, directory, depth)
+            elif depth < SHARD_LEVELS:
+                for child in subdirectories.get(relative, ()):
+                    visit(child, depth + 1)
+            else:
+                for row in files.get(relative, ()):
+                    sharded.append((False, from_row(f"{directory}/{row[0]}", row)))
+
+        def scan(relative: str, directory: str, depth: int) -> None:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                return
+            recorded = {row[0]: row for row in files.get(relative, ())}
+            for item in entries:
+                if depth < SHARD_LEVELS and item.is_dir():
+                    visit(posixpath.join(relative, item.name), depth + 1)
+                elif (depth == 0 or depth == SHARD_LEVELS) and item.name.endswith(".json") and item.is_file():
+                    indexed = check(recorded.get(item.name), item.path)
+                    (flat if depth == 0 else sharded).append((depth == 0, indexed))
+
+        def check(row: Optional[list], file_path: str) -> Optional[IndexedFile]:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            if row is not None and row[3] == stat.st_mtime_ns and row[4] == stat.st_size:
+                return from_row(file_path, row)
+            return self._index_file(file_path)
+
+        # The root always changes (the snapshot itself is renamed into it), so it is always scanned
+        scan("", root, 0)
+        self._install(sharded + flat, signature)
+        return True
+
+    def save_snapshot(self) -> None:
+        """
+        Write the indexes to the snapshot file, for the next store to start from.
+
+        Raises:
+            OSError: If the snapshot cannot be written
+        """
+        with self._snapshot_lock:
+            created_ns = time.time_ns()
+            # Directories are stat'ed before the index is copied, so a write
+            # racing with the snapshot leaves its directory looking changed
+            directories: Dict[str, int] = {}
+            level = [""]
+            for _ in range(SHARD_LEVELS):
+                below = []
+                for relative in level:
+                    try:
+                        entries = list(os.scandir(self.root / relative))
+                    except FileNotFoundError:
+                        continue
+                    for item in entries:
+                        if item.is_dir():
+                            child = posixpath.join(relative, item.name)
+                            directories[child] = item.stat().st_mtime_ns
+                            below.append(child)
+                level = below
+            prefix = len(str(self.root)) + 1
+            files: Dict[str, List[list]] = {}
+            with self._index_lock:
+                changes = self._changes
+                for key, entry in self._index.items():
+                    directory, file_name = posixpath.split(entry.path[prefix:].replace(os.sep, "/"))
+                    files.setdefault(directory, []).append(
+                        [file_name, key, entry.name, entry.mtime_ns, entry.size, entry.etag, self._summaries.get(key)]
+                    )
+            document = json.dumps({
+                "format": SNAPSHOT_FORMAT,
+                "created_ns": created_ns,
+                "directories": directories,
+                "files": files,
+            }, separators=(',', ':')).encode('utf-8')
+            snapshot_path = self.root / SNAPSHOT_NAME
+            temp_path = snapshot_path.with_name(f"{SNAPSHOT_NAME}.{os.getpid()}-{threading.get_ident()}.tmp")
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(document)
+                os.replace(temp_path, snapshot_path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    temp_path.unlink()
+                raise
+            with self._index_lock:
+                self._snapshot_changes = changes
+                # Our own rename changed the root directory; it needs no rebuild
+                self._index_signature = self._directory_signature()
+
+    def checkpoint(self) -> None:
+        """Save the index snapshot if snapshots are enabled and the indexes changed since the last one."""
+        if self.snapshot and self._changes != self._snapshot_changes:
+            self.save_snapshot()
+
+    def _save_snapshots(self, interval: float) -> None:
+        while not self._stop_snapshots.wait(interval):
+            try:
+                self.checkpoint()
+            except OSError as e:
+                print(f"Error saving the index snapshot: {e}")
+
+    def refresh_files(self, paths: Iterable[str]) -> List[str]:
+        """
+        Bring the indexes up to date with files changed outside the store.
+
+        Files whose mtime and size still match the index (such as the
+        store's own writes) are not re-read. Flat-layout files are indexed
+        as they would be by rebuild_index().
+
+        Args:
+            paths: Character files that were added, modified or deleted
+
+        Returns:
+            List[str]: Keys whose entries were added, updated or removed
+        """
+        root = str(self.root)
+        with self._index_lock:
+            keys_by_path = {entry.path: key for key, entry in self._index.items()}
+            keys_by_path.update({str(path): key for key, path in self._legacy.items()})
+        changed: Set[str] = set()
+        for path in paths:
+            if not path.endswith(".json"):
+                continue
+            known_key = keys_by_path.get(path)
+            flat = os.path.dirname(path) == root
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            with self._index_lock:
+                entry = self._index.get(known_key) if known_key is not None else None
+            if stat is not None and entry is not None and entry.path == path and \
+                    (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            indexed = self._index_file(path) if stat is not None else None
+            with self._index_lock:
+                if known_key is not None:
+                    if flat:
+                        self._legacy.pop(known_key, None)
+                    current = self._index.get(known_key)
+                    if current is not None and current.path == path:
+                        del self._index[known_key]
+                        self._summaries.remove(known_key)
+                        changed.add(known_key)
+                if indexed is not None:
+                    key, entry, summary = indexed
+                    if flat:
+                        self._legacy[key] = Path(path)
+                    current = self._index.get(key)
+                    if flat and current is not None and current.path != path:
+                        continue  # a stale flat copy of a character already in its shard
+                    self._index[key] = entry
+                    if summary is not None:
+                        self._summaries.add(key, summary)
+                    else:
+                        self._summaries.remove(key)
+                    changed.add(key)
+        with self._index_lock:
+            # Files dropped into the root reach refresh_files through the watcher too,
+            # so a root that changed needs no full rebuild
+            self._index_signature = self._directory_signature()
+            if changed:
+                self._generation += 1
+                self._changes += 1
+        return sorted(changed)
+
+    def watch(self, on_change: Callable[[Optional[List[str]]], None], mode: WatchMode = "auto",
+              debounce: float = 0.5, poll_interval: float = 2.0) -> bool:
+        def apply(paths: Optional[Set[str]]) -> None:
+            if paths is None:
+                self.rebuild_index()
+                on_change(None)
+                return
+            keys = self.refresh_files(paths)
+            if keys:
+                on_change(keys)
+
+        self.unwatch()
+        self._watcher = watch_directory(str(self.root), SHARD_LEVELS, apply, mode, debounce, poll_interval)
+        return True
+
+    def unwatch(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def close(self) -> None:
+        """Stop watching and the periodic snapshots, and save a final snapshot."""
+        self.unwatch()
+        self._stop_snapshots.set()
+        self.checkpoint()
+
+    def _ensure_index_fresh(self) -> None:
+        if self._directory_signature() != self._index_signature:
+            self.rebuild_index()
+
+    def generation(self) -> int:
+        self._ensure_index_fresh()
+        return self._generation
+
+    def _remember(self, key: str, file_path: Path, character_data: Dict[str, Any],
+                  stat: os.stat_result, etag: str) -> None:
+        """Record the current state of a file in the indexes."""
+        entry = IndexEntry(
+            name=character_data["name"],
+            path=str(file_path),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            etag=etag,
+        )
+        try:
+            summary = summarize(character_data)
+        except ValueError:
+            summary = None
+        with self._index_lock:
+            if self._index.get(key) != entry:
+                self._changes += 1
+            self._index[key] = entry
+            if summary is not None:
+                self._summaries.add(key, summary)
+            else:
+                self._summaries.remove(key)
+
+    def _migrate_key(self, key: str) -> bool:
+        """
+        Move a key's flat-layout file into its shard.
+
+        A flat file whose key already has a sharded file is stale and is
+        removed instead.
+
+        Returns:
+            bool: True if a file now exists at the sharded location
+        """
+        with self._migration_lock:
+            with self._index_lock:
+                legacy_path = self._legacy.pop(key, None)
+            if legacy_path is None:
+                return False
+            target = shard_path(self.root, key)
+            try:
+                if target.exists():
+                    legacy_path.unlink()
+                else:
+                    _make_shard_dirs(target)
+                    os.replace(legacy_path, target)
+            except FileNotFoundError:
+                pass  # removed behind our back
+            with self._index_lock:
+                entry = self._index.get(key)
+                if entry is not None and entry.path == str(legacy_path):
+                    entry.path = str(target)
+                    self._changes += 1
+                # Our own rename changed the root directory; it needs no rebuild
+                self._index_signature = self._directory_signature()
+            return target.exists()
+
+    def _fall_back_to_legacy(self, key: str) -> bool:
+        """Migrate a key that has no sharded file yet, if the flat layout has it."""
+        if not self._legacy:
+            self._ensure_index_fresh()
+        return bool(self._legacy) and self._migrate_key(key)
+
+    def migrate_layout(self) -> Dict[str, int]:
+        """
+        Move every file left in the flat layout into its shard.
+
+        Safe to run while the store is serving requests: each file is moved
+        with an atomic rename, under the lock writes take while flat files
+        remain, and a character written in the meantime keeps its new file.
+
+        Returns:
+            Dict[str, int]: Number of files moved and stale flat files removed
+        """
+        moved = removed = 0
+        self._ensure_index_fresh()
+        with self._index_lock:
+            keys = list(self._legacy)
+        for key in keys:
+            had_shard = shard_path(self.root, key).exists()
+            if self._migrate_key(key):
+                if had_shard:
+                    removed += 1
+                else:
+                    moved += 1
+        return {"moved": moved, "removed_stale": removed}
+
+    def version(self, character_name: str) -> Optional[str]:
+        file_path = self.path_for(character_name)
+        key = self.key_for(character_name)
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            if not self._fall_back_to_legacy(key):
+                return None
+            return self.version(character_name)
+        with self._index_lock:
+            entry = self._index.get(key)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry.etag
+        record = self.read(character_name)
+        return record.version if record is not None else None
+
+    def read(self, character_name: str) -> Optional[StoredRecord]:
+        file_path = self.path_for(character_name)
+        key = self.key_for(character_name)
+        try:
+            with open(file_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                document = f.read()
+        except FileNotFoundError:
+            if not self._fall_back_to_legacy(key):
+                return None
+            return self.read(character_name)
+        with timed("parse"):
+            character_data, body, stamp = decode_document(document)
+        etag, trusted = _verified(body, stamp)
+        if isinstance(character_data, dict) and "name" in character_data:
+            self._remember(key, file_path, character_data, stat, etag)
+        return StoredRecord(character_data, etag, trusted)
+
+    def _encode(self, character_data: Dict[str, Any]) -> bytes:
+        return encode_document(character_data, self.encoding)
+
+    def version_for(self, character_data: Dict[str, Any]) -> str:
+        return content_hash(self._encode(character_data))
+
+    def write(self, character_data: Dict[str, Any]) -> str:
+        return self._write(character_data, stamped=True)
+
+    def _write(self, character_data: Dict[str, Any], stamped: bool) -> str:
+        self._ensure_index_fresh()
+        key = self.key_for(character_data["name"])
+        file_path = shard_path(self.root, key)
+        document = self._encode(character_data)
+        etag = content_hash(document)
+        with self._migration_lock if self._legacy else _NO_LOCK:
+            _write_atomically(file_path, stamp_document(document) if stamped else document)
+            self._remember(key, file_path, character_data, file_path.stat(), etag)
+            if key in self._legacy:
+                self._migrate_key(key)  # drops the stale flat copy
+        with self._index_lock:
+            self._index_signature = self._directory_signature()
+        return etag
+
+    def patch(self, character_name: str, changes: Dict[str, Any],
+              current: Optional[StoredRecord] = None) -> Optional[str]:
+        record = current if current is not None else self.read(character_name)
+        if record is None:
+            return None
+        # Only the changed fields were validated; the rest is as trusted as the record was
+        return self._write({**record.data, **changes}, stamped=record.trusted)
+
+    def patch_many(self, changes: Dict[str, Dict[str, Any]],
+                   current: Optional[Dict[str, StoredRecord]] = None) -> Dict[str, Optional[str]]:
+        current = current or {}
+        return {name: self.patch(name, fields, current.get(name)) for name, fields in changes.items()}
+
+    def sync(self, character_names: Iterable[str]) -> None:
+        """fsync the characters' files and the shard directories holding them."""
+        directories = set()
+        for name in character_names:
+            file_path = shard_path(self.root, self.key_for(name))
+            directories.add(file_path.parent)
+            _fsync_path(file_path)
+        for directory in directories:
+            _fsync_path(directory)
+
+    def delete(self, character_name: str) -> bool:
+        self._ensure_index_fresh()
+        key = self.key_for(character_name)
+        file_path = shard_path(self.root, key)
+        with self._migration_lock if self._legacy else _NO_LOCK:
+            self._migrate_key(key)
+            try:
+                file_path.unlink()
+            except FileNotFoundError:
+                return False
+        with self._index_lock:
+            self._index.pop(key, None)
+            self._summaries.remove(key)
+            self._index_signature = self._directory_signature()
+            self._changes += 1
+        return True
+
+    def list_names(self) -> List[str]:
+        self._ensure_index_fresh()
+        with self._index_lock:
+            return [entry.name for entry in self._index.values()]
+
+    def query_summaries(self, filters: Dict[str, Any], sort: str = "name", descending: bool = False,
+                        limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        position = decode_cursor(cursor, sort) if cursor is not None else None
+        self._ensure_index_fresh()
+        with self._index_lock:
+            items, last = self._summaries.query(filters, sort, descending, limit, position)
+        return items, encode_cursor(last) if last is not None else None
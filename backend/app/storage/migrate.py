@@ -0,0 +1,70 @@
+"""
+Copy an existing JSON character directory into a SQLite database.
+
+Usage (from the backend directory):
+    python -m app.storage.migrate --source data/characters --target data/characters.db
+"""
+import argparse
+from pathlib import Path
+from typing import Dict, List
+from pydantic import ValidationError
+from ..models.character import Character
+from .encoding import decode_document
+from .json_store import character_files
+from .sqlite_store import SqliteCharacterStore
+
+
+def migrate_json_to_sqlite(source: Path, target: Path, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Copy every character file under ``source`` into the database at ``target``.
+
+    Each file is validated against Character before it is written; invalid
+    or unreadable files are skipped. Rows are committed in batches of
+    ``batch_size``. Existing rows with the same key are replaced, so the
+    migration can be re-run safely.
+
+    Args:
+        source (Path): Directory of ``*.json`` character files
+        target (Path): SQLite database file (created if missing)
+        batch_size (int): Number of characters written per transaction
+
+    Returns:
+        Dict[str, int]: Counts of migrated and skipped files
+    """
+    store = SqliteCharacterStore(target)
+    migrated = skipped = 0
+    batch: List[dict] = []
+    try:
+        for file_path in sorted(character_files(Path(source))):
+            try:
+                with open(file_path, 'rb') as f:
+                    character = Character(**decode_document(f.read())[0])
+            except (OSError, ValueError, RuntimeError, ValidationError) as e:
+                print(f"Skipping {file_path}: {e}")
+                skipped += 1
+                continue
+            batch.append(character.model_dump())
+            if len(batch) >= batch_size:
+                store.write_many(batch)
+                migrated += len(batch)
+                batch = []
+        if batch:
+            store.write_many(batch)
+            migrated += len(batch)
+    finally:
+        store.close()
+    return {"migrated": migrated, "skipped": skipped}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", type=Path, default=Path("data/characters"))
+    parser.add_argument("--target", type=Path, default=Path("data/characters.db"))
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    result = migrate_json_to_sqlite(args.source, args.target, args.batch_size)
+    print(f"Migrated {result['migrated']} characters ({result['skipped']} skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..metrics import timed
+from .base import CharacterStore, StoredRecord, content_hash, encode_key
+from .summary_index import FILTER_FIELDS, SUMMARY_FIELDS, decode_cursor, encode_cursor
+
+
+def _rekey(connection: sqlite3.Connection) -> None:
+    """
+    Move rows stored under the original lowercase/underscore keys to their encode_key keys.
+
+    Raises:
+        ValueError: If several rows would move to the same key (their names
+            differ only in case); the message names them, and nothing is moved
+    """
+    targets: Dict[str, List[Tuple[str, str]]] = {}
+    for key, name in connection.execute("SELECT key, name FROM characters").fetchall():
+        targets.setdefault(encode_key(name), []).append((key, name))
+    collisions = [rows for rows in targets.values() if len(rows) > 1]
+    if collisions:
+        listed = "; ".join(
+            " and ".join(f"{name!r} (key {key!r})" for key, name in rows) for rows in collisions
+        )
+        raise ValueError(f"Cannot move characters to their new keys, these rows would share one: {listed}. "
+                         "Delete or rename all but one of each and restart.")
+    moves = [(target, rows[0][0]) for target, rows in targets.items() if rows[0][0] != target]
+    # Step every moving row aside first, so one can take a key another is leaving
+    connection.executemany("UPDATE characters SET key = ? WHERE key = ?", [("\0" + key, key) for _, key in moves])
+    connection.executemany("UPDATE characters SET key = ? WHERE key = ?",
+                           [(target, "\0" + key) for target, key in moves])
+
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version:
+# SQL scripts, or functions run in a transaction for data changes.
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS characters (
+        key TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        race TEXT NOT NULL,
+        character_class TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        version TEXT NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_characters_name ON characters (name);
+    CREATE INDEX IF NOT EXISTS idx_characters_race ON characters (race);
+    CREATE INDEX IF NOT EXISTS idx_characters_class ON characters (character_class);
+    CREATE INDEX IF NOT EXISTS idx_characters_level ON characters (level);
+    """,
+    # Composite indexes ending in the primary key, so a filtered page in
+    # either sort order is read straight off an index without sorting.
+    """
+    DROP INDEX IF EXISTS idx_characters_race;
+    DROP INDEX IF EXISTS idx_characters_class;
+    DROP INDEX IF EXISTS idx_characters_level;
+    CREATE INDEX idx_characters_race ON characters (race, key);
+    CREATE INDEX idx_characters_race_level ON characters (race, level, key);
+    CREATE INDEX idx_characters_class ON characters (character_class, key);
+    CREATE INDEX idx_characters_class_level ON characters (character_class, level, key);
+    CREATE INDEX idx_characters_level ON characters (level, key);
+    """,
+    _rekey,
+    # Race and class together, so pages filtered on both stay bounded too.
+    """
+    CREATE INDEX IF NOT EXISTS idx_characters_race_class ON characters (race, character_class, key);
+    CREATE INDEX IF NOT EXISTS idx_characters_race_class_level ON characters (race, character_class, level, key);
+    """,
+]
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache compiles each one once and reuses it as a prepared statement.
+SELECT_VERSION = "SELECT version FROM characters WHERE key = ?"
+SELECT_RECORD = "SELECT data, version FROM characters WHERE key = ?"
+SELECT_NAMES = "SELECT name FROM characters ORDER BY key"
+UPSERT = """
+INSERT INTO characters (key, name, race, character_class, level, version, data)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    name = excluded.name,
+    race = excluded.race,
+    character_class = excluded.character_class,
+    level = excluded.level,
+    version = excluded.version,
+    data = excluded.data
+"""
+UPDATE_VERSION = "UPDATE characters SET version = content_hash(data) WHERE key = ? RETURNING version"
+DELETE = "DELETE FROM characters WHERE key = ?"
+SUMMARY_COLUMNS = (
+    "key, name, race, character_class, level, "
+    "json_extract(data, '$.max_hp'), json_extract(data, '$.current_hp')"
+)
+SORT_COLUMNS = {"name": ("key",), "level": ("level", "key")}
+# Keys per SELECT ... IN (...) in read_many, well below SQLite's variable limit.
+READ_BATCH_SIZE = 500
+# Document fields mirrored in their own column, kept in sync by patch().
+INDEXED_COLUMNS = ("race", "character_class", "level")
+
+
+def _hash_text(document: str) -> str:
+    return content_hash(document.encode('utf-8'))
+
+
+class SqliteCharacterStore(CharacterStore):
+    """
+    Characters stored as rows of a single SQLite database.
+
+    The database runs in WAL mode so readers never block the writer. Name,
+    race, class and level are kept in indexed columns next to the JSON
+    document. Each thread gets its own connection, which lets the store be
+    used from the AsyncCharacterService worker pool.
+
+    Version tokens are a hash of the stored document.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._migrate()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.create_function("content_hash", 1, _hash_text, deterministic=True)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _migrate(self) -> None:
+        connection = self._connection()
+        current = connection.execute("PRAGMA user_version").fetchone()[0]
+        for version, script in enumerate(MIGRATIONS[current:], start=current + 1):
+            if callable(script):
+                with connection:
+                    script(connection)
+                    connection.execute(f"PRAGMA user_version = {version}")
+            else:
+                connection.executescript(f"BEGIN; {script} PRAGMA user_version = {version}; COMMIT;")
+
+    @staticmethod
+    def _row(key: str, character_data: Dict[str, Any]) -> Tuple[Any, ...]:
+        document = json.dumps(character_data, separators=(',', ':'))
+        version = content_hash(document.encode('utf-8'))
+        return (
+            key,
+            character_data["name"],
+            character_data["race"],
+            character_data["character_class"],
+            character_data["level"],
+            version,
+            document,
+        )
+
+    def version_for(self, character_data: Dict[str, Any]) -> str:
+        return self._row("", character_data)[5]
+
+    def sync(self, character_names: Iterable[str]) -> None:
+        """Checkpoint the WAL, which fsyncs it; commits under synchronous=NORMAL are not synced."""
+        self._connection().execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def version(self, character_name: str) -> Optional[str]:
+        row = self._connection().execute(SELECT_VERSION, (self.key_for(character_name),)).fetchone()
+        return row[0] if row else None
+
+    def read(self, character_name: str) -> Optional[StoredRecord]:
+        row = self._connection().execute(SELECT_RECORD, (self.key_for(character_name),)).fetchone()
+        if row is None:
+            return None
+        with timed("parse"):
+            data = json.loads(row[0])
+        return StoredRecord(data, row[1])
+
+    def write(self, character_data: Dict[str, Any]) -> str:
+        return self.write_many([character_data])[0]
+
+    def write_many(self, characters_data: Iterable[Dict[str, Any]]) -> List[str]:
+        rows = [self._row(self.key_for(data["name"]), data) for data in characters_data]
+        connection = self._connection()
+        with connection:
+            connection.executemany(UPSERT, rows)
+        return [row[5] for row in rows]
+
+    def read_many(self, character_names: Iterable[str]) -> Dict[str, StoredRecord]:
+        names_by_key = {self.key_for(name): name for name in character_names}
+        keys = list(names_by_key)
+        connection = self._connection()
+        records = {}
+        for start in range(0, len(keys), READ_BATCH_SIZE):
+            chunk = keys[start:start + READ_BATCH_SIZE]
+            rows = connection.execute(
+                f"SELECT key, data, version FROM characters WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for key, document, version in rows:
+                with timed("parse"):
+                    data = json.loads(document)
+                records[names_by_key[key]] = StoredRecord(data, version)
+        return records
+
+    def patch(self, character_name: str, changes: Dict[str, Any],
+              current: Optional[StoredRecord] = None) -> Optional[str]:
+        """
+        Update fields inside the stored document with json_set.
+
+        Only the changed values are serialized; SQLite rewrites the document
+        and the version is rehashed inside the same transaction.
+        """
+        return self.patch_many({character_name: changes})[character_name]
+
+    def patch_many(self, changes: Dict[str, Dict[str, Any]],
+                   current: Optional[Dict[str, StoredRecord]] = None) -> Dict[str, Optional[str]]:
+        connection = self._connection()
+        versions: Dict[str, Optional[str]] = {}
+        with connection:
+            for name, fields in changes.items():
+                versions[name] = self._patch_row(connection, self.key_for(name), fields)
+        return versions
+
+    @staticmethod
+    def _patch_row(connection: sqlite3.Connection, key: str, changes: Dict[str, Any]) -> Optional[str]:
+        if not changes:
+            row = connection.execute(SELECT_VERSION, (key,)).fetchone()
+            return row[0] if row else None
+        assignments = [f"data = json_set(data{', ?, json(?)' * len(changes)})"]
+        params: List[Any] = []
+        for field, value in changes.items():
+            params.extend((f"$.{field}", json.dumps(value, separators=(',', ':'))))
+        for column in INDEXED_COLUMNS:
+            if column in changes:
+                assignments.append(f"{column} = ?")
+                params.append(changes[column])
+        cursor = connection.execute(f"UPDATE characters SET {', '.join(assignments)} WHERE key = ?", (*params, key))
+        if cursor.rowcount == 0:
+            return None
+        return connection.execute(UPDATE_VERSION, (key,)).fetchone()[0]
+
+    def delete(self, character_name: str) -> bool:
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(DELETE, (self.key_for(character_name),))
+        return cursor.rowcount > 0
+
+    def list_names(self) -> List[str]:
+        return [row[0] for row in self._connection().execute(SELECT_NAMES)]
+
+    def query_summaries(self, filters: Dict[str, Any], sort: str = "name", descending: bool = False,
+                        limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        sort_columns = SORT_COLUMNS[sort]
+        clauses: List[str] = []
+        params: List[Any] = []
+        for field, value in filters.items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Unsupported filter: {field}")
+            clauses.append(f"{field} = ?")
+            params.append(value)
+        if cursor is not None:
+            position = decode_cursor(cursor, sort)
+            comparison = "<" if descending else ">"
+            clauses.append(f"({', '.join(sort_columns)}) {comparison} ({', '.join('?' * len(position))})")
+            params.extend(position)
+        direction = " DESC" if descending else ""
+        sql = (
+            f"SELECT {SUMMARY_COLUMNS} FROM characters"
+            + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+            + f" ORDER BY {', '.join(column + direction for column in sort_columns)} LIMIT ?"
+        )
+        params.append(limit + 1)
+        rows = self._connection().execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor((last[4], last[0]) if sort == "level" else (last[0],))
+        return [dict(zip(SUMMARY_FIELDS, row[1:])) for row in rows], next_cursor
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
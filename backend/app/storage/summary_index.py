@@ -0,0 +1,187 @@
+import base64
+import binascii
+import itertools
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+SUMMARY_FIELDS = ("name", "race", "character_class", "level", "max_hp", "current_hp")
+FILTER_FIELDS = ("race", "character_class", "level")
+SORT_FIELDS = ("name", "level")
+# Every combination of filter fields gets its own buckets, in FILTER_FIELDS order
+FILTER_COMBINATIONS = tuple(
+    fields for size in range(1, len(FILTER_FIELDS) + 1) for fields in itertools.combinations(FILTER_FIELDS, size)
+)
+
+SortKey = Tuple[Any, ...]
+
+
+def summarize(character_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the summary fields from a stored character document.
+
+    Raises:
+        ValueError: If a summary field is missing or has the wrong type
+    """
+    summary = {field: character_data.get(field) for field in SUMMARY_FIELDS}
+    for field in ("name", "race", "character_class"):
+        if not isinstance(summary[field], str):
+            raise ValueError(f"Invalid summary field: {field}")
+    for field in ("level", "max_hp", "current_hp"):
+        if not isinstance(summary[field], int) or isinstance(summary[field], bool):
+            raise ValueError(f"Invalid summary field: {field}")
+    return summary
+
+
+def encode_cursor(sort_key: SortKey) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str) -> SortKey:
+    """
+    Decode a cursor produced by encode_cursor for the given sort order.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    if sort == "name" and len(values) == 1 and isinstance(values[0], str):
+        return (values[0],)
+    if sort == "level" and len(values) == 2 and isinstance(values[0], int) and isinstance(values[1], str):
+        return (values[0], values[1])
+    raise ValueError("Invalid cursor")
+
+
+def sort_key(sort: str, key: str, summary: Dict[str, Any]) -> SortKey:
+    """Build the ordering tuple of a record; the store key breaks ties."""
+    if sort == "level":
+        return (summary["level"], key)
+    return (key,)
+
+
+class SummaryIndex:
+    """
+    In-memory secondary indexes over character summaries.
+
+    Keeps, for each sort order, a sorted list of the whole roster and one
+    per combination of filter values (race, class, level, race and class,
+    and so on; see FILTER_COMBINATIONS). A page is read by bisecting to the
+    cursor in the list of exactly the requested filters and walking forward,
+    so every row walked is returned and its cost depends on the page size
+    rather than the roster size, however many filters are combined. Each
+    summary is therefore held in 2 * (1 + len(FILTER_COMBINATIONS)) lists.
+    Not thread-safe; the owning store serializes access.
+    """
+
+    def __init__(self):
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._orders: Dict[str, List[SortKey]] = {sort: [] for sort in SORT_FIELDS}
+        self._buckets: Dict[Tuple[str, ...], Dict[Tuple[Any, ...], Dict[str, List[SortKey]]]] = {
+            fields: {} for fields in FILTER_COMBINATIONS
+        }
+
+    @classmethod
+    def build(cls, summaries: Dict[str, Dict[str, Any]]) -> "SummaryIndex":
+        """Index many summaries at once, sorting each list once instead of inserting one by one."""
+        index = cls()
+        index._summaries = dict(summaries)
+        for sort in SORT_FIELDS:
+            index._orders[sort] = sorted(sort_key(sort, key, summary) for key, summary in summaries.items())
+            # Walking the sorted order keeps every bucket sorted as it is filled
+            for fields in FILTER_COMBINATIONS:
+                buckets = index._buckets[fields]
+                for item in index._orders[sort]:
+                    summary = summaries[item[-1]]
+                    value = tuple(summary[field] for field in fields)
+                    bucket = buckets.get(value)
+                    if bucket is None:
+                        bucket = buckets[value] = {s: [] for s in SORT_FIELDS}
+                    bucket[sort].append(item)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._summaries.get(key)
+
+    def add(self, key: str, summary: Dict[str, Any]) -> None:
+        """Insert or replace the summary stored under ``key``."""
+        self.remove(key)
+        self._summaries[key] = summary
+        for sort in SORT_FIELDS:
+            insort(self._orders[sort], sort_key(sort, key, summary))
+        for fields in FILTER_COMBINATIONS:
+            value = tuple(summary[field] for field in fields)
+            bucket = self._buckets[fields].setdefault(value, {sort: [] for sort in SORT_FIELDS})
+            for sort in SORT_FIELDS:
+                insort(bucket[sort], sort_key(sort, key, summary))
+
+    def remove(self, key: str) -> None:
+        """Remove ``key`` from every index; unknown keys are ignored."""
+        summary = self._summaries.pop(key, None)
+        if summary is None:
+            return
+        for sort in SORT_FIELDS:
+            self._discard(self._orders[sort], sort_key(sort, key, summary))
+        for fields in FILTER_COMBINATIONS:
+            value = tuple(summary[field] for field in fields)
+            bucket = self._buckets[fields].get(value)
+            if bucket is None:
+                continue
+            for sort in SORT_FIELDS:
+                self._discard(bucket[sort], sort_key(sort, key, summary))
+            if not bucket[SORT_FIELDS[0]]:
+                del self._buckets[fields][value]
+
+    @staticmethod
+    def _discard(ordered: List[SortKey], item: SortKey) -> None:
+        position = bisect_left(ordered, item)
+        if position < len(ordered) and ordered[position] == item:
+            del ordered[position]
+
+    def query(self, filters: Dict[str, Any], sort: str = "name", descending: bool = False,
+              limit: int = 50, cursor: Optional[SortKey] = None) -> Tuple[List[Dict[str, Any]], Optional[SortKey]]:
+        """
+        Return one page of summaries matching every filter.
+
+        Args:
+            filters: Field -> required value, for fields in FILTER_FIELDS
+            sort: One of SORT_FIELDS
+            descending: Reverse the sort order
+            limit: Maximum number of rows
+            cursor: Sort key of the last row of the previous page
+
+        Returns:
+            The page rows and the sort key to resume from, or None on the last page
+        """
+        candidates = self._orders[sort]
+        if filters:
+            fields = tuple(sorted(filters, key=FILTER_FIELDS.index))
+            bucket = self._buckets[fields].get(tuple(filters[field] for field in fields))
+            if bucket is None:
+                return [], None
+            candidates = bucket[sort]
+
+        if descending:
+            start = bisect_left(candidates, cursor) - 1 if cursor is not None else len(candidates) - 1
+            positions = range(start, -1, -1)
+        else:
+            start = bisect_right(candidates, cursor) if cursor is not None else 0
+            positions = range(start, len(candidates))
+
+        items: List[Dict[str, Any]] = []
+        last: Optional[SortKey] = None
+        for position in positions:
+            item = candidates[position]
+            if len(items) == limit:
+                return items, last
+            items.append(self._summaries[item[-1]])
+            last = item
+        return items, None
@@ -0,0 +1,304 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterator, Literal, Optional, Set, Tuple
+
+WatchMode = Literal["auto", "inotify", "poll"]
+# Called with the paths that changed, or None when events were lost and
+# anything may have changed
+ChangeCallback = Callable[[Optional[Set[str]]], None]
+
+# A batch is handed over once events pause for the debounce delay, but never
+# later than this many debounce delays after its first event
+MAX_DELAY_FACTOR = 10
+# How often a blocked watcher thread checks whether it was stopped
+STOP_CHECK_SECONDS = 0.5
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _walk(directory: str, depth: int) -> Iterator[Tuple[str, int]]:
+    """Yield ``directory`` and its subdirectories down to ``depth`` levels below it."""
+    yield directory, depth
+    if depth == 0:
+        return
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for item in entries:
+        if item.is_dir(follow_symlinks=False):
+            yield from _walk(item.path, depth - 1)
+
+
+def _json_files(directory: str) -> Iterator[os.DirEntry]:
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for item in entries:
+        if item.name.endswith(".json") and item.is_file():
+            yield item
+
+
+class DirectoryWatcher:
+    """
+    Background thread reporting changed ``*.json`` files under a directory tree.
+
+    Changes are collected into a set and handed to the callback in batches:
+    a batch is delivered once no new change has arrived for ``debounce``
+    seconds, or at the latest MAX_DELAY_FACTOR debounce delays after its
+    first change. A path changed many times in that window is reported
+    once, so a bulk copy of thousands of files yields a few large batches
+    rather than one callback per file. Subclasses supply the changes.
+    """
+
+    def __init__(self, root: str, depth: int, on_change: ChangeCallback, debounce: float = 0.5):
+        self.root = root
+        self.depth = depth
+        self.on_change = on_change
+        self.debounce = debounce
+        self._pending: Set[str] = set()
+        self._overflow = False
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "DirectoryWatcher":
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread; changes not yet delivered are dropped."""
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._close()
+
+    def _note(self, path: Optional[str]) -> None:
+        """Record a changed path; None means events were lost."""
+        now = time.monotonic()
+        if path is None:
+            self._overflow = True
+        elif path.endswith(".json"):
+            self._pending.add(path)
+        else:
+            return
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+
+    def _due_in(self) -> Optional[float]:
+        """Seconds until the pending batch is due, or None if nothing is pending."""
+        if self._first_change is None:
+            return None
+        due = min(self._last_change + self.debounce, self._first_change + self.debounce * MAX_DELAY_FACTOR)
+        return max(0.0, due - time.monotonic())
+
+    def _deliver(self) -> None:
+        paths = None if self._overflow else self._pending
+        self._pending, self._overflow = set(), False
+        self._first_change = self._last_change = None
+        try:
+            self.on_change(paths)
+        except Exception as e:
+            print(f"Error applying file changes: {e}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            due_in = self._due_in()
+            if due_in == 0:
+                self._deliver()
+                continue
+            self._collect(due_in)
+
+    def _collect(self, timeout: Optional[float]) -> None:
+        """Wait up to ``timeout`` seconds (None: until stopped) for changes and note them."""
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        """Release resources once the thread has stopped."""
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """
+    Watches every directory of the tree with Linux inotify.
+
+    Files count as changed when they are closed after writing, renamed in or
+    out, or deleted. New subdirectories are watched (and their files reported)
+    as they appear. If the kernel queue overflows, the callback is told that
+    anything may have changed.
+
+    Raises:
+        OSError: From the constructor, if inotify is unavailable or the tree
+            needs more watches than the system allows
+    """
+
+    def __init__(self, root: str, depth: int, on_change: ChangeCallback, debounce: float = 0.5):
+        super().__init__(root, depth, on_change, debounce)
+        library = ctypes.util.find_library("c")
+        if library is None:
+            raise OSError(errno.ENOSYS, "libc not found")
+        self._libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, Tuple[str, int]] = {}
+        try:
+            for directory, depth_left in _walk(root, depth):
+                self._add_watch(directory, depth_left)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _add_watch(self, directory: str, depth_left: int) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return  # removed before we got to it
+            raise OSError(error, f"Cannot watch {directory}: {os.strerror(error)}")
+        self._watches[wd] = (directory, depth_left)
+
+    def _collect(self, timeout: Optional[float]) -> None:
+        wait = STOP_CHECK_SECONDS if timeout is None else min(timeout, STOP_CHECK_SECONDS)
+        readable, _, _ = select.select([self._fd], [], [], wait)
+        if not readable:
+            return
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+            self._handle(wd, mask, os.fsdecode(name))
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self._note(None)
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        watched = self._watches.get(wd)
+        if watched is None or not name:
+            return
+        directory, depth_left = watched
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO) and depth_left > 0:
+                self._watch_new_directory(path, depth_left - 1)
+            return
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+            self._note(path)
+
+    def _watch_new_directory(self, directory: str, depth_left: int) -> None:
+        """Watch a directory that just appeared, and report files written into it before the watch."""
+        try:
+            for subdirectory, subdirectory_depth in _walk(directory, depth_left):
+                self._add_watch(subdirectory, subdirectory_depth)
+                for item in _json_files(subdirectory):
+                    self._note(item.path)
+        except OSError as e:
+            print(f"Error watching {directory}: {e}")
+            self._note(None)
+
+    def _close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(DirectoryWatcher):
+    """
+    Finds changes by stat'ing every file of the tree each ``poll_interval`` seconds.
+
+    A file counts as changed when it appears, disappears, or its mtime or
+    size differ from the previous scan. Used where inotify is unavailable.
+    """
+
+    def __init__(self, root: str, depth: int, on_change: ChangeCallback, debounce: float = 0.5,
+                 poll_interval: float = 2.0):
+        super().__init__(root, depth, on_change, debounce)
+        self.poll_interval = poll_interval
+        self._files = self._scan()
+        self._next_scan = time.monotonic() + poll_interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for directory, _ in _walk(self.root, self.depth):
+            for item in _json_files(directory):
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                files[item.path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _collect(self, timeout: Optional[float]) -> None:
+        until_scan = max(0.0, self._next_scan - time.monotonic())
+        if timeout is not None and timeout < until_scan:
+            self._stopped.wait(timeout)
+            return
+        if self._stopped.wait(until_scan):
+            return
+        files = self._scan()
+        self._next_scan = time.monotonic() + self.poll_interval
+        for path in files.keys() - self._files.keys():
+            self._note(path)
+        for path, signature in self._files.items():
+            if files.get(path) != signature:
+                self._note(path)
+        self._files = files
+
+
+def watch_directory(root: str, depth: int, on_change: ChangeCallback, mode: WatchMode = "auto",
+                    debounce: float = 0.5, poll_interval: float = 2.0) -> DirectoryWatcher:
+    """
+    Start watching ``root`` and the directories ``depth`` levels below it.
+
+    Args:
+        root: Directory to watch
+        depth: Levels of subdirectories to watch as well
+        on_change: Receives batches of changed ``*.json`` paths (see ChangeCallback)
+        mode: "inotify", "poll", or "auto" for inotify falling back to polling
+        debounce: Quiet period, in seconds, that ends a batch
+        poll_interval: Seconds between scans when polling
+
+    Returns:
+        DirectoryWatcher: The running watcher; stop() it when done
+
+    Raises:
+        OSError: If mode is "inotify" and inotify cannot watch the tree
+    """
+    if mode != "poll":
+        try:
+            return InotifyWatcher(root, depth, on_change, debounce).start()
+        except OSError as e:
+            if mode == "inotify":
+                raise
+            print(f"inotify unavailable ({e}); polling {root} for changes instead")
+    return PollingWatcher(root, depth, on_change, debounce, poll_interval).start()
@@ -0,0 +1,330 @@
+import copy
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Tuple
+from ..metrics import REGISTRY, timed
+from .base import CharacterStore, StoredRecord
+
+FsyncPolicy = Literal["never", "batch"]
+
+# Longest wait (seconds) between flush retries after repeated failures
+MAX_RETRY_DELAY = 30.0
+
+PENDING_WRITES = REGISTRY.gauge("dnd_write_behind_pending", "Characters waiting in the write-behind buffer")
+FAILED_FLUSHES = REGISTRY.counter("dnd_write_behind_failed_flushes_total",
+                                  "Write-behind group flushes the wrapped store rejected")
+CONSECUTIVE_FAILURES = REGISTRY.gauge("dnd_write_behind_consecutive_failures",
+                                      "Write-behind flushes that have failed since the last one that succeeded")
+
+
+@dataclass
+class PendingWrite:
+    """
+    The latest buffered change of one character; ``data`` is None for a delete.
+
+    ``trusted`` is False for a patch of an untrusted record (see
+    StoredRecord.trusted), which must not be written as a validated document.
+    """
+    name: str
+    data: Optional[Dict[str, Any]]
+    version: Optional[str]
+    trusted: bool = True
+
+
+class WriteBehindStore(CharacterStore):
+    """
+    Buffers writes in memory and flushes them to another store in groups.
+
+    A save only records the new document, replacing any earlier save of the
+    same character that has not been flushed yet, and returns the version
+    token the wrapped store will give it (see CharacterStore.version_for).
+    A background thread flushes the buffer ``flush_interval`` seconds after
+    the first buffered change, or as soon as ``max_batch`` characters are
+    waiting, handing every write to the wrapped store's write_many as one
+    group commit.
+
+    Reads of a single character are answered from the buffer (including
+    writes being flushed at that moment), so they always see the latest
+    save. Listings, summary queries and history flush the buffer first and
+    then ask the wrapped store.
+
+    Durability is traded for write throughput: a saved change reaches disk
+    only when its group is flushed, and is lost if the process dies first.
+    With the "batch" fsync policy each group is also synced to stable
+    storage once it is written (see CharacterStore.sync). Call flush() (the
+    FastAPI lifespan does on shutdown) or close() to write everything out.
+
+    When the wrapped store rejects a group, the flusher retries it after
+    ``flush_interval`` seconds, doubling the wait after every further failure
+    (up to MAX_RETRY_DELAY). After ``max_retries`` failures in a row it stops
+    retrying, and each new save first flushes the buffer itself, so the
+    store's error reaches the caller instead of piling up more buffered
+    saves. stats() and the dnd_write_behind_* metrics report the failures.
+    """
+
+    def __init__(self, store: CharacterStore, flush_interval: float = 0.05, max_batch: int = 500,
+                 fsync: FsyncPolicy = "never", max_retries: int = 8):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.max_retries = max_retries
+        self._pending: Dict[str, PendingWrite] = {}
+        self._flushing: Dict[str, PendingWrite] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {"buffered": 0, "coalesced": 0, "flushes": 0, "flushed": 0, "failed_flushes": 0}
+        self._failures = 0
+        self._last_error: Optional[str] = None
+
+    def _buffer(self, entry: PendingWrite) -> None:
+        key = self.store.key_for(entry.name)
+        if self._failures >= self.max_retries:
+            # The flusher has given up; raises (without buffering) while the store still fails
+            self.flush()
+        with self._lock:
+            if key in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[key] = entry
+            self._stats["buffered"] += 1
+            if self._flusher is None and not self._closed:
+                self._flusher = threading.Thread(target=self._run_flusher, name="character-write-behind",
+                                                 daemon=True)
+                self._flusher.start()
+            if len(self._pending) >= self.max_batch:
+                self._wakeup.notify()
+            PENDING_WRITES.set(len(self._pending))
+
+    def _buffered(self, character_name: str) -> Optional[PendingWrite]:
+        key = self.store.key_for(character_name)
+        with self._lock:
+            entry = self._pending.get(key)
+            return entry if entry is not None else self._flushing.get(key)
+
+    def _run_flusher(self) -> None:
+        while True:
+            with self._lock:
+                self._wakeup.wait_for(lambda: self._closed or self._pending)
+                if self._closed:
+                    return
+                # Leave the window open so that repeated saves coalesce
+                self._wakeup.wait_for(lambda: self._closed or len(self._pending) >= self.max_batch,
+                                      timeout=self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                # flush() has counted the failure; back off, or wait for a flush that succeeds
+                with self._lock:
+                    if self._failures >= self.max_retries:
+                        self._wakeup.wait_for(lambda: self._closed or not self._failures)
+                    else:
+                        delay = min(self.flush_interval * 2 ** (self._failures - 1), MAX_RETRY_DELAY)
+                        self._wakeup.wait_for(lambda: self._closed, timeout=delay)
+
+    def _commit(self, batch: Dict[str, PendingWrite]) -> None:
+        writes = [entry.data for entry in batch.values() if entry.data is not None and entry.trusted]
+        with timed("group_commit"):
+            if writes:
+                self.store.write_many(writes)
+            for entry in batch.values():
+                if entry.data is not None and not entry.trusted:
+                    # Every field patched over an untrusted record: written, but not vouched for
+                    self.store.patch(entry.name, entry.data, StoredRecord(entry.data, entry.version))
+            for entry in batch.values():
+                if entry.data is None:
+                    self.store.delete(entry.name)
+            if self.fsync == "batch":
+                self.store.sync([entry.name for entry in batch.values()])
+
+    def flush(self) -> int:
+        """
+        Write every buffered change to the wrapped store as one group.
+
+        Returns:
+            int: Number of characters written or deleted
+
+        Raises:
+            Exception: Whatever the wrapped store raised; the failed changes
+                stay buffered (unless saved again meanwhile) for the next flush
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            try:
+                self._commit(batch)
+            except Exception as e:
+                with self._lock:
+                    for key, entry in batch.items():
+                        self._pending.setdefault(key, entry)
+                    self._flushing = {}
+                    self._stats["failed_flushes"] += 1
+                    self._failures += 1
+                    self._last_error = f"{type(e).__name__}: {e}"
+                    FAILED_FLUSHES.inc()
+                    CONSECUTIVE_FAILURES.set(self._failures)
+                    PENDING_WRITES.set(len(self._pending))
+                raise
+            with self._lock:
+                self._flushing = {}
+                self._stats["flushes"] += 1
+                self._stats["flushed"] += len(batch)
+                if self._failures:
+                    self._failures = 0
+                    self._last_error = None
+                    CONSECUTIVE_FAILURES.set(0)
+                    # Let a flusher that gave up go back to flushing on its own
+                    self._wakeup.notify_all()
+                PENDING_WRITES.set(len(self._pending))
+            return len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report buffer counters and the state of failing flushes.
+
+        Returns:
+            Dict[str, Any]: Characters waiting, saves buffered and coalesced
+            away, the number of flushes, characters flushed and failed
+            flushes, the failures since the last successful flush
+            ("consecutive_failures"), whether the flusher has stopped
+            retrying ("retries_exhausted") and the last error (None once a
+            flush succeeds)
+        """
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                **self._stats,
+                "consecutive_failures": self._failures,
+                "retries_exhausted": self._failures >= self.max_retries,
+                "last_error": self._last_error,
+            }
+
+    def key_for(self, character_name: str) -> str:
+        return self.store.key_for(character_name)
+
+    def version_for(self, character_data: Dict[str, Any]) -> str:
+        return self.store.version_for(character_data)
+
+    def version(self, character_name: str) -> Optional[str]:
+        entry = self._buffered(character_name)
+        if entry is not None:
+            return entry.version
+        return self.store.version(character_name)
+
+    def read(self, character_name: str) -> Optional[StoredRecord]:
+        entry = self._buffered(character_name)
+        if entry is None:
+            return self.store.read(character_name)
+        if entry.data is None:
+            return None
+        # Callers own the records they read; the buffered document must stay as saved
+        return StoredRecord(copy.deepcopy(entry.data), entry.version, entry.trusted)
+
+    def read_many(self, character_names: Iterable[str]) -> Dict[str, StoredRecord]:
+        records = {}
+        unbuffered = []
+        for name in character_names:
+            entry = self._buffered(name)
+            if entry is None:
+                unbuffered.append(name)
+            elif entry.data is not None:
+                records[name] = StoredRecord(copy.deepcopy(entry.data), entry.version, entry.trusted)
+        records.update(self.store.read_many(unbuffered))
+        return records
+
+    def write(self, character_data: Dict[str, Any]) -> str:
+        version = self.store.version_for(character_data)
+        self._buffer(PendingWrite(character_data["name"], character_data, version))
+        return version
+
+    def write_many(self, characters_data: Iterable[Dict[str, Any]]) -> List[str]:
+        return [self.write(data) for data in characters_data]
+
+    def patch(self, character_name: str, changes: Dict[str, Any],
+              current: Optional[StoredRecord] = None) -> Optional[str]:
+        record = current if current is not None else self.read(character_name)
+        if record is None:
+            return None
+        character_data = {**record.data, **changes}
+        version = self.store.version_for(character_data)
+        self._buffer(PendingWrite(character_name, character_data, version, record.trusted))
+        return version
+
+    def patch_many(self, changes: Dict[str, Dict[str, Any]],
+                   current: Optional[Dict[str, StoredRecord]] = None) -> Dict[str, Optional[str]]:
+        current = current or {}
+        return {name: self.patch(name, fields, current.get(name)) for name, fields in changes.items()}
+
+    def delete(self, character_name: str) -> bool:
+        entry = self._buffered(character_name)
+        if entry is not None:
+            existed = entry.data is not None
+        else:
+            existed = self.store.version(character_name) is not None
+        if existed:
+            self._buffer(PendingWrite(character_name, None, None))
+        return existed
+
+    def sync(self, character_names: Iterable[str]) -> None:
+        self.flush()
+        self.store.sync(character_names)
+
+    def list_names(self) -> List[str]:
+        self.flush()
+        return self.store.list_names()
+
+    def query_summaries(self, filters: Dict[str, Any], sort: str = "name", descending: bool = False,
+                        limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        self.flush()
+        return self.store.query_summaries(filters, sort, descending, limit, cursor)
+
+    def history(self, character_name: str) -> Optional[List[Dict[str, Any]]]:
+        self.flush()
+        return self.store.history(character_name)
+
+    def undo(self, character_name: str) -> Optional[StoredRecord]:
+        self.flush()
+        return self.store.undo(character_name)
+
+    def generation(self) -> int:
+        return self.store.generation()
+
+    def rebuild_index(self) -> None:
+        self.flush()
+        self.store.rebuild_index()
+
+    def checkpoint(self) -> None:
+        self.flush()
+        self.store.checkpoint()
+
+    def watch(self, on_change: Callable[[Optional[List[str]]], None], mode: str = "auto",
+              debounce: float = 0.5, poll_interval: float = 2.0) -> bool:
+        return self.store.watch(on_change, mode, debounce, poll_interval)
+
+    def unwatch(self) -> None:
+        self.store.unwatch()
+
+    def close(self) -> None:
+        """
+        Stop the flusher thread, flush what is left and close the wrapped store.
+
+        Raises:
+            Exception: Whatever the wrapped store raised for the final flush;
+                the wrapped store is closed anyway and the changes still
+                buffered are lost (stats() counts them as pending)
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join()
+        try:
+            self.flush()
+        finally:
+            self.store.close()
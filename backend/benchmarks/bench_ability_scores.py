@@ -0,0 +1,68 @@
+"""
+Ability score generation and percentile lookup throughput.
+
+Times generating batches of rolled and standard-array stat blocks, the
+one-off cost of building the exact distribution tables, and per-block
+percentile lookups against them.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_ability_scores --count 10000 --repeats 50
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services import ability_scores
+from benchmarks.common import latency_summary
+
+
+def bench_generate(method: str, count: int, repeats: int, seed: int) -> dict:
+    """Latency of generating and rating one batch of ``count`` stat blocks."""
+    rng = np.random.default_rng(seed)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeats):
+        call_started = time.perf_counter()
+        if method == "roll":
+            blocks = ability_scores.roll_stat_blocks(count, rng)
+        else:
+            blocks = ability_scores.standard_array_blocks(count, rng)
+        ability_scores.total_percentile(blocks.sum(axis=1))
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {**latency_summary(latencies, elapsed), "blocks_per_second": count * repeats / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    ability_scores.total_percentile(np.array([72]))
+    results = {"table_build_ms": (time.perf_counter() - started) * 1000}
+    print(f"distribution tables built in {results['table_build_ms']:.2f} ms")
+
+    totals = np.random.default_rng(args.seed).integers(18, 109, size=args.count)
+    started = time.perf_counter()
+    for _ in range(args.repeats):
+        ability_scores.total_percentile(totals)
+    results["lookups_per_second"] = args.count * args.repeats / (time.perf_counter() - started)
+    print(f"percentile lookups: {results['lookups_per_second'] / 1e6:.1f} M/s")
+
+    for method in ("roll", "standard_array"):
+        results[method] = bench_generate(method, args.count, args.repeats, args.seed)
+        print(f"{method:>15}: p50 {results[method]['p50_ms']:.2f} ms per {args.count} blocks, "
+              f"{results[method]['blocks_per_second'] / 1e6:.2f} M blocks/s")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
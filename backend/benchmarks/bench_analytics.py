@@ -0,0 +1,89 @@
+"""
+Roster analytics benchmark.
+
+Compares the naive approach (load_character for every name, then aggregate
+in Python) with the NumPy columns behind /analytics: the first query, which
+loads the columns, repeated queries, and queries right after a save.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_analytics --characters 5000
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+from app.services.character_service import CharacterService
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from benchmarks.common import latency_summary, make_character
+
+
+def naive_average_hp_by_class(service: CharacterService) -> Dict[str, float]:
+    """The pre-analytics way: load and validate every character."""
+    hp: Dict[str, List[int]] = defaultdict(list)
+    for name in service.list_characters():
+        character = service.load_character(name)
+        if character is not None:
+            hp[character.character_class].append(character.max_hp)
+    return {key: statistics.mean(values) for key, values in hp.items()}
+
+
+def timed(func, repeat: int) -> Dict[str, float]:
+    """Call func repeatedly and summarize the latencies."""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    return latency_summary(latencies, time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--characters", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.backend == "sqlite":
+            store = SqliteCharacterStore(Path(tmp) / "characters.db")
+        else:
+            store = JsonCharacterStore(Path(tmp))
+        roster = [make_character(i) for i in range(args.characters)]
+        CharacterService(store=store).save_characters(roster)
+
+        # A fresh service each time so neither cache is warm
+        results["naive_loop"] = timed(lambda: naive_average_hp_by_class(CharacterService(store=store, cache_size=0)), 1)
+        results["columns_first_query"] = timed(lambda: CharacterService(store=store).roster_summary("character_class"), 1)
+
+        service = CharacterService(store=store)
+        service.roster_summary("character_class")
+        results["columns_repeat_query"] = timed(lambda: service.roster_summary("character_class"), args.repeat)
+
+        counter = iter(range(10 ** 9))
+
+        def save_then_query() -> None:
+            character = roster[next(counter) % len(roster)]
+            service.patch_character(character.name, {"current_hp": next(counter) % character.max_hp})
+            service.roster_summary("character_class")
+
+        results["save_then_query"] = timed(save_then_query, args.repeat)
+        service.close()
+
+    for mode, summary in results.items():
+        print(f"{mode:>22}: p50 {summary['p50_ms']:9.3f} ms  max {summary['max_ms']:9.3f} ms")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Concurrency benchmark for the characters router under mixed read/write load.
+
+Compares the old behaviour, where routes call CharacterService directly on
+the event loop, with the thread-pool backed AsyncCharacterService. A fixed
+per-operation delay simulates a slow disk so the effect of blocking the
+loop is visible on any machine.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_async_io --rate 400 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from app.api import characters
+from app.main import app
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from benchmarks.common import latency_summary, make_character
+
+
+class SlowDiskCharacterService(CharacterService):
+    """CharacterService that sleeps before every file operation."""
+
+    def __init__(self, save_dir: Path, delay: float):
+        super().__init__(save_dir=save_dir)
+        self.delay = delay
+
+    def load_character_with_etag(self, character_name):
+        time.sleep(self.delay)
+        return super().load_character_with_etag(character_name)
+
+    def save_character(self, character, expected_version=None):
+        time.sleep(self.delay)
+        return super().save_character(character, expected_version)
+
+
+class BlockingCharacterService:
+    """The pre-async behaviour: synchronous storage calls on the event loop."""
+
+    def __init__(self, service: CharacterService):
+        self.service = service
+
+    async def character_exists(self, character_name):
+        return self.service.character_exists(character_name)
+
+    async def get_etag(self, character_name):
+        return self.service.get_etag(character_name)
+
+    async def load_character_with_etag(self, character_name):
+        return self.service.load_character_with_etag(character_name)
+
+    async def load_character(self, character_name):
+        return self.service.load_character(character_name)
+
+    async def save_character(self, character, expected_version=None):
+        return self.service.save_character(character, expected_version)
+
+    async def list_characters(self):
+        return self.service.list_characters()
+
+    async def delete_character(self, character_name, expected_version=None):
+        return self.service.delete_character(character_name, expected_version)
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+async def drive(rate: float, requests: int, write_ratio: float, names: List[str], seed: int) -> Dict[str, float]:
+    """
+    Issue requests on an open-loop schedule and time each one from its
+    scheduled arrival, so time spent waiting for a blocked loop is counted.
+    """
+    rng = random.Random(seed)
+    plan = [(rng.random() < write_ratio, rng.choice(names)) for _ in range(requests)]
+    payloads = {name: make_character(int(name.rsplit(' ', 1)[1])).model_dump() for name in names}
+    latencies: List[float] = []
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(scheduled: float, is_write: bool, name: str) -> None:
+            nonlocal errors
+            if is_write:
+                response = await client.put(f"/characters/{name}", json=payloads[name])
+            else:
+                response = await client.get(f"/characters/{name}")
+            latencies.append(time.perf_counter() - scheduled)
+            if response.status_code != 200:
+                errors += 1
+
+        started = time.perf_counter()
+        tasks = []
+        for i, (is_write, name) in enumerate(plan):
+            scheduled = started + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(scheduled, is_write, name)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    summary = latency_summary(latencies, elapsed)
+    summary["errors"] = errors
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=400.0, help="Offered load in requests per second")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--disk-latency-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=8, help="AsyncCharacterService thread pool size")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SlowDiskCharacterService(Path(tmp), args.disk_latency_ms / 1000)
+        names = []
+        for i in range(args.characters):
+            character = make_character(i)
+            CharacterService.save_character(storage, character)
+            names.append(character.name)
+
+        original = characters.character_service
+        modes = {
+            "blocking": BlockingCharacterService(storage),
+            "threadpool": AsyncCharacterService(storage, max_workers=args.workers),
+        }
+        try:
+            for mode, service in modes.items():
+                characters.character_service = service
+                results[mode] = asyncio.run(drive(args.rate, args.requests, args.write_ratio, names, args.seed))
+                service.shutdown()
+        finally:
+            characters.character_service = original
+
+    for mode, summary in results.items():
+        print(f"{mode:>10}: {summary['throughput_rps']:8.1f} req/s  "
+              f"p50 {summary['p50_ms']:7.2f} ms  p99 {summary['p99_ms']:7.2f} ms  "
+              f"errors {summary['errors']}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
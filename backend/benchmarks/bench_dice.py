@@ -0,0 +1,92 @@
+"""
+Dice and encounter simulation throughput.
+
+Reports vectorized dice rolls per second for a few common expressions, then
+runs one encounter simulation with 1..N worker processes and reports
+simulated combatant-rounds per second overall and per core.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_dice --rolls 1000000 --trials 400000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.schemas.simulation import MonsterSpec
+from app.services.dice import parse_dice
+from app.services.simulation import PARTY, EncounterSimulator, combatant_from_character, combatants_from_monster
+from benchmarks.common import make_character
+
+EXPRESSIONS = ("1d20+5", "2d20kh1", "4d6kh3", "8d6", "1d8+1d6+3")
+
+
+def bench_rolls(rolls: int, seed: int) -> dict:
+    """Dice rolls per second for each expression, on one core."""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for expression in EXPRESSIONS:
+        dice = parse_dice(expression)
+        dice.sample(rng, 1000)
+        started = time.perf_counter()
+        dice.sample(rng, rolls)
+        results[expression] = rolls / (time.perf_counter() - started)
+    return results
+
+
+def bench_simulation(trials: int, workers: int, seed: int) -> dict:
+    """Encounter throughput with a given number of worker processes."""
+    party = [combatant_from_character(make_character(i), PARTY) for i in range(4)]
+    enemies = combatants_from_monster(MonsterSpec(
+        name="Goblin", max_hp=7, armor_class=15, attack_bonus=4, damage="1d6+2", count=6
+    ))
+    simulator = EncounterSimulator(max_workers=workers)
+    try:
+        # Warm the pool so process start-up is not timed
+        asyncio.run(simulator.simulate(party + enemies, 100, seed=seed))
+        started = time.perf_counter()
+        result = asyncio.run(simulator.simulate(party + enemies, trials, seed=seed))
+        elapsed = time.perf_counter() - started
+    finally:
+        simulator.shutdown()
+    combatant_rounds = trials * result.mean_rounds * len(party + enemies)
+    return {
+        "workers": workers,
+        "seconds": elapsed,
+        "trials_per_second": trials / elapsed,
+        "combatant_rounds_per_second": combatant_rounds / elapsed,
+        "combatant_rounds_per_second_per_core": combatant_rounds / elapsed / max(workers, 1),
+        "party_win_rate": result.party_win_rate,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rolls", type=int, default=1_000_000)
+    parser.add_argument("--trials", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Largest pool size to try")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"rolls_per_second": bench_rolls(args.rolls, args.seed), "simulation": []}
+    for expression, rate in results["rolls_per_second"].items():
+        print(f"{expression:>12}: {rate / 1e6:8.2f} M rolls/s (1 core)")
+    workers = 1
+    while workers <= args.workers:
+        summary = bench_simulation(args.trials, workers, args.seed)
+        results["simulation"].append(summary)
+        print(f"{workers:>3} workers: {summary['trials_per_second']:10.0f} trials/s  "
+              f"{summary['combatant_rounds_per_second_per_core'] / 1e6:6.2f} M combatant-rounds/s per core  "
+              f"party wins {summary['party_win_rate']:.3f}")
+        workers *= 2
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
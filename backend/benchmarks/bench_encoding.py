@@ -0,0 +1,136 @@
+"""
+Storage encoding and response negotiation benchmark.
+
+Storage: saves the same characters to a JSON store in each storage
+encoding (indented JSON, compact JSON, and msgpack when installed), and
+reports bytes on disk, write time per character and CPU time per cold load.
+
+Wire: serves GET /characters/{name} through the app for each combination
+of Accept (JSON, MessagePack when installed) and Accept-Encoding
+(identity, gzip, br when brotli is installed), and reports the bytes sent
+per response and request latency.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_encoding --characters 200 --inventory 100 --requests 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from app.api import characters, negotiation
+from app.main import app
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from app.storage import encoding
+from app.storage.json_store import JsonCharacterStore, character_files
+from benchmarks.common import latency_summary, make_character
+
+
+def available_encodings() -> List[str]:
+    encodings = ["indented", "compact"]
+    if encoding.msgpack is not None:
+        encodings.append("msgpack")
+    return encodings
+
+
+def bench_storage(storage_encoding: str, count: int, inventory: int, rounds: int) -> Dict[str, float]:
+    """Save and cold-load ``count`` characters in one storage encoding."""
+    with tempfile.TemporaryDirectory() as tmp:
+        service = CharacterService(store=JsonCharacterStore(Path(tmp), encoding=storage_encoding), cache_size=0)
+        batch = [make_character(i, inventory_size=inventory) for i in range(count)]
+        started = time.perf_counter()
+        for character in batch:
+            service.save_character(character)
+        write_us = (time.perf_counter() - started) / count * 1e6
+        disk_bytes = sum(os.path.getsize(path) for path in character_files(Path(tmp)))
+
+        cpu_started = time.process_time()
+        for _ in range(rounds):
+            for character in batch:
+                if service.load_character(character.name) is None:
+                    raise RuntimeError(f"{character.name} failed to load")
+        load_cpu_us = (time.process_time() - cpu_started) / (count * rounds) * 1e6
+        service.close()
+    return {"disk_bytes_per_character": disk_bytes / count, "write_us": write_us, "load_cpu_us": load_cpu_us}
+
+
+async def drive(names: List[str], requests: int, accept: str, accept_encoding: str, seed: int) -> Dict[str, float]:
+    """Send ``requests`` sequential GETs with the given negotiation headers."""
+    rng = random.Random(seed)
+    headers = {"Accept": accept, "Accept-Encoding": accept_encoding}
+    latencies: List[float] = []
+    wire_bytes = errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for _ in range(requests):
+            request_started = time.perf_counter()
+            response = await client.get(f"/characters/{rng.choice(names)}", headers=headers)
+            latencies.append(time.perf_counter() - request_started)
+            wire_bytes += response.num_bytes_downloaded
+            if response.status_code != 200:
+                errors += 1
+        elapsed = time.perf_counter() - started
+    summary = latency_summary(latencies, elapsed)
+    summary["mean_response_bytes"] = wire_bytes / requests if requests else 0.0
+    summary["errors"] = errors
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--inventory", type=int, default=100, help="Inventory items per character")
+    parser.add_argument("--rounds", type=int, default=3, help="Cold loads of every character per encoding")
+    parser.add_argument("--requests", type=int, default=1000, help="GET requests per negotiated format")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"storage": {}, "wire": {}}
+    for storage_encoding in available_encodings():
+        results["storage"][storage_encoding] = bench_storage(storage_encoding, args.characters, args.inventory,
+                                                             args.rounds)
+
+    accepts = {"json": "application/json"}
+    if negotiation.msgpack is not None:
+        accepts["msgpack"] = "application/msgpack"
+    codings = ["identity", "gzip"] + (["br"] if negotiation.brotli is not None else [])
+    original = characters.character_service
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            service = CharacterService(store=JsonCharacterStore(Path(tmp)))
+            batch = [make_character(i, inventory_size=args.inventory) for i in range(args.characters)]
+            service.save_characters(batch)
+            async_service = AsyncCharacterService(service)
+            characters.character_service = async_service
+            names = [character.name for character in batch]
+            for format_name, accept in accepts.items():
+                for coding in codings:
+                    results["wire"][f"{format_name}/{coding}"] = asyncio.run(
+                        drive(names, args.requests, accept, coding, args.seed))
+            async_service.shutdown()
+            service.close()
+    finally:
+        characters.character_service = original
+
+    for storage_encoding, summary in results["storage"].items():
+        print(f"{storage_encoding:>14}: {summary['disk_bytes_per_character']:9.0f} B/character on disk  "
+              f"write {summary['write_us']:8.1f} us  load {summary['load_cpu_us']:8.1f} us CPU")
+    for mode, summary in results["wire"].items():
+        print(f"{mode:>14}: {summary['mean_response_bytes']:9.0f} B/response  "
+              f"p50 {summary['p50_ms']:7.2f} ms  p99 {summary['p99_ms']:7.2f} ms  errors {summary['errors']}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Batch HP endpoint benchmark.
+
+Applies one area-effect hit to every combatant in an encounter, either as
+one PATCH request per combatant or as a single POST /characters/hp batch,
+and reports the wall time of each approach per storage backend.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_hp_batch --combatants 300 --rounds 10
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from app.api import characters
+from app.main import app
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from benchmarks.common import latency_summary, make_character
+
+
+async def drive(mode: str, names: List[str], rounds: int) -> Dict[str, float]:
+    """Deal 1 damage to every combatant ``rounds`` times, timing each round."""
+    latencies: List[float] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for round_number in range(rounds):
+            delta = -1 if round_number % 2 == 0 else 1
+            round_started = time.perf_counter()
+            if mode == "batch":
+                response = await client.post("/characters/hp", json={
+                    "changes": [{"name": name, "delta": delta} for name in names]
+                })
+                errors += response.status_code != 200 or response.json()["updated"] != len(names)
+            else:
+                for name in names:
+                    current = (await client.get(f"/characters/{name}")).json()["current_hp"]
+                    response = await client.patch(f"/characters/{name}", json={"current_hp": current + delta})
+                    errors += response.status_code != 200
+            latencies.append(time.perf_counter() - round_started)
+        elapsed = time.perf_counter() - started
+    summary = latency_summary(latencies, elapsed)
+    summary["errors"] = errors
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--combatants", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--backend", choices=["json", "sqlite", "all"], default="all")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    backends = ["json", "sqlite"] if args.backend == "all" else [args.backend]
+    roster = [make_character(i) for i in range(args.combatants)]
+    names = [character.name for character in roster]
+
+    results = {}
+    original = characters.character_service
+    try:
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as tmp:
+                if backend == "sqlite":
+                    store = SqliteCharacterStore(Path(tmp) / "characters.db")
+                else:
+                    store = JsonCharacterStore(Path(tmp))
+                service = CharacterService(store=store)
+                service.save_characters(roster)
+                async_service = AsyncCharacterService(service)
+                characters.character_service = async_service
+                for mode in ("per-request", "batch"):
+                    results[f"{backend}/{mode}"] = asyncio.run(drive(mode, names, args.rounds))
+                async_service.shutdown()
+                service.close()
+    finally:
+        characters.character_service = original
+
+    for mode, summary in results.items():
+        print(f"{mode:>18}: p50 {summary['p50_ms']:8.2f} ms/round  "
+              f"max {summary['max_ms']:8.2f} ms/round  errors {summary['errors']}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
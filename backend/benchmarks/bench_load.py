@@ -0,0 +1,326 @@
+"""
+Load test of the characters API with a configurable operation mix.
+
+N concurrent clients each issue requests back to back, picking the next
+operation from --mix (relative weights of create/get/list/update/delete/
+import), for --duration seconds. Reports overall and per-operation
+throughput, error rate, latency percentiles and a latency histogram.
+
+Targets:
+  * in process (default): app.main:app through an ASGI transport, with a
+    fresh store of the chosen --backend and --io-workers threads. The
+    client shares the server's event loop, so the loop's scheduling lag is
+    also sampled. It includes the clients' own work, so compare it between
+    runs and mixes: a lag that jumps with one operation means its route
+    blocks the loop.
+  * --uvicorn: starts a local uvicorn with --workers processes on a fresh
+    data directory, so worker counts can be compared.
+  * --url: an already running server (its data is modified).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_load --clients 32 --duration 20 --mix get=6,list=2,create=1,update=1
+    python -m benchmarks.bench_load --uvicorn --workers 4 --clients 64 --backend sqlite
+    python -m benchmarks.bench_load --url http://localhost:8000 --mix get=1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import latency_summary, run_metadata, synthetic_character
+
+OPERATIONS = ("create", "get", "list", "update", "delete", "import")
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+LOOP_LAG_INTERVAL = 0.01
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``get=6,list=2,create=1`` into operation weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+    return mix
+
+
+def latency_histogram(latencies: List[float]) -> Dict[str, int]:
+    """Count latencies (seconds) into fixed millisecond buckets."""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for latency in latencies:
+        counts[bisect_left(HISTOGRAM_BOUNDS_MS, latency * 1000)] += 1
+    labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+    return dict(zip(labels, counts))
+
+
+class LoadState:
+    """Characters known to exist, shared by all clients, and the recorded results."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.names: List[str] = []
+        self.next_index = 0
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def new_character(self):
+        self.next_index += 1
+        return synthetic_character(self.next_index, self.seed)
+
+    def pick_name(self) -> Optional[str]:
+        return self.rng.choice(self.names) if self.names else None
+
+    def take_name(self) -> Optional[str]:
+        """Remove and return a random known character, for a delete."""
+        if not self.names:
+            return None
+        i = self.rng.randrange(len(self.names))
+        self.names[i], self.names[-1] = self.names[-1], self.names[i]
+        return self.names.pop()
+
+
+async def run_operation(client: httpx.AsyncClient, state: LoadState, operation: str) -> Optional[int]:
+    """Issue one request of the given kind; returns its status, or None if it was skipped."""
+    if operation in ("create", "import"):
+        character = state.new_character()
+        if operation == "create":
+            response = await client.post("/characters/", json=character.model_dump())
+        else:
+            files = {"file": (f"{character.name}.json", character.model_dump_json(), "application/json")}
+            response = await client.post("/characters/import", files=files)
+        if response.status_code == 200:
+            state.names.append(character.name)
+        return response.status_code
+    if operation == "list":
+        return (await client.get("/characters/summaries", params={"limit": 50})).status_code
+
+    name = state.take_name() if operation == "delete" else state.pick_name()
+    if name is None:
+        return None
+    if operation == "get":
+        return (await client.get(f"/characters/{name}")).status_code
+    if operation == "delete":
+        return (await client.delete(f"/characters/{name}")).status_code
+    response = await client.get(f"/characters/{name}")
+    if response.status_code != 200:
+        return response.status_code
+    character = response.json()
+    character["current_hp"] = state.rng.randint(0, character["max_hp"])
+    return (await client.put(f"/characters/{name}", json=character)).status_code
+
+
+async def client_loop(client: httpx.AsyncClient, state: LoadState, mix: Dict[str, float], deadline: float) -> None:
+    operations, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        operation = state.rng.choices(operations, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = await run_operation(client, state, operation)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        if status is None:
+            await asyncio.sleep(0)
+            continue
+        state.latencies[operation].append(time.perf_counter() - started)
+        state.statuses[operation][str(status)] += 1
+
+
+async def sample_loop_lag(lags: List[float], stop: asyncio.Event) -> None:
+    """Record how late the event loop wakes a sleeping task."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - started - LOOP_LAG_INTERVAL))
+
+
+@asynccontextmanager
+async def in_process_client(backend: str, io_workers: int) -> AsyncIterator[httpx.AsyncClient]:
+    """A client for app.main:app with a fresh temporary store."""
+    from app.api import characters
+    from app.config import Settings
+    from app.main import app
+    from app.services.async_character_service import AsyncCharacterService
+    from app.services.character_service import CharacterService
+    from app.storage.factory import create_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(storage_backend=backend, data_dir=Path(tmp) / "characters",
+                            sqlite_path=Path(tmp) / "characters.db", event_log_dir=Path(tmp) / "logs")
+        previous = characters.character_service
+        characters.character_service = AsyncCharacterService(
+            CharacterService(store=create_store(settings)), max_workers=io_workers)
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+                yield client
+        finally:
+            characters.character_service.shutdown()
+            characters.character_service.service.close()
+            characters.character_service = previous
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(backend: str, workers: int, io_workers: int,
+                         connections: int) -> AsyncIterator[httpx.AsyncClient]:
+    """A client for a local uvicorn server on a fresh data directory."""
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DND_STORAGE_BACKEND": backend,
+            "DND_DATA_DIR": str(Path(tmp) / "characters"),
+            "DND_SQLITE_PATH": str(Path(tmp) / "characters.db"),
+            "DND_EVENT_LOG_DIR": str(Path(tmp) / "logs"),
+            "DND_IO_WORKERS": str(io_workers),
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--workers", str(workers), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            async with url_client(f"http://127.0.0.1:{port}", connections) as client:
+                for _ in range(200):
+                    try:
+                        await client.get("/")
+                        break
+                    except httpx.TransportError:
+                        await asyncio.sleep(0.05)
+                else:
+                    raise RuntimeError("uvicorn did not start")
+                yield client
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+@asynccontextmanager
+async def url_client(url: str, connections: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        yield client
+
+
+async def run_load(client: httpx.AsyncClient, args: argparse.Namespace, measure_lag: bool) -> Dict:
+    state = LoadState(args.seed)
+    # Preload characters so reads and updates have targets from the start
+    for start in range(0, args.preload, args.clients):
+        batch = [state.new_character() for _ in range(min(args.clients, args.preload - start))]
+        responses = await asyncio.gather(*(client.post("/characters/", json=c.model_dump()) for c in batch))
+        state.names.extend(c.name for c, r in zip(batch, responses) if r.status_code == 200)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(sample_loop_lag(lags, stop)) if measure_lag else None
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(client_loop(client, state, args.mix, deadline) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if lag_task is not None:
+        await lag_task
+
+    operations = {}
+    for operation, latencies in state.latencies.items():
+        statuses = state.statuses[operation]
+        errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+        operations[operation] = {
+            **latency_summary(latencies, elapsed),
+            "error_rate": errors / len(latencies),
+            "statuses": dict(statuses),
+            "histogram": latency_histogram(latencies),
+        }
+    all_latencies = [latency for latencies in state.latencies.values() for latency in latencies]
+    total_errors = sum(stats["error_rate"] * stats["requests"] for stats in operations.values())
+    result = {
+        "overall": {
+            **latency_summary(all_latencies, elapsed),
+            "error_rate": total_errors / len(all_latencies) if all_latencies else 0.0,
+            "histogram": latency_histogram(all_latencies),
+        },
+        "operations": operations,
+    }
+    if lags:
+        result["loop_lag"] = {
+            "samples": len(lags),
+            "p50_ms": sorted(lags)[len(lags) // 2] * 1000,
+            "p99_ms": sorted(lags)[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000,
+            "max_ms": max(lags) * 1000,
+        }
+    return result
+
+
+def print_result(result: Dict) -> None:
+    overall = result["overall"]
+    print(f"{overall['requests']} requests, {overall['throughput_rps']:.1f} req/s, "
+          f"error rate {overall['error_rate']:.2%}, p50 {overall['p50_ms']:.2f} ms, p99 {overall['p99_ms']:.2f} ms")
+    for operation, stats in sorted(result["operations"].items()):
+        print(f"  {operation:>7}: {stats['throughput_rps']:8.1f} req/s  p50 {stats['p50_ms']:7.2f} ms  "
+              f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms  errors {stats['error_rate']:.2%}")
+    print("  latency histogram: " + "  ".join(
+        f"{label} {count}" for label, count in overall["histogram"].items() if count))
+    if "loop_lag" in result:
+        lag = result["loop_lag"]
+        print(f"  event loop lag: p50 {lag['p50_ms']:.2f} ms  p99 {lag['p99_ms']:.2f} ms  max {lag['max_ms']:.2f} ms")
+
+
+async def main_async(args: argparse.Namespace) -> Dict:
+    if args.url:
+        target = url_client(args.url, args.clients)
+    elif args.uvicorn:
+        target = uvicorn_client(args.backend, args.workers, args.io_workers, args.clients)
+    else:
+        target = in_process_client(args.backend, args.io_workers)
+    async with target as client:
+        return await run_load(client, args, measure_lag=not (args.url or args.uvicorn))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("get=6,list=2,create=1,update=1"),
+                        help="Relative operation weights, e.g. get=6,list=2,create=1,update=1,delete=0.5,import=0.5")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--preload", type=int, default=200, help="Characters created before timing starts")
+    parser.add_argument("--backend", choices=["json", "sqlite", "eventlog"], default="json")
+    parser.add_argument("--io-workers", type=int, default=8, help="Storage threads per server process")
+    parser.add_argument("--uvicorn", action="store_true", help="Run against a local uvicorn server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (with --uvicorn)")
+    parser.add_argument("--url", help="Run against an already running server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print_result(result)
+    if args.output:
+        metadata = run_metadata({**vars(args), "mix": args.mix})
+        args.output.write_text(json.dumps({"metadata": metadata, **result}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+PUT vs PATCH benchmark for hot-field updates.
+
+Applies the same current_hp change to random characters either by sending
+the whole character with PUT or a one-field merge patch with PATCH, and
+reports request payload size and latency for each storage backend. Larger
+inventories make the cost of full rewrites more visible.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_patch --characters 200 --updates 2000 --inventory 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from app.api import characters
+from app.main import app
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from benchmarks.common import latency_summary, make_character
+
+
+async def drive(method: str, updates: int, payloads: Dict[str, dict], seed: int) -> Dict[str, float]:
+    """Send ``updates`` sequential current_hp updates using PUT or PATCH."""
+    rng = random.Random(seed)
+    names = list(payloads)
+    latencies: List[float] = []
+    payload_bytes = 0
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for _ in range(updates):
+            name = rng.choice(names)
+            current_hp = rng.randint(0, 20)
+            if method == "put":
+                body = json.dumps({**payloads[name], "current_hp": current_hp}).encode('utf-8')
+                content_type = "application/json"
+            else:
+                body = json.dumps({"current_hp": current_hp}).encode('utf-8')
+                content_type = "application/merge-patch+json"
+            payload_bytes += len(body)
+            request_started = time.perf_counter()
+            response = await client.request(method.upper(), f"/characters/{name}", content=body,
+                                            headers={"Content-Type": content_type})
+            latencies.append(time.perf_counter() - request_started)
+            if response.status_code != 200:
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+    summary = latency_summary(latencies, elapsed)
+    summary["mean_payload_bytes"] = payload_bytes / updates if updates else 0.0
+    summary["errors"] = errors
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--inventory", type=int, default=50, help="Inventory items per character")
+    parser.add_argument("--backend", choices=["json", "sqlite", "all"], default="all")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    backends = ["json", "sqlite"] if args.backend == "all" else [args.backend]
+    payloads = {}
+    for i in range(args.characters):
+        character = make_character(i, inventory_size=args.inventory)
+        payloads[character.name] = character.model_dump()
+
+    results = {}
+    original = characters.character_service
+    try:
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as tmp:
+                if backend == "sqlite":
+                    store = SqliteCharacterStore(Path(tmp) / "characters.db")
+                else:
+                    store = JsonCharacterStore(Path(tmp))
+                service = CharacterService(store=store)
+                service.save_characters([make_character(i, inventory_size=args.inventory)
+                                         for i in range(args.characters)])
+                async_service = AsyncCharacterService(service)
+                characters.character_service = async_service
+                for method in ("put", "patch"):
+                    results[f"{backend}/{method}"] = asyncio.run(drive(method, args.updates, payloads, args.seed))
+                async_service.shutdown()
+                service.close()
+    finally:
+        characters.character_service = original
+
+    for mode, summary in results.items():
+        print(f"{mode:>12}: {summary['mean_payload_bytes']:8.0f} B/request  "
+              f"p50 {summary['p50_ms']:7.2f} ms  p99 {summary['p99_ms']:7.2f} ms  "
+              f"errors {summary['errors']}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+CharacterService and characters API benchmarks at roster scale.
+
+For every storage backend and roster size, fills a fresh store with
+synthetic characters (varied names and inventories, reproducible from
+--seed), then times save_character, load_character (cached and uncached),
+list_characters, a filtered summary page and the main HTTP routes. Each
+operation reports throughput, latency percentiles and the peak RSS reached
+while it ran.
+
+Results are written as JSON with the run's commit and machine details;
+pass an earlier result file to --compare to flag regressions.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scale --sizes 1000 10000 --backends json sqlite --output scale.json
+    python -m benchmarks.bench_scale --sizes 1000 10000 --compare scale.json
+    python -m benchmarks.bench_scale --sizes 100000 1000000 --ops 200 --backends sqlite
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+from fastapi.testclient import TestClient
+
+from app.api import characters
+from app.config import Settings
+from app.main import app
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from app.storage.factory import create_store
+from benchmarks.common import latency_summary, peak_rss_mb, reset_peak_rss, run_metadata, synthetic_character
+
+POPULATE_BATCH = 1000
+
+
+def measure(operation: Callable[[int], Any], count: int) -> Dict[str, float]:
+    """Call ``operation(i)`` for i in range(count), timing each call and the peak RSS."""
+    reset_peak_rss()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        call_started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {**latency_summary(latencies, elapsed), "peak_rss_mb": peak_rss_mb()}
+
+
+def populate(service: CharacterService, size: int, seed: int) -> Dict[str, float]:
+    """Fill the store with ``size`` synthetic characters in batches."""
+    reset_peak_rss()
+    started = time.perf_counter()
+    for start in range(0, size, POPULATE_BATCH):
+        batch = [synthetic_character(i, seed) for i in range(start, min(start + POPULATE_BATCH, size))]
+        if not service.save_characters(batch):
+            raise RuntimeError("Failed to populate the store")
+    elapsed = time.perf_counter() - started
+    return {"characters": size, "seconds": elapsed, "characters_per_second": size / elapsed,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def bench_backend(backend: str, size: int, ops: int, list_repeats: int, seed: int) -> Dict[str, Any]:
+    """Run every operation against one backend holding ``size`` characters."""
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(
+            storage_backend=backend,
+            data_dir=Path(tmp) / "characters",
+            sqlite_path=Path(tmp) / "characters.db",
+            event_log_dir=Path(tmp) / "logs",
+        )
+        store = create_store(settings)
+        service = CharacterService(store=store)
+        uncached = CharacterService(store=store, cache_size=0)
+        result: Dict[str, Any] = {"backend": backend, "size": size, "populate": populate(service, size, seed)}
+
+        rng = random.Random(seed)
+        sample = [synthetic_character(rng.randrange(size), seed) for _ in range(ops)]
+        fresh = [synthetic_character(size + i, seed) for i in range(ops)]
+        for character in sample:
+            service.load_character(character.name)
+
+        operations = {
+            "save_character": lambda i: service.save_character(fresh[i]),
+            "load_character_cached": lambda i: service.load_character(sample[i].name),
+            "load_character_uncached": lambda i: uncached.load_character(sample[i].name),
+            "list_characters": lambda i: service.list_characters(),
+            "list_character_summaries": lambda i: service.list_character_summaries(
+                race=sample[i].race, limit=50),
+        }
+        counts = {"list_characters": list_repeats}
+        result["operations"] = {
+            name: measure(operation, counts.get(name, ops)) for name, operation in operations.items()
+        }
+
+        previous = characters.character_service
+        characters.character_service = AsyncCharacterService(service)
+        try:
+            with TestClient(app) as client:
+                updated = [character.model_copy(update={"current_hp": 0}) for character in sample]
+                http_operations = {
+                    "http_get_character": lambda i: client.get(f"/characters/{sample[i].name}"),
+                    "http_list_page": lambda i: client.get("/characters/summaries", params={"limit": 50}),
+                    "http_list_names": lambda i: client.get("/characters/"),
+                    "http_create_character": lambda i: client.post(
+                        "/characters/", json=synthetic_character(size + ops + i, seed).model_dump()),
+                    "http_update_character": lambda i: client.put(
+                        f"/characters/{updated[i].name}", json=updated[i].model_dump()),
+                }
+                counts = {"http_list_names": list_repeats}
+                for name, operation in http_operations.items():
+                    result["operations"][name] = measure(operation, counts.get(name, ops))
+        finally:
+            characters.character_service.shutdown()
+            characters.character_service = previous
+        service.close()
+        return result
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> List[str]:
+    """List operations whose p50 latency grew by more than ``threshold`` since the baseline."""
+    baseline = {
+        (run["backend"], run["size"], name): stats
+        for run in json.loads(baseline_path.read_text())["runs"]
+        for name, stats in run["operations"].items()
+    }
+    regressions = []
+    for run in results:
+        for name, stats in run["operations"].items():
+            before = baseline.get((run["backend"], run["size"], name))
+            if before is None or not before["p50_ms"]:
+                continue
+            ratio = stats["p50_ms"] / before["p50_ms"]
+            if ratio > 1 + threshold:
+                regressions.append(f"{run['backend']} {run['size']:>8} {name}: p50 "
+                                   f"{before['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def print_run(run: Dict[str, Any]) -> None:
+    populate_stats = run["populate"]
+    print(f"\n{run['backend']} with {run['size']} characters "
+          f"(populated at {populate_stats['characters_per_second']:.0f}/s, "
+          f"peak RSS {populate_stats['peak_rss_mb']:.0f} MiB)")
+    for name, stats in run["operations"].items():
+        print(f"  {name:>26}: {stats['throughput_rps']:10.1f} ops/s  p50 {stats['p50_ms']:8.3f} ms  "
+              f"p99 {stats['p99_ms']:8.3f} ms  peak RSS {stats['peak_rss_mb']:7.1f} MiB")
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--backends", nargs="+", choices=["json", "sqlite", "eventlog"], default=["json", "sqlite"])
+    parser.add_argument("--ops", type=int, default=500, help="Timed calls per operation")
+    parser.add_argument("--list-repeats", type=int, default=5, help="Timed calls of full name listings")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown, e.g. 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for size in args.sizes:
+        for backend in args.backends:
+            run = bench_backend(backend, size, args.ops, args.list_repeats, args.seed)
+            runs.append(run)
+            print_run(run)
+    if args.output:
+        args.output.write_text(json.dumps({"metadata": run_metadata(vars(args)), "runs": runs}, indent=4))
+    if args.compare:
+        regressions = compare(runs, args.compare, args.threshold)
+        print(f"\n{len(regressions)} regression(s) against {args.compare}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Trusted vs validated character load benchmark.
+
+Saves characters with large inventories to a JSON store, then loads each
+one through CharacterService (with the cache disabled) twice: from the
+stamped files the service wrote, which go through strict validation, and
+from the same files with their stamp removed, which go through lax
+validation. Reports CPU time per load and the share saved, plus
+the cost of the model-building step alone, for each inventory size.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_trusted_load --characters 200 --inventory 10 100 1000
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.models.character import Character, validate_trusted
+from app.services.character_service import CharacterService
+from app.storage.encoding import decode_document
+from app.storage.json_store import JsonCharacterStore
+from benchmarks.common import latency_summary, make_character
+
+
+def timed_loads(service: CharacterService, names: List[str], rounds: int) -> Dict[str, float]:
+    """Load every character ``rounds`` times; report latency and CPU time per load."""
+    latencies = []
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            load_started = time.perf_counter()
+            if service.load_character(name) is None:
+                raise RuntimeError(f"{name} failed to load")
+            latencies.append(time.perf_counter() - load_started)
+    elapsed = time.perf_counter() - started
+    summary = latency_summary(latencies, elapsed)
+    summary["cpu_us_per_load"] = (time.process_time() - cpu_started) / len(latencies) * 1e6
+    return summary
+
+
+def build_cost(documents: List[dict], rounds: int) -> Dict[str, float]:
+    """CPU time per character of building models from parsed documents, each way."""
+    results = {}
+    for mode, build in (("validated", lambda data: Character(**data)), ("trusted", validate_trusted)):
+        copies = [json.loads(json.dumps(data)) for data in documents for _ in range(rounds)]
+        started = time.process_time()
+        for data in copies:
+            build(data)
+        results[f"{mode}_build_us"] = (time.process_time() - started) / len(copies) * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--inventory", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Inventory sizes to measure")
+    parser.add_argument("--rounds", type=int, default=3, help="Loads of every character per mode")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for inventory in args.inventory:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = JsonCharacterStore(Path(tmp))
+            service = CharacterService(store=store, cache_size=0)
+            characters = [make_character(i, inventory_size=inventory) for i in range(args.characters)]
+            service.save_characters(characters)
+            names = [character.name for character in characters]
+
+            trusted = timed_loads(service, names, args.rounds)
+            for name in names:
+                path = store.path_for(name)
+                path.write_bytes(decode_document(path.read_bytes())[1])
+            validated = timed_loads(service, names, args.rounds)
+            service.close()
+
+        saved = 1 - trusted["cpu_us_per_load"] / validated["cpu_us_per_load"]
+        results[str(inventory)] = {
+            "trusted": trusted,
+            "validated": validated,
+            "cpu_saved_share": saved,
+            **build_cost([character.model_dump() for character in characters[:20]], args.rounds),
+        }
+
+    for inventory, result in results.items():
+        print(f"inventory {inventory:>5}: validated {result['validated']['cpu_us_per_load']:9.1f} us/load  "
+              f"trusted {result['trusted']['cpu_us_per_load']:9.1f} us/load  "
+              f"saved {result['cpu_saved_share']:6.1%}  "
+              f"(build {result['validated_build_us']:8.1f} -> {result['trusted_build_us']:8.1f} us)")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Shared helpers for the backend benchmarks."""
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+from app.models.character import AbilityScores, Character, InventoryItem
+
+RACES = ("Human", "Elf", "Dwarf", "Halfling", "Gnome", "Half-Orc", "Tiefling", "Dragonborn")
+CLASSES = ("Fighter", "Wizard", "Rogue", "Cleric", "Barbarian", "Bard", "Druid", "Monk",
+           "Paladin", "Ranger", "Sorcerer", "Warlock")
+NAME_SYLLABLES = ("ar", "bel", "cor", "dra", "el", "fin", "gar", "hal", "is", "jor", "kel", "lor",
+                  "mir", "nor", "or", "pel", "quin", "ra", "syl", "thal", "ul", "vor", "wen", "zan")
+ITEMS = ("Longsword", "Shortbow", "Arrows", "Rations", "Rope (50 ft)", "Healing Potion", "Torch",
+         "Bedroll", "Spellbook", "Holy Symbol", "Thieves' Tools", "Lute", "Gold Piece", "Dagger")
+
+
+def make_character(index: int, inventory_size: int = 3) -> Character:
+    """Build a deterministic synthetic character."""
+    return Character(
+        name=f"Bench Character {index}",
+        race=("Human", "Elf", "Dwarf", "Halfling")[index % 4],
+        character_class=("Fighter", "Wizard", "Rogue", "Cleric")[index % 4],
+        level=index % 20 + 1,
+        ability_scores=AbilityScores(
+            strength=10,
+            dexterity=12,
+            constitution=14,
+            intelligence=16,
+            wisdom=14,
+            charisma=12
+        ),
+        max_hp=20,
+        current_hp=20,
+        inventory=[
+            InventoryItem(name=f"Item {i}", quantity=i + 1, description="Synthetic item")
+            for i in range(inventory_size)
+        ]
+    )
+
+
+def synthetic_character(index: int, seed: int = 0) -> Character:
+    """
+    Build a varied but reproducible synthetic character.
+
+    Names (5 to ~60 characters), races, classes, levels, scores and
+    inventories (0 to 40 items, some with long descriptions) vary with the
+    index; the same index and seed always give the same character, and
+    distinct indexes give distinct names.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    words = [
+        "".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(1, 4))).capitalize()
+        for _ in range(rng.choice((1, 1, 2, 2, 3, 5)))
+    ]
+    level = rng.randint(1, 20)
+    max_hp = rng.randint(6, 12) * level
+    inventory_size = min(int(rng.expovariate(1 / 6)), 40)
+    return Character(
+        name=f"{' '.join(words)} {index}",
+        race=rng.choice(RACES),
+        character_class=rng.choice(CLASSES),
+        level=level,
+        ability_scores=AbilityScores(**{
+            field: rng.randint(3, 18) for field in AbilityScores.model_fields
+        }),
+        max_hp=max_hp,
+        current_hp=rng.randint(0, max_hp),
+        inventory=[
+            InventoryItem(
+                name=rng.choice(ITEMS),
+                quantity=rng.randint(1, 50),
+                description=" ".join(rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(0, 60))) or None,
+            )
+            for _ in range(inventory_size)
+        ],
+    )
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the process's peak RSS so the next reading covers only what follows.
+
+    Uses /proc/self/clear_refs (Linux); returns False where that is not
+    available, in which case peak_rss_mb reports the lifetime peak.
+    """
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process, in MiB."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_metadata(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe the machine, code revision and arguments of a benchmark run."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {key: str(value) if isinstance(value, Path) else value for key, value in args.items()},
+    }
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a sequence of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarize latencies (seconds) as throughput and millisecond percentiles."""
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
@@ -0,0 +1,61 @@
+"""Unit tests for ability score generation and the exact distribution tables."""
+import itertools
+import numpy as np
+import pytest
+from app.services import ability_scores
+
+def test_score_distribution_is_exact():
+    """Test the 4d6-drop-lowest table against brute-force enumeration."""
+    counts = np.zeros(19)
+    for roll in itertools.product(range(1, 7), repeat=4):
+        counts[sum(roll) - min(roll)] += 1
+    assert np.allclose(ability_scores.score_distribution(), counts / 1296)
+    assert ability_scores.score_distribution()[18] == pytest.approx(21 / 1296)
+
+def test_total_distribution():
+    """Test that the six-score total sums to one and has the expected mean."""
+    pmf = ability_scores.total_distribution()
+    assert pmf.sum() == pytest.approx(1)
+    assert np.dot(np.arange(len(pmf)), pmf) == pytest.approx(6 * 15869 / 1296)
+    assert pmf[:18].sum() == 0 and len(pmf) == 109
+
+def test_tables_are_cached_and_read_only():
+    """Test that the tables are computed once and cannot be modified."""
+    assert ability_scores.total_distribution() is ability_scores.total_distribution()
+    with pytest.raises(ValueError):
+        ability_scores.score_distribution()[3] = 1
+
+def test_percentile_lookup():
+    """Test score and total percentiles, including out-of-range values."""
+    assert ability_scores.score_percentile(np.array([2, 3, 18, 20])).tolist() == pytest.approx(
+        [0, 100 / 1296, 100, 100])
+    totals = ability_scores.total_percentile(np.array([17, 73, 74, 108]))
+    assert totals[0] == 0 and totals[1] < 50 < totals[2] and totals[3] == pytest.approx(100)
+
+def test_rolled_blocks_match_the_distribution():
+    """Test that vectorized rolls follow the exact score distribution."""
+    blocks = ability_scores.roll_stat_blocks(20_000, np.random.default_rng(0))
+    assert blocks.shape == (20_000, 6)
+    observed = np.bincount(blocks.ravel(), minlength=19) / blocks.size
+    assert np.abs(observed - ability_scores.score_distribution()).max() < 0.005
+
+def test_standard_array_blocks():
+    """Test that every standard array block is a permutation of the array."""
+    blocks = ability_scores.standard_array_blocks(500, np.random.default_rng(1))
+    assert (np.sort(blocks, axis=1) == sorted(ability_scores.STANDARD_ARRAY)).all()
+    assert len({tuple(block) for block in blocks.tolist()}) > 1
+    fixed = ability_scores.standard_array_blocks(2, np.random.default_rng(1), shuffle=False)
+    assert fixed.tolist() == [list(ability_scores.STANDARD_ARRAY)] * 2
+
+@pytest.mark.parametrize("scores, cost, valid", [
+    ((15, 14, 13, 12, 10, 8), 27, True),
+    ((15, 15, 15, 8, 8, 8), 27, True),
+    ((8, 8, 8, 8, 8, 8), 0, True),
+    ((15, 15, 15, 15, 8, 8), 36, False),
+    ((16, 8, 8, 8, 8, 8), None, False),
+    ((7, 8, 8, 8, 8, 8), None, False),
+])
+def test_point_buy_cost(scores, cost, valid):
+    """Test point buy pricing and validation."""
+    spent, errors = ability_scores.point_buy_cost(scores)
+    assert spent == cost and (not errors) == valid
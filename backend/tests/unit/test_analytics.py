@@ -0,0 +1,145 @@
+"""Unit tests for the columnar roster analytics."""
+import numpy as np
+import pytest
+from app.services.analytics import ABILITY_FIELDS, RosterColumns
+from app.services.character_service import CharacterService
+from app.storage.json_store import JsonCharacterStore
+
+def character_data(index, **overrides):
+    """Build a stored character document."""
+    return {
+        "name": f"Hero {index}",
+        "race": ("Human", "Elf")[index % 2],
+        "character_class": ("Fighter", "Wizard", "Rogue")[index % 3],
+        "level": index % 5 + 1,
+        "ability_scores": {field: 8 + (index + i) % 10 for i, field in enumerate(ABILITY_FIELDS)},
+        "max_hp": 10 + index,
+        "current_hp": 5 + index,
+        "inventory": [],
+        **overrides
+    }
+
+@pytest.fixture
+def roster():
+    """Fixture providing 60 characters as (key, data) pairs."""
+    return [(f"hero_{i}", character_data(i)) for i in range(60)]
+
+def test_summary_matches_python_aggregates(roster):
+    """Test that grouped stats agree with a plain Python computation."""
+    columns = RosterColumns.build(roster)
+    summary = columns.summary("character_class", percentiles=(50,))
+    assert summary.count == 60
+    for group in summary.groups:
+        rows = [data for _, data in roster if data["character_class"] == group.key]
+        hp = [data["max_hp"] for data in rows]
+        assert group.count == len(rows)
+        assert group.fields["max_hp"].mean == pytest.approx(sum(hp) / len(hp))
+        assert group.fields["max_hp"].min == min(hp)
+        assert group.fields["max_hp"].percentiles["p50"] == pytest.approx(float(np.median(hp)))
+
+def test_summary_by_level_and_whole_roster(roster):
+    """Test grouping by level and the ungrouped summary."""
+    columns = RosterColumns.build(roster)
+    assert sorted(group.key for group in columns.summary("level").groups) == [1, 2, 3, 4, 5]
+    overall = columns.summary()
+    assert [group.key for group in overall.groups] == [None]
+    assert overall.groups[0].fields["strength"].max == 17
+
+def test_histogram(roster):
+    """Test level histograms by race."""
+    histogram = RosterColumns.build(roster).histogram("level", "race")
+    assert histogram.bins == [1, 2, 3, 4, 5]
+    assert {group.key: sum(group.counts) for group in histogram.groups} == {"Elf": 30, "Human": 30}
+
+def test_incremental_updates(roster):
+    """Test that upserts and removals keep the columns dense and correct."""
+    columns = RosterColumns.build(roster)
+    columns.remove("hero_0")
+    columns.remove("hero_missing")
+    columns.upsert("hero_59", character_data(59, max_hp=1000))
+    columns.upsert("hero_new", character_data(100))
+    summary = columns.summary()
+    assert summary.count == 60
+    assert summary.groups[0].fields["max_hp"].max == 1000
+
+def test_results_reused_until_change(roster):
+    """Test that repeated queries reuse the result until the columns change."""
+    columns = RosterColumns.build(roster)
+    first = columns.summary("race")
+    assert columns.summary("race") is first
+    columns.upsert("hero_1", character_data(1, level=20))
+    assert columns.summary("race") is not first
+
+def test_invalid_documents_are_skipped(roster):
+    """Test that documents without usable fields are left out."""
+    roster.append(("broken", {"name": "Broken", "level": "high"}))
+    assert RosterColumns.build(roster).size == 60
+
+def test_growth_beyond_initial_capacity():
+    """Test that the columns grow past their initial capacity."""
+    columns = RosterColumns(capacity=4)
+    for i in range(10):
+        columns.upsert(f"hero_{i}", character_data(i))
+    assert columns.summary().count == 10
+
+@pytest.mark.parametrize("query", [{"group_by": "name"}, {"percentiles": (150,)}])
+def test_invalid_summary_query(roster, query):
+    """Test that unsupported groupings and percentiles are rejected."""
+    with pytest.raises(ValueError):
+        RosterColumns.build(roster).summary(**query)
+
+def test_service_keeps_columns_in_step(tmp_path):
+    """Test that service writes, patches and deletes update the analytics."""
+    service = CharacterService(store=JsonCharacterStore(tmp_path))
+    service.store.write_many([character_data(i) for i in range(6)])
+    assert service.roster_summary().count == 6
+    service.store.write(character_data(6))
+    service.patch_character("Hero 0", {"max_hp": 500})
+    service.delete_character("Hero 1")
+    summary = service.roster_summary()
+    assert summary.count == 5
+    assert summary.groups[0].fields["max_hp"].max == 500
+    assert sum(service.roster_histogram("level").groups[0].counts) == 5
+
+def test_service_rebuilds_after_out_of_band_change(tmp_path):
+    """Test that files added behind the service's back are picked up."""
+    service = CharacterService(store=JsonCharacterStore(tmp_path))
+    assert service.roster_summary().count == 0
+    JsonCharacterStore(tmp_path).write(character_data(1))
+    assert service.roster_summary().count == 1
+
+def test_writes_during_the_first_build_are_kept(tmp_path):
+    """Test that writes landing while the columns are built are applied to them."""
+    service = CharacterService(store=JsonCharacterStore(tmp_path))
+    service.store.write_many([character_data(i) for i in range(4)])
+    scan = service.iter_character_data
+
+    def scan_with_writes():
+        for position, item in enumerate(scan()):
+            yield item
+            if position == 3:
+                service.patch_character(item[1]["name"], {"max_hp": 500})
+                service.delete_character("Hero 0" if item[1]["name"] != "Hero 0" else "Hero 1")
+
+    service.iter_character_data = scan_with_writes
+    assert service.roster_summary().count == 3
+    service.iter_character_data = scan
+    summary = service.roster_summary()
+    assert summary.count == 3 and summary.groups[0].fields["max_hp"].max == 500
+
+def test_columns_dropped_during_a_build_are_rebuilt(tmp_path):
+    """Test that columns invalidated while being built are not kept."""
+    service = CharacterService(store=JsonCharacterStore(tmp_path))
+    service.store.write_many([character_data(i) for i in range(2)])
+    scan = service.iter_character_data
+
+    def scan_then_drop():
+        yield from scan()
+        service._on_external_change(None)
+
+    service.iter_character_data = scan_then_drop
+    service.roster_summary()
+    assert service._roster is None
+    service.iter_character_data = scan
+    service.roster_summary()
+    assert service._roster is not None
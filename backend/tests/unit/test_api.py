@@ -3,6 +3,7 @@ import pytest
 import shutil
 from pathlib import Path
 from fastapi.testclient import TestClient
+from app.api import characters, simulation
 from app.main import app
 
 client = TestClient(app)
@@ -168,4 +169,22 @@ def test_delete_character(test_character_data):
 def test_delete_nonexistent_character():
     """Test deleting a character that doesn't exist."""
     response = client.delete("/characters/NonexistentCharacter")
-    assert response.status_code == 404 
\ No newline at end of file
+    assert response.status_code == 404 
+def test_shutdown_runs_every_step_and_closes_the_store(monkeypatch):
+    """Test that a failing shutdown step does not skip the later ones or closing the store."""
+    calls = []
+    class Recorder:
+        def __init__(self, prefix):
+            self.prefix = prefix
+        def __getattr__(self, name):
+            def step(*args):
+                calls.append(f"{self.prefix}{name}")
+                if name == "flush":
+                    raise OSError("disk full")
+            return step
+    monkeypatch.setattr(characters, "character_service", Recorder(""))
+    monkeypatch.setattr(simulation, "simulator", Recorder("simulator."))
+    with pytest.raises(OSError):
+        with TestClient(app):
+            pass
+    assert calls[-5:] == ["shutdown", "flush", "checkpoint", "simulator.shutdown", "close"]
@@ -0,0 +1,132 @@
+"""Unit tests for the async character service."""
+import asyncio
+import shutil
+import threading
+from pathlib import Path
+import pytest
+from app.models.character import Character, AbilityScores
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+
+@pytest.fixture
+def test_character():
+    """Fixture providing a test character."""
+    return Character(
+        name="Async Character",
+        race="Elf",
+        character_class="Rogue",
+        level=3,
+        ability_scores=AbilityScores(
+            strength=10,
+            dexterity=16,
+            constitution=12,
+            intelligence=12,
+            wisdom=10,
+            charisma=14
+        ),
+        max_hp=18,
+        current_hp=18
+    )
+
+@pytest.fixture
+def async_service():
+    """Fixture providing an async service over a test directory."""
+    save_dir = Path("test_async_data/characters")
+    service = AsyncCharacterService(CharacterService(save_dir=save_dir), max_workers=2)
+    yield service
+    service.shutdown()
+    shutil.rmtree(save_dir.parent, ignore_errors=True)
+
+def test_save_and_load_roundtrip(async_service, test_character):
+    """Test that a saved character can be loaded back."""
+    async def scenario():
+        await async_service.save_character(test_character)
+        return await async_service.load_character(test_character.name)
+    assert asyncio.run(scenario()) == test_character
+
+def test_list_and_delete(async_service, test_character):
+    """Test that listing reflects a delete."""
+    async def scenario():
+        await async_service.save_character(test_character)
+        await async_service.delete_character(test_character.name)
+        return await async_service.list_characters()
+    assert asyncio.run(scenario()) == []
+
+def test_calls_run_off_the_event_loop_thread(async_service):
+    """Test that storage calls execute in a worker thread."""
+    seen = []
+    original = async_service.service.list_characters
+    def recording_list():
+        seen.append(threading.current_thread().name)
+        return original()
+    async_service.service.list_characters = recording_list
+    asyncio.run(async_service.list_characters())
+    assert seen[0].startswith("character-io")
+
+def test_service_usable_after_shutdown(async_service):
+    """Test that a new pool is created after shutdown."""
+    async_service.shutdown()
+    assert asyncio.run(async_service.list_characters()) == []
+
+def test_cache_stats_passthrough(async_service):
+    """Test that cache counters come from the wrapped service."""
+    assert async_service.cache_stats() == async_service.service.cache_stats()
+
+def test_imports_waiting_for_locks_do_not_tie_up_workers(async_service, test_character):
+    """Test that bulk imports queued behind a held lock leave the worker pool free."""
+    record = ("line 1", test_character.model_dump_json().encode())
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with async_service.service.locked(test_character.name):
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait(5)
+
+    async def scenario():
+        imports = [asyncio.ensure_future(async_service.import_records(iter([record]), "overwrite"))
+                   for _ in range(async_service.max_workers + 1)]
+        names = await asyncio.wait_for(async_service.list_characters(), 5)
+        release.set()
+        return names, await asyncio.gather(*imports)
+
+    try:
+        names, reports = asyncio.run(scenario())
+    finally:
+        release.set()
+        holder.join()
+    assert names == []
+    assert sum(report.created + report.updated for report in reports) == len(reports)
+
+def test_cancelled_write_holds_its_lock_until_the_worker_finishes(async_service, test_character, monkeypatch):
+    """Test that cancelling a locked save does not let another write to the character start early."""
+    service = async_service.service
+    started, finish = threading.Event(), threading.Event()
+    events = []
+    save_character, delete_character = service.save_character, service.delete_character
+    def slow_save(character, expected_version=None):
+        started.set()
+        finish.wait(5)
+        events.append("save")
+        return save_character(character, expected_version)
+    def recording_delete(name, expected_version=None):
+        events.append("delete")
+        return delete_character(name, expected_version)
+    monkeypatch.setattr(service, "save_character", slow_save)
+    monkeypatch.setattr(service, "delete_character", recording_delete)
+    async def scenario():
+        save = asyncio.ensure_future(async_service.save_character(test_character))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        save.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await save
+        delete = asyncio.ensure_future(async_service.delete_character(test_character.name))
+        await asyncio.sleep(0.1)
+        assert events == []
+        finish.set()
+        return await delete
+    assert asyncio.run(scenario())
+    assert events == ["save", "delete"]
@@ -0,0 +1,131 @@
+"""Unit tests for bulk import."""
+import gzip
+import io
+import json
+import zipfile
+import pytest
+from app.models.character import Character, AbilityScores
+from app.services import bulk_import
+from app.services.bulk_import import RecordTooLargeError, import_records, iter_ndjson_records, open_import_records
+from app.services.character_service import CharacterService
+
+def make_character(name, level=1):
+    """Build a minimal valid character."""
+    return Character(
+        name=name,
+        race="Human",
+        character_class="Fighter",
+        level=level,
+        ability_scores=AbilityScores(
+            strength=10,
+            dexterity=12,
+            constitution=14,
+            intelligence=16,
+            wisdom=14,
+            charisma=12
+        ),
+        max_hp=10,
+        current_hp=10
+    )
+
+def ndjson(*characters):
+    """Encode characters as an NDJSON stream."""
+    return io.BytesIO(b"\n".join(c.model_dump_json().encode() for c in characters) + b"\n")
+
+@pytest.fixture
+def service(tmp_path):
+    """Fixture providing a service over a temporary directory."""
+    return CharacterService(save_dir=tmp_path)
+
+def test_import_creates_characters_in_batches(service):
+    """Test that every record is created across several batches."""
+    records = iter_ndjson_records(ndjson(*(make_character(f"Hero {i}") for i in range(5))))
+    report = import_records(service, records, batch_size=2)
+    assert report.created == 5 and len(service.list_characters()) == 5
+
+def test_invalid_record_reported(service):
+    """Test that invalid records are reported with their line number."""
+    stream = io.BytesIO(b'{"name": "Broken"}\n\n' + make_character("Good").model_dump_json().encode())
+    report = import_records(service, iter_ndjson_records(stream))
+    assert [(r.record, r.status) for r in report.results] == [("line 1", "invalid"), ("line 3", "created")]
+
+def test_skip_policy_keeps_existing(service):
+    """Test that skip leaves existing characters untouched."""
+    service.save_character(make_character("Hero", level=3))
+    report = import_records(service, iter_ndjson_records(ndjson(make_character("Hero", level=9))), "skip")
+    assert report.skipped == 1 and service.load_character("Hero").level == 3
+
+def test_overwrite_policy_replaces_existing(service):
+    """Test that overwrite replaces existing characters."""
+    service.save_character(make_character("Hero", level=3))
+    report = import_records(service, iter_ndjson_records(ndjson(make_character("Hero", level=9))), "overwrite")
+    assert report.updated == 1 and service.load_character("Hero").level == 9
+
+def test_fail_policy_stops_at_conflict(service):
+    """Test that fail stops at the first conflict but keeps earlier records."""
+    service.save_character(make_character("Hero"))
+    stream = ndjson(make_character("First"), make_character("Hero"), make_character("Last"))
+    report = import_records(service, iter_ndjson_records(stream), "fail")
+    assert report.aborted and sorted(service.list_characters()) == ["First", "Hero"]
+
+def test_duplicate_within_upload_is_a_conflict(service):
+    """Test that a repeated name in one upload conflicts with the first copy."""
+    stream = ndjson(make_character("Hero", level=2), make_character("Hero", level=7))
+    report = import_records(service, iter_ndjson_records(stream), "skip")
+    assert [r.status for r in report.results] == ["created", "skipped"] and service.load_character("Hero").level == 2
+
+def test_failed_batch_reported_as_error(service, monkeypatch):
+    """Test that a failed storage batch marks its records as errors."""
+    monkeypatch.setattr(service, "save_characters", lambda characters: False)
+    report = import_records(service, iter_ndjson_records(ndjson(make_character("Hero"))))
+    assert report.errors == 1 and report.results[0].status == "error"
+
+def test_unreadable_upload_keeps_the_report_of_written_batches(service):
+    """Test that a read error partway through stops the import and reports what was written."""
+    def records():
+        yield from iter_ndjson_records(ndjson(make_character("Alpha"), make_character("Beta")))
+        raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+    report = import_records(service, records(), batch_size=1)
+    assert (report.created, report.aborted) == (2, True)
+    assert report.error.startswith("Unreadable upload: Compressed file ended")
+    assert service.list_characters() == ["Alpha", "Beta"]
+
+def test_open_gzipped_ndjson():
+    """Test that .ndjson.gz uploads are decompressed."""
+    data = gzip.compress(make_character("Hero").model_dump_json().encode())
+    records = list(open_import_records("roster.ndjson.gz", io.BytesIO(data)))
+    assert json.loads(records[0][1])["name"] == "Hero"
+
+def test_open_zip():
+    """Test that only .json entries of a ZIP are read."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("hero.json", make_character("Hero").model_dump_json())
+        archive.writestr("README.txt", "ignore me")
+    buffer.seek(0)
+    assert [label for label, _ in open_import_records("roster.zip", buffer)] == ["hero.json"]
+
+def test_oversized_records_are_not_read_whole(monkeypatch):
+    """Test that ZIP entries and NDJSON lines past MAX_RECORD_BYTES are refused while streaming."""
+    monkeypatch.setattr(bulk_import, "MAX_RECORD_BYTES", 1000)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("hero.json", make_character("Hero").model_dump_json())
+        archive.writestr("bomb.json", b" " * 10**7)
+    buffer.seek(0)
+    records = open_import_records("roster.zip", buffer)
+    assert next(records)[0] == "hero.json"
+    with pytest.raises(RecordTooLargeError, match="bomb.json"):
+        next(records)
+    with pytest.raises(RecordTooLargeError, match="line 2"):
+        list(iter_ndjson_records(io.BytesIO(b"{}\n" + b" " * 2000 + b"\n")))
+
+def test_open_corrupt_zip():
+    """Test that a corrupt archive is rejected."""
+    with pytest.raises(ValueError):
+        open_import_records("roster.zip", io.BytesIO(b"not a zip"))
+
+def test_open_unsupported_extension():
+    """Test that unsupported file types are rejected."""
+    with pytest.raises(ValueError):
+        open_import_records("roster.csv", io.BytesIO(b""))
@@ -0,0 +1,42 @@
+"""Unit tests for the LRU cache."""
+import pytest
+from app.services.cache import LRUCache
+
+def test_get_miss_counts_miss():
+    """Test that looking up an absent key counts a miss."""
+    cache = LRUCache(2)
+    cache.get("missing")
+    assert cache.stats()["misses"] == 1
+
+def test_get_hit_returns_value():
+    """Test that a stored value is returned."""
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+
+def test_eviction_drops_least_recently_used():
+    """Test that the least recently used entry is evicted first."""
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "b" not in cache and "a" in cache and cache.evictions == 1
+
+def test_invalidate_removes_entry():
+    """Test that invalidate removes a single entry."""
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.invalidate("a")
+    assert len(cache) == 0
+
+def test_zero_size_cache_stores_nothing():
+    """Test that a zero-sized cache never stores values."""
+    cache = LRUCache(0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+def test_negative_size_rejected():
+    """Test that a negative capacity is rejected."""
+    with pytest.raises(ValueError):
+        LRUCache(-1)
@@ -0,0 +1,123 @@
+"""Unit tests for JSON Merge Patch / JSON Patch handling."""
+import pytest
+from pydantic import ValidationError
+from app.services.character_patch import (
+    JSON_PATCH,
+    PatchConflictError,
+    PatchError,
+    apply_json_patch,
+    apply_merge_patch,
+    apply_patch,
+    validate_changes,
+)
+
+@pytest.fixture
+def document():
+    """Fixture providing a stored character document."""
+    return {
+        "name": "Test Character",
+        "race": "Human",
+        "character_class": "Fighter",
+        "level": 5,
+        "ability_scores": {
+            "strength": 16,
+            "dexterity": 14,
+            "constitution": 15,
+            "intelligence": 10,
+            "wisdom": 12,
+            "charisma": 8
+        },
+        "max_hp": 45,
+        "current_hp": 45,
+        "inventory": [{"name": "Longsword", "quantity": 1, "description": None}]
+    }
+
+def test_merge_patch_replaces_and_removes():
+    """Test RFC 7396 replace, nested merge and null removal."""
+    target = {"a": 1, "b": {"c": 2, "d": 3}, "e": 4}
+    patched = apply_merge_patch(target, {"a": 5, "b": {"c": None}, "e": None})
+    assert patched == {"a": 5, "b": {"d": 3}}
+    assert target == {"a": 1, "b": {"c": 2, "d": 3}, "e": 4}
+
+def test_json_patch_operations():
+    """Test add, remove, replace, move, copy and test operations."""
+    target = {"a": [1, 2], "b": {"c": 1}}
+    patched = apply_json_patch(target, [
+        {"op": "add", "path": "/a/-", "value": 3},
+        {"op": "replace", "path": "/b/c", "value": 2},
+        {"op": "copy", "from": "/b/c", "path": "/d"},
+        {"op": "move", "from": "/a/0", "path": "/e"},
+        {"op": "remove", "path": "/b"},
+        {"op": "test", "path": "/a", "value": [2, 3]},
+    ])
+    assert patched == {"a": [2, 3], "d": 2, "e": 1}
+    assert target == {"a": [1, 2], "b": {"c": 1}}
+
+def test_json_patch_escaped_pointer():
+    """Test that ~0 and ~1 are unescaped in JSON pointers."""
+    assert apply_json_patch({"a/b": 1, "c~d": 2}, [
+        {"op": "remove", "path": "/a~1b"},
+        {"op": "replace", "path": "/c~0d", "value": 3},
+    ]) == {"c~d": 3}
+
+def test_json_patch_failed_test():
+    """Test that a failing test operation raises a conflict."""
+    with pytest.raises(PatchConflictError):
+        apply_json_patch({"a": 1}, [{"op": "test", "path": "/a", "value": 2}])
+
+@pytest.mark.parametrize("operations", [
+    {"op": "add", "path": "/a", "value": 1},
+    [{"op": "add", "path": "/a"}],
+    [{"op": "replace", "path": "/missing", "value": 1}],
+    [{"op": "remove", "path": "/a/5"}],
+    [{"op": "add", "path": "a", "value": 1}],
+    [{"op": "move", "from": "/a", "path": "/a/0"}],
+    [{"op": "frobnicate", "path": "/a"}],
+])
+def test_json_patch_invalid(operations):
+    """Test that malformed or inapplicable patches are rejected."""
+    with pytest.raises(PatchError):
+        apply_json_patch({"a": [1]}, operations)
+
+def test_apply_patch_chooses_format(document):
+    """Test that the media type selects JSON Patch, merge patch otherwise."""
+    merged = apply_patch(document, {"current_hp": 10}, "application/merge-patch+json")
+    patched = apply_patch(document, [{"op": "replace", "path": "/current_hp", "value": 10}],
+                          f"{JSON_PATCH}; charset=utf-8")
+    assert merged == patched
+    with pytest.raises(PatchError):
+        apply_patch(document, [{"op": "replace", "path": "/current_hp", "value": 10}], "application/json")
+
+def test_validate_changes_only_changed_fields(document):
+    """Test that only changed fields are validated and returned."""
+    document["ability_scores"]["strength"] = 99  # invalid but untouched
+    patched = apply_merge_patch(document, {"current_hp": 10})
+    assert validate_changes(document, patched) == {"current_hp": 10}
+
+def test_validate_changes_rejects_invalid_value(document):
+    """Test that field constraints are enforced on changed fields."""
+    with pytest.raises(ValidationError):
+        validate_changes(document, apply_merge_patch(document, {"current_hp": -1}))
+
+def test_validate_changes_validates_nested_items(document):
+    """Test that nested inventory items are validated and normalized."""
+    patched = apply_json_patch(document, [{"op": "add", "path": "/inventory/-", "value": {"name": "Rope", "quantity": 2}}])
+    changes = validate_changes(document, patched)
+    assert changes["inventory"][1] == {"name": "Rope", "quantity": 2, "description": None}
+    patched = apply_json_patch(document, [{"op": "replace", "path": "/inventory/0/quantity", "value": -3}])
+    with pytest.raises(ValidationError):
+        validate_changes(document, patched)
+
+def test_validate_changes_resets_removed_default(document):
+    """Test that removing a field with a default resets it."""
+    assert validate_changes(document, apply_merge_patch(document, {"inventory": None})) == {"inventory": []}
+
+@pytest.mark.parametrize("patch", [{"name": "Renamed"}, {"race": None}, {"alignment": "Good"}])
+def test_validate_changes_rejects_forbidden_fields(document, patch):
+    """Test that renames, required removals and unknown fields are rejected."""
+    with pytest.raises(PatchError):
+        validate_changes(document, apply_merge_patch(document, patch))
+
+def test_validate_changes_no_op(document):
+    """Test that a patch which changes nothing yields no changes."""
+    assert validate_changes(document, apply_merge_patch(document, {"current_hp": 45})) == {}
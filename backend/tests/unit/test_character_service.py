@@ -4,7 +4,7 @@ import json
 from pathlib import Path
 import shutil
 from app.models.character import Character, AbilityScores, InventoryItem
-from app.services.character_service import CharacterService
+from app.services.character_service import CharacterService, VersionMismatchError
 
 @pytest.fixture
 def test_character():
@@ -48,7 +48,7 @@ def test_save_character(character_service, test_character):
     """Test saving a character."""
     success = character_service.save_character(test_character)
     assert success
-    file_path = character_service.save_dir / f"{test_character.name.lower().replace(' ', '_')}.json"
+    file_path = character_service.store.path_for(test_character.name)
     assert file_path.exists()
 
 def test_load_character(character_service, test_character):
@@ -146,4 +146,118 @@ def test_import_character_from_json(character_service, test_character):
     finally:
         # Clean up
         if temp_file.exists():
-            temp_file.unlink() 
\ No newline at end of file
+            temp_file.unlink() 
+
+def test_list_characters_uses_index(character_service, test_character):
+    """Test that listing does not reopen character files once indexed."""
+    character_service.save_character(test_character)
+    character_service.list_characters()
+    file_path = character_service.store.path_for(test_character.name)
+    file_path.write_text("not json")
+    # Overwriting in place leaves the directory untouched, so the index is trusted
+    assert character_service.list_characters() == [test_character.name]
+
+def test_list_characters_detects_out_of_band_file(character_service, test_character):
+    """Test that a file added behind the service's back shows up in the list."""
+    character_service.list_characters()
+    # A file dropped into the old flat layout
+    file_path = character_service.save_dir / "test_character.json"
+    file_path.write_text(test_character.model_dump_json())
+    assert character_service.list_characters() == [test_character.name]
+
+def test_delete_character_removes_index_entry(character_service, test_character):
+    """Test that deleting a character removes it from the listing."""
+    character_service.save_character(test_character)
+    character_service.delete_character(test_character.name)
+    assert character_service.list_characters() == []
+
+def test_rebuild_index(character_service, test_character):
+    """Test that rebuild_index picks up renamed files in place."""
+    character_service.save_character(test_character)
+    renamed = test_character.model_copy(update={"name": "Renamed"})
+    file_path = character_service.store.path_for(test_character.name)
+    file_path.write_text(renamed.model_dump_json())
+    character_service.rebuild_index()
+    assert character_service.list_characters() == ["Renamed"]
+
+def test_load_character_cache_hit(character_service, test_character):
+    """Test that a repeated load is served from the cache."""
+    character_service.save_character(test_character)
+    first = character_service.load_character(test_character.name)
+    second = character_service.load_character(test_character.name)
+    assert second is first and character_service.cache_stats()["hits"] == 1
+
+def test_load_character_cache_invalidated_on_save(character_service, test_character):
+    """Test that saving a character drops the cached copy."""
+    character_service.save_character(test_character)
+    character_service.load_character(test_character.name)
+    character_service.save_character(test_character.model_copy(update={"level": 5}))
+    assert character_service.load_character(test_character.name).level == 5
+
+def test_load_character_cache_detects_out_of_band_change(character_service, test_character):
+    """Test that a file rewritten outside the service is reloaded."""
+    character_service.save_character(test_character)
+    character_service.load_character(test_character.name)
+    file_path = character_service.store.path_for(test_character.name)
+    file_path.write_text(test_character.model_copy(update={"level": 12}).model_dump_json())
+    assert character_service.load_character(test_character.name).level == 12
+
+def test_load_character_cache_dropped_when_file_removed(character_service, test_character):
+    """Test that a cached character is not served after its file disappears."""
+    character_service.save_character(test_character)
+    character_service.load_character(test_character.name)
+    character_service.store.path_for(test_character.name).unlink()
+    assert character_service.load_character(test_character.name) is None
+
+def test_get_etag_matches_loaded_version(character_service, test_character):
+    """Test that get_etag reports the version load_character_with_etag read."""
+    character_service.save_character(test_character)
+    _, etag = character_service.load_character_with_etag(test_character.name)
+    assert character_service.get_etag(test_character.name) == etag
+
+def test_get_etag_unchanged_by_identical_rewrite(character_service, test_character):
+    """Test that rewriting identical content keeps the same ETag."""
+    character_service.save_character(test_character)
+    etag = character_service.get_etag(test_character.name)
+    character_service.save_character(test_character)
+    assert character_service.get_etag(test_character.name) == etag
+
+def test_get_etag_detects_out_of_band_edit(character_service, test_character):
+    """Test that editing the file outside the service changes the ETag."""
+    character_service.save_character(test_character)
+    etag = character_service.get_etag(test_character.name)
+    file_path = character_service.store.path_for(test_character.name)
+    file_path.write_text(test_character.model_copy(update={"level": 7}).model_dump_json())
+    assert character_service.get_etag(test_character.name) != etag
+
+def test_save_character_version_mismatch(character_service, test_character):
+    """Test that a conditional save with a stale version raises."""
+    character_service.save_character(test_character)
+    with pytest.raises(VersionMismatchError):
+        character_service.save_character(test_character, expected_version="stale")
+
+def test_delete_character_version_match(character_service, test_character):
+    """Test that a conditional delete with the current version succeeds."""
+    character_service.save_character(test_character)
+    etag = character_service.get_etag(test_character.name)
+    assert character_service.delete_character(test_character.name, expected_version=etag)
+
+def test_patch_character(character_service, test_character):
+    """Test that patching changes only the patched field and the version."""
+    character_service.save_character(test_character)
+    etag = character_service.get_etag(test_character.name)
+    record = character_service.patch_character(test_character.name, {"current_hp": 5})
+    assert record.data["current_hp"] == 5
+    assert record.version != etag
+    assert record.version == character_service.get_etag(test_character.name)
+    assert character_service.load_character(test_character.name).current_hp == 5
+
+def test_patch_character_version_mismatch(character_service, test_character):
+    """Test that a conditional patch with a stale version raises."""
+    character_service.save_character(test_character)
+    with pytest.raises(VersionMismatchError):
+        character_service.patch_character(test_character.name, {"current_hp": 5}, expected_version="stale")
+
+def test_patch_nonexistent_character(character_service):
+    """Test that patching a missing character returns None."""
+    assert character_service.patch_character("Nobody", {"current_hp": 5}) is None
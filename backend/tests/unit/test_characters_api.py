@@ -1,10 +1,19 @@
 """Unit tests for character API endpoints."""
+import gzip
+import io
+import json
+import zipfile
 import pytest
 import shutil
 from pathlib import Path
 from fastapi.testclient import TestClient
+from app.api import characters, simulation
 from app.main import app
 from app.models.character import Character, AbilityScores, InventoryItem
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from app.services.simulation import EncounterSimulator
+from app.storage.event_log_store import EventLogCharacterStore
 
 client = TestClient(app)
 
@@ -200,4 +209,312 @@ def test_import_invalid_character_data():
     files = {"file": ("character.json", invalid_data, "application/json")}
     response = client.post("/characters/import", files=files)
     assert response.status_code == 400
-    assert "Invalid character data" in response.json()["detail"] 
\ No newline at end of file
+    assert "Invalid character data" in response.json()["detail"] 
+
+def test_list_characters_page(test_character):
+    """Test that the summaries endpoint returns pages with a cursor, and / stays a list of names."""
+    for name in ("Alpha", "Beta", "Gamma"):
+        client.post("/characters/", json=test_character.model_copy(update={"name": name}).model_dump())
+
+    response = client.get("/characters/summaries", params={"limit": 2})
+    page = response.json()
+    assert [item["name"] for item in page["items"]] == ["Alpha", "Beta"]
+    assert page["items"][0]["character_class"] == test_character.character_class
+
+    response = client.get("/characters/summaries", params={"limit": 2, "cursor": page["next_cursor"]})
+    assert response.json() == {"items": [{**page["items"][0], "name": "Gamma"}], "next_cursor": None}
+    assert sorted(client.get("/characters/", params={"limit": 2}).json()) == ["Alpha", "Beta", "Gamma"]
+
+def test_list_characters_filtered(test_character):
+    """Test filtering by race."""
+    client.post("/characters/", json=test_character.model_dump())
+    client.post("/characters/", json=test_character.model_copy(update={"name": "Elfo", "race": "Elf"}).model_dump())
+    response = client.get("/characters/summaries", params={"race": "Elf"})
+    assert [item["name"] for item in response.json()["items"]] == ["Elfo"]
+
+def test_list_characters_invalid_cursor():
+    """Test that a malformed cursor is rejected."""
+    for cursor in ("garbage", "NQ=="):
+        assert client.get("/characters/summaries", params={"cursor": cursor}).status_code == 400
+
+def test_bulk_export_ndjson(test_character):
+    """Test exporting every character as NDJSON."""
+    for name in ("Alpha", "Beta"):
+        client.post("/characters/", json=test_character.model_copy(update={"name": name}).model_dump())
+    response = client.get("/characters/export")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["name"] for line in lines] == ["Alpha", "Beta"]
+
+def test_bulk_export_ndjson_gzip(test_character):
+    """Test that gzip=true compresses the NDJSON stream."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.get("/characters/export", params={"gzip": "true"})
+    assert json.loads(gzip.decompress(response.content)) == test_character.model_dump()
+
+def test_bulk_export_zip_filtered(test_character):
+    """Test exporting a filtered subset as a ZIP of JSON files."""
+    client.post("/characters/", json=test_character.model_dump())
+    client.post("/characters/", json=test_character.model_copy(update={"name": "Elfo", "race": "Elf"}).model_dump())
+    response = client.get("/characters/export", params={"format": "zip", "race": "Elf", "gzip": "true"})
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["elfo.json"] and json.loads(archive.read("elfo.json"))["race"] == "Elf"
+
+def test_bulk_import_ndjson(test_character):
+    """Test bulk importing an NDJSON upload."""
+    lines = [test_character.model_copy(update={"name": name}).model_dump_json() for name in ("Alpha", "Beta")]
+    files = {"file": ("roster.ndjson", "\n".join(lines).encode(), "application/x-ndjson")}
+    response = client.post("/characters/import/bulk", files=files)
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+def test_bulk_import_fail_policy_conflict(test_character):
+    """Test that on_conflict=fail returns 409 on an existing character."""
+    client.post("/characters/", json=test_character.model_dump())
+    files = {"file": ("roster.ndjson", test_character.model_dump_json().encode(), "application/x-ndjson")}
+    response = client.post("/characters/import/bulk", params={"on_conflict": "fail"}, files=files)
+    assert response.status_code == 409
+    assert response.json()["conflicts"] == 1
+
+def test_bulk_import_unsupported_file():
+    """Test that unsupported uploads are rejected."""
+    files = {"file": ("roster.csv", b"a,b", "text/csv")}
+    response = client.post("/characters/import/bulk", files=files)
+    assert response.status_code == 400
+
+def test_bulk_import_corrupt_gzip():
+    """Test that an unreadable compressed upload is rejected."""
+    files = {"file": ("roster.ndjson.gz", b"not gzip", "application/gzip")}
+    response = client.post("/characters/import/bulk", files=files)
+    assert response.status_code == 400
+
+def test_bulk_import_truncated_upload_reports_what_was_written(test_character):
+    """Test that an upload cut off partway returns the report of the records already written."""
+    lines = [test_character.model_copy(update={"name": name}).model_dump_json() for name in ("Alpha", "Beta")]
+    data = gzip.compress("\n".join(lines).encode())
+    files = {"file": ("roster.ndjson.gz", data[:-12], "application/gzip")}
+    response = client.post("/characters/import/bulk", files=files)
+    report = response.json()
+    assert response.status_code == 400
+    assert report["aborted"] and report["error"].startswith("Unreadable upload")
+    assert client.get("/characters/").json() == [result["name"] for result in report["results"]]
+
+def test_get_character_returns_etag(test_character):
+    """Test that GET returns an ETag header."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.get(f"/characters/{test_character.name}")
+    assert response.headers["etag"].startswith('"')
+
+def test_get_character_not_modified(test_character):
+    """Test that a matching If-None-Match returns 304 with no body."""
+    client.post("/characters/", json=test_character.model_dump())
+    etag = client.get(f"/characters/{test_character.name}").headers["etag"]
+    response = client.get(f"/characters/{test_character.name}", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+
+def test_get_character_modified_since_etag(test_character):
+    """Test that a stale If-None-Match returns the new body."""
+    client.post("/characters/", json=test_character.model_dump())
+    etag = client.get(f"/characters/{test_character.name}").headers["etag"]
+    client.put(f"/characters/{test_character.name}", json=test_character.model_copy(update={"level": 3}).model_dump())
+    response = client.get(f"/characters/{test_character.name}", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["level"] == 3
+
+def test_get_nonexistent_character_with_if_none_match():
+    """Test that If-None-Match on a missing character is still a 404."""
+    response = client.get("/characters/Nobody", headers={"If-None-Match": '"abc"'})
+    assert response.status_code == 404
+
+def test_update_with_matching_if_match(test_character):
+    """Test that a PUT with the current ETag succeeds and returns the new ETag."""
+    client.post("/characters/", json=test_character.model_dump())
+    etag = client.get(f"/characters/{test_character.name}").headers["etag"]
+    updated = test_character.model_copy(update={"level": 2}).model_dump()
+    response = client.put(f"/characters/{test_character.name}", json=updated, headers={"If-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+
+def test_update_with_stale_if_match(test_character):
+    """Test that a PUT with an outdated ETag is rejected with 412."""
+    client.post("/characters/", json=test_character.model_dump())
+    etag = client.get(f"/characters/{test_character.name}").headers["etag"]
+    client.put(f"/characters/{test_character.name}", json=test_character.model_copy(update={"level": 2}).model_dump())
+    response = client.put(f"/characters/{test_character.name}", json=test_character.model_dump(), headers={"If-Match": etag})
+    assert response.status_code == 412
+
+def test_update_with_weak_if_match(test_character):
+    """Test that If-Match uses strong comparison, so a weak ETag is rejected with 412."""
+    client.post("/characters/", json=test_character.model_dump())
+    etag = client.get(f"/characters/{test_character.name}", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    response = client.put(f"/characters/{test_character.name}", json=test_character.model_dump(),
+                          headers={"If-Match": f"W/{etag}"})
+    assert response.status_code == 412
+    response = client.get(f"/characters/{test_character.name}", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+def test_delete_with_stale_if_match(test_character):
+    """Test that a DELETE with an outdated ETag is rejected with 412."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.delete(f"/characters/{test_character.name}", headers={"If-Match": '"stale"'})
+    assert response.status_code == 412
+
+def test_delete_with_wildcard_if_match(test_character):
+    """Test that If-Match: * allows deleting an existing character."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.delete(f"/characters/{test_character.name}", headers={"If-Match": "*"})
+    assert response.status_code == 200
+
+def test_patch_character_merge_patch(test_character):
+    """Test a merge patch of current_hp."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.patch(f"/characters/{test_character.name}", json={"current_hp": 7},
+                            headers={"Content-Type": "application/merge-patch+json"})
+    assert response.status_code == 200
+    assert response.json()["current_hp"] == 7
+    assert response.headers["etag"] == client.get(f"/characters/{test_character.name}").headers["etag"]
+
+def test_patch_character_json_patch(test_character):
+    """Test a JSON Patch of an inventory quantity."""
+    test_character.inventory = [InventoryItem(name="Rope", quantity=1)]
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.patch(f"/characters/{test_character.name}",
+                            json=[{"op": "replace", "path": "/inventory/0/quantity", "value": 3}],
+                            headers={"Content-Type": "application/json-patch+json"})
+    assert response.status_code == 200
+    assert client.get(f"/characters/{test_character.name}").json()["inventory"][0]["quantity"] == 3
+
+def test_patch_character_invalid_value(test_character):
+    """Test that an invalid patched field returns 422."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.patch(f"/characters/{test_character.name}", json={"current_hp": -1})
+    assert response.status_code == 422
+
+def test_patch_character_errors(test_character):
+    """Test the status codes for bad, conflicting, stale and missing patches."""
+    client.post("/characters/", json=test_character.model_dump())
+    url = f"/characters/{test_character.name}"
+    json_patch = {"Content-Type": "application/json-patch+json"}
+    assert client.patch(url, json={"name": "Other"}).status_code == 400
+    assert client.patch(url, json=[{"op": "test", "path": "/level", "value": 99}], headers=json_patch).status_code == 409
+    assert client.patch(url, json={"current_hp": 1}, headers={"If-Match": '"stale"'}).status_code == 412
+    assert client.patch("/characters/Nobody", json={"current_hp": 1}).status_code == 404
+
+def test_apply_hp_changes(test_character):
+    """Test the batch HP endpoint."""
+    client.post("/characters/", json=test_character.model_dump())
+    response = client.post("/characters/hp", json={"changes": [
+        {"name": test_character.name, "delta": -10},
+        {"name": "Nobody", "delta": -10},
+    ]})
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["updated"], report["not_found"]) == (1, 1)
+    assert client.get(f"/characters/{test_character.name}").json()["current_hp"] == test_character.current_hp - 10
+
+@pytest.fixture
+def event_log_backend(tmp_path, monkeypatch):
+    """Fixture routing the API to an event log store."""
+    service = AsyncCharacterService(CharacterService(store=EventLogCharacterStore(tmp_path)))
+    monkeypatch.setattr(characters, "character_service", service)
+    yield service
+    service.shutdown()
+
+def test_history_requires_event_log(test_character):
+    """Test that history and undo report 501 on backends without a log."""
+    client.post("/characters/", json=test_character.model_dump())
+    assert client.get(f"/characters/{test_character.name}/history").status_code == 501
+    assert client.post(f"/characters/{test_character.name}/undo").status_code == 501
+
+def test_history_and_undo(event_log_backend, test_character):
+    """Test the history and undo endpoints over the event log."""
+    client.post("/characters/", json=test_character.model_dump())
+    client.patch(f"/characters/{test_character.name}", json={"current_hp": 1})
+    history = client.get(f"/characters/{test_character.name}/history").json()
+    assert [(event["op"], event["fields"]) for event in history] == [
+        ("put", sorted(test_character.model_dump())), ("patch", ["current_hp"])
+    ]
+    response = client.post(f"/characters/{test_character.name}/undo")
+    assert response.status_code == 200
+    assert response.json()["current_hp"] == test_character.current_hp
+    assert client.post(f"/characters/{test_character.name}/undo").status_code == 204
+    assert client.post(f"/characters/{test_character.name}/undo").status_code == 409
+    assert client.post("/characters/Nobody/undo").status_code == 404
+    assert client.get("/characters/Nobody/history").status_code == 404
+
+def test_roster_analytics(test_character):
+    """Test the analytics summary and histogram endpoints."""
+    client.post("/characters/", json=test_character.model_dump())
+    summary = client.get("/analytics/summary", params={"group_by": "character_class"}).json()
+    assert summary["count"] == 1
+    assert summary["groups"][0]["key"] == test_character.character_class
+    histogram = client.get("/analytics/histogram", params={"field": "level", "group_by": "race"}).json()
+    assert histogram["bins"] == [test_character.level]
+    assert client.get("/analytics/summary", params={"percentiles": 150}).status_code == 400
+
+def test_roll_dice():
+    """Test the dice roll endpoint."""
+    response = client.get("/dice/roll", params={"expression": "4d6kh3", "count": 20, "seed": 9})
+    body = response.json()
+    assert response.status_code == 200
+    assert len(body["rolls"]) == 20 and all(3 <= roll <= 18 for roll in body["rolls"])
+    assert client.get("/dice/roll", params={"expression": "4d6kh3", "count": 20, "seed": 9}).json() == body
+    assert client.get("/dice/roll", params={"expression": "4x6"}).status_code == 400
+    assert client.get("/dice/roll", params={"expression": "1000d1000+1d6"}).status_code == 400
+
+def test_simulate_encounter(test_character, monkeypatch):
+    """Test the encounter simulation endpoint."""
+    monkeypatch.setattr(simulation, "simulator", EncounterSimulator(max_workers=0))
+    client.post("/characters/", json=test_character.model_dump())
+    request = {
+        "party": [test_character.name],
+        "monsters": [{"name": "Goblin", "max_hp": 7, "armor_class": 15, "attack_bonus": 4, "damage": "1d6+2", "count": 2}],
+        "trials": 2000,
+        "seed": 1,
+    }
+    response = client.post("/simulations/encounter", json=request)
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()["combatants"]] == [test_character.name, "Goblin 1", "Goblin 2"]
+    assert client.post("/simulations/encounter", json={**request, "party": ["Nobody"]}).status_code == 404
+    assert client.post("/simulations/encounter", json={**request, "monsters": []}).status_code == 400
+
+def test_oversized_encounters_are_rejected(test_character, monkeypatch):
+    """Test that encounters with huge HP or too many combatants get a 422 before simulating."""
+    monkeypatch.setattr(simulation, "simulator", EncounterSimulator(max_workers=0))
+    goblin = {"name": "Goblin", "max_hp": 7, "armor_class": 15, "attack_bonus": 4}
+    request = {"party": [test_character.name], "monsters": [goblin]}
+    oversized = [
+        {**request, "monsters": [{**goblin, "max_hp": 10**12}]},
+        {**request, "monsters": [goblin] * 21},
+        {**request, "enemies": ["Enemy"] * 21},
+        {**request, "monsters": [{**goblin, "count": 50}] * 2},
+        {**request, "monsters": [{**goblin, "damage": "+".join(["1d6"] * 20)}]},
+    ]
+    for body in oversized:
+        assert client.post("/simulations/encounter", json=body).status_code == 422
+    client.post("/characters/", json={**test_character.model_dump(), "max_hp": 10**12, "current_hp": 10**12})
+    assert client.post("/simulations/encounter", json=request).status_code == 400
+
+def test_generate_ability_scores():
+    """Test the stat block generation endpoint."""
+    request = {"method": "roll", "count": 50, "seed": 3}
+    response = client.post("/ability-scores/generate", json=request)
+    body = response.json()
+    assert response.status_code == 200
+    assert len(body["stat_blocks"]) == 50 and body["seed"] == 3
+    block = body["stat_blocks"][0]
+    assert block["total"] == sum(block["ability_scores"].values()) and 0 < block["percentile"] <= 100
+    assert client.post("/ability-scores/generate", json=request).json() == body
+
+    standard = client.post("/ability-scores/generate", json={"method": "standard_array", "count": 3}).json()
+    assert all(block["total"] == 72 for block in standard["stat_blocks"])
+    assert client.post("/ability-scores/generate", json={"count": 10_001}).status_code == 422
+
+def test_point_buy_and_rating():
+    """Test the point buy validation and rating endpoints."""
+    scores = {"strength": 15, "dexterity": 14, "constitution": 13, "intelligence": 12, "wisdom": 10, "charisma": 8}
+    assert client.post("/ability-scores/point-buy", json=scores).json() == {
+        "valid": True, "cost": 27, "budget": 27, "errors": []}
+    over = client.post("/ability-scores/point-buy", json={**scores, "dexterity": 15}).json()
+    assert not over["valid"] and over["cost"] == 29
+
+    rating = client.post("/ability-scores/rate", json={**scores, "strength": 18}).json()
+    assert rating["total"] == 75 and rating["score_percentiles"]["strength"] == 100
+    assert not rating["point_buy"]["valid"]
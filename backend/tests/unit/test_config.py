@@ -0,0 +1,58 @@
+"""Unit tests for configuration and store selection."""
+from pathlib import Path
+from app.config import Settings
+from app.storage.event_log_store import EventLogCharacterStore
+from app.storage.factory import create_store
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from app.storage.write_behind import WriteBehindStore
+
+def test_defaults_to_json_backend(monkeypatch):
+    """Test that the JSON store is the default backend."""
+    monkeypatch.delenv("DND_STORAGE_BACKEND", raising=False)
+    assert Settings.from_env().storage_backend == "json"
+
+def test_reads_environment(monkeypatch):
+    """Test that settings are read from DND_* variables."""
+    monkeypatch.setenv("DND_STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("DND_CACHE_SIZE", "16")
+    settings = Settings.from_env()
+    assert (settings.storage_backend, settings.cache_size) == ("sqlite", 16)
+
+def test_create_json_store(tmp_path):
+    """Test that the json backend builds a JsonCharacterStore."""
+    store = create_store(Settings(data_dir=tmp_path / "characters"))
+    assert isinstance(store, JsonCharacterStore) and store.encoding == "indented"
+
+def test_storage_encoding_from_environment(monkeypatch, tmp_path):
+    """Test that DND_STORAGE_ENCODING selects the JSON store's file encoding."""
+    monkeypatch.setenv("DND_STORAGE_ENCODING", "compact")
+    monkeypatch.setenv("DND_DATA_DIR", str(tmp_path / "characters"))
+    assert create_store(Settings.from_env()).encoding == "compact"
+
+def test_create_sqlite_store(tmp_path):
+    """Test that the sqlite backend builds a SqliteCharacterStore."""
+    store = create_store(Settings(storage_backend="sqlite", sqlite_path=tmp_path / "c.db"))
+    assert isinstance(store, SqliteCharacterStore)
+    store.close()
+
+def test_create_event_log_store(tmp_path):
+    """Test that the eventlog backend builds an EventLogCharacterStore."""
+    store = create_store(Settings(storage_backend="eventlog", event_log_dir=tmp_path / "logs", log_compact_every=5,
+                                  log_undo_depth=7))
+    assert isinstance(store, EventLogCharacterStore)
+    assert store.compact_every == 5 and store.undo_depth == 7
+
+def test_metrics_can_be_disabled(monkeypatch):
+    """Test that DND_METRICS_ENABLED turns metrics collection off."""
+    assert Settings.from_env().metrics_enabled
+    monkeypatch.setenv("DND_METRICS_ENABLED", "false")
+    assert not Settings.from_env().metrics_enabled
+
+def test_create_write_behind_store(tmp_path):
+    """Test that write-behind mode wraps the configured backend."""
+    store = create_store(Settings(storage_backend="sqlite", sqlite_path=tmp_path / "c.db",
+                                  write_behind=True, write_behind_fsync="batch", write_behind_max_retries=3))
+    assert isinstance(store, WriteBehindStore) and isinstance(store.store, SqliteCharacterStore)
+    assert store.fsync == "batch" and store.max_retries == 3
+    store.close()
@@ -0,0 +1,46 @@
+"""Unit tests for the dice expression engine."""
+import numpy as np
+import pytest
+from app.services.dice import parse_dice
+
+@pytest.mark.parametrize("expression, text, minimum, maximum", [
+    ("4d6kh3", "4d6kh3", 3, 18),
+    ("2d20kl1+5", "2d20kl1+5", 6, 25),
+    ("d8 + 1d6 - 2", "1d8+1d6-2", 0, 12),
+    ("-1d4+2", "-1d4+2", -2, 1),
+    ("7", "7", 7, 7),
+])
+def test_parse(expression, text, minimum, maximum):
+    """Test parsing, formatting and bounds of dice expressions."""
+    dice = parse_dice(expression)
+    assert (str(dice), dice.minimum, dice.maximum) == (text, minimum, maximum)
+
+@pytest.mark.parametrize("expression", ["", "4x6", "1d0", "2d6kh3", "1d6+", "++2", "5d", "1001d6",
+                                        "+".join(["1000d6", "1d6"])])
+def test_parse_invalid(expression):
+    """Test that malformed expressions are rejected."""
+    with pytest.raises(ValueError):
+        parse_dice(expression)
+
+def test_samples_stay_within_bounds():
+    """Test that every sampled total lies between the minimum and maximum."""
+    dice = parse_dice("3d6kl2+1d4-1")
+    rolls = dice.sample(np.random.default_rng(0), 50_000)
+    assert rolls.min() == dice.minimum and rolls.max() == dice.maximum
+
+def test_keep_highest_mean():
+    """Test that 4d6kh3 averages about 12.24, its exact expectation."""
+    rolls = parse_dice("4d6kh3").sample(np.random.default_rng(1), 200_000)
+    assert rolls.mean() == pytest.approx(12.2446, abs=0.03)
+
+def test_advantage_and_disadvantage():
+    """Test that keeping the higher of two d20s beats keeping the lower."""
+    rng = np.random.default_rng(2)
+    assert parse_dice("2d20kh1").sample(rng, 20_000).mean() > 13
+    assert parse_dice("2d20kl1").sample(rng, 20_000).mean() < 8
+
+def test_sampling_is_deterministic_for_a_seed():
+    """Test that the same seed produces the same rolls."""
+    dice = parse_dice("8d6")
+    first = dice.sample(np.random.default_rng(42), 100)
+    assert np.array_equal(first, dice.sample(np.random.default_rng(42), 100))
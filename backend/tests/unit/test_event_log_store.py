@@ -0,0 +1,202 @@
+"""Unit tests for the append-only event log storage backend."""
+import json
+import pytest
+from app.services.character_service import CharacterService
+from app.storage.event_log_store import EventLogCharacterStore
+
+def character_data(**overrides):
+    """Build a stored character document."""
+    return {
+        "name": "Test Character",
+        "race": "Human",
+        "character_class": "Fighter",
+        "level": 5,
+        "ability_scores": {
+            "strength": 16, "dexterity": 14, "constitution": 15,
+            "intelligence": 10, "wisdom": 12, "charisma": 8
+        },
+        "max_hp": 45,
+        "current_hp": 45,
+        "inventory": [],
+        **overrides
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture providing an event log store that snapshots every 3 events."""
+    return EventLogCharacterStore(tmp_path, compact_every=3)
+
+def log_events(store):
+    """Read the raw events of the test character's log."""
+    lines = (store.root / "test_character.log").read_bytes().splitlines()
+    return [json.loads(line) for line in lines]
+
+def test_write_and_read(store):
+    """Test that a written character reads back with a version."""
+    version = store.write(character_data())
+    record = store.read("Test Character")
+    assert record.data == character_data()
+    assert record.version == version == store.version("test character")
+
+def test_small_change_is_logged_as_patch(store):
+    """Test that re-saving a character appends only the changed fields."""
+    store.write(character_data())
+    store.write(character_data(current_hp=30))
+    events = log_events(store)
+    assert [event["op"] for event in events] == ["put", "patch"]
+    assert events[1]["changes"] == {"current_hp": 30}
+
+def test_unchanged_save_appends_nothing(store):
+    """Test that saving identical data does not grow the log."""
+    version = store.write(character_data())
+    assert store.write(character_data()) == version
+    assert len(log_events(store)) == 1
+
+def test_patch_and_delete(store):
+    """Test patch and delete events."""
+    store.write(character_data())
+    store.patch("Test Character", {"current_hp": 1})
+    assert store.read("Test Character").data["current_hp"] == 1
+    assert store.delete("Test Character")
+    assert store.read("Test Character") is None
+    assert store.list_names() == []
+    assert not store.delete("Test Character")
+    assert store.patch("Test Character", {"current_hp": 2}) is None
+
+def test_compaction_writes_snapshot(store):
+    """Test that a snapshot with the undo stack is written after compact_every events."""
+    for hp in (45, 40, 35):
+        store.write(character_data(current_hp=hp))
+    snapshot = json.loads((store.root / "test_character.snapshot.json").read_bytes())
+    assert [data and data["current_hp"] for data in snapshot["undo"]] == [None, 45, 40, 35]
+    assert snapshot["offset"] == (store.root / "test_character.log").stat().st_size
+
+def test_restart_rebuilds_from_snapshot_and_tail(store, tmp_path):
+    """Test that a new store sees the same state as the old one."""
+    for hp in (45, 40, 35, 30, 25):
+        store.write(character_data(current_hp=hp))
+    reopened = EventLogCharacterStore(tmp_path)
+    record = reopened.read("Test Character")
+    assert record.data["current_hp"] == 25
+    assert record.version == store.version("Test Character")
+
+def test_out_of_band_append_is_picked_up(store):
+    """Test that events appended by another process are replayed."""
+    store.write(character_data())
+    with open(store.root / "test_character.log", "ab") as f:
+        f.write(b'{"op":"patch","changes":{"current_hp":3}}\n')
+    assert store.read("Test Character").data["current_hp"] == 3
+
+def test_documents_are_read_from_disk(store):
+    """Test that only versions and log sizes are kept in memory, and reads replay from disk."""
+    for hp in (45, 40, 35, 30):
+        store.write(character_data(current_hp=hp))
+    state = store._states["test_character"]
+    assert not hasattr(state, "document") and state.version == store.version("Test Character")
+    # A snapshot at the end of the log, rewritten behind the store's back, is what the next read sees
+    log_size = (store.root / "test_character.log").stat().st_size
+    (store.root / "test_character.snapshot.json").write_bytes(
+        json.dumps({"format": 2, "offset": log_size, "undo": [character_data(current_hp=7)]}).encode())
+    assert store.read("Test Character").data["current_hp"] == 7
+
+def test_partial_last_line_is_ignored(store, tmp_path):
+    """Test that an incomplete trailing event is not replayed."""
+    store.write(character_data())
+    with open(store.root / "test_character.log", "ab") as f:
+        f.write(b'{"op":"patch","chan')
+    assert EventLogCharacterStore(tmp_path).read("Test Character").data == character_data()
+
+def test_history(store):
+    """Test that history lists every event and the fields it changed."""
+    store.write(character_data())
+    store.write(character_data(current_hp=30, level=6))
+    history = store.history("Test Character")
+    assert [(event["seq"], event["op"]) for event in history] == [(1, "put"), (2, "patch")]
+    assert history[1]["fields"] == ["current_hp", "level"]
+    assert history[0]["at"] is not None
+    assert store.history("Nobody") is None
+
+def test_undo_walks_back(store):
+    """Test that repeated undos restore earlier states, down to deletion."""
+    store.write(character_data())
+    store.write(character_data(current_hp=30))
+    store.write(character_data(current_hp=20))
+    assert store.undo("Test Character").data["current_hp"] == 30
+    assert store.undo("Test Character").data["current_hp"] == 45
+    assert store.undo("Test Character") is None
+    assert store.read("Test Character") is None
+    with pytest.raises(ValueError):
+        store.undo("Test Character")
+    with pytest.raises(LookupError):
+        store.undo("Nobody")
+
+def test_undo_starts_from_the_snapshot(store, tmp_path):
+    """Test that undo walks back past a snapshot without reading the log before it."""
+    for hp in (45, 40, 35, 30):
+        store.write(character_data(current_hp=hp))
+    log = store.root / "test_character.log"
+    snapshot = json.loads((store.root / "test_character.snapshot.json").read_bytes())
+    log.write_bytes(b"\n" * snapshot["offset"] + log.read_bytes()[snapshot["offset"]:])
+    reopened = EventLogCharacterStore(tmp_path, compact_every=3)
+    assert [reopened.undo("Test Character").data["current_hp"] for _ in range(3)] == [35, 40, 45]
+
+def test_undo_depth_is_limited(tmp_path):
+    """Test that at most undo_depth changes can be undone."""
+    store = EventLogCharacterStore(tmp_path, compact_every=2, undo_depth=2)
+    for hp in (45, 40, 35, 30):
+        store.write(character_data(current_hp=hp))
+    assert store.undo("Test Character").data["current_hp"] == 35
+    assert store.undo("Test Character").data["current_hp"] == 40
+    with pytest.raises(ValueError):
+        store.undo("Test Character")
+
+def test_old_snapshots_replay_the_whole_log(store, tmp_path):
+    """Test that a snapshot without an undo stack is ignored in favour of the log."""
+    for hp in (45, 40, 35):
+        store.write(character_data(current_hp=hp))
+    log_size = (store.root / "test_character.log").stat().st_size
+    (store.root / "test_character.snapshot.json").write_text(
+        json.dumps({"offset": log_size, "data": character_data(current_hp=35)}))
+    reopened = EventLogCharacterStore(tmp_path)
+    assert reopened.undo("Test Character").data["current_hp"] == 40
+
+def test_undo_delete(store):
+    """Test that undoing a delete restores the character."""
+    store.write(character_data())
+    store.delete("Test Character")
+    assert store.undo("Test Character").data == character_data()
+    assert store.list_names() == ["Test Character"]
+
+def test_compact_all(store):
+    """Test that compact() snapshots characters with pending events."""
+    store.write(character_data())
+    assert store.compact() == 1
+    assert store.compact() == 0
+
+def test_service_over_event_log(store):
+    """Test that the service caches and invalidates over the event log."""
+    service = CharacterService(store=store)
+    service.store.write(character_data())
+    assert service.load_character("Test Character").current_hp == 45
+    service.patch_character("Test Character", {"current_hp": 9})
+    assert service.load_character("Test Character").current_hp == 9
+    service.undo_character("Test Character")
+    assert service.load_character("Test Character").current_hp == 45
+    assert [event.op for event in service.character_history("Test Character")] == ["put", "patch", "undo"]
+
+def test_keys_are_escaped(store, tmp_path):
+    """Test that names cannot escape the store directory or share a log."""
+    store.write(character_data(name="../x"))
+    store.write(character_data(name="A B"))
+    store.write(character_data(name="a_b"))
+    assert not (tmp_path.parent / "x.log").exists()
+    assert store.read("../x").data["name"] == "../x"
+    assert store.read("A B").data["name"] == "A B" and store.read("a_b").data["name"] == "a_b"
+
+def test_logs_under_old_keys_are_renamed(tmp_path):
+    """Test that logs named with the original lowercase/underscore keys move to their escaped key."""
+    event = {"op": "put", "data": character_data(name="O'Brien")}
+    (tmp_path / "o'brien.log").write_text(json.dumps(event) + "\n")
+    store = EventLogCharacterStore(tmp_path)
+    assert store.read("O'Brien").data["name"] == "O'Brien"
+    assert (tmp_path / "o%27brien.log").exists() and not (tmp_path / "o'brien.log").exists()
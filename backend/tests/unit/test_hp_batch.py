@@ -0,0 +1,95 @@
+"""Unit tests for batch HP updates on every storage backend."""
+import pytest
+from app.schemas.hp_batch import HpChange
+from app.services.character_service import CharacterService
+from app.services.hp_batch import apply_hp_changes
+from app.storage.event_log_store import EventLogCharacterStore
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+
+def character_data(index):
+    """Build a stored character document."""
+    return {
+        "name": f"Combatant {index}",
+        "race": "Goblin",
+        "character_class": "Fighter",
+        "level": 1,
+        "ability_scores": {
+            "strength": 10, "dexterity": 10, "constitution": 10,
+            "intelligence": 10, "wisdom": 10, "charisma": 10
+        },
+        "max_hp": 20,
+        "current_hp": 15,
+        "inventory": []
+    }
+
+@pytest.fixture(params=["json", "sqlite", "eventlog"])
+def service(request, tmp_path):
+    """Fixture providing a service over each backend with 300 combatants."""
+    if request.param == "json":
+        store = JsonCharacterStore(tmp_path)
+    elif request.param == "eventlog":
+        store = EventLogCharacterStore(tmp_path)
+    else:
+        store = SqliteCharacterStore(tmp_path / "characters.db")
+    store.write_many([character_data(i) for i in range(300)])
+    service = CharacterService(store=store)
+    yield service
+    service.close()
+
+def test_damage_and_heal_are_clamped(service):
+    """Test that damage stops at 0 and healing at max_hp."""
+    report = apply_hp_changes(service, [
+        HpChange(name="Combatant 0", delta=-7),
+        HpChange(name="Combatant 1", delta=-40),
+        HpChange(name="Combatant 2", delta=100),
+    ])
+    assert report.updated == 3
+    assert [(r.previous_hp, r.current_hp) for r in report.results] == [(15, 8), (15, 0), (15, 20)]
+    assert service.load_character("Combatant 1").current_hp == 0
+    assert service.load_character("Combatant 2").current_hp == 20
+
+def test_area_effect_on_hundreds_of_targets(service):
+    """Test that one batch updates every target in a large encounter."""
+    report = apply_hp_changes(service, [HpChange(name=f"Combatant {i}", delta=-4) for i in range(300)])
+    assert report.updated == 300
+    assert all(service.load_character(f"Combatant {i}").current_hp == 11 for i in range(0, 300, 37))
+
+def test_repeated_target_applied_in_order(service):
+    """Test that several changes to one character accumulate in order."""
+    report = apply_hp_changes(service, [
+        HpChange(name="Combatant 5", delta=-20),
+        HpChange(name="combatant 5", delta=6),
+    ])
+    assert [(r.previous_hp, r.current_hp) for r in report.results] == [(15, 0), (0, 6)]
+    assert service.load_character("Combatant 5").current_hp == 6
+
+def test_missing_target_is_reported(service):
+    """Test that unknown characters are reported without failing the batch."""
+    report = apply_hp_changes(service, [
+        HpChange(name="Nobody", delta=-1),
+        HpChange(name="Combatant 3", delta=-1),
+    ])
+    assert [r.status for r in report.results] == ["not_found", "updated"]
+    assert (report.updated, report.not_found) == (1, 1)
+
+def test_only_current_hp_changes(service):
+    """Test that the rest of the character is left as stored."""
+    before = service.store.read("Combatant 9").data
+    apply_hp_changes(service, [HpChange(name="Combatant 9", delta=-1)])
+    after = service.store.read("Combatant 9").data
+    assert {**before, "current_hp": 14} == after
+
+def test_invalid_stored_hit_points(service):
+    """Test that a stored character without usable HP is reported as invalid."""
+    service.store.write({**character_data(400), "current_hp": "lots"})
+    report = apply_hp_changes(service, [HpChange(name="Combatant 400", delta=-1)])
+    assert report.results[0].status == "invalid"
+
+def test_failed_write_is_reported(service, monkeypatch):
+    """Test that a failing write batch marks every change as an error."""
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(service.store, "patch_many", fail)
+    report = apply_hp_changes(service, [HpChange(name="Combatant 1", delta=-1)])
+    assert report.errors == 1 and report.results[0].status == "error"
@@ -0,0 +1,227 @@
+"""Unit tests for the sharded JSON store layout, its migration from the flat layout, index snapshots and file encodings."""
+import json
+import os
+import time
+import pytest
+from app.models.character import AbilityScores, Character
+from app.storage import encoding, json_store
+from app.storage.base import MAX_KEY_LENGTH, encode_key
+from app.storage.json_store import JsonCharacterStore, shard_path
+from app.storage.migrate import migrate_json_to_sqlite
+
+def make_character(name: str, level: int = 1) -> Character:
+    return Character(
+        name=name,
+        race="Human",
+        character_class="Fighter",
+        level=level,
+        ability_scores=AbilityScores(strength=10, dexterity=10, constitution=10,
+                                     intelligence=10, wisdom=10, charisma=10),
+        max_hp=10,
+        current_hp=10,
+    )
+
+def write_flat(root, file_stem, character: Character):
+    """Write a character file the way the flat layout did."""
+    (root / f"{file_stem}.json").write_text(json.dumps(character.model_dump(), indent=4))
+
+@pytest.mark.parametrize("name, key", [
+    ("Gandalf the Grey", "gandalf_the_grey"),
+    ("a_b", "a%5fb"),
+    ("../etc/passwd", "%2e%2e%2fetc%2fpasswd"),
+    ("Éowyn", "%c3%a9owyn"),
+])
+def test_encode_key(name, key):
+    """Test that keys are lowercase, filesystem-safe and keep plain names unchanged."""
+    assert encode_key(name) == key
+
+def test_encode_key_is_collision_free():
+    """Test that names the flat layout merged get distinct keys, while case still folds."""
+    assert encode_key("A B") != encode_key("a_b")
+    assert encode_key("Hero") == encode_key("HERO")
+    long_names = ["x" * 300 + "a", "x" * 300 + "b"]
+    keys = [encode_key(name) for name in long_names]
+    assert keys[0] != keys[1] and all(len(key) <= MAX_KEY_LENGTH for key in keys)
+
+def test_files_are_sharded(tmp_path):
+    """Test that characters are stored two hash-prefix directories deep."""
+    store = JsonCharacterStore(tmp_path)
+    store.write(make_character("A B").model_dump())
+    store.write(make_character("a_b", level=2).model_dump())
+    path = store.path_for("A B")
+    assert path == shard_path(tmp_path, "a_b") and path.exists()
+    assert len(path.relative_to(tmp_path).parts) == 3
+    assert store.read("A B").data["level"] == 1 and store.read("a_b").data["level"] == 2
+    assert sorted(store.list_names()) == ["A B", "a_b"]
+
+def test_flat_files_are_served_and_migrated_on_read(tmp_path):
+    """Test that a flat-layout file is listed, then moved into its shard when read."""
+    write_flat(tmp_path, "old_hero", make_character("Old Hero"))
+    store = JsonCharacterStore(tmp_path)
+    assert store.list_names() == ["Old Hero"]
+    version = store.version("Old Hero")
+    assert version is not None
+    assert not (tmp_path / "old_hero.json").exists() and store.path_for("Old Hero").exists()
+    assert store.read("Old Hero").version == version
+
+def test_flat_file_dropped_in_while_running(tmp_path):
+    """Test that a flat file added out of band is found and migrated."""
+    store = JsonCharacterStore(tmp_path)
+    assert store.read("Late Arrival") is None
+    write_flat(tmp_path, "late_arrival", make_character("Late Arrival"))
+    assert store.read("Late Arrival").data["name"] == "Late Arrival"
+    assert store.path_for("Late Arrival").exists()
+
+def test_migrate_layout(tmp_path):
+    """Test moving every flat file, dropping flat copies superseded by a sharded file."""
+    write_flat(tmp_path, "alpha", make_character("Alpha"))
+    write_flat(tmp_path, "beta", make_character("Beta"))
+    store = JsonCharacterStore(tmp_path)
+    store.write(make_character("Beta", level=9).model_dump())
+    write_flat(tmp_path, "beta", make_character("Beta"))
+    store.rebuild_index()
+    assert store.migrate_layout() == {"moved": 1, "removed_stale": 1}
+    assert list(tmp_path.glob("*.json")) == []
+    assert store.read("Beta").data["level"] == 9
+    assert sorted(store.list_names()) == ["Alpha", "Beta"]
+    assert store.migrate_layout() == {"moved": 0, "removed_stale": 0}
+
+def test_write_and_delete_replace_flat_files(tmp_path):
+    """Test that writes and deletes also clear the character's flat-layout copy."""
+    write_flat(tmp_path, "alpha", make_character("Alpha"))
+    write_flat(tmp_path, "beta", make_character("Beta"))
+    store = JsonCharacterStore(tmp_path)
+    store.write(make_character("Alpha", level=3).model_dump())
+    assert not (tmp_path / "alpha.json").exists()
+    assert store.delete("Beta")
+    assert not (tmp_path / "beta.json").exists() and store.read("Beta") is None
+    assert store.list_names() == ["Alpha"]
+
+def test_background_migration(tmp_path):
+    """Test that the background migration empties the flat layout."""
+    for i in range(20):
+        write_flat(tmp_path, f"hero_{i}", make_character(f"Hero {i}"))
+    store = JsonCharacterStore(tmp_path, migrate_in_background=True)
+    deadline = time.monotonic() + 10
+    while list(tmp_path.glob("*.json")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(tmp_path.glob("*.json")) == []
+    assert len(store.list_names()) == 20
+
+def test_migrate_to_sqlite_reads_sharded_files(tmp_path):
+    """Test that the SQLite migration finds files in both layouts."""
+    store = JsonCharacterStore(tmp_path / "characters")
+    store.root.mkdir()
+    store.write(make_character("Sharded").model_dump())
+    write_flat(store.root, "flat", make_character("Flat"))
+    assert migrate_json_to_sqlite(store.root, tmp_path / "c.db") == {"migrated": 2, "skipped": 0}
+
+def snapshot_store(root, monkeypatch, trust_directories=True):
+    """Open a snapshot-enabled store, counting the files it reads while indexing."""
+    if trust_directories:
+        # Files written a moment ago are otherwise within the racy window and re-checked
+        monkeypatch.setattr(json_store, "RACY_WINDOW_NS", 0)
+    reads = []
+    index_file = JsonCharacterStore._index_file
+    monkeypatch.setattr(JsonCharacterStore, "_index_file",
+                        lambda self, file_path: reads.append(os.path.basename(file_path)) or index_file(self, file_path))
+    return JsonCharacterStore(root, snapshot=True), reads
+
+def test_snapshot_skips_reading_unchanged_files(tmp_path, monkeypatch):
+    """Test that a store started from a snapshot reads no files and serves the same index."""
+    store = JsonCharacterStore(tmp_path, snapshot=True)
+    for i in range(20):
+        store.write(make_character(f"Hero {i}", level=i % 5 + 1).model_dump())
+    store.close()
+    assert (tmp_path / json_store.SNAPSHOT_NAME).exists()
+    loaded, reads = snapshot_store(tmp_path, monkeypatch)
+    assert reads == []
+    assert sorted(loaded.list_names()) == sorted(store.list_names())
+    assert loaded.query_summaries({"level": 3})[0] == store.query_summaries({"level": 3})[0]
+    assert loaded.version("Hero 4") == store.version("Hero 4")
+
+def test_snapshot_rereads_only_changed_files(tmp_path, monkeypatch):
+    """Test that files written, added or removed after the snapshot are picked up."""
+    store = JsonCharacterStore(tmp_path, snapshot=True)
+    for i in range(10):
+        store.write(make_character(f"Hero {i}").model_dump())
+    store.save_snapshot()
+    other = JsonCharacterStore(tmp_path)
+    other.write(make_character("Hero 3", level=9).model_dump())
+    other.write(make_character("Newcomer").model_dump())
+    other.delete("Hero 5")
+    write_flat(tmp_path, "flat", make_character("Flat"))
+    loaded, reads = snapshot_store(tmp_path, monkeypatch)
+    assert set(reads) == {"hero_3.json", "newcomer.json", "flat.json"}
+    assert sorted(loaded.list_names()) == sorted(other.list_names())
+    assert "Flat" in loaded.list_names() and "Hero 5" not in loaded.list_names()
+    assert loaded.query_summaries({"level": 9})[0][0]["name"] == "Hero 3"
+
+def test_snapshot_racy_directories_are_stat_checked(tmp_path, monkeypatch):
+    """Test that recently modified directories are rescanned, re-reading only changed files."""
+    store = JsonCharacterStore(tmp_path, snapshot=True)
+    store.write(make_character("Aria").model_dump())
+    store.save_snapshot()
+    store.path_for("Aria").write_text(json.dumps(make_character("Aria", level=7).model_dump()))
+    loaded, reads = snapshot_store(tmp_path, monkeypatch, trust_directories=False)
+    assert reads == ["aria.json"]
+    assert loaded.query_summaries({})[0][0]["level"] == 7
+
+def test_unusable_snapshot_falls_back_to_scan(tmp_path):
+    """Test that a corrupt snapshot is ignored in favour of a full scan."""
+    store = JsonCharacterStore(tmp_path, snapshot=True)
+    store.write(make_character("Aria").model_dump())
+    (tmp_path / json_store.SNAPSHOT_NAME).write_text("{not json")
+    assert JsonCharacterStore(tmp_path, snapshot=True).list_names() == ["Aria"]
+
+def test_checkpoint_only_saves_changes(tmp_path):
+    """Test that checkpoint rewrites the snapshot only after the index changed."""
+    store = JsonCharacterStore(tmp_path, snapshot=True)
+    store.write(make_character("Aria").model_dump())
+    store.checkpoint()
+    snapshot = tmp_path / json_store.SNAPSHOT_NAME
+    snapshot.unlink()
+    store.read("Aria")
+    store.checkpoint()
+    assert not snapshot.exists()
+    store.write(make_character("Aria", level=2).model_dump())
+    store.checkpoint()
+    assert snapshot.exists()
+
+def test_snapshot_saved_periodically(tmp_path):
+    """Test that the snapshot thread saves a changed index without being asked."""
+    store = JsonCharacterStore(tmp_path, snapshot=True, snapshot_interval=0.01)
+    store.write(make_character("Aria").model_dump())
+    deadline = time.monotonic() + 10
+    while not (tmp_path / json_store.SNAPSHOT_NAME).exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    store.close()
+    assert (tmp_path / json_store.SNAPSHOT_NAME).exists()
+
+def test_compact_encoding_reads_existing_files(tmp_path):
+    """Test that a compact store reads indented files and writes smaller, still trusted ones."""
+    JsonCharacterStore(tmp_path).write(make_character("Old").model_dump())
+    indented_size = shard_path(tmp_path, "old").stat().st_size
+    store = JsonCharacterStore(tmp_path, encoding="compact")
+    assert store.read("Old").trusted and store.read("Old").data["name"] == "Old"
+    version = store.write(make_character("Old").model_dump())
+    document = shard_path(tmp_path, "old").read_bytes()
+    assert b"\n" not in document and len(document) < indented_size
+    record = store.read("Old")
+    assert record.trusted and record.version == version == store.version_for(record.data)
+    assert JsonCharacterStore(tmp_path).read("Old").trusted
+
+def test_msgpack_encoding(tmp_path):
+    """Test that msgpack files are written, stamped and read back by any store."""
+    pytest.importorskip("msgpack")
+    store = JsonCharacterStore(tmp_path, encoding="msgpack")
+    store.write(make_character("Packed", level=3).model_dump())
+    assert shard_path(tmp_path, "packed").read_bytes()[:1] != b"{"
+    record = JsonCharacterStore(tmp_path).read("Packed")
+    assert record.trusted and record.data == make_character("Packed", level=3).model_dump()
+
+def test_msgpack_encoding_needs_the_package(tmp_path, monkeypatch):
+    """Test that choosing msgpack without the package fails when the store is created."""
+    monkeypatch.setattr(encoding, "msgpack", None)
+    with pytest.raises(RuntimeError):
+        JsonCharacterStore(tmp_path, encoding="msgpack")
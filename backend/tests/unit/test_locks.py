@@ -0,0 +1,162 @@
+"""Unit tests for striped key locks and atomic character writes."""
+import asyncio
+import threading
+import time
+import pytest
+from app.models.character import AbilityScores, Character
+from app.services.async_character_service import AsyncCharacterService
+from app.services.character_service import CharacterService
+from app.locks import KeyLocks
+from app.storage import json_store
+
+def make_character(name: str, current_hp: int = 0) -> Character:
+    return Character(
+        name=name,
+        race="Human",
+        character_class="Fighter",
+        level=1,
+        ability_scores=AbilityScores(strength=10, dexterity=10, constitution=10,
+                                     intelligence=10, wisdom=10, charisma=10),
+        max_hp=100,
+        current_hp=current_hp,
+    )
+
+def two_keys_on_different_stripes(locks: KeyLocks):
+    first = "key-0"
+    for i in range(1, 100):
+        if locks._indexes([first]) != locks._indexes([f"key-{i}"]):
+            return first, f"key-{i}"
+
+@pytest.fixture
+def service(tmp_path):
+    """Fixture providing a character service on a temporary JSON store."""
+    service = CharacterService(save_dir=tmp_path / "characters")
+    yield service
+    service.close()
+
+def test_same_key_waits():
+    """Test that a second holder of a key waits for the first to release it."""
+    locks = KeyLocks(4)
+    order = []
+
+    def hold_after():
+        with locks.hold("aria"):
+            order.append("waiter")
+
+    with locks.hold("aria"):
+        waiter = threading.Thread(target=hold_after)
+        waiter.start()
+        time.sleep(0.05)
+        order.append("holder")
+    waiter.join(5)
+    assert order == ["holder", "waiter"]
+
+def test_different_stripes_run_in_parallel():
+    """Test that keys on different stripes do not wait for each other."""
+    locks = KeyLocks(8)
+    first, second = two_keys_on_different_stripes(locks)
+    acquired = threading.Event()
+
+    def hold_second():
+        with locks.hold(second):
+            acquired.set()
+
+    with locks.hold(first):
+        threading.Thread(target=hold_second).start()
+        assert acquired.wait(5)
+
+def test_hold_is_reentrant():
+    """Test that a context holding a stripe can lock it again, alone or in a batch."""
+    locks = KeyLocks(1)
+    with locks.hold("aria"):
+        with locks.hold("aria", "brom"):
+            pass
+
+def test_stripes_must_be_positive():
+    """Test that a lock table needs at least one stripe."""
+    with pytest.raises(ValueError):
+        KeyLocks(0)
+
+def test_hold_async_waits_for_thread_without_blocking_loop():
+    """Test that a coroutine awaits a stripe held by a thread while the loop keeps running."""
+    locks = KeyLocks(1)
+    held, release = threading.Event(), threading.Event()
+
+    def hold_in_thread():
+        with locks.hold("aria"):
+            held.set()
+            release.wait(5)
+
+    async def scenario():
+        thread = threading.Thread(target=hold_in_thread)
+        thread.start()
+        held.wait(5)
+        waiter = asyncio.ensure_future(locks.hold_async("aria").__aenter__())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        release.set()
+        await asyncio.wait_for(waiter, 5)
+        thread.join(5)
+
+    asyncio.run(scenario())
+
+def test_cancelled_waiter_passes_on_its_turn():
+    """Test that cancelling a waiting coroutine does not strand the ones behind it."""
+    locks = KeyLocks(1)
+
+    async def scenario():
+        async with locks.hold_async("aria"):
+            first = asyncio.ensure_future(locks.hold_async("aria").__aenter__())
+            second = asyncio.ensure_future(locks.hold_async("aria").__aenter__())
+            await asyncio.sleep(0.01)
+            first.cancel()
+        await asyncio.wait_for(second, 5)
+
+    asyncio.run(scenario())
+
+def test_concurrent_read_modify_writes_are_serialized(service):
+    """Test that increments made under the character's lock are never lost."""
+    service.save_character(make_character("Aria"))
+
+    def increment():
+        for _ in range(10):
+            with service.locked("Aria"):
+                character = service.load_character("Aria")
+                service.save_character(character.model_copy(update={"current_hp": character.current_hp + 1}))
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert service.load_character("Aria").current_hp == 40
+
+def test_async_writes_to_one_character_queue_on_the_loop(service):
+    """Test that concurrent async saves of one character all complete, one at a time."""
+    async_service = AsyncCharacterService(service, max_workers=2)
+
+    async def scenario():
+        results = await asyncio.gather(*(
+            async_service.save_character(make_character("Aria", hp)) for hp in range(10)
+        ))
+        return results
+
+    try:
+        assert all(asyncio.run(scenario()))
+    finally:
+        async_service.shutdown()
+    assert service.load_character("Aria").current_hp == 9
+
+def test_failed_write_keeps_previous_file(service, monkeypatch):
+    """Test that a write interrupted before the rename leaves the old file whole and no temp file."""
+    service.save_character(make_character("Aria", 5))
+    path = service.store.path_for("Aria")
+
+    def crash(*args):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(json_store.os, "replace", crash)
+    assert not service.save_character(make_character("Aria", 6))
+    monkeypatch.undo()
+    assert service.load_character("Aria").current_hp == 5
+    assert list(path.parent.iterdir()) == [path]
@@ -0,0 +1,64 @@
+"""Unit tests for the metrics registry and the /metrics endpoint."""
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.metrics import OPERATION_SECONDS, MetricsRegistry
+
+client = TestClient(app)
+
+def test_histogram_buckets_are_cumulative():
+    """Test that rendered bucket counts are cumulative and include +Inf, sum and count."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("op_seconds", "Operation time", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "read")
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP op_seconds Operation time", "# TYPE op_seconds histogram"]
+    assert 'op_seconds_bucket{op="read",le="0.1"} 1' in lines
+    assert 'op_seconds_bucket{op="read",le="1"} 3' in lines
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in lines
+    assert 'op_seconds_sum{op="read"} 6.05' in lines
+    assert 'op_seconds_count{op="read"} 4' in lines
+
+def test_counters_gauges_and_timers():
+    """Test counters, gauges, label escaping and the timing context manager."""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("path",))
+    counter.inc('/a"b')
+    counter.inc('/a"b', amount=2)
+    gauge = registry.gauge("in_flight", "In flight")
+    gauge.inc()
+    gauge.dec()
+    gauge.set(7)
+    with registry.histogram("work_seconds", "Work").time():
+        pass
+    text = registry.render()
+    assert 'requests_total{path="/a\\"b"} 3' in text
+    assert "in_flight 7" in text
+    assert "work_seconds_count 1" in text
+
+def test_register_is_idempotent():
+    """Test that registering a metric twice returns it, and conflicting definitions fail."""
+    registry = MetricsRegistry()
+    counter = registry.counter("things_total", "Things")
+    assert registry.counter("things_total", "Things") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("things_total", "Things")
+    with pytest.raises(ValueError):
+        counter.inc("unexpected")
+        registry.render()
+
+def test_metrics_endpoint():
+    """Test that requests, storage operations and cache counters are exported."""
+    reads = OPERATION_SECONDS.count("list")
+    client.get("/characters/")
+    client.get("/characters/nobody-here")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'dnd_http_requests_total{method="GET",route="/characters/{character_name}",status="404"}' in text
+    assert 'dnd_http_request_duration_seconds_count{method="GET",route="/characters/"}' in text
+    assert "dnd_http_requests_in_flight 1" in text
+    assert "dnd_character_cache_hit_ratio" in text
+    assert OPERATION_SECONDS.count("list") == reads + 1
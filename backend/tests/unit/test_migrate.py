@@ -0,0 +1,48 @@
+"""Unit tests for the JSON to SQLite migration tool."""
+import json
+import sys
+from app.models.character import Character, AbilityScores
+from app.storage import migrate
+from app.storage.sqlite_store import SqliteCharacterStore
+
+def make_character(name):
+    """Build a minimal valid character."""
+    return Character(
+        name=name,
+        race="Human",
+        character_class="Fighter",
+        level=1,
+        ability_scores=AbilityScores(
+            strength=10,
+            dexterity=12,
+            constitution=14,
+            intelligence=16,
+            wisdom=14,
+            charisma=12
+        ),
+        max_hp=10,
+        current_hp=10
+    )
+
+def test_migrate_copies_characters(tmp_path):
+    """Test that every valid file is copied and invalid ones are skipped."""
+    source = tmp_path / "characters"
+    source.mkdir()
+    for name in ("Alpha", "Beta", "Gamma"):
+        (source / f"{name.lower()}.json").write_text(make_character(name).model_dump_json())
+    (source / "broken.json").write_text(json.dumps({"name": "Broken"}))
+
+    result = migrate.migrate_json_to_sqlite(source, tmp_path / "characters.db", batch_size=2)
+
+    store = SqliteCharacterStore(tmp_path / "characters.db")
+    assert result == {"migrated": 3, "skipped": 1} and sorted(store.list_names()) == ["Alpha", "Beta", "Gamma"]
+    store.close()
+
+def test_migrate_cli(tmp_path, monkeypatch, capsys):
+    """Test the command line entry point."""
+    source = tmp_path / "characters"
+    source.mkdir()
+    (source / "alpha.json").write_text(make_character("Alpha").model_dump_json())
+    monkeypatch.setattr(sys, "argv", ["migrate", "--source", str(source), "--target", str(tmp_path / "out.db")])
+    migrate.main()
+    assert "Migrated 1 characters" in capsys.readouterr().out
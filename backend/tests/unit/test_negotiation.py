@@ -0,0 +1,100 @@
+"""Unit tests for Accept/Accept-Encoding negotiation of API responses."""
+import threading
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.api import negotiation
+from app.api.negotiation import NegotiationMiddleware, choose_encoding, parse_header, wants_msgpack
+
+BIG = {"items": [{"name": f"Item {i}", "quantity": i} for i in range(200)]}
+
+def make_client(compress: bool = True, offload_size: int = negotiation.OFFLOAD_SIZE) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(NegotiationMiddleware, compress=compress, minimum_size=100, offload_size=offload_size)
+
+    @app.get("/big")
+    async def big():
+        return JSONResponse(BIG, headers={"ETag": '"v1"', "X-Thread": str(threading.get_ident())})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b'{"a":1}\n'] * 100), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+def test_parse_header():
+    """Test that values are lowercased and quality values parsed, defaulting to 1."""
+    assert parse_header("Application/JSON, application/msgpack;q=0.5, */*;q=oops") == [
+        ("application/json", 1.0), ("application/msgpack", 0.5), ("*/*", 0.0)]
+
+@pytest.mark.parametrize("header, coding", [
+    (None, None),
+    ("gzip, deflate", "gzip"),
+    ("identity", None),
+    ("*", "gzip"),
+    ("gzip;q=0, *;q=1", None),
+])
+def test_choose_encoding(header, coding, monkeypatch):
+    """Test that gzip is chosen when accepted, and only then (without brotli)."""
+    monkeypatch.setattr(negotiation, "brotli", None)
+    assert choose_encoding(header) == coding
+
+def test_wants_msgpack_needs_a_preference_and_the_package(monkeypatch):
+    """Test that MessagePack is used only when preferred over JSON and installed."""
+    monkeypatch.setattr(negotiation, "msgpack", object())
+    assert wants_msgpack("application/msgpack")
+    assert wants_msgpack("application/x-msgpack, application/json;q=0.9")
+    assert not wants_msgpack("application/json, application/msgpack")
+    assert not wants_msgpack("*/*")
+    monkeypatch.setattr(negotiation, "msgpack", None)
+    assert not wants_msgpack("application/msgpack")
+
+def test_large_json_responses_are_gzipped():
+    """Test that bodies over the minimum size are compressed, with a weakened ETag."""
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == BIG
+
+def test_small_and_unrequested_responses_are_untouched():
+    """Test that small bodies, clients without gzip and disabled compression get plain JSON."""
+    client = make_client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    plain = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == '"v1"'
+    disabled = make_client(compress=False).get("/big", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in disabled.headers
+
+def test_streamed_responses_pass_through():
+    """Test that streamed bodies are neither buffered nor compressed."""
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers and "vary" not in response.headers
+    assert response.content == b'{"a":1}\n' * 100
+
+@pytest.mark.parametrize("offload_size, offloaded", [(1000, True), (10 ** 6, False)])
+def test_large_bodies_are_converted_off_the_event_loop(offload_size, offloaded, monkeypatch):
+    """Test that only bodies of at least offload_size bytes are converted on a worker thread."""
+    threads = []
+    convert = NegotiationMiddleware._convert
+    def recording_convert(self, *args):
+        threads.append(threading.get_ident())
+        return convert(self, *args)
+    monkeypatch.setattr(NegotiationMiddleware, "_convert", recording_convert)
+    response = make_client(offload_size=offload_size).get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip" and response.json() == BIG
+    assert (threads != [int(response.headers["x-thread"])]) is offloaded
+
+def test_msgpack_responses():
+    """Test that JSON bodies are re-encoded for clients preferring MessagePack."""
+    msgpack = pytest.importorskip("msgpack")
+    response = make_client().get("/big", headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert msgpack.unpackb(response.content) == BIG
@@ -0,0 +1,95 @@
+"""Unit tests for on-demand request profiling."""
+import cProfile
+import threading
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import characters, profiling
+from app.schemas.profiling import RequestProfile
+from app.services import profiling as profiling_service
+from app.services.profiling import ProfileBuffer, ProfileSession, activate, deactivate, profiled
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    """A client for an app with profiling enabled and an empty buffer."""
+    buffer = ProfileBuffer(max_size=3)
+    monkeypatch.setattr(profiling, "profile_buffer", buffer)
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware)
+    app.include_router(characters.router)
+    app.include_router(profiling.router)
+    return TestClient(app)
+
+def _profile(profile_id: str) -> RequestProfile:
+    return RequestProfile(id=profile_id, method="GET", path="/", status=200, reason="header",
+                          started_at="2024-01-01T00:00:00+00:00", duration_ms=1.0, total_calls=0, functions=[])
+
+def test_session_merges_threads():
+    """Test that calls bound with profiled() are captured from another thread."""
+    session = ProfileSession()
+    token = activate(session)
+    try:
+        work = profiled(sorted)
+    finally:
+        deactivate(token)
+    thread = threading.Thread(target=work, args=([3, 1, 2],))
+    thread.start()
+    thread.join()
+    total_calls, functions = session.functions()
+    assert total_calls >= 1
+    assert any("sorted" in function.function for function in functions)
+    assert profiled(sorted) is sorted
+
+def test_session_counts_skipped_profilers(monkeypatch):
+    """Test that a profiler that cannot be enabled is counted, not silently dropped."""
+    class ActiveProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    session = ProfileSession()
+    monkeypatch.setattr(profiling_service.cProfile, "Profile", ActiveProfile)
+    assert session.run(sorted, [3, 1, 2]) == [1, 2, 3]
+    assert session.skipped == 1 and session.functions()[1] == []
+
+def test_ring_buffer_keeps_newest():
+    """Test that the buffer drops the oldest profiles once full."""
+    buffer = ProfileBuffer(max_size=2)
+    for profile_id in ("a", "b", "c"):
+        buffer.add(_profile(profile_id))
+    assert [profile.id for profile in buffer.list()] == ["c", "b"]
+    assert buffer.get("a") is None and buffer.get("c").id == "c"
+
+def test_unprofiled_requests_are_not_recorded(profiled_client):
+    """Test that requests without the header are not profiled."""
+    response = profiled_client.get("/characters/")
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert profiled_client.get("/admin/profiles").json() == []
+
+def test_profile_request_with_header(profiled_client):
+    """Test profiling a request on demand and reading it back."""
+    response = profiled_client.get("/characters/", headers={"X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+    listed = profiled_client.get("/admin/profiles").json()
+    assert [profile["id"] for profile in listed] == [profile_id]
+    assert listed[0]["path"] == "/characters/" and "functions" not in listed[0]
+
+    profile = profiled_client.get(f"/admin/profiles/{profile_id}", params={"limit": 200}).json()
+    assert len(profile["functions"]) > 1
+    assert any("list_characters" in function["function"] for function in profile["functions"])
+    cumulative = [function["cumulative_time"] for function in profile["functions"]]
+    assert cumulative == sorted(cumulative, reverse=True)
+    assert len(profiled_client.get(f"/admin/profiles/{profile_id}", params={"limit": 3}).json()["functions"]) == 3
+
+    assert profiled_client.get("/admin/profiles/missing").status_code == 404
+    assert profiled_client.delete("/admin/profiles").status_code == 204
+    assert profiled_client.get("/admin/profiles").json() == []
+
+def test_sampling(monkeypatch):
+    """Test that a sample rate of 1 profiles every request."""
+    buffer = ProfileBuffer()
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware, buffer=buffer, sample_rate=1.0)
+    app.include_router(characters.router)
+    TestClient(app).get("/characters/")
+    assert [profile.reason for profile in buffer.list()] == ["sampled"]
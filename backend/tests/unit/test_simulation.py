@@ -0,0 +1,96 @@
+"""Unit tests for the encounter simulator."""
+import asyncio
+from dataclasses import replace
+import pytest
+from app.models.character import AbilityScores, Character
+from app.schemas.simulation import MonsterSpec
+from app.services import simulation
+from app.services.simulation import (
+    ENEMIES,
+    PARTY,
+    EncounterSimulator,
+    combatant_from_character,
+    combatants_from_monster,
+)
+
+@pytest.fixture
+def fighter():
+    """Fixture providing a level 5 fighter."""
+    return Character(
+        name="Fighter",
+        race="Human",
+        character_class="Fighter",
+        level=5,
+        ability_scores=AbilityScores(
+            strength=16, dexterity=12, constitution=14,
+            intelligence=10, wisdom=10, charisma=10
+        ),
+        max_hp=44,
+        current_hp=44
+    )
+
+def goblins(count=3):
+    """Build a goblin pack."""
+    return combatants_from_monster(MonsterSpec(
+        name="Goblin", max_hp=7, armor_class=15, attack_bonus=4, damage="1d6+2", count=count
+    ))
+
+def test_combatant_from_character(fighter):
+    """Test that combat stats are derived from abilities, class and level."""
+    combatant = combatant_from_character(fighter, PARTY)
+    assert combatant.attack_bonus == 3 + 3
+    assert combatant.damage == "1d10+3"
+    assert combatant.attacks == 2
+    assert combatant.armor_class == 11
+    assert combatant.start_hp == 44
+
+def test_monsters_expand_by_count():
+    """Test that a monster spec becomes numbered enemies."""
+    pack = goblins(3)
+    assert [c.name for c in pack] == ["Goblin 1", "Goblin 2", "Goblin 3"]
+    assert all(c.side == ENEMIES for c in pack)
+
+def test_invalid_monster_damage():
+    """Test that a monster with a bad damage expression is rejected."""
+    with pytest.raises(ValueError):
+        combatants_from_monster(MonsterSpec(name="Ooze", max_hp=5, armor_class=8, attack_bonus=0, damage="xd"))
+    with pytest.raises(ValueError):
+        combatants_from_monster(MonsterSpec(name="Ooze", max_hp=5, armor_class=8, attack_bonus=0, damage="20d6+21d6"))
+
+def test_results_are_consistent(fighter):
+    """Test that win, loss and draw rates add up and HP stays in range."""
+    combatants = [combatant_from_character(fighter, PARTY)] + goblins()
+    result = asyncio.run(EncounterSimulator(0).simulate(combatants, 5_000, seed=3))
+    assert result.party_win_rate + result.enemy_win_rate + result.draw_rate == pytest.approx(1)
+    assert result.party_win_rate > 0.5
+    outcome = result.combatants[0]
+    assert 0 <= outcome.hp_percentiles["p5"] <= outcome.hp_percentiles["p95"] <= 44
+    assert 0 <= outcome.survival_rate <= 1
+
+def test_seed_is_deterministic_across_chunking(fighter, monkeypatch):
+    """Test that a seed reproduces results, and a random seed is reported."""
+    combatants = [combatant_from_character(fighter, PARTY)] + goblins()
+    monkeypatch.setattr(simulation, "CHUNK_TRIALS", 1_000)
+    first = asyncio.run(EncounterSimulator(0).simulate(combatants, 4_500, seed=11))
+    second = asyncio.run(EncounterSimulator(0).simulate(combatants, 4_500, seed=11))
+    assert first == second
+    unseeded = asyncio.run(EncounterSimulator(0).simulate(combatants, 100))
+    assert unseeded == asyncio.run(EncounterSimulator(0).simulate(combatants, 100, seed=unseeded.seed))
+
+def test_max_rounds_gives_draws():
+    """Test that fights nobody can win end as draws."""
+    wall = combatants_from_monster(MonsterSpec(name="Wall", max_hp=1000, armor_class=30, attack_bonus=-5, damage="1"))
+    party = [replace(c, name="Other wall", side=PARTY) for c in wall]
+    result = asyncio.run(EncounterSimulator(0).simulate(party + wall, 100, max_rounds=3, seed=1))
+    assert result.draw_rate > 0.9
+    assert result.mean_rounds == pytest.approx(3, abs=0.2)
+
+def test_process_pool_matches_threads(fighter):
+    """Test that worker processes give the same result as in-process runs."""
+    combatants = [combatant_from_character(fighter, PARTY)] + goblins()
+    simulator = EncounterSimulator(max_workers=1)
+    try:
+        pooled = asyncio.run(simulator.simulate(combatants, 500, seed=5))
+    finally:
+        simulator.shutdown()
+    assert pooled == asyncio.run(EncounterSimulator(0).simulate(combatants, 500, seed=5))
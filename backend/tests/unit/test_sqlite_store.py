@@ -0,0 +1,169 @@
+"""Unit tests for the SQLite storage backend."""
+import sqlite3
+import pytest
+from app.models.character import Character, AbilityScores
+from app.services.character_service import CharacterService
+from app.storage.sqlite_store import SqliteCharacterStore
+
+@pytest.fixture
+def test_character():
+    """Fixture providing a test character."""
+    return Character(
+        name="Test Character",
+        race="Dwarf",
+        character_class="Cleric",
+        level=4,
+        ability_scores=AbilityScores(
+            strength=14,
+            dexterity=10,
+            constitution=16,
+            intelligence=10,
+            wisdom=16,
+            charisma=8
+        ),
+        max_hp=30,
+        current_hp=30
+    )
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture providing a SQLite store in a temporary directory."""
+    store = SqliteCharacterStore(tmp_path / "characters.db")
+    yield store
+    store.close()
+
+def test_uses_wal_mode(store):
+    """Test that the database is opened in WAL mode."""
+    mode = store._connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_indexes_created(store):
+    """Test that name/race/class/level are indexed."""
+    rows = store._connection().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'characters'"
+    ).fetchall()
+    assert {"idx_characters_name", "idx_characters_race", "idx_characters_class", "idx_characters_level",
+            "idx_characters_race_class", "idx_characters_race_class_level"} <= {row[0] for row in rows}
+
+def test_write_and_read(store, test_character):
+    """Test that a written character reads back unchanged."""
+    store.write(test_character.model_dump())
+    assert store.read(test_character.name).data == test_character.model_dump()
+
+def test_read_missing(store):
+    """Test that reading an absent character returns None."""
+    assert store.read("Nobody") is None
+
+def test_version_changes_with_content(store, test_character):
+    """Test that rewriting with new content changes the version."""
+    first = store.write(test_character.model_dump())
+    second = store.write(test_character.model_copy(update={"level": 5}).model_dump())
+    assert first != second and store.version(test_character.name) == second
+
+def test_write_many_and_list(store, test_character):
+    """Test that a batch write lists every character."""
+    store.write_many([
+        test_character.model_dump(),
+        test_character.model_copy(update={"name": "Other"}).model_dump(),
+    ])
+    assert sorted(store.list_names()) == ["Other", "Test Character"]
+
+def test_delete(store, test_character):
+    """Test that delete reports whether a row was removed."""
+    store.write(test_character.model_dump())
+    assert store.delete(test_character.name) and not store.delete(test_character.name)
+
+def test_indexed_columns_populated(store, test_character):
+    """Test that the indexed columns mirror the document."""
+    store.write(test_character.model_dump())
+    row = store._connection().execute(
+        "SELECT race, character_class, level FROM characters"
+    ).fetchone()
+    assert row == ("Dwarf", "Cleric", 4)
+
+def test_service_over_sqlite(store, test_character):
+    """Test that CharacterService works unchanged on the SQLite store."""
+    service = CharacterService(store=store)
+    service.save_character(test_character)
+    assert service.load_character(test_character.name) == test_character
+
+def test_service_over_sqlite_cache_hit(store, test_character):
+    """Test that repeat loads from SQLite are served from the cache."""
+    service = CharacterService(store=store)
+    service.save_character(test_character)
+    service.load_character(test_character.name)
+    service.load_character(test_character.name)
+    assert service.cache_stats()["hits"] == 1
+
+def test_service_save_dir_is_none_for_sqlite(store):
+    """Test that save_dir only applies to the JSON store."""
+    assert CharacterService(store=store).save_dir is None
+
+def test_patch_updates_document_in_place(store, test_character):
+    """Test that patch rewrites fields with json_set and rehashes the version."""
+    store.write(test_character.model_dump())
+    version = store.patch(test_character.name, {"current_hp": 12, "level": 5})
+    record = store.read(test_character.name)
+    assert record.data["current_hp"] == 12
+    assert record.version == version
+    row = store._connection().execute("SELECT level FROM characters").fetchone()
+    assert row[0] == 5
+
+def test_patch_missing(store):
+    """Test that patching a missing character returns None."""
+    assert store.patch("Nobody", {"current_hp": 1}) is None
+
+def test_read_many(store, test_character):
+    """Test that read_many returns the records found, keyed by requested name."""
+    store.write(test_character.model_dump())
+    records = store.read_many(["test character", "Nobody"])
+    assert list(records) == ["test character"]
+    assert records["test character"].data["name"] == test_character.name
+
+def test_patch_many(store, test_character):
+    """Test that patch_many updates several rows and reports missing ones."""
+    store.write(test_character.model_dump())
+    versions = store.patch_many({test_character.name: {"current_hp": 1}, "Nobody": {"current_hp": 1}})
+    assert versions["Nobody"] is None
+    assert versions[test_character.name] == store.version(test_character.name)
+    assert store.read(test_character.name).data["current_hp"] == 1
+
+def test_keys_are_collision_free(store, test_character):
+    """Test that names differing only in spaces and underscores get their own rows."""
+    store.write(test_character.model_copy(update={"name": "A B"}).model_dump())
+    store.write(test_character.model_copy(update={"name": "a_b"}).model_dump())
+    assert sorted(store.list_names()) == ["A B", "a_b"]
+
+def test_rows_under_old_keys_are_rekeyed(tmp_path, test_character):
+    """Test that upgrading a database moves rows to the escaped keys."""
+    store = SqliteCharacterStore(tmp_path / "characters.db")
+    store.write(test_character.model_copy(update={"name": "O'Brien"}).model_dump())
+    connection = store._connection()
+    connection.execute("UPDATE characters SET key = 'o''brien'")
+    connection.execute("PRAGMA user_version = 2")
+    connection.commit()
+    store.close()
+    store = SqliteCharacterStore(tmp_path / "characters.db")
+    assert store.read("O'Brien").data["name"] == "O'Brien"
+    store.close()
+
+def test_rekey_collisions_fail_the_migration(tmp_path, test_character):
+    """Test that rows whose new keys would collide are named and left where they are."""
+    store = SqliteCharacterStore(tmp_path / "characters.db")
+    store.write(test_character.model_copy(update={"name": "Aria"}).model_dump())
+    store.write(test_character.model_copy(update={"name": "O'Brien"}).model_dump())
+    connection = store._connection()
+    connection.execute("UPDATE characters SET key = 'aria_old', name = 'ARIA' WHERE key = 'aria'")
+    connection.execute("INSERT INTO characters SELECT 'aria', 'Aria', race, character_class, level, version, data "
+                       "FROM characters WHERE key = 'aria_old'")
+    connection.execute("UPDATE characters SET key = 'o''brien' WHERE name = 'O''Brien'")
+    connection.execute("PRAGMA user_version = 2")
+    connection.commit()
+    store.close()
+    with pytest.raises(ValueError, match="share one") as error:
+        SqliteCharacterStore(tmp_path / "characters.db")
+    assert "'ARIA' (key 'aria_old')" in str(error.value) and "'Aria' (key 'aria')" in str(error.value)
+    connection = sqlite3.connect(tmp_path / "characters.db")
+    assert connection.execute("PRAGMA user_version").fetchone()[0] == 2
+    assert sorted(row[0] for row in connection.execute("SELECT key FROM characters")) == ["aria", "aria_old", "o'brien"]
+    connection.close()
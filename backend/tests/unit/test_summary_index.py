@@ -0,0 +1,143 @@
+"""Unit tests for paginated summary queries on every storage backend."""
+import pytest
+from app.storage.event_log_store import EventLogCharacterStore
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from app.storage.summary_index import SummaryIndex, decode_cursor, encode_cursor, summarize
+
+RACES = ("Human", "Elf", "Dwarf")
+CLASSES = ("Fighter", "Wizard")
+
+def character_data(index):
+    """Build a stored character document."""
+    return {
+        "name": f"Hero {index:02d}",
+        "race": RACES[index % 3],
+        "character_class": CLASSES[index % 2],
+        "level": index % 5 + 1,
+        "ability_scores": {
+            "strength": 10, "dexterity": 10, "constitution": 10,
+            "intelligence": 10, "wisdom": 10, "charisma": 10
+        },
+        "max_hp": 10 + index,
+        "current_hp": 10,
+        "inventory": []
+    }
+
+@pytest.fixture(params=["json", "sqlite", "eventlog"])
+def store(request, tmp_path):
+    """Fixture providing each backend populated with 30 characters."""
+    if request.param == "json":
+        store = JsonCharacterStore(tmp_path)
+    elif request.param == "eventlog":
+        store = EventLogCharacterStore(tmp_path)
+    else:
+        store = SqliteCharacterStore(tmp_path / "characters.db")
+    for i in range(30):
+        store.write(character_data(i))
+    yield store
+    store.close()
+
+def collect(store, **query):
+    """Walk every page of a query and return the names in order."""
+    names, cursor = [], None
+    while True:
+        items, cursor = store.query_summaries(limit=7, cursor=cursor, **query)
+        names.extend(item["name"] for item in items)
+        if cursor is None:
+            return names
+
+def test_pages_cover_every_character_in_name_order(store):
+    """Test that paging by name returns each character exactly once, in order."""
+    assert collect(store, filters={}) == [f"Hero {i:02d}" for i in range(30)]
+
+def test_descending_name_order(store):
+    """Test that descending order reverses the listing."""
+    assert collect(store, filters={}, descending=True) == [f"Hero {i:02d}" for i in reversed(range(30))]
+
+def test_filter_by_race_and_class(store):
+    """Test that combined filters only return matching characters."""
+    expected = [f"Hero {i:02d}" for i in range(30) if i % 3 == 1 and i % 2 == 0]
+    assert collect(store, filters={"race": "Elf", "character_class": "Fighter"}) == expected
+
+def test_sort_by_level(store):
+    """Test that sorting by level orders by level, then by name."""
+    expected = [f"Hero {i:02d}" for i in sorted(range(30), key=lambda i: (i % 5, i))]
+    assert collect(store, filters={}, sort="level") == expected
+
+def test_sort_by_level_descending_with_filter(store):
+    """Test a filtered, descending level sort across pages."""
+    matching = [i for i in range(30) if i % 2 == 1]
+    expected = [f"Hero {i:02d}" for i in sorted(matching, key=lambda i: (i % 5, i), reverse=True)]
+    assert collect(store, filters={"character_class": "Wizard"}, sort="level", descending=True) == expected
+
+def test_unknown_filter_value_returns_empty_page(store):
+    """Test that a filter value with no matches returns no rows and no cursor."""
+    assert store.query_summaries({"race": "Orc"}) == ([], None)
+
+def test_summary_fields(store):
+    """Test that rows carry the summary fields."""
+    items, _ = store.query_summaries({"level": 1}, limit=1)
+    assert items[0] == {"name": "Hero 00", "race": "Human", "character_class": "Fighter",
+                        "level": 1, "max_hp": 10, "current_hp": 10}
+
+def test_delete_removes_from_pages(store):
+    """Test that deleted characters disappear from the indexes."""
+    store.delete("Hero 03")
+    assert "Hero 03" not in collect(store, filters={"race": "Human"})
+
+def test_rewrite_moves_between_buckets(store):
+    """Test that changing a filtered field moves the character between buckets."""
+    data = character_data(0)
+    data["race"] = "Elf"
+    store.write(data)
+    assert "Hero 00" in collect(store, filters={"race": "Elf"}) and "Hero 00" not in collect(store, filters={"race": "Human"})
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "NQ==", "eyJhIjogMX0=", "bnVsbA=="])
+def test_invalid_cursor_rejected(store, cursor):
+    """Test that a malformed cursor, or valid JSON that is not a list, raises ValueError."""
+    with pytest.raises(ValueError):
+        store.query_summaries({}, cursor=cursor)
+
+def test_cursor_for_other_sort_rejected():
+    """Test that a name cursor cannot be used for a level sort."""
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(("hero_01",)), "level")
+
+def test_summarize_rejects_incomplete_documents():
+    """Test that documents missing summary fields are rejected."""
+    with pytest.raises(ValueError):
+        summarize({"name": "Broken"})
+
+def test_summary_index_remove_unknown_key():
+    """Test that removing an unknown key is a no-op."""
+    index = SummaryIndex()
+    index.remove("missing")
+    assert len(index) == 0
+
+def test_build_matches_incremental_adds():
+    """Test that bulk-building the index answers queries like adding summaries one by one."""
+    summaries = {f"hero_{i:02d}": summarize(character_data(i)) for i in range(30)}
+    built, added = SummaryIndex.build(summaries), SummaryIndex()
+    for key, summary in summaries.items():
+        added.add(key, summary)
+    for filters, sort in [({}, "name"), ({"race": "Elf"}, "level"), ({"level": 2, "character_class": "Wizard"}, "name")]:
+        assert built.query(filters, sort, limit=100) == added.query(filters, sort, limit=100)
+
+def test_multi_filter_pages_only_touch_matching_rows():
+    """Test that a page over several filters reads only its own rows, however large the broader buckets are."""
+    class CountingDict(dict):
+        reads = 0
+        def __getitem__(self, key):
+            CountingDict.reads += 1
+            return super().__getitem__(key)
+    summaries = {f"hero_{i:05d}": summarize({**character_data(i), "name": f"Hero {i:05d}", "race": "Human"})
+                 for i in range(5000)}
+    index = SummaryIndex.build(summaries)
+    index._summaries = CountingDict(index._summaries)
+    items, cursor = index.query({"race": "Human", "character_class": "Wizard", "level": 5}, "name", limit=3)
+    assert [item["name"] for item in items] == ["Hero 00009", "Hero 00019", "Hero 00029"]
+    assert CountingDict.reads == 3
+    items, _ = index.query({"character_class": "Wizard", "race": "Human"}, "level", descending=True, limit=2)
+    assert [(item["level"], item["name"]) for item in items] == [(5, "Hero 04999"), (5, "Hero 04989")]
+    assert CountingDict.reads == 5
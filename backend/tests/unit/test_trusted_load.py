@@ -0,0 +1,118 @@
+"""Unit tests for stamped JSON records and the trusted, non-validating load path."""
+import json
+import pytest
+from pydantic import ValidationError
+from app.models.character import AbilityScores, Character, InventoryItem, validate_trusted
+from app.services.character_service import CharacterService
+from app.storage import json_store
+from app.storage.encoding import STAMP_FIELD, decode_document
+from app.storage.json_store import JsonCharacterStore
+from app.storage.write_behind import WriteBehindStore
+
+def make_character(name: str, items: int = 3) -> Character:
+    return Character(
+        name=name,
+        race="Dwarf",
+        character_class="Cleric",
+        level=4,
+        ability_scores=AbilityScores(strength=14, dexterity=10, constitution=16,
+                                     intelligence=8, wisdom=15, charisma=12),
+        max_hp=30,
+        current_hp=30,
+        inventory=[InventoryItem(name=f"Item {i}", quantity=i, description=None if i % 2 else "Shiny")
+                   for i in range(items)],
+    )
+
+@pytest.fixture
+def service(tmp_path):
+    """Fixture providing a service over a fresh JSON store."""
+    return CharacterService(store=JsonCharacterStore(tmp_path))
+
+def edit_file(path, **fields):
+    """Change fields of a stored file by hand, leaving its stamp in place."""
+    data = json.loads(path.read_bytes())
+    data.update(fields)
+    path.write_text(json.dumps(data, indent=4))
+
+@pytest.mark.parametrize("items", [0, 1, 5])
+def test_validate_trusted_matches_validation(items):
+    """Test that the trusted path builds exactly the models lax validation builds."""
+    data = json.loads(json.dumps(make_character("Brom", items).model_dump()))
+    trusted, validated = validate_trusted(json.loads(json.dumps(data))), Character(**data)
+    assert trusted == validated
+    assert trusted.model_dump() == validated.model_dump() == data
+    assert trusted.model_fields_set == validated.model_fields_set
+    assert trusted.ability_scores.model_fields_set == validated.ability_scores.model_fields_set
+    assert [item.model_fields_set for item in trusted.inventory] == [item.model_fields_set for item in validated.inventory]
+    assert all(isinstance(item, InventoryItem) for item in trusted.inventory)
+    assert isinstance(trusted.ability_scores, AbilityScores)
+
+def test_validate_trusted_rejects_documents_that_are_not_model_dump_output():
+    """Test that a document needing coercion or breaking a constraint fails on the trusted path."""
+    data = make_character("Brom").model_dump()
+    with pytest.raises(ValidationError):
+        validate_trusted({**data, "level": "4"})
+    with pytest.raises(ValidationError):
+        validate_trusted({**data, "level": 99})
+
+def test_written_files_are_stamped_and_trusted(service):
+    """Test that service writes carry a stamp that makes the next read trusted."""
+    service.save_character(make_character("Brom"))
+    path = service.store.path_for("Brom")
+    _, body, stamp = decode_document(path.read_bytes())
+    record = service.store.read("Brom")
+    assert stamp is not None and record.trusted and STAMP_FIELD not in record.data
+    assert record.version == service.store.version_for(record.data) == service.get_etag("Brom")
+    assert json.loads(body) == record.data
+    service._cache.clear()
+    assert service.load_character("Brom") == make_character("Brom")
+
+def test_hand_edited_files_are_validated(service, capsys):
+    """Test that a file edited after it was stamped is read untrusted and fully validated."""
+    service.save_character(make_character("Brom"))
+    edit_file(service.store.path_for("Brom"), level=99)
+    assert service.store.read("Brom").trusted is False
+    assert service.load_character("Brom") is None
+    assert "validation error" in capsys.readouterr().out
+
+def test_trusted_records_strict_validation_rejects_fall_back_to_lax(service):
+    """Test that a stamped record only lax validation accepts still loads."""
+    service.store.write({**make_character("Brom").model_dump(), "level": 4.0})
+    assert service.store.read("Brom").trusted
+    character = service.load_character("Brom")
+    assert character == make_character("Brom") and isinstance(character.level, int)
+
+def test_legacy_and_other_schema_files_are_validated(service, tmp_path, monkeypatch):
+    """Test that unstamped flat files and stamps of another schema version are not trusted."""
+    (tmp_path / "old.json").write_text(json.dumps(make_character("Old").model_dump(), indent=4))
+    assert service.store.read("Old").trusted is False
+    service.save_character(make_character("Brom"))
+    monkeypatch.setattr(json_store, "SCHEMA_VERSION", 2)
+    assert service.store.read("Brom").trusted is False
+
+def test_patches_keep_the_stamp_only_of_trusted_records(service):
+    """Test that patching an untrusted record writes it without a stamp."""
+    service.save_character(make_character("Brom"))
+    service.save_character(make_character("Edited"))
+    edit_file(service.store.path_for("Edited"), max_hp=31)
+    assert service.patch_character("Brom", {"current_hp": 5}).trusted
+    assert service.patch_character("Edited", {"current_hp": 5}).trusted is False
+    assert service.store.read("Brom").trusted
+    record = service.store.read("Edited")
+    assert record.trusted is False and record.data["max_hp"] == 31 and record.data["current_hp"] == 5
+
+def test_write_behind_keeps_patches_of_untrusted_records_unstamped(tmp_path):
+    """Test that buffered patches carry the trust of the record they patched through a flush."""
+    inner = JsonCharacterStore(tmp_path)
+    inner.write(make_character("Brom").model_dump())
+    inner.write(make_character("Edited").model_dump())
+    edit_file(inner.path_for("Edited"), max_hp=31)
+    store = WriteBehindStore(inner, flush_interval=60)
+    try:
+        versions = store.patch_many({"Brom": {"current_hp": 1}, "Edited": {"current_hp": 2}})
+        assert store.read("Brom").trusted and store.read("Edited").trusted is False
+        assert store.flush() == 2
+        assert inner.read("Brom").trusted and inner.read("Edited").trusted is False
+        assert {name: inner.version(name) for name in versions} == versions
+    finally:
+        store.close()
@@ -0,0 +1,174 @@
+"""Unit tests for the file watchers and for applying out-of-band edits to the JSON store and service."""
+import json
+import os
+import time
+import pytest
+from app.models.character import AbilityScores, Character
+from app.services.character_service import CharacterService
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from app.storage.watcher import InotifyWatcher, PollingWatcher, watch_directory
+
+def make_character(name: str, level: int = 1) -> Character:
+    return Character(
+        name=name,
+        race="Human",
+        character_class="Fighter",
+        level=level,
+        ability_scores=AbilityScores(strength=10, dexterity=10, constitution=10,
+                                     intelligence=10, wisdom=10, charisma=10),
+        max_hp=10,
+        current_hp=10,
+    )
+
+class Batches:
+    """Collects the batches a watcher delivers."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, paths):
+        self.batches.append(paths)
+
+    def paths(self):
+        return set().union(*(batch for batch in self.batches if batch is not None))
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+def start_inotify(root, on_change, debounce=0.05):
+    try:
+        return InotifyWatcher(str(root), 2, on_change, debounce).start()
+    except OSError as e:
+        pytest.skip(f"inotify unavailable: {e}")
+
+def test_inotify_reports_added_edited_and_deleted_files(tmp_path):
+    """Test that inotify reports files written into new subdirectories, edited and deleted."""
+    batches = Batches()
+    watcher = start_inotify(tmp_path, batches)
+    try:
+        target = tmp_path / "ab" / "cd" / "hero.json"
+        target.parent.mkdir(parents=True)
+        target.write_text("{}")
+        (tmp_path / "notes.txt").write_text("ignored")
+        assert wait_for(lambda: str(target) in batches.paths())
+        assert all(path.endswith(".json") for path in batches.paths())
+        batches.batches.clear()
+        target.unlink()
+        assert wait_for(lambda: str(target) in batches.paths())
+    finally:
+        watcher.stop()
+
+def test_polling_reports_added_modified_and_deleted_files(tmp_path):
+    """Test that polling notices files appearing, changing size and disappearing."""
+    existing = tmp_path / "old.json"
+    existing.write_text("{}")
+    batches = Batches()
+    watcher = PollingWatcher(str(tmp_path), 2, batches, debounce=0.01, poll_interval=0.05).start()
+    try:
+        added = tmp_path / "ab" / "new.json"
+        added.parent.mkdir()
+        added.write_text("{}")
+        existing.write_text('{"changed": true}')
+        assert wait_for(lambda: {str(added), str(existing)} <= batches.paths())
+        batches.batches.clear()
+        added.unlink()
+        assert wait_for(lambda: str(added) in batches.paths())
+    finally:
+        watcher.stop()
+
+def test_bulk_changes_are_coalesced(tmp_path):
+    """Test that a burst of writes is delivered as a few batches, each path once."""
+    batches = Batches()
+    watcher = start_inotify(tmp_path, batches, debounce=0.2)
+    try:
+        paths = {str(tmp_path / f"c{i}.json") for i in range(300)}
+        for path in sorted(paths):
+            with open(path, "w") as f:
+                f.write("{}")
+        for path in sorted(paths):
+            with open(path, "w") as f:
+                f.write("[]")
+        assert wait_for(lambda: batches.paths() == paths)
+        assert len(batches.batches) <= 3
+    finally:
+        watcher.stop()
+
+def test_watch_directory_polls_when_asked(tmp_path):
+    """Test that poll mode never tries inotify."""
+    watcher = watch_directory(str(tmp_path), 2, Batches(), mode="poll", poll_interval=0.05)
+    try:
+        assert isinstance(watcher, PollingWatcher)
+    finally:
+        watcher.stop()
+
+def test_watcher_survives_callback_errors(tmp_path, capsys):
+    """Test that an exception in the callback is reported and later batches still arrive."""
+    batches = Batches()
+
+    def failing(paths):
+        batches(paths)
+        raise RuntimeError("boom")
+
+    watcher = PollingWatcher(str(tmp_path), 0, failing, debounce=0.01, poll_interval=0.05).start()
+    try:
+        (tmp_path / "a.json").write_text("{}")
+        assert wait_for(lambda: len(batches.batches) == 1)
+        (tmp_path / "b.json").write_text("{}")
+        assert wait_for(lambda: len(batches.batches) == 2)
+    finally:
+        watcher.stop()
+    assert "boom" in capsys.readouterr().out
+
+def test_refresh_files_applies_out_of_band_edits(tmp_path):
+    """Test that refresh_files re-indexes edited, deleted and dropped-in files only."""
+    store = JsonCharacterStore(tmp_path)
+    store.write(make_character("Edited").model_dump())
+    store.write(make_character("Removed").model_dump())
+    store.write(make_character("Untouched").model_dump())
+    generation = store.generation()
+
+    edited = store.path_for("Edited")
+    edited.write_text(json.dumps(make_character("Edited", level=7).model_dump()))
+    store.path_for("Removed").unlink()
+    dropped = tmp_path / "dropped.json"
+    dropped.write_text(json.dumps(make_character("Dropped", level=3).model_dump()))
+
+    keys = store.refresh_files([str(edited), str(store.path_for("Removed")), str(dropped),
+                                str(store.path_for("Untouched"))])
+    assert keys == ["dropped", "edited", "removed"]
+    assert store.generation() == generation + 1
+    summaries, _ = store.query_summaries({})
+    assert {(s["name"], s["level"]) for s in summaries} == {("Dropped", 3), ("Edited", 7), ("Untouched", 1)}
+    assert store.read("Dropped").data["level"] == 3
+    # Files the store wrote itself are recognized by their stat and not re-read
+    store.write(make_character("Untouched", level=2).model_dump())
+    assert store.refresh_files([str(store.path_for("Untouched"))]) == []
+
+def test_service_follows_out_of_band_edits(tmp_path):
+    """Test that a watching service lists and loads characters edited outside the API."""
+    service = CharacterService(store=JsonCharacterStore(tmp_path))
+    service.save_character(make_character("Hero"))
+    assert service.load_character("Hero").level == 1
+    assert service.start_watching(mode="poll", debounce=0.01, poll_interval=0.05)
+    try:
+        path = service.store.path_for("Hero")
+        path.write_text(json.dumps(make_character("Hero", level=9).model_dump()))
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        # An edit inside a shard leaves the root untouched, so only the watcher can notice it
+        assert wait_for(lambda: service.list_character_summaries().items[0].level == 9)
+        assert service.load_character("Hero").level == 9
+    finally:
+        service.close()
+    assert service.store._watcher is None
+
+def test_start_watching_unsupported_store(tmp_path):
+    """Test that stores without watch support report it instead of failing."""
+    service = CharacterService(store=SqliteCharacterStore(tmp_path / "characters.db"))
+    assert service.start_watching() is False
+    service.stop_watching()
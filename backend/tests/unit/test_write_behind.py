@@ -0,0 +1,187 @@
+"""Unit tests for the write-behind store and CharacterService in write-behind mode."""
+import threading
+import time
+import pytest
+from app.models.character import AbilityScores, Character
+from app.services.character_service import CharacterService
+from app.storage.event_log_store import EventLogCharacterStore
+from app.storage.json_store import JsonCharacterStore
+from app.storage.sqlite_store import SqliteCharacterStore
+from app.storage.write_behind import FAILED_FLUSHES, WriteBehindStore
+
+def make_character(name: str, level: int = 1) -> Character:
+    return Character(
+        name=name,
+        race="Human",
+        character_class="Fighter",
+        level=level,
+        ability_scores=AbilityScores(strength=10, dexterity=10, constitution=10,
+                                     intelligence=10, wisdom=10, charisma=10),
+        max_hp=10,
+        current_hp=10,
+    )
+
+class CountingStore(JsonCharacterStore):
+    """JSON store that records each write_many batch and can be made to fail."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.batches = []
+        self.fail = False
+
+    def write_many(self, characters_data):
+        if self.fail:
+            raise OSError("disk full")
+        characters_data = list(characters_data)
+        self.batches.append([data["name"] for data in characters_data])
+        return super().write_many(characters_data)
+
+@pytest.fixture
+def inner(tmp_path):
+    """Fixture providing the store the write-behind buffer flushes into."""
+    (tmp_path / "characters").mkdir()
+    return CountingStore(tmp_path / "characters")
+
+@pytest.fixture
+def store(inner):
+    """Fixture providing a write-behind store whose flusher never fires on its own."""
+    store = WriteBehindStore(inner, flush_interval=60)
+    yield store
+    store.close()
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "eventlog"])
+def test_version_for_matches_write(tmp_path, backend):
+    """Test that every backend predicts the version its write returns."""
+    stores = {
+        "json": lambda: JsonCharacterStore(tmp_path / "characters"),
+        "sqlite": lambda: SqliteCharacterStore(tmp_path / "c.db"),
+        "eventlog": lambda: EventLogCharacterStore(tmp_path / "logs"),
+    }
+    (tmp_path / "characters").mkdir()
+    (tmp_path / "logs").mkdir()
+    backing = stores[backend]()
+    first = make_character("Aria").model_dump()
+    second = make_character("Aria", level=4).model_dump()
+    assert backing.version_for(first) == backing.write(first)
+    assert backing.version_for(second) == backing.write(second)
+    backing.sync(["Aria", "Nobody"])
+    backing.close()
+
+def test_reads_see_buffered_write(store, inner):
+    """Test that a buffered save is visible before it reaches the wrapped store."""
+    data = make_character("Aria", level=3).model_dump()
+    version = store.write(data)
+    assert inner.read("Aria") is None
+    assert store.version("Aria") == version
+    assert store.read("Aria").data == data
+    assert store.read_many(["Aria", "Nobody"])["Aria"].version == version
+
+def test_repeated_saves_coalesce_into_one_group(store, inner):
+    """Test that saves of the same character collapse and flush as one batch."""
+    for level in range(1, 6):
+        store.write(make_character("Aria", level).model_dump())
+    store.write(make_character("Brom").model_dump())
+    assert store.flush() == 2
+    assert inner.batches == [["Aria", "Brom"]]
+    assert inner.read("Aria").data["level"] == 5
+    assert store.stats()["coalesced"] == 4
+
+def test_flushed_version_matches_buffered_version(store, inner):
+    """Test that the ETag handed out for a buffered save survives the flush."""
+    version = store.write(make_character("Aria").model_dump())
+    store.flush()
+    assert inner.version("Aria") == version == store.version("Aria")
+
+def test_buffered_delete(store, inner):
+    """Test that deletes are buffered and hide the stored character."""
+    inner.write(make_character("Aria").model_dump())
+    assert store.delete("Aria")
+    assert store.read("Aria") is None and store.version("Aria") is None
+    assert not store.delete("Aria")
+    store.flush()
+    assert inner.read("Aria") is None
+
+def test_listing_flushes_first(store, inner):
+    """Test that listings and summary queries include buffered saves."""
+    store.write(make_character("Aria").model_dump())
+    assert store.list_names() == ["Aria"]
+    store.write(make_character("Brom").model_dump())
+    items, _ = store.query_summaries({})
+    assert [item["name"] for item in items] == ["Aria", "Brom"]
+
+def test_failed_flush_keeps_changes(store, inner):
+    """Test that a failed group stays buffered unless it was saved again."""
+    store.write(make_character("Aria").model_dump())
+    store.write(make_character("Brom").model_dump())
+    inner.fail = True
+    with pytest.raises(OSError):
+        store.flush()
+    store.write(make_character("Aria", level=9).model_dump())
+    assert store.stats()["pending"] == 2
+    inner.fail = False
+    assert store.flush() == 2
+    assert inner.read("Aria").data["level"] == 9 and inner.read("Brom") is not None
+
+def test_flusher_gives_up_after_max_retries(inner):
+    """Test that a failing store is retried a bounded number of times and then fails saves."""
+    store = WriteBehindStore(inner, flush_interval=0.01, max_retries=3)
+    failed = FAILED_FLUSHES.value()
+    inner.fail = True
+    store.write(make_character("Aria").model_dump())
+    deadline = time.monotonic() + 5
+    while not store.stats()["retries_exhausted"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    stats = store.stats()
+    assert stats["failed_flushes"] == stats["consecutive_failures"] == 3
+    assert stats["last_error"] == "OSError: disk full"
+    assert FAILED_FLUSHES.value() - failed == 3
+    with pytest.raises(OSError):
+        store.write(make_character("Brom").model_dump())
+    assert store.stats()["pending"] == 1
+    inner.fail = False
+    assert store.flush() == 1
+    assert store.stats()["consecutive_failures"] == 0 and store.stats()["last_error"] is None
+    store.write(make_character("Brom").model_dump())
+    store.close()
+    assert inner.read("Aria") is not None and inner.read("Brom") is not None
+
+def test_flusher_thread_writes_after_interval(inner):
+    """Test that the background thread flushes without being asked."""
+    store = WriteBehindStore(inner, flush_interval=0.01, fsync="batch")
+    flushed = threading.Event()
+    write_many = inner.write_many
+    inner.write_many = lambda data: (write_many(data), flushed.set())[0]
+    store.write(make_character("Aria").model_dump())
+    assert flushed.wait(5)
+    store.close()
+    assert inner.read("Aria") is not None
+
+def test_full_batch_flushes_early(inner):
+    """Test that reaching max_batch wakes the flusher before the interval ends."""
+    store = WriteBehindStore(inner, flush_interval=60, max_batch=2)
+    flushed = threading.Event()
+    write_many = inner.write_many
+    inner.write_many = lambda data: (write_many(data), flushed.set())[0]
+    store.write(make_character("Aria").model_dump())
+    store.write(make_character("Brom").model_dump())
+    assert flushed.wait(5)
+    store.close()
+
+def test_close_flushes_pending_writes(inner):
+    """Test that closing the store writes out whatever is still buffered."""
+    store = WriteBehindStore(inner, flush_interval=60)
+    store.write(make_character("Aria").model_dump())
+    store.close()
+    assert inner.read("Aria") is not None
+
+def test_service_in_write_behind_mode(store, inner):
+    """Test that the service reads its own buffered saves and flushes on request."""
+    service = CharacterService(store=store)
+    assert service.save_character(make_character("Aria", level=2))
+    record = service.patch_character("Aria", {"current_hp": 4})
+    assert service.get_etag("Aria") == record.version
+    assert service.load_character("Aria").current_hp == 4
+    assert inner.read("Aria") is None
+    assert service.flush() == 1
+    assert inner.read("Aria").data["current_hp"] == 4
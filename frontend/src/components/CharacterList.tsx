@@ -25,15 +25,18 @@ import MenuBookIcon from '@mui/icons-material/MenuBook';
 import { useNavigate } from 'react-router-dom';
 import { motion, AnimatePresence } from 'framer-motion';
 import { characterApi } from '../services/api';
+import { CharacterSummary } from '../types/character';
 
 interface CharacterListProps {
     characters: string[];
+    summaries?: Record<string, CharacterSummary>;
     onCharacterDeleted?: () => void;
     onCharacterImported?: () => void;
 }
 
 export const CharacterList: React.FC<CharacterListProps> = ({ 
     characters,
+    summaries,
     onCharacterDeleted,
     onCharacterImported
 }) => {
@@ -228,6 +231,11 @@ export const CharacterList: React.FC<CharacterListProps> = ({
                                                     {name}
                                                 </Typography>
                                             }
+                                            secondary={summaries?.[name] && (
+                                                `Level ${summaries[name].level} ${summaries[name].race} ` +
+                                                `${summaries[name].character_class} · ` +
+                                                `HP ${summaries[name].current_hp}/${summaries[name].max_hp}`
+                                            )}
                                         />
                                         <ListItemSecondaryAction>
                                             <Tooltip title="Export Character">
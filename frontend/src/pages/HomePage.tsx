@@ -4,22 +4,34 @@ import { useNavigate } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { CharacterList } from '../components/CharacterList';
 import { characterApi } from '../services/api';
+import { CharacterSummary } from '../types/character';
 import AddIcon from '@mui/icons-material/Add';
 
 export const HomePage: React.FC = () => {
     const navigate = useNavigate();
     const [characters, setCharacters] = useState<string[]>([]);
+    const [summaries, setSummaries] = useState<Record<string, CharacterSummary>>({});
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         loadCharacters();
     }, []);
 
+    const showPage = (rows: CharacterSummary[], cursor: string | null, append: boolean) => {
+        const names = rows.map(row => row.name);
+        const entries = Object.fromEntries(rows.map(row => [row.name, row]));
+        setCharacters(previous => append ? [...previous, ...names] : names);
+        setSummaries(previous => append ? { ...previous, ...entries } : entries);
+        setNextCursor(cursor);
+    };
+
     const loadCharacters = async () => {
         try {
             setLoading(true);
-            const characterList = await characterApi.listCharacters();
-            setCharacters(characterList);
+            const page = await characterApi.listCharacterSummaries();
+            showPage(page.items, page.next_cursor, false);
         } catch (error) {
             console.error('Error loading characters:', error);
         } finally {
@@ -27,6 +39,19 @@ export const HomePage: React.FC = () => {
         }
     };
 
+    const loadMoreCharacters = async () => {
+        if (!nextCursor) return;
+        try {
+            setLoadingMore(true);
+            const page = await characterApi.listCharacterSummaries({ cursor: nextCursor });
+            showPage(page.items, page.next_cursor, true);
+        } catch (error) {
+            console.error('Error loading characters:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleCharacterDeleted = () => {
         loadCharacters();
     };
@@ -132,11 +157,28 @@ export const HomePage: React.FC = () => {
                             <div className="loading-spinner" />
                         </Box>
                     ) : (
-                        <CharacterList 
-                            characters={characters} 
-                            onCharacterDeleted={handleCharacterDeleted}
-                            onCharacterImported={handleCharacterDeleted}
-                        />
+                        <>
+                            <CharacterList 
+                                characters={characters} 
+                                summaries={summaries}
+                                onCharacterDeleted={handleCharacterDeleted}
+                                onCharacterImported={handleCharacterDeleted}
+                            />
+                            {nextCursor && (
+                                <Box sx={{ display: 'flex', justifyContent: 'center', mt: 3 }}>
+                                    <Button
+                                        variant="outlined"
+                                        color="primary"
+                                        onClick={loadMoreCharacters}
+                                        disabled={loadingMore}
+                                        className="fantasy-button"
+                                        sx={{ fontFamily: '"Merriweather", serif' }}
+                                    >
+                                        {loadingMore ? 'Loading...' : 'Load More Characters'}
+                                    </Button>
+                                </Box>
+                            )}
+                        </>
                     )}
                 </motion.div>
             </Container>
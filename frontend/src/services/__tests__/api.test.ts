@@ -90,6 +90,31 @@ describe('characterApi', () => {
         });
     });
 
+    describe('listCharacterSummaries', () => {
+        it('requests a page with filters', async () => {
+            const mockPage = {
+                items: [{
+                    name: 'Test Character',
+                    race: 'Human',
+                    character_class: 'Fighter',
+                    level: 1,
+                    max_hp: 10,
+                    current_hp: 10
+                }],
+                next_cursor: null
+            };
+            mockedAxios.get.mockResolvedValueOnce({ data: mockPage });
+
+            const result = await characterApi.listCharacterSummaries({ race: 'Human' });
+
+            expect(result).toEqual(mockPage);
+            expect(mockedAxios.get).toHaveBeenCalledWith(
+                'http://localhost:8000/characters/summaries',
+                { params: { limit: 50, race: 'Human' } }
+            );
+        });
+    });
+
     describe('updateCharacter', () => {
         it('updates a character successfully', async () => {
             mockedAxios.put.mockResolvedValueOnce({ data: true });
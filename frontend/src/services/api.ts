@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Character } from '../types/character';
+import { Character, CharacterPage, CharacterQuery } from '../types/character';
 
 const API_URL = 'http://localhost:8000';
 
@@ -19,6 +19,13 @@ export const characterApi = {
         return response.data;
     },
 
+    async listCharacterSummaries(query: CharacterQuery = {}): Promise<CharacterPage> {
+        const response = await axios.get(`${API_URL}/characters/summaries`, {
+            params: { limit: 50, ...query }
+        });
+        return response.data;
+    },
+
     async updateCharacter(name: string, character: Character): Promise<boolean> {
         const response = await axios.put(`${API_URL}/characters/${name}`, character);
         return response.data;
@@ -22,4 +22,28 @@ export interface Character {
     max_hp: number;
     current_hp: number;
     inventory: InventoryItem[];
-} 
\ No newline at end of file
+} 
+
+export interface CharacterSummary {
+    name: string;
+    race: string;
+    character_class: string;
+    level: number;
+    max_hp: number;
+    current_hp: number;
+}
+
+export interface CharacterPage {
+    items: CharacterSummary[];
+    next_cursor: string | null;
+}
+
+export interface CharacterQuery {
+    limit?: number;
+    cursor?: string;
+    race?: string;
+    character_class?: string;
+    level?: number;
+    sort?: 'name' | 'level';
+    order?: 'asc' | 'desc';
+}